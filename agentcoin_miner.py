@@ -6,6 +6,8 @@ from datetime import datetime
 from web3 import Web3
 from eth_account import Account
 
+from onchain import get_chain
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,49 +42,33 @@ def get_web3():
         return None
     return w3
 
-def check_bnb_balance(w3, address):
-    """Check BNB balance"""
+def check_bnb_balance(address):
+    """Check BNB balance (batched JSON-RPC client shared across checks)"""
     try:
-        balance_wei = w3.eth.get_balance(address)
-        balance_bnb = w3.from_wei(balance_wei, 'ether')
-        return float(balance_bnb)
+        wei = get_chain('bsc').raw_balances([address])[address]['native']
+        return wei / 1e18 if wei is not None else None
     except Exception as e:
         logger.error(f"Error checking BNB balance: {e}")
         return None
 
-def check_agc_balance(w3, address):
-    """Check AGC token balance"""
-    # Standard ERC20 balanceOf function signature
-    erc20_abi = [
-        {
-            "constant": True,
-            "inputs": [{"name": "_owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "balance", "type": "uint256"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [],
-            "name": "decimals",
-            "outputs": [{"name": "", "type": "uint8"}],
-            "type": "function"
-        }
-    ]
-    
+def check_agc_balance(address):
+    """Check AGC token balance (balanceOf via Multicall3, decimals cached)"""
     # AgentCoin contract address (need to find correct one)
     agc_contracts_to_try = [
         "0x0000000000000000000000000000000000000000",  # Placeholder - will be updated
     ]
     
+    chain = get_chain('bsc')
+    try:
+        meta = chain.token_meta(agc_contracts_to_try)
+        raw = chain.raw_balances([address], list(meta), native=False)[address]
+    except Exception as e:
+        logger.error(f"Error checking AGC balance: {e}")
+        return None
+    
     for contract_addr in agc_contracts_to_try:
-        try:
-            contract = w3.eth.contract(address=Web3.to_checksum_address(contract_addr), abi=erc20_abi)
-            balance = contract.functions.balanceOf(address).call()
-            decimals = contract.functions.decimals().call()
-            return balance / (10 ** decimals)
-        except:
-            continue
+        if contract_addr in meta and raw.get(contract_addr) is not None:
+            return raw[contract_addr] / (10 ** meta[contract_addr]['decimals'])
     
     return None
 
@@ -136,14 +122,14 @@ def main():
     logger.info(f"Account loaded: {account.address}")
     
     # Check initial balances
-    bnb_balance = check_bnb_balance(w3, account.address)
+    bnb_balance = check_bnb_balance(account.address)
     logger.info(f"Current BNB Balance: {bnb_balance:.6f} BNB")
     
     if bnb_balance < MIN_BNB_THRESHOLD:
         logger.warning(f"⚠️ BNB balance ({bnb_balance:.6f}) is below threshold ({MIN_BNB_THRESHOLD})!")
         logger.warning("Please recharge BNB for gas fees.")
     
-    agc_balance = check_agc_balance(w3, account.address)
+    agc_balance = check_agc_balance(account.address)
     if agc_balance is not None:
         logger.info(f"Current AGC Balance: {agc_balance:.6f} AGC")
     else:
@@ -154,7 +140,7 @@ def main():
     while True:
         try:
             # Re-check BNB balance periodically
-            bnb_balance = check_bnb_balance(w3, account.address)
+            bnb_balance = check_bnb_balance(account.address)
             
             if bnb_balance < MIN_BNB_THRESHOLD:
                 logger.warning(f"⚠️ BNB balance ({bnb_balance:.6f}) is below threshold ({MIN_BNB_THRESHOLD})!")
@@ -172,7 +158,7 @@ def main():
             
             if success:
                 # Update AGC balance
-                agc_balance = check_agc_balance(w3, account.address)
+                agc_balance = check_agc_balance(account.address)
                 if agc_balance is not None:
                     logger.info(f"Updated AGC Balance: {agc_balance:.6f} AGC")
             
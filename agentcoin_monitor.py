@@ -4,6 +4,8 @@ import json
 import logging
 from datetime import datetime
 from web3 import Web3
+
+from onchain import get_chain
 from eth_account import Account
 
 # Setup logging
@@ -59,27 +61,25 @@ def get_web3():
         return None
     return w3
 
-def check_balances(w3, wallet_address):
-    """Check BNB and AGC balances"""
-    results = {}
-    
-    # Check BNB balance
+def check_balances(wallet_address):
+    """Check BNB and AGC balances (one batched on-chain read, decimals cached)"""
+    results = {'bnb': None, 'agc': None}
+    chain = get_chain('bsc')
     try:
-        balance_wei = w3.eth.get_balance(wallet_address)
-        results['bnb'] = float(w3.from_wei(balance_wei, 'ether'))
+        meta = chain.token_meta([AGC_TOKEN]).get(AGC_TOKEN)
+        raw = chain.raw_balances([wallet_address], [AGC_TOKEN] if meta else [])[wallet_address]
     except Exception as e:
-        logger.error(f"Error checking BNB balance: {e}")
-        results['bnb'] = None
+        logger.error(f"Error checking balances: {e}")
+        return results
     
-    # Check AGC balance
-    try:
-        agc_contract = w3.eth.contract(address=AGC_TOKEN, abi=ERC20_ABI)
-        balance = agc_contract.functions.balanceOf(wallet_address).call()
-        decimals = agc_contract.functions.decimals().call()
-        results['agc'] = balance / (10 ** decimals)
-    except Exception as e:
-        logger.error(f"Error checking AGC balance: {e}")
-        results['agc'] = None
+    if raw.get('native') is not None:
+        results['bnb'] = raw['native'] / 1e18
+    else:
+        logger.error("Error checking BNB balance")
+    if meta and raw.get(AGC_TOKEN) is not None:
+        results['agc'] = raw[AGC_TOKEN] / (10 ** meta['decimals'])
+    else:
+        logger.error("Error checking AGC balance")
     
     return results
 
@@ -177,7 +177,7 @@ def main():
     
     # Single status check (for cron job)
     logger.info("Checking status...")
-    balances = check_balances(w3, WALLET_ADDRESS)
+    balances = check_balances(WALLET_ADDRESS)
     mining_status = check_mining_status(w3, WALLET_ADDRESS)
     print_status_report(balances, mining_status)
     
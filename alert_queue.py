@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+🚦 推送告警队列 - 各监控脚本的提醒统一从这里发
+以前 clanker / 马斯克 / POW / Twitter 推送同时触发时，用户一下子收到一串消息。现在：
+- 优先级: high (关键词命中等) 立即发送，插队；normal 等一个合并窗口；low 攒成摘要
+- 合并窗口: 窗口内到达的 normal 提醒合成一条
+- 每个频道限速: 每小时最多 N 条 (high 不受限)，超出的留在队列里继续合并
+- 内容指纹去重: 同样的内容 (或同一个 key) 在去重窗口内只发一次
+队列在 SQLite 里，cron 跑的脚本和调度守护进程共用；守护进程每30秒 flush 一次
+
+用法:
+    from alert_queue import enqueue_alert
+    enqueue_alert("🔔 ...", source='clanker', priority='normal')
+    python3 alert_queue.py --status
+    python3 alert_queue.py --flush
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from notifier import TELEGRAM_TARGET, get_dispatcher
+
+DEFAULT_DB = '/tmp/alert_queue.db'
+
+PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+COALESCE_WINDOW = 120        # normal: 最早一条等满2分钟再发，期间到达的合并
+DIGEST_INTERVAL = 3600       # low: 最多每小时一条摘要
+DIGEST_MAX = 15              # low 攒够这么多条提前出摘要
+DEDUPE_WINDOW = 6 * 3600     # 同样内容6小时内只发一次
+RATE_CAPS = {'telegram': (6, 3600)}   # 频道: (最多条数, 秒)，high 不受限
+MAX_ATTEMPTS = 3
+CLAIM_TIMEOUT = 600          # 标记 sending 超过这么久还没结果，认为发送进程已退出，放回队列
+MAX_LENGTH = 4000
+SEPARATOR = '\n\n' + '─' * 20 + '\n\n'
+
+
+def fingerprint(text: str, key: Optional[str] = None) -> str:
+    """内容指纹: 有 key 用 key，否则用去掉空白差异后的正文"""
+    basis = key or re.sub(r'\s+', ' ', text).strip().lower()
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+def headline(text: str, limit: int = 80) -> str:
+    line = next((l.strip() for l in text.splitlines() if l.strip() and not set(l.strip()) <= set('=-─')), '')
+    return line if len(line) <= limit else line[:limit - 1] + '…'
+
+
+class AlertQueue:
+    """SQLite 告警队列"""
+
+    def __init__(self, db_path: str = DEFAULT_DB, sender=None):
+        self.db_path = db_path
+        self.sender = sender  # sender(channel, target, text) -> bool，默认走 notifier
+        self.init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint TEXT NOT NULL,
+                source TEXT,
+                priority INTEGER,
+                channel TEXT,
+                target TEXT,
+                title TEXT,
+                body TEXT,
+                created_at REAL,
+                sent_at REAL,
+                claimed_at REAL,
+                attempts INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'pending'
+            )
+        ''')
+        columns = {r['name'] for r in conn.execute('PRAGMA table_info(alerts)')}
+        if 'claimed_at' not in columns:  # 旧库补列
+            conn.execute('ALTER TABLE alerts ADD COLUMN claimed_at REAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_status ON alerts(status, channel, target)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_fp ON alerts(fingerprint, created_at)')
+        # 每次成功发出的消息 (限速统计)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sends (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT,
+                kind TEXT,
+                alert_count INTEGER,
+                sent_at REAL
+            )
+        ''')
+        conn.close()
+
+    # ---------- 入队 ----------
+
+    def enqueue(self, text: str, source: str, priority: str = 'normal', title: Optional[str] = None,
+                key: Optional[str] = None, channel: str = 'telegram', target: str = TELEGRAM_TARGET,
+                now: Optional[float] = None, flush: bool = True) -> Optional[int]:
+        """
+        提醒入队，返回 id；去重窗口内已有同样内容返回 None
+        flush=True 时顺便 flush 一次 (high 会立即发出)
+        """
+        now = now or time.time()
+        fp = fingerprint(text, key)
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            dup = conn.execute(
+                "SELECT 1 FROM alerts WHERE fingerprint = ? AND created_at >= ? AND status != 'failed' LIMIT 1",
+                (fp, now - DEDUPE_WINDOW)).fetchone()
+            if dup:
+                conn.execute('COMMIT')
+                print(f"🔁 重复提醒，跳过: {title or headline(text)}")
+                return None
+            cur = conn.execute(
+                'INSERT INTO alerts (fingerprint, source, priority, channel, target, title, body, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (fp, source, PRIORITIES.get(priority, PRIORITIES['normal']), channel, target,
+                 title or headline(text), text, now))
+            conn.execute('COMMIT')
+            alert_id = cur.lastrowid
+        finally:
+            conn.close()
+        if flush:
+            self.flush(now)
+        return alert_id
+
+    # ---------- 发送 ----------
+
+    def _sent_within(self, conn, channel: str, seconds: float, now: float, kind: Optional[str] = None) -> int:
+        sql = 'SELECT COUNT(*) FROM sends WHERE channel = ? AND sent_at >= ?'
+        args = [channel, now - seconds]
+        if kind:
+            sql += ' AND kind = ?'
+            args.append(kind)
+        return conn.execute(sql, args).fetchone()[0]
+
+    def _rate_ok(self, conn, channel: str, now: float) -> bool:
+        if channel not in RATE_CAPS:
+            return True
+        limit, per = RATE_CAPS[channel]
+        return self._sent_within(conn, channel, per, now) < limit
+
+    def _plan(self, conn, now: float) -> List[Dict]:
+        """
+        决定这次要发哪些消息 (在事务里调用)
+        选中的提醒标记 sending 并记下认领时间；同时先在 sends 里占一个限速名额，
+        这样并发的 flush 不会一起超过上限，发送失败时再释放
+        """
+        plans = []
+        targets = conn.execute(
+            "SELECT DISTINCT channel, target FROM alerts WHERE status = 'pending'").fetchall()
+        for t in targets:
+            channel, target = t['channel'], t['target']
+            rows = conn.execute(
+                "SELECT * FROM alerts WHERE status = 'pending' AND channel = ? AND target = ? "
+                "ORDER BY priority, created_at", (channel, target)).fetchall()
+            by_priority = {p: [r for r in rows if r['priority'] == p] for p in PRIORITIES.values()}
+
+            high = by_priority[PRIORITIES['high']]
+            if high:
+                plans.append({'channel': channel, 'target': target, 'kind': 'high', 'rows': high})
+
+            normal = by_priority[PRIORITIES['normal']]
+            if normal and now - normal[0]['created_at'] >= COALESCE_WINDOW and self._rate_ok(conn, channel, now):
+                plans.append({'channel': channel, 'target': target, 'kind': 'normal', 'rows': normal})
+
+            low = by_priority[PRIORITIES['low']]
+            digest_due = (len(low) >= DIGEST_MAX or
+                          self._sent_within(conn, channel, DIGEST_INTERVAL, now, kind='digest') == 0)
+            if low and digest_due and now - low[0]['created_at'] >= COALESCE_WINDOW \
+                    and self._rate_ok(conn, channel, now):
+                plans.append({'channel': channel, 'target': target, 'kind': 'digest', 'rows': low})
+
+        for plan in plans:
+            ids = [r['id'] for r in plan['rows']]
+            conn.execute(f"UPDATE alerts SET status = 'sending', claimed_at = ?, attempts = attempts + 1 "
+                         f"WHERE id IN ({','.join('?' * len(ids))})", [now] + ids)
+            cur = conn.execute('INSERT INTO sends (channel, kind, alert_count, sent_at) VALUES (?, ?, ?, ?)',
+                               (plan['channel'], plan['kind'], len(ids), now))
+            plan['send_id'] = cur.lastrowid
+        return plans
+
+    @staticmethod
+    def render(kind: str, rows: List) -> str:
+        """把一组提醒渲染成一条消息"""
+        if kind == 'digest':
+            lines = [f"🗞️ 提醒摘要 ({len(rows)}条)", ""]
+            lines += [f"• [{r['source']}] {r['title']}" for r in rows]
+            return '\n'.join(lines)[:MAX_LENGTH]
+        if len(rows) == 1:
+            return rows[0]['body'][:MAX_LENGTH]
+
+        header = f"🚨 {len(rows)}条紧急提醒" if kind == 'high' else f"📬 {len(rows)}条提醒"
+        parts, used, rest = [header], len(header), []
+        for r in rows:
+            if not rest and used + len(SEPARATOR) + len(r['body']) <= MAX_LENGTH - 200:
+                parts.append(r['body'])
+                used += len(SEPARATOR) + len(r['body'])
+            else:
+                rest.append(r)  # 放不下的只列标题
+        text = SEPARATOR.join(parts)
+        if rest:
+            text += SEPARATOR + '\n'.join(f"• [{r['source']}] {r['title']}" for r in rest)
+        return text[:MAX_LENGTH]
+
+    def _send(self, channel: str, target: str, text: str) -> bool:
+        if self.sender:
+            return self.sender(channel, target, text)
+        return get_dispatcher().send(text, target, channel)
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """发送到期的提醒，返回发出的消息条数"""
+        now = now or time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # 认领后很久没有结果的 (发送中途进程退出)，放回队列；按认领时间算，不会抢走别的进程正在发的
+            conn.execute("UPDATE alerts SET status = 'pending' WHERE status = 'sending' "
+                         "AND (claimed_at IS NULL OR claimed_at < ?)", (now - CLAIM_TIMEOUT,))
+            plans = self._plan(conn, now)
+            conn.execute('COMMIT')
+
+            sent = 0
+            for plan in plans:
+                ids = [r['id'] for r in plan['rows']]
+                marks = ','.join('?' * len(ids))
+                ok = self._send(plan['channel'], plan['target'], self.render(plan['kind'], plan['rows']))
+                if ok:
+                    sent += 1
+                    conn.execute(f"UPDATE alerts SET status = 'sent', sent_at = ? WHERE id IN ({marks})",
+                                 [now] + ids)
+                else:
+                    conn.execute(f"UPDATE alerts SET status = CASE WHEN attempts >= ? THEN 'failed' "
+                                 f"ELSE 'pending' END WHERE id IN ({marks})", [MAX_ATTEMPTS] + ids)
+                    conn.execute('DELETE FROM sends WHERE id = ?', (plan['send_id'],))  # 没发出去不占限速名额
+            return sent
+        finally:
+            conn.close()
+
+    def status(self) -> Dict:
+        conn = self._connect()
+        try:
+            names = {v: k for k, v in PRIORITIES.items()}
+            pending = {names[r[0]]: r[1] for r in conn.execute(
+                "SELECT priority, COUNT(*) FROM alerts WHERE status = 'pending' GROUP BY priority")}
+            sent_hour = {r[0]: r[1] for r in conn.execute(
+                'SELECT channel, COUNT(*) FROM sends WHERE sent_at >= ? GROUP BY channel', (time.time() - 3600,))}
+            sent_24h = conn.execute(
+                "SELECT COUNT(*) FROM alerts WHERE status = 'sent' AND sent_at >= ?", (time.time() - 86400,)
+            ).fetchone()[0]
+            return {'pending': pending, 'sent_last_hour': sent_hour, 'alerts_sent_24h': sent_24h}
+        finally:
+            conn.close()
+
+
+_queue: Optional[AlertQueue] = None
+
+
+def get_queue() -> AlertQueue:
+    global _queue
+    if _queue is None:
+        _queue = AlertQueue()
+    return _queue
+
+
+def enqueue_alert(text: str, source: str, priority: str = 'normal', **kwargs) -> Optional[int]:
+    """提醒入队 (进程内共用一个队列对象)"""
+    return get_queue().enqueue(text, source, priority, **kwargs)
+
+
+def flush() -> int:
+    """调度守护进程定时调用"""
+    return get_queue().flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='推送告警队列')
+    parser.add_argument('--flush', action='store_true', help='发送到期的提醒')
+    parser.add_argument('--status', action='store_true', help='查看队列状态')
+    parser.add_argument('--add', metavar='TEXT', help='手动加一条提醒')
+    parser.add_argument('--priority', default='normal', choices=list(PRIORITIES))
+    args = parser.parse_args()
+
+    if args.add:
+        alert_id = enqueue_alert(args.add, source='manual', priority=args.priority)
+        print(f"✅ 已入队 #{alert_id}" if alert_id else "🔁 重复提醒")
+    if args.flush:
+        print(f"📨 发出 {flush()} 条消息")
+    if args.status or not (args.add or args.flush):
+        print(get_queue().status())
+
+
+if __name__ == '__main__':
+    main()
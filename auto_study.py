@@ -7,9 +7,10 @@ GaN博士自动学习系统 - 完整版
 import os
 import sys
 import datetime
-import subprocess
 import json
 
+from dashboard_deploy import Deployer
+
 # 配置
 WORKSPACE = "/root/.openclaw/workspace"
 STUDY_DIR = f"{WORKSPACE}/memory/study"
@@ -17,6 +18,8 @@ REPORTS_DIR = f"{WORKSPACE}/memory/reports"
 DASHBOARD_DIR = f"{WORKSPACE}/memory/dashboard"
 SERVER = "ubuntu@43.160.229.161"
 SSH_KEY = os.path.expanduser("~/.ssh/dashboard_deploy_key")
+# 学习笔记页 (部署白名单)
+STUDY_PAGES = ("study-notes.html", "study-day-*.html")
 
 # 14天学习课程表
 CURRICULUM = {
@@ -493,31 +496,20 @@ def generate_html_for_dashboard(day_num):
     return html_file
 
 def deploy_to_server(files):
-    """部署文件到服务器"""
+    """部署文件到服务器 (复用SSH连接，只传内容变化的文件，一次批量原子替换)"""
     log("🚀 部署到服务器...")
-    for filename in files:
-        local_path = f"{DASHBOARD_DIR}/{filename}"
-        if not os.path.exists(local_path):
-            continue
-            
-        tmp_path = f"/tmp/{filename}"
-        
-        # scp到服务器
-        cmd1 = ["scp", "-i", SSH_KEY, "-o", "StrictHostKeyChecking=no",
-                local_path, f"{SERVER}:{tmp_path}"]
-        result1 = subprocess.run(cmd1, capture_output=True, text=True)
-        
-        if result1.returncode == 0:
-            cmd2 = ["ssh", "-i", SSH_KEY, "-o", "StrictHostKeyChecking=no",
-                    SERVER, f"sudo mv {tmp_path} /var/www/html/ && sudo chmod 644 /var/www/html/{filename}"]
-            result2 = subprocess.run(cmd2, capture_output=True, text=True)
-            
-            if result2.returncode == 0:
-                log(f"✅ {filename} 部署成功")
-            else:
-                log(f"❌ {filename} 移动失败")
-        else:
-            log(f"❌ {filename} 上传失败")
+    deployer = Deployer(DASHBOARD_DIR, server=SERVER, ssh_key=SSH_KEY, owner=None,
+                        allowed=STUDY_PAGES)
+    try:
+        result = deployer.deploy(files)
+    except Exception as e:
+        log(f"❌ 部署失败: {e}")
+        return
+
+    for filename in result['uploaded']:
+        log(f"✅ {filename} 部署成功")
+    for filename in result['skipped']:
+        log(f"⏭️ {filename} 无变化，跳过")
 
 def auto_study():
     """主学习函数 - 三大方案全部执行"""
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+🗂️ 报告预生成快照 - 早报 / 晚报共用
+以前发送时才串行抓行情、读推文、读新闻，上游一慢推送就晚。现在分两步：
+1. 预计算 (发送前几分钟，由调度守护进程触发): 各板块数据抓好存进快照
+2. 发送: 直接从快照渲染，毫秒级；某个板块过期或缺失才现抓
+每个板块记录数据时间，报告末尾标注数据新鲜度
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+SNAPSHOT_DIR = '/tmp'
+
+
+def format_age(fetched_at: float, now: Optional[float] = None) -> str:
+    """数据时间 + 距今多久，例如 08:25 (5分钟前)"""
+    age = (now or time.time()) - fetched_at
+    stamp = datetime.fromtimestamp(fetched_at).strftime('%H:%M')
+    if age < 60:
+        return f"{stamp} (刚刚)"
+    if age < 3600:
+        return f"{stamp} ({age / 60:.0f}分钟前)"
+    return f"{stamp} ({age / 3600:.1f}小时前)"
+
+
+class BriefingSnapshot:
+    """
+    sections: {板块名: (取数函数, 最长可用秒数)}
+    取数函数返回可 JSON 序列化的数据；抛异常时保留快照里上一次的数据
+    """
+
+    def __init__(self, name: str, sections: Dict[str, Tuple[Callable, float]],
+                 path: Optional[str] = None):
+        self.name = name
+        self.sections = sections
+        self.path = path or os.path.join(SNAPSHOT_DIR, f"{name}_snapshot.json")
+        self.snapshot = self._load()
+        self.used: Dict[str, Dict] = {}  # 本次渲染实际用到的板块 {name: {'fetched_at', 'live'}}
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'sections': {}}
+
+    def _save(self):
+        self.snapshot['built_at'] = time.time()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def _fetch(self, section: str) -> Dict:
+        """抓一个板块；失败时保留旧数据并记下错误"""
+        func, _ = self.sections[section]
+        started = time.time()
+        old = self.snapshot['sections'].get(section)
+        try:
+            entry = {'data': func(), 'fetched_at': time.time(), 'ok': True}
+        except Exception as e:
+            print(f"⚠️ {self.name}/{section} 获取失败: {e}")
+            if old:
+                entry = dict(old, ok=False, error=str(e)[:200])
+            else:
+                entry = {'data': None, 'fetched_at': time.time(), 'ok': False, 'error': str(e)[:200]}
+        entry['elapsed'] = round(time.time() - started, 2)
+        self.snapshot['sections'][section] = entry
+        return entry
+
+    def prepare(self) -> Dict:
+        """预计算: 抓取全部板块并写入快照"""
+        print(f"🗂️ 预生成 {self.name} 快照...")
+        for section in self.sections:
+            entry = self._fetch(section)
+            print(f"  {'✅' if entry['ok'] else '❌'} {section} ({entry['elapsed']:.1f}s)")
+        self._save()
+        return self.snapshot
+
+    def get(self, section: str):
+        """
+        取板块数据: 快照里的数据没过期就直接用，否则现抓一次
+        (现抓的结果也写回快照)
+        """
+        _, max_age = self.sections[section]
+        entry = self.snapshot['sections'].get(section)
+        live = not entry or entry.get('data') is None or time.time() - entry['fetched_at'] > max_age
+        if live:
+            entry = self._fetch(section)
+            self._save()
+        self.used[section] = {'fetched_at': entry['fetched_at'], 'live': live}
+        return entry['data']
+
+    def freshness_line(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """报告末尾的数据新鲜度说明"""
+        labels = labels or {}
+        now = time.time()
+        parts = [f"{labels.get(name, name)} {format_age(info['fetched_at'], now)}"
+                 for name, info in self.used.items()]
+        return "🕒 数据时间: " + " · ".join(parts) if parts else ""
@@ -1,9 +1,9 @@
-from web3 import Web3
 import datetime
 
-# BSC RPC endpoint
-bsc_rpc = "https://bsc-dataseed.binance.org/"
-w3 = Web3(Web3.HTTPProvider(bsc_rpc))
+from onchain import OnChain
+
+# BSC: BNB + AGC 余额 / decimals / symbol 一次 Multicall3 读完 (decimals、symbol 本地缓存)
+chain = OnChain('bsc')
 
 # Wallet address
 wallet_address = "0xf2BD3694E7B0505cEcC4317B3Da8F86D54d770DA"
@@ -11,34 +11,11 @@ wallet_address = "0xf2BD3694E7B0505cEcC4317B3Da8F86D54d770DA"
 # AGC Token contract address (from the mining script)
 agc_contract = "0x09D1A98772225b4b11c36607926dca916C436Fe3"
 
-# Standard ERC20 ABI for balanceOf
-erc20_abi = [
-    {
-        "constant": True,
-        "inputs": [{"name": "_owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "balance", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [{"name": "", "type": "uint8"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "symbol",
-        "outputs": [{"name": "", "type": "string"}],
-        "type": "function"
-    }
-]
+meta = chain.token_meta([agc_contract]).get(agc_contract)
+raw = chain.raw_balances([wallet_address], [agc_contract] if meta else [])[wallet_address]
 
 # Get BNB balance
-bnb_balance = w3.eth.get_balance(wallet_address)
-bnb_balance_eth = float(w3.from_wei(bnb_balance, 'ether'))
+bnb_balance_eth = raw['native'] / 1e18 if raw.get('native') is not None else 0.0
 
 print(f"=== AgentCoin Mining Status ===")
 print(f"📅 Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC")
@@ -51,14 +28,11 @@ else:
     print(f"✅ BNB余额充足 (可挖约 {int(bnb_balance_eth / 0.005)} 次)")
 
 # Get AGC balance
-try:
-    token_contract = w3.eth.contract(address=agc_contract, abi=erc20_abi)
-    agc_balance = token_contract.functions.balanceOf(wallet_address).call()
-    decimals = token_contract.functions.decimals().call()
-    symbol = token_contract.functions.symbol().call()
-    agc_formatted = agc_balance / (10 ** decimals)
+if meta and raw.get(agc_contract) is not None:
+    symbol = meta['symbol']
+    agc_formatted = raw[agc_contract] / (10 ** meta['decimals'])
     print(f"🪙 {symbol} Balance: {agc_formatted:,.2f} {symbol}")
-except Exception as e:
-    print(f"❌ 无法获取AGC余额: {e}")
+else:
+    print(f"❌ 无法获取AGC余额: {agc_contract} 不是可读的 ERC-20 合约或节点出错")
 
 print(f"\n=== Mining Process ===")
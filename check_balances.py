@@ -1,16 +1,14 @@
-from web3 import Web3
-import json
+from onchain import OnChain
 
-# BSC RPC endpoint
-bsc_rpc = "https://bsc-dataseed.binance.org/"
-w3 = Web3(Web3.HTTPProvider(bsc_rpc))
+# BSC RPC endpoint (批量 JSON-RPC / Multicall3)
+chain = OnChain('bsc')
 
 # Wallet address
 wallet_address = "0xf2BD3694E7B0505cEcC4317B3Da8F86D54d770DA"
 
 # Check BNB balance
-bnb_balance = w3.eth.get_balance(wallet_address)
-bnb_balance_eth = w3.from_wei(bnb_balance, 'ether')
+bnb_balance = chain.raw_balances([wallet_address])[wallet_address]['native'] or 0
+bnb_balance_eth = bnb_balance / 1e18
 
 print(f"=== Wallet Status ===")
 print(f"Address: {wallet_address}")
@@ -10,16 +10,22 @@ Clanker/Bankr Meme币监控系统 v5.0
 import urllib.request
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Set, Optional
 
 from smart_database import SmartDatabase
+from honeypot_cache import HoneypotCache
+from dexscreener_client import default_client
+from alert_queue import enqueue_alert
 
 class ClankerMonitor:
     """Clanker/Bankr币监控器"""
     
     def __init__(self):
         self.db = SmartDatabase()  # 使用新的SQLite数据库
+        self.honeypot_cache = HoneypotCache(self.db)  # 同一合约不重复检测
+        self.dex = default_client()  # DexScreener批量查询+短缓存
         self.clanker_api = "https://www.clanker.world/api/tokens"
     
     def get_clanker_tokens(self) -> List[Dict]:
@@ -35,6 +41,9 @@ class ClankerMonitor:
                 data = json.loads(resp.read().decode('utf-8'))
                 tokens = data.get('data', [])
                 
+                # 一次批量拉取所有合约的DexScreener数据，下面逐个查询直接命中缓存
+                self.dex.prefetch(t.get('contract_address', '') for t in tokens)
+                
                 processed = []
                 for token in tokens:
                     contract = token.get('contract_address', '')
@@ -87,23 +96,20 @@ class ClankerMonitor:
     def get_dexscreener_data(self, contract: str) -> Dict:
         """从DexScreener获取价格数据"""
         try:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{contract}"
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode('utf-8'))
-                pairs = data.get('pairs', [])
-                
-                if pairs:
-                    pair = pairs[0]  # 取第一个交易对
-                    return {
-                        'price': float(pair.get('priceUsd', 0) or 0),
-                        'liquidity': float(pair.get('liquidity', {}).get('usd', 0) or 0),
-                        'volume_24h': float(pair.get('volume', {}).get('h24', 0) or 0),
-                        'change_24h': float(pair.get('priceChange', {}).get('h24', 0) or 0),
-                        'tx_count': (pair.get('txns', {}).get('h24', {}).get('buys', 0) or 0) + 
-                                   (pair.get('txns', {}).get('h24', {}).get('sells', 0) or 0),
-                        'pair_url': pair.get('url', '')
-                    }
+            pairs = self.dex.get_token_pairs(contract)
+            
+            if pairs:
+                pair = pairs[0]  # 取第一个交易对
+                self.db.add_pair_snapshot(contract, pair)  # 攒价格历史，策略回测用
+                return {
+                    'price': float(pair.get('priceUsd', 0) or 0),
+                    'liquidity': float(pair.get('liquidity', {}).get('usd', 0) or 0),
+                    'volume_24h': float(pair.get('volume', {}).get('h24', 0) or 0),
+                    'change_24h': float(pair.get('priceChange', {}).get('h24', 0) or 0),
+                    'tx_count': (pair.get('txns', {}).get('h24', {}).get('buys', 0) or 0) + 
+                               (pair.get('txns', {}).get('h24', {}).get('sells', 0) or 0),
+                    'pair_url': pair.get('url', '')
+                }
         except Exception as e:
             print(f"⚠️ 获取代币详情失败: {e}")
         
@@ -140,29 +146,26 @@ class ClankerMonitor:
         }
         
         try:
-            # 使用Honeypot.is API检测（Base链ID=8453）
-            url = f"https://api.honeypot.is/v2/IsHoneypot?address={contract}&chainID=8453"
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode())
-                
-                # 检查是否是貔貅
-                if data.get('isHoneypot', False):
-                    result['is_honeypot'] = True
-                    result['risk_level'] = 'high'
-                    result['reason'] = 'API检测为貔貅'
-                
-                # 检查买入/卖出税是否异常
-                buy_tax = data.get('buyTax', 0)
-                sell_tax = data.get('sellTax', 0)
-                
-                if sell_tax > 90:  # 卖出税超过90%，可能是貔貅
-                    result['is_honeypot'] = True
-                    result['risk_level'] = 'high'
-                    result['reason'] = f'卖出税过高: {sell_tax}%'
-                elif sell_tax > 50:
-                    result['risk_level'] = 'medium'
-                    result['reason'] = f'卖出税较高: {sell_tax}%'
+            # 使用Honeypot.is API检测（Base链ID=8453），结果走缓存
+            data = self.honeypot_cache.get(8453, contract)
+            
+            # 检查是否是貔貅
+            if data.get('isHoneypot', False):
+                result['is_honeypot'] = True
+                result['risk_level'] = 'high'
+                result['reason'] = 'API检测为貔貅'
+            
+            # 检查买入/卖出税是否异常
+            buy_tax = data.get('buyTax', 0)
+            sell_tax = data.get('sellTax', 0)
+            
+            if sell_tax > 90:  # 卖出税超过90%，可能是貔貅
+                result['is_honeypot'] = True
+                result['risk_level'] = 'high'
+                result['reason'] = f'卖出税过高: {sell_tax}%'
+            elif sell_tax > 50:
+                result['risk_level'] = 'medium'
+                result['reason'] = f'卖出税较高: {sell_tax}%'
                     
         except Exception as e:
             # API失败时返回未知
@@ -417,11 +420,24 @@ def main():
     """主函数 - 带智能推送调节"""
     from smart_scheduler import SmartScheduler
     
-    monitor = ClankerMonitor()
     scheduler = SmartScheduler()
+    try:
+        run_once(scheduler)
+    finally:
+        scheduler.flush()  # 局部实例等不到退出时的批量写盘，这一轮的节奏状态在这里一次写掉
+
+
+def run_once(scheduler):
+    """抓取一轮，按 scheduler 的节奏决定是否推送"""
+    if '--force' not in sys.argv and not scheduler.due('clanker'):
+        print(f"💤 新币很少，降低抓取频率，下次: {scheduler.next_fetch('clanker'):%H:%M}")
+        return
+    
+    monitor = ClankerMonitor()
     
-    # 获取代币数据
+    # 获取代币数据 (新币越多下次抓得越快)
     tokens = monitor.get_clanker_tokens()
+    scheduler.record('clanker', new_items=sum(1 for t in tokens if t.get('is_new')))
     
     # 过滤貔貅币
     filtered_tokens = []
@@ -453,7 +469,9 @@ def main():
     
     # 生成并发送报告
     report = monitor.generate_report()
-    print(report)
+    # 推送只走告警队列，不再打印全文 (输出会被当作推送再发一次)
+    if enqueue_alert(report, source='clanker', priority='normal'):
+        print("📨 推送已入队")
     
     # 标记已推送
     scheduler.mark_pushed()
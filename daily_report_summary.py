@@ -2,161 +2,75 @@
 """
 📊 每日晚报生成器 - 真实数据版
 每天晚上18:30自动生成专业晚报并推送到Telegram
+18:20 先用 --prepare 预抓数据存快照，18:30 发送时直接从快照渲染
 """
 
 import json
-import os
-import re
-import urllib.request
-import subprocess
 import glob
+import sys
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from tweet_store import TweetStore
+from briefing_snapshot import BriefingSnapshot
+from market_quotes import fetch_market_snapshot
+from notifier import send_telegram
 
 # Telegram推送配置
 TELEGRAM_TARGET = '5440939697'
 
 def send_to_telegram(message: str) -> bool:
-    """推送消息到Telegram"""
-    try:
-        env = os.environ.copy()
-        env['PATH'] = '/root/.nvm/versions/node/v22.22.0/bin:' + env.get('PATH', '')
-        
-        cmd = [
-            '/root/.nvm/versions/node/v22.22.0/bin/openclaw',
-            'message', 'send',
-            '--channel', 'telegram',
-            '--target', TELEGRAM_TARGET,
-            '--message', message
-        ]
-        result = subprocess.run(cmd, capture_output=True, timeout=30, env=env)
-        if result.returncode == 0:
-            print("✅ Telegram 推送成功")
-            return True
-        else:
-            err = result.stderr.decode()[:100] if result.stderr else '未知错误'
-            print(f"⚠️ Telegram 推送失败: {err}")
-            return False
-    except Exception as e:
-        print(f"❌ Telegram 推送异常: {e}")
-        return False
-
-def get_tencent_us(symbol: str) -> Dict:
-    """从腾讯财经获取美股数据"""
-    try:
-        url = f"https://qt.gtimg.cn/q=us.{symbol}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as r:
-            text = r.read().decode('gbk')
-            match = re.search(r'"([^"]+)"', text)
-            if match:
-                data = match.group(1).split('~')
-                price = float(data[3])
-                prev = float(data[4])
-                change_pct = ((price - prev) / prev) * 100
-                return {
-                    'price': price,
-                    'change': change_pct,
-                    'trend': 'up' if change_pct >= 0 else 'down'
-                }
-    except Exception as e:
-        print(f"❌ 获取 {symbol} 失败: {e}")
-    return None
-
-def get_tencent_hk(code: str) -> Dict:
-    """从腾讯财经获取港股数据"""
-    try:
-        url = f"https://qt.gtimg.cn/q=hk{code}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as r:
-            text = r.read().decode('gbk')
-            match = re.search(r'"([^"]+)"', text)
-            if match:
-                data = match.group(1).split('~')
-                price = float(data[3])
-                prev = float(data[4])
-                change_pct = ((price - prev) / prev) * 100
-                return {
-                    'price': price,
-                    'change': change_pct,
-                    'trend': 'up' if change_pct >= 0 else 'down'
-                }
-    except Exception as e:
-        print(f"❌ 获取 hk{code} 失败: {e}")
-    return None
-
-def get_binance_price(symbol: str) -> Dict:
-    """从币安获取加密货币数据"""
-    try:
-        url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={symbol}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            return {
-                'price': float(data['lastPrice']),
-                'change': float(data['priceChangePercent']),
-                'trend': 'up' if float(data['priceChangePercent']) >= 0 else 'down'
-            }
-    except Exception as e:
-        print(f"❌ 获取 {symbol} 失败: {e}")
-    return None
+    """推送消息到Telegram (进程内推送队列，不再每条消息启动一次 openclaw CLI)"""
+    if send_telegram(message, TELEGRAM_TARGET):
+        print("✅ Telegram 推送成功")
+        return True
+    print("⚠️ Telegram 推送失败")
+    return False
 
 def get_closing_data() -> Dict:
-    """获取收盘数据"""
+    """获取收盘数据 (批量并发抓取，整体8秒截止；已收盘的市场直接用收盘缓存)"""
     print("🔄 获取收盘数据...")
-    
-    # 美股
-    nasdaq = get_tencent_us('IXIC') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    dow = get_tencent_us('DJI') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    sp500 = get_tencent_us('SPX') or get_tencent_us('INX') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    
-    # 港股
-    hstech = get_tencent_hk('HSTECH') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    innoscience = get_tencent_hk('02577') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    
-    # 加密货币
-    btc = get_binance_price('BTCUSDT') or {'price': 0, 'change': 0, 'trend': 'flat'}
-    eth = get_binance_price('ETHUSDT') or {'price': 0, 'change': 0, 'trend': 'flat'}
+    flat = {'price': 0, 'change': 0, 'trend': 'flat'}
+    quotes = fetch_market_snapshot(
+        tencent={
+            'nasdaq': 'us.IXIC', 'dow': 'us.DJI', 'sp500': ['us.SPX', 'us.INX'],  # 美股
+            'hstech': 'hkHSTECH', 'innoscience': 'hk02577',                       # 港股
+        },
+        binance={'btc': 'BTCUSDT', 'eth': 'ETHUSDT'},                             # 加密货币
+    )
+    q = {name: quote or dict(flat) for name, quote in quotes.items()}
     
     return {
         'us_stocks': {
-            'nasdaq': nasdaq,
-            'dow': dow,
-            'sp500': sp500
+            'nasdaq': q['nasdaq'],
+            'dow': q['dow'],
+            'sp500': q['sp500']
         },
         'hk_stocks': {
-            'hstech': hstech,
-            'innoscience': innoscience
+            'hstech': q['hstech'],
+            'innoscience': q['innoscience']
         },
         'crypto': {
-            'btc': btc,
-            'eth': eth
+            'btc': q['btc'],
+            'eth': q['eth']
         }
     }
 
 def get_twitter_summary() -> str:
     """获取今日Twitter抓取摘要"""
     today = datetime.now().strftime('%Y-%m-%d')
-    log_file = f"/root/.openclaw/workspace/memory/twitter_logs/{today}.md"
-    
-    if not os.path.exists(log_file):
-        return "暂无今日推文记录"
+    store = TweetStore()
     
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # 统计抓取次数
-        update_count = content.count('## [')
+        update_count = store.count_fetches(today)
+        if update_count == 0:
+            return "暂无今日推文记录"
         
-        # 提取最新几条推文标题
-        lines = content.split('\n')
-        recent_tweets = []
-        for line in lines:
-            if '💡' in line and len(line) > 10:
-                recent_tweets.append(line.replace('💡 ', '').strip()[:40])
-            if len(recent_tweets) >= 3:
-                break
+        # 最新几条推文（优先中文翻译）
+        recent_tweets = [(t['translate'] or t['text'])[:40]
+                         for t in store.query(day=today, limit=3, newest_first=True)]
         
         summary = f"今日抓取 {update_count} 次"
         if recent_tweets:
@@ -173,11 +87,23 @@ def format_price(value: float) -> str:
         return f"{value:,.0f}"
     return f"{value:,.2f}"
 
-def generate_evening_report() -> str:
-    """生成晚报"""
+def evening_snapshot() -> BriefingSnapshot:
+    """晚报各板块及其最长可用时间 (超过就发送时现抓)"""
+    return BriefingSnapshot('evening_report', {
+        'market': (get_closing_data, 15 * 60),
+        'twitter': (get_twitter_summary, 30 * 60),
+    })
+
+def prepare_snapshot():
+    """发送前几分钟预抓全部数据 (调度守护进程 18:20 触发)"""
+    evening_snapshot().prepare()
+
+def generate_evening_report(snapshot: Optional[BriefingSnapshot] = None) -> str:
+    """生成晚报 (从预生成快照渲染)"""
     now = datetime.now()
-    market = get_closing_data()
-    twitter_summary = get_twitter_summary()
+    snapshot = snapshot or evening_snapshot()
+    market = snapshot.get('market')
+    twitter_summary = snapshot.get('twitter')
     
     lines = [
         f"🌙 *龙虾晚报* | {now.strftime('%m/%d %a')}",
@@ -225,17 +151,25 @@ def generate_evening_report() -> str:
     lines.append("  · 存储芯片涨价动态")
     lines.append("  · 英伟达后续影响")
     lines.append("  · 港股南向资金流向")
+    lines.append("")
+    lines.append(snapshot.freshness_line({'market': '行情', 'twitter': 'Twitter'}))
     
     return "\n".join(lines)
 
 def main():
     """生成并推送晚报"""
+    if '--prepare' in sys.argv:
+        prepare_snapshot()
+        return
+    
     print("=" * 50)
     print("🌙 生成龙虾晚报...")
     print("=" * 50)
     
-    # 生成晚报
+    # 生成晚报 (数据来自预生成快照)
+    started = time.time()
     report = generate_evening_report()
+    print(f"⚡ 渲染耗时 {time.time() - started:.2f}s")
     
     # 保存到文件
     report_file = f"/tmp/evening_report_{datetime.now().strftime('%H%M')}.txt"
@@ -74,6 +74,41 @@ class CardRegistry {
             await this.update(id);
         }
     }
+
+    // 轮询 data.delta.json (dashboard_renderer.py 生成)，只替换变化的卡片
+    // 第一次轮询记下当前版本；之后 delta.base 对不上说明中间漏了更新，整页刷新
+    pollDelta(url = 'data.delta.json', interval = 60000) {
+        let version = null;
+        const tick = async () => {
+            try {
+                const resp = await fetch(`${url}?t=${Date.now()}`, { cache: 'no-store' });
+                if (!resp.ok) return;
+                const delta = await resp.json();
+                if (version === null || delta.version === version) {
+                    version = delta.version;
+                    return;
+                }
+                if (delta.base !== version) {
+                    location.reload();
+                    return;
+                }
+                for (const [id, html] of Object.entries(delta.cards || {})) {
+                    const el = document.querySelector(`[data-card-id="${id}"]`) || document.getElementById(id);
+                    if (el) el.outerHTML = html;
+                }
+                document.querySelectorAll('[data-field="updated_at"]').forEach(el => {
+                    el.textContent = delta.updated_at;
+                });
+                version = delta.version;
+                document.dispatchEvent(new CustomEvent('dashboard:delta', { detail: delta }));
+                console.log(`✅ 增量更新: ${Object.keys(delta.cards || {}).join(', ')}`);
+            } catch (e) {
+                console.error('❌ 增量更新失败:', e);
+            }
+        };
+        tick();
+        return setInterval(tick, interval);
+    }
 }
 
 // 全局卡片注册表
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+🚀 Dashboard 部署 - 各更新脚本共用
+以前每个文件都 scp 一次再 ssh sudo mv 一次，每次两次完整SSH握手；现在：
+- SSH ControlMaster 复用一条持久连接 (ControlPersist)，分钟级更新不再反复握手
+- 按内容哈希只发送变化的文件 (有 rsync 时走 rsync 增量)
+- 所有文件一批发送，先进暂存目录 (在 Web 根目录之外)，再同一文件系统内 mv 原子替换
+- 只部署白名单里的文件 (默认 PUBLIC_FILES)，工作目录里的备份页/笔记页不会被公开
+- target 可以是本地目录 (server=None)，方便测试
+
+用法:
+    python3 dashboard_deploy.py index.html data.delta.json
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+SERVER = "ubuntu@43.160.229.161"
+SSH_KEY = "/root/.ssh/lobster_deploy"
+LOCAL_DIR = "/root/.openclaw/workspace/lobster-workspace/dashboard"
+WEB_DIR = "/var/www/html"
+CONTROL_PATH = "/tmp/ssh-deploy-%r@%h:%p"
+MANIFEST_FILE = "/tmp/dashboard_deploy_manifest.json"
+STAGING = ".dashboard_deploy_staging"
+
+# 允许公开到 Web 根目录的文件 (相对路径，可用通配符)；其他文件一律不部署
+PUBLIC_FILES = (
+    "index.html",
+    "data.delta.json",
+    "js/card-system.js",
+    "data/twitter_translated.json",
+)
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Deployer:
+    """把本地目录里的文件同步到服务器 (或本地) 目标目录"""
+
+    def __init__(self, local_dir: str = LOCAL_DIR, target: str = WEB_DIR,
+                 server: Optional[str] = SERVER, ssh_key: str = SSH_KEY,
+                 owner: Optional[str] = "www-data:www-data", sudo: bool = True,
+                 manifest_file: str = MANIFEST_FILE, use_rsync: Optional[bool] = None,
+                 control_persist: str = "10m", ssh_port: Optional[int] = None,
+                 allowed: Iterable[str] = PUBLIC_FILES):
+        self.local_dir = local_dir
+        self.target = target.rstrip('/') or '/'
+        self.server = server
+        self.ssh_key = ssh_key
+        self.owner = owner
+        self.sudo = sudo
+        self.manifest_file = manifest_file
+        self.use_rsync = shutil.which('rsync') is not None if use_rsync is None else use_rsync
+        self.control_persist = control_persist
+        self.ssh_port = ssh_port
+        self.allowed = tuple(allowed)
+        self.manifest = self._load_manifest()
+
+    # ---------- 清单 (上次部署的内容哈希) ----------
+
+    @property
+    def manifest_key(self) -> str:
+        return f"{self.server or 'local'}:{self.target}"
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get(self.manifest_key, {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                all_manifests = json.load(f)
+        except (OSError, ValueError):
+            all_manifests = {}
+        all_manifests[self.manifest_key] = self.manifest
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(all_manifests, f, indent=2)
+
+    def is_allowed(self, rel: str) -> bool:
+        rel = os.path.normpath(rel)
+        if rel.startswith('..') or os.path.isabs(rel):
+            return False
+        return any(fnmatch.fnmatchcase(rel, pattern) for pattern in self.allowed)
+
+    @property
+    def staging_root(self) -> str:
+        """暂存目录放在目标目录旁边: 不在 Web 根目录里被公开访问，又和目标在同一文件系统 (mv 才是原子的)"""
+        return os.path.dirname(self.target) or '/'
+
+    def changed_files(self, files: Iterable[str]) -> Dict[str, str]:
+        """返回内容和上次部署不同的文件 {相对路径: 哈希}"""
+        changed = {}
+        for rel in files:
+            path = os.path.join(self.local_dir, rel)
+            if not os.path.isfile(path):
+                print(f"⚠️ 文件不存在，跳过: {rel}")
+                continue
+            digest = file_hash(path)
+            if self.manifest.get(rel) != digest:
+                changed[rel] = digest
+        return changed
+
+    # ---------- SSH ----------
+
+    def ssh_options(self) -> List[str]:
+        """复用同一条控制连接: 第一次握手后 ControlPersist 时间内的命令都不再握手"""
+        options = ["-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes",
+                   "-o", "ControlMaster=auto", "-o", f"ControlPath={CONTROL_PATH}",
+                   "-o", f"ControlPersist={self.control_persist}"]
+        if self.ssh_key:
+            options = ["-i", self.ssh_key] + options
+        if self.ssh_port:
+            options += ["-p", str(self.ssh_port)]
+        return options
+
+    def _remote_install_script(self, files: List[str], staging: str) -> str:
+        """暂存目录里的文件改权限后 mv 到目标位置 (同一文件系统内 rename，原子替换)"""
+        lines = ["set -e"]
+        for rel in files:
+            src, dst = shlex.quote(f"{staging}/{rel}"), shlex.quote(f"{self.target}/{rel}")
+            lines.append(f"mkdir -p {shlex.quote(os.path.dirname(f'{self.target}/{rel}'))}")
+            lines.append(f"chmod 644 {src}")
+            if self.owner:
+                lines.append(f"chown {shlex.quote(self.owner)} {src}")
+            lines.append(f"mv -f {src} {dst}")
+        lines.append(f"rm -rf {shlex.quote(staging)}")
+        return "\n".join(lines)
+
+    def _sh(self, script: str) -> List[str]:
+        return (["sudo"] if self.sudo else []) + ["sh", "-c", script]
+
+    def _deploy_remote(self, files: List[str]):
+        staging = f"{self.staging_root.rstrip('/')}/{STAGING}.{os.getpid()}"
+        install = self._remote_install_script(files, staging)
+
+        if self.use_rsync:
+            # rsync 只传差异块: 暂存目录是空的，用 --copy-dest 把线上文件当作比对基准 (只读，不会被改动)；
+            # 先同步到暂存目录，再同一条SSH连接里原子替换
+            ssh_cmd = " ".join(["ssh"] + [shlex.quote(o) for o in self.ssh_options()])
+            rsync_path = "sudo rsync" if self.sudo else "rsync"
+            mkdir = " ".join(shlex.quote(a) for a in self._sh(f"mkdir -p {shlex.quote(staging)}"))
+            subprocess.run(["rsync", "-az", "--relative", "-e", ssh_cmd, f"--copy-dest={self.target}",
+                            f"--rsync-path={mkdir} && {rsync_path}",
+                            *[f"./{rel}" for rel in files], f"{self.server}:{staging}/"],
+                           cwd=self.local_dir, check=True, capture_output=True, timeout=120)
+            remote = " ".join(shlex.quote(a) for a in self._sh(install))
+            subprocess.run(["ssh", *self.ssh_options(), self.server, remote],
+                           check=True, capture_output=True, timeout=60)
+            return
+
+        # 没有 rsync: tar 打包成一个流，一次SSH命令完成上传 + 替换
+        script = f"mkdir -p {shlex.quote(staging)} && tar -C {shlex.quote(staging)} -xf - && {install}"
+        remote = " ".join(shlex.quote(a) for a in self._sh(script))
+        tar = subprocess.Popen(["tar", "-C", self.local_dir, "-cf", "-", *files], stdout=subprocess.PIPE)
+        try:
+            subprocess.run(["ssh", *self.ssh_options(), self.server, remote],
+                           stdin=tar.stdout, check=True, capture_output=True, timeout=120)
+        finally:
+            tar.stdout.close()
+            tar.wait()
+
+    def _deploy_local(self, files: List[str]):
+        """目标是本地目录: 复制到暂存目录后 os.replace 原子替换"""
+        staging = tempfile.mkdtemp(prefix=STAGING, dir=self.staging_root)
+        try:
+            for rel in files:
+                staged = os.path.join(staging, rel.replace('/', '__'))
+                shutil.copy2(os.path.join(self.local_dir, rel), staged)
+                os.chmod(staged, 0o644)
+                dst = os.path.join(self.target, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(staged, dst)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    # ---------- 对外接口 ----------
+
+    def deploy(self, files: Iterable[str], force: bool = False) -> Dict:
+        """
+        部署文件 (相对 local_dir 的路径)，内容没变的跳过
+        不在白名单里的文件不部署 (记在 skipped 里)
+        返回 {'uploaded': [...], 'skipped': [...]}；失败时抛出异常
+        """
+        files = list(dict.fromkeys(files))
+        rejected = [rel for rel in files if not self.is_allowed(rel)]
+        for rel in rejected:
+            print(f"⚠️ 不在部署白名单里，跳过: {rel}")
+        files = [rel for rel in files if rel not in rejected]
+        changed = self.changed_files(files) if not force else {
+            rel: file_hash(os.path.join(self.local_dir, rel)) for rel in files
+            if os.path.isfile(os.path.join(self.local_dir, rel))}
+        skipped = rejected + [rel for rel in files if rel not in changed]
+        if not changed:
+            return {'uploaded': [], 'skipped': skipped}
+
+        if self.server:
+            self._deploy_remote(list(changed))
+        else:
+            os.makedirs(self.target, exist_ok=True)
+            self._deploy_local(list(changed))
+
+        self.manifest.update(changed)
+        self._save_manifest()
+        return {'uploaded': list(changed), 'skipped': skipped}
+
+    def close(self):
+        """关闭持久控制连接 (一般不需要，ControlPersist 到期会自动关闭)"""
+        if self.server:
+            subprocess.run(["ssh", *self.ssh_options(), "-O", "exit", self.server],
+                           capture_output=True)
+
+
+def deploy_files(files: Iterable[str], local_dir: str = LOCAL_DIR, **kwargs) -> bool:
+    """更新脚本调用: 部署并打印结果，失败只打印不抛出"""
+    try:
+        result = Deployer(local_dir, **kwargs).deploy(files)
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b'').decode('utf-8', errors='replace').strip()
+        print(f"❌ 部署失败: {stderr[:200] or e}")
+        return False
+    except Exception as e:
+        print(f"❌ 部署失败: {e}")
+        return False
+
+    if result['uploaded']:
+        print(f"✅ 已部署: {', '.join(result['uploaded'])}")
+    else:
+        print("⏭️ 文件无变化，跳过部署")
+    return True
+
+
+def main():
+    files = sys.argv[1:] or ["index.html"]
+    print("🚀 开始部署 Dashboard...")
+    ok = deploy_files(files)
+    if ok:
+        print(f"🌐 访问地址: http://{SERVER.split('@')[-1]}/")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+🖼️ Dashboard 增量渲染器 - 各 update_dashboard_* 脚本共用
+- 页面骨架用预编译模板 (string.Template)，不再每次拼巨型 f-string
+- 每张卡片按数据哈希缓存渲染结果，数据没变就直接复用上次的HTML片段
+- 渲染结果和磁盘上的文件逐字节相同时不写文件、不部署
+- 输出 data.delta.json (只含变化的数据和卡片)，card-system.js 轮询它局部刷新，不用整页重载
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from string import Template
+from typing import Callable, Dict, Iterable, Optional
+
+DELTA_FILE = 'data.delta.json'
+DATA_FILE = 'data.json'
+CACHE_FILE = '.fragment_cache.json'
+
+# 每次都会变、但不代表内容有更新的字段
+VOLATILE_KEYS = ('updated_at', 'update_time')
+
+# 手工维护的页面 (正则替换更新的 index.html) 里注入的增量轮询脚本
+# 页面已经加载 card-system.js 就直接用，否则动态加载后再开始轮询
+DELTA_POLL_SCRIPT = """<script data-delta-poll>
+(function () {
+    const start = () => dashboardCards.pollDelta('data.delta.json', 60000);
+    if (typeof dashboardCards !== 'undefined') return start();
+    const s = document.createElement('script');
+    s.src = 'js/card-system.js';
+    s.onload = start;
+    document.head.appendChild(s);
+})();
+</script>"""
+DELTA_POLL_ASSETS = ['data.delta.json', 'js/card-system.js']  # 页面轮询依赖的文件，部署时一起发
+
+
+def data_hash(data) -> str:
+    """数据哈希 (键排序后序列化，保证同样的数据得到同样的哈希)"""
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def compile_template(text: str) -> Template:
+    """预编译页面模板: 占位符用 $name，CSS/JS 里的大括号不用再转义"""
+    return Template(text)
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _mask(content: str, ignore: Iterable[str]) -> str:
+    for pattern in ignore:
+        content = re.sub(pattern, '', content)
+    return content
+
+
+def write_if_changed(path: str, content: str, ignore: Iterable[str] = ()) -> bool:
+    """
+    内容有变化才写文件 (先写临时文件再替换，避免读到半个文件)
+    ignore: 比较时忽略的正则 (例如页面里的"最后更新"时间)
+    返回是否写入
+    """
+    old = _read(path)
+    if old is not None and _mask(old, ignore) == _mask(content, ignore):
+        return False
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+def with_delta_polling(html: str) -> str:
+    """页面还没有调用 pollDelta 时，在 </body> 前注入轮询脚本 (已注入过则原样返回)"""
+    if 'pollDelta' in html or 'data-delta-poll' in html:
+        return html
+    index = html.lower().rfind('</body>')
+    if index < 0:
+        return html + '\n' + DELTA_POLL_SCRIPT + '\n'
+    return html[:index] + DELTA_POLL_SCRIPT + '\n' + html[index:]
+
+
+class DashboardRenderer:
+    """卡片片段缓存 + 差异写入 + data.json 增量"""
+
+    def __init__(self, output_dir: str, volatile_keys: Iterable[str] = VOLATILE_KEYS):
+        self.output_dir = output_dir
+        self.volatile_keys = set(volatile_keys)
+        self.cache_file = os.path.join(output_dir, CACHE_FILE)
+        self.fragments: Dict[str, Dict] = self._load_json(self.cache_file)
+        self.rendered: Dict[str, str] = {}
+        self.changed_cards: Dict[str, str] = {}
+        self.stats = {'cache_hits': 0, 'renders': 0}
+
+    @staticmethod
+    def _load_json(path: str) -> Dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+    # ---------- 卡片 ----------
+
+    def card(self, card_id: str, data, render: Callable[..., str]) -> str:
+        """渲染一张卡片: 数据哈希和上次相同则直接复用缓存的HTML"""
+        key = data_hash(data)
+        cached = self.fragments.get(card_id)
+        if cached and cached['hash'] == key:
+            self.stats['cache_hits'] += 1
+            html = cached['html']
+        else:
+            self.stats['renders'] += 1
+            html = render(data)
+            self.fragments[card_id] = {'hash': key, 'html': html}
+            self.changed_cards[card_id] = html
+        self.rendered[card_id] = html
+        return html
+
+    # ---------- 输出 ----------
+
+    def publish(self, data: Dict, html: Optional[str] = None, html_name: str = 'index.html',
+                ignore: Iterable[str] = (), extra_cards: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        写出页面和数据:
+        - html 与磁盘上的相同 → 不写
+        - data 合并进 data.json，变化的键和卡片写进 data.delta.json
+        - extra_cards: 不经过 card() 的片段 (例如正则替换的元素)，按元素id局部替换
+        返回 {'changed', 'html_changed', 'data_keys', 'cards', 'version'}，changed 为 False 时不必部署
+        """
+        html_changed = html is not None and write_if_changed(self.path(html_name), html, ignore)
+
+        old_data = self._load_json(self.path(DATA_FILE))
+        changed = {k: v for k, v in data.items()
+                   if k not in self.volatile_keys and data_hash(old_data.get(k)) != data_hash(v)}
+        cards = dict(self.changed_cards)
+        for card_id, fragment in (extra_cards or {}).items():
+            if self.fragments.get(card_id, {}).get('hash') != data_hash(fragment):
+                self.fragments[card_id] = {'hash': data_hash(fragment), 'html': fragment}
+                cards[card_id] = fragment
+
+        result = {'changed': bool(html_changed or changed or cards), 'html_changed': html_changed,
+                  'data_keys': sorted(changed), 'cards': sorted(cards), 'version': None}
+        if not result['changed']:
+            return result
+
+        write_if_changed(self.path(DATA_FILE),
+                         json.dumps({**old_data, **data}, ensure_ascii=False, indent=2))
+
+        base = self._load_json(self.path(DELTA_FILE)).get('version')
+        version = data_hash([base, changed, cards])[:12]
+        delta = {
+            'version': version,
+            'base': base,
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'data': changed,
+            'cards': cards,
+        }
+        write_if_changed(self.path(DELTA_FILE), json.dumps(delta, ensure_ascii=False))
+        write_if_changed(self.cache_file, json.dumps(self.fragments, ensure_ascii=False))
+
+        self.changed_cards = {}
+        result['version'] = version
+        return result
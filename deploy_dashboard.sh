@@ -1,19 +1,9 @@
 #!/bin/bash
 # Dashboard 自动部署脚本
+# 复用SSH持久连接，只上传内容有变化的文件，服务器上原子替换 (见 dashboard_deploy.py)
+# 用法: ./deploy_dashboard.sh [文件...]   默认只部署 index.html
+# 只有 dashboard_deploy.py 里 PUBLIC_FILES 白名单中的文件会被公开 (备份页/笔记页不会上线)
 
-SERVER="ubuntu@43.160.229.161"
-SSH_KEY="/root/.ssh/lobster_deploy"
-LOCAL_DIR="/root/.openclaw/workspace/lobster-workspace/dashboard"
-REMOTE_DIR="/home/ubuntu"
-WEB_DIR="/var/www/html"
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
-echo "🚀 开始部署 Dashboard..."
-
-# 1. 复制文件到服务器
-scp -i $SSH_KEY -o StrictHostKeyChecking=no $LOCAL_DIR/*.html $SERVER:$REMOTE_DIR/
-
-# 2. 更新 Web 目录
-ssh -i $SSH_KEY -o StrictHostKeyChecking=no $SERVER "sudo cp $REMOTE_DIR/index.html $WEB_DIR/ && sudo chown www-data:www-data $WEB_DIR/index.html"
-
-echo "✅ Dashboard 部署完成!"
-echo "🌐 访问地址: http://43.160.229.161/"
+python3 "$SCRIPT_DIR/dashboard_deploy.py" "$@"
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+DexScreener 客户端 - 合并地址批量查询
+/latest/dex/tokens/{a,b,c} 一次最多支持30个地址：
+- 查询按30个一批合并
+- 多批之间在限速内并发
+- 交易对快照短时间缓存，同一轮扫描重复查询不再走网络
+- 查询失败的批次也缓存一小段时间，后续逐个查询不会各自再发请求
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class DexScreenerClient:
+    """DexScreener tokens 接口批量客户端"""
+
+    TOKENS_URL = "https://api.dexscreener.com/latest/dex/tokens/"
+    BATCH_SIZE = 30          # 接口单次最多30个地址
+    CACHE_TTL = 30           # 交易对快照缓存秒数
+    MAX_CACHE = 5000         # 缓存最多保留的地址数 (常驻进程里不会无限增长)
+    MAX_WORKERS = 4          # 并发批次数
+    MIN_INTERVAL = 0.2       # 两次请求最小间隔(秒)，约300次/分钟的官方限速
+
+    def __init__(self, cache_ttl: int = CACHE_TTL, max_workers: int = MAX_WORKERS,
+                 min_interval: float = MIN_INTERVAL, timeout: int = 10):
+        self.cache_ttl = cache_ttl
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.timeout = timeout
+        # 地址(小写) → (pairs, 时间, 错误)；查询失败时 pairs 为 None，错误在 TTL 内直接复用
+        # 按写入时间排序 (TTL 统一，过期的都在头部)，写入时顺手清掉；超过 MAX_CACHE 时淘汰最早写入的
+        self.cache: "OrderedDict[str, Tuple[Optional[List[Dict]], float, Optional[Exception]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._next_slot = 0.0
+        self.stats = {'requests': 0, 'cache_hits': 0, 'errors': 0}
+
+    # ---------- 底层 ----------
+
+    def _wait_for_slot(self):
+        """简单限速: 每个请求占一个时间槽"""
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _request(self, addresses: List[str]) -> List[Dict]:
+        self._wait_for_slot()
+        self.stats['requests'] += 1
+        url = self.TOKENS_URL + ",".join(addresses)
+        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            data = json.loads(resp.read().decode('utf-8'))
+        return data.get('pairs') or []
+
+    def _store(self, addr: str, pairs: Optional[List[Dict]], fetched_at: float,
+               error: Optional[Exception] = None):
+        """写入缓存并清理过期/超量的条目 (调用方持有 _cache_lock)"""
+        key = addr.lower()
+        self.cache[key] = (pairs, fetched_at, error)
+        self.cache.move_to_end(key)
+        while self.cache:
+            oldest = next(iter(self.cache.values()))
+            if len(self.cache) <= self.MAX_CACHE and fetched_at - oldest[1] < self.cache_ttl:
+                break
+            self.cache.popitem(last=False)
+
+    def _fetch_batch(self, addresses: List[str]) -> Dict[str, List[Dict]]:
+        """请求一批地址，把返回的交易对按地址分组 (保持接口返回顺序)"""
+        grouped = {addr.lower(): [] for addr in addresses}
+        for pair in self._request(addresses):
+            sides = {((pair.get(side) or {}).get('address') or '').lower()
+                     for side in ('baseToken', 'quoteToken')}
+            # 同一批里的两个代币组成的交易对，两边都要算上
+            for addr in sides:
+                if addr in grouped:
+                    grouped[addr].append(pair)
+        return grouped
+
+    # ---------- 对外接口 ----------
+
+    def get_pairs(self, addresses: Iterable[str],
+                  raise_errors: bool = False) -> Dict[str, List[Dict]]:
+        """
+        批量查询多个代币的交易对
+        返回 {原始地址: [pair, ...]}；查询失败的地址不在结果里
+        (TTL 内刚失败过的地址不重新请求，raise_errors 时抛出上次的错误)
+        """
+        wanted = list(dict.fromkeys(a for a in addresses if a))
+        result: Dict[str, List[Dict]] = {}
+        missing: List[str] = []
+        errors = []
+        now = time.time()
+
+        with self._cache_lock:
+            for addr in wanted:
+                cached = self.cache.get(addr.lower())
+                if cached and now - cached[1] < self.cache_ttl:
+                    self.stats['cache_hits'] += 1
+                    if cached[2] is not None:
+                        errors.append(cached[2])
+                    else:
+                        result[addr] = cached[0]
+                else:
+                    missing.append(addr)
+
+        if not missing:
+            if errors and raise_errors:
+                raise errors[0]
+            return result
+
+        batches = [missing[i:i + self.BATCH_SIZE]
+                   for i in range(0, len(missing), self.BATCH_SIZE)]
+
+        def run(batch):
+            try:
+                return batch, self._fetch_batch(batch), None
+            except Exception as e:
+                return batch, None, e
+
+        workers = min(self.max_workers, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch, grouped, error in pool.map(run, batches):
+                fetched_at = time.time()
+                if error is not None:
+                    self.stats['errors'] += 1
+                    errors.append(error)
+                    print(f"⚠️ DexScreener批量查询失败 ({len(batch)}个地址): {error}")
+                    with self._cache_lock:
+                        for addr in batch:
+                            self._store(addr, None, fetched_at, error)
+                    continue
+                with self._cache_lock:
+                    for addr in batch:
+                        pairs = grouped[addr.lower()]
+                        self._store(addr, pairs, fetched_at)
+                        result[addr] = pairs
+
+        if errors and raise_errors:
+            raise errors[0]
+        return result
+
+    def get_token_pairs(self, address: str) -> List[Dict]:
+        """查询单个代币的交易对 (走缓存；失败时抛出异常)"""
+        return self.get_pairs([address], raise_errors=True).get(address, [])
+
+    def prefetch(self, addresses: Iterable[str]):
+        """预先批量拉取，后续逐个 get_token_pairs 直接命中缓存"""
+        self.get_pairs(addresses)
+
+
+_default_client: Optional[DexScreenerClient] = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> DexScreenerClient:
+    """进程内共享的客户端实例"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = DexScreenerClient()
+        return _default_client
@@ -7,7 +7,9 @@
 
 import json
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, FrozenSet, Optional
+
+from tweet_engine import get_engine
 
 class ElonContentAnalyzer:
     """Elon内容分析师 - 极简版"""
@@ -51,22 +53,20 @@ class ElonContentAnalyzer:
                 'focus': '个人动态、社会话题、其他内容'
             }
         }
+        
+        # 关键词注册进共用的匹配引擎
+        self.engine = get_engine()
+        self.engine.register(*(info['keywords'] for info in self.industries.values()))
     
-    def analyze_content(self, text: str) -> List[str]:
-        """分析推文内容涉及的产业"""
+    def analyze_content(self, text: str, found: Optional[FrozenSet[str]] = None) -> List[str]:
+        """分析推文内容涉及的产业 (found: 词库命中结果，批量分析时传入)"""
         if not text:
             return ['other']
         
-        text_lower = text.lower()
-        matched = []
-        
-        for ind_id, info in self.industries.items():
-            if ind_id == 'other':
-                continue
-            for keyword in info['keywords']:
-                if keyword in text_lower:
-                    matched.append(ind_id)
-                    break
+        if found is None:
+            found = self.engine.scan(text)
+        matched = [ind_id for ind_id, info in self.industries.items()
+                   if ind_id != 'other' and not found.isdisjoint(info['keywords'])]
         
         return matched if matched else ['other']
     
@@ -97,13 +97,15 @@ class ElonContentAnalyzer:
         
         # 按产业分类
         industry_content = {ind_id: [] for ind_id in self.industries.keys()}
+        # 词库命中和 strip 无关 (词不以空白开头结尾)，用原文扫描才能命中其他分析器留下的缓存
+        found_all = self.engine.scan_many([(tweet.get('text', ''), tweet.get('id')) for tweet in tweets])
         
-        for tweet in tweets:
+        for tweet, found in zip(tweets, found_all):
             text = tweet.get('text', '').strip()
             if not text:
                 continue
             
-            industries = self.analyze_content(text)
+            industries = self.analyze_content(text, found)
             clean = self.clean_text(text)
             
             if clean:
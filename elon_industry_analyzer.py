@@ -8,9 +8,11 @@
 import json
 import urllib.request
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
 import os
 
+from tweet_engine import get_engine
+
 class ElonIndustryAnalyzer:
     """Elon产业分析师"""
     
@@ -68,19 +70,16 @@ class ElonIndustryAnalyzer:
                 'stock': None
             }
         }
-    
-    def analyze_tweet_industry(self, tweet_text: str) -> List[Dict]:
-        """分析推文涉及的产业"""
-        text_lower = tweet_text.lower()
-        matched_industries = []
         
-        for industry_id, industry_info in self.industries.items():
-            for keyword in industry_info['keywords']:
-                if keyword in text_lower:
-                    matched_industries.append(industry_info)
-                    break
-        
-        return matched_industries
+        # 关键词注册进共用的匹配引擎
+        self.engine = get_engine()
+        self.engine.register(*(info['keywords'] for info in self.industries.values()))
+    
+    def analyze_tweet_industry(self, tweet_text: str, found: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """分析推文涉及的产业 (found: 词库命中结果，批量分析时传入)"""
+        if found is None:
+            found = self.engine.scan(tweet_text)
+        return [info for info in self.industries.values() if not found.isdisjoint(info['keywords'])]
     
     def get_industry_analysis(self, industry_id: str) -> str:
         """获取产业深度分析"""
@@ -152,9 +151,10 @@ class ElonIndustryAnalyzer:
         industry_tweets = {ind_id: [] for ind_id in self.industries.keys()}
         industry_tweets['other'] = []
         
-        for tweet in tweets:
+        found_all = self.engine.scan_many([(tweet.get('text', ''), tweet.get('id')) for tweet in tweets])
+        for tweet, found in zip(tweets, found_all):
             text = tweet.get('text', '')
-            industries = self.analyze_tweet_industry(text)
+            industries = self.analyze_tweet_industry(text, found)
             
             if industries:
                 for ind in industries:
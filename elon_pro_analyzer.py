@@ -8,9 +8,11 @@ import os
 import re
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from collections import Counter
 
+from tweet_engine import get_engine
+
 class ElonMuskProAnalyzer:
     """马斯克推文专业分析器"""
     
@@ -59,17 +61,37 @@ class ElonMuskProAnalyzer:
             'moderate': ['good', 'great', 'nice', 'cool', 'interesting'],
             'mild': ['ok', 'fine', 'maybe', 'perhaps']
         }
+        
+        # 情绪词
+        self.positive_words = ['love', 'great', 'amazing', 'awesome', 'bullish', 'moon', 'rocket']
+        self.negative_words = ['hate', 'bad', 'terrible', 'bearish', 'crash', 'dump', 'scam']
+        
+        # 所有词库注册进共用的匹配引擎 (编译一次，按推文 id 缓存命中结果)
+        self.engine = get_engine()
+        self.engine.register(*(data['terms'] for data in self.keywords.values()),
+                             self.sarcasm_markers, *self.intensity_words.values(),
+                             self.positive_words, self.negative_words)
     
     def fetch_recent_tweets(self, hours: int = 25) -> List[Dict]:
         """获取最近N小时的推文"""
         # API调用逻辑...
         pass
     
-    def analyze_tweet_pro(self, tweet: Dict) -> Dict:
-        """专业级推文分析（5层分析法）"""
+    def analyze_tweets_pro(self, tweets: List[Dict]) -> List[Dict]:
+        """批量分析: 整批推文一次扫描词库，再逐条评分"""
+        found = self.engine.scan_many([(t.get('text', ''), t.get('id')) for t in tweets])
+        return [self.analyze_tweet_pro(t, f) for t, f in zip(tweets, found)]
+    
+    def analyze_tweet_pro(self, tweet: Dict, found: Optional[FrozenSet[str]] = None) -> Dict:
+        """
+        专业级推文分析（5层分析法）
+        found: 词库命中结果 (批量分析时传入)，不传则现扫
+        """
         
         text = tweet.get('text', '')
         text_lower = text.lower()
+        if found is None:
+            found = self.engine.scan(text, tweet.get('id'))
         created = tweet.get('createdAt', '')
         likes = tweet.get('likeCount', 0)
         retweets = tweet.get('retweetCount', 0)
@@ -105,7 +127,7 @@ class ElonMuskProAnalyzer:
         # 检测相关领域
         detected_categories = []
         for category, data in self.keywords.items():
-            if any(term in text_lower for term in data['terms']):
+            if not found.isdisjoint(data['terms']):
                 detected_categories.append({
                     'category': category,
                     'impact': data['impact_level'],
@@ -122,18 +144,18 @@ class ElonMuskProAnalyzer:
         
         # === 第3层：语义分析 ===
         # 讽刺检测
-        sarcasm_score = sum(1 for marker in self.sarcasm_markers if marker in text_lower)
+        sarcasm_score = sum(1 for marker in self.sarcasm_markers if marker in found)
         is_likely_sarcasm = sarcasm_score >= 1 and likes > 100000  # 高互动+讽刺标记
         
         # 情感强度
         intensity = 'neutral'
         for level, words in self.intensity_words.items():
-            if any(w in text_lower for w in words):
+            if not found.isdisjoint(words):
                 intensity = level
                 break
         
         # 情绪极性
-        sentiment = self._analyze_sentiment(text_lower)
+        sentiment = self._analyze_sentiment(found)
         
         analysis['semantic'] = {
             'sentiment': sentiment,
@@ -185,13 +207,10 @@ class ElonMuskProAnalyzer:
         else:
             return total / 50000 * 5
     
-    def _analyze_sentiment(self, text: str) -> Dict:
-        """分析情感"""
-        positive_words = ['love', 'great', 'amazing', 'awesome', 'bullish', 'moon', 'rocket']
-        negative_words = ['hate', 'bad', 'terrible', 'bearish', 'crash', 'dump', 'scam']
-        
-        pos_count = sum(1 for w in positive_words if w in text)
-        neg_count = sum(1 for w in negative_words if w in text)
+    def _analyze_sentiment(self, found: FrozenSet[str]) -> Dict:
+        """分析情感 (found: 命中的词)"""
+        pos_count = sum(1 for w in self.positive_words if w in found)
+        neg_count = sum(1 for w in self.negative_words if w in found)
         
         if pos_count > neg_count:
             return {'type': 'positive', 'score': min(pos_count * 2, 10)}
@@ -491,8 +510,7 @@ def main():
         }
     ]
     
-    for tweet in test_tweets:
-        analysis = analyzer.analyze_tweet_pro(tweet)
+    for analysis in analyzer.analyze_tweets_pro(test_tweets):
         report = analyzer.generate_pro_report(analysis)
         print(report)
         print("\n" + "="*70 + "\n")
@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List
 import subprocess
 
+from dashboard_renderer import write_if_changed
+from scheduler_daemon import load_job_status
+
 class DashboardGenerator:
     """Dashboard生成器"""
     
@@ -20,14 +23,14 @@ class DashboardGenerator:
         os.makedirs(self.output_dir, exist_ok=True)
     
     def get_cron_status(self) -> List[Dict]:
-        """获取定时任务状态"""
+        """获取定时任务状态 (openclaw cron + 调度守护进程里的任务)"""
+        jobs = []
         try:
             result = subprocess.run(
                 ['openclaw', 'cron', 'list', '--json'],
                 capture_output=True, text=True, timeout=10
             )
             data = json.loads(result.stdout)
-            jobs = []
             for job in data.get('jobs', []):
                 state = job.get('state', {})
                 jobs.append({
@@ -38,10 +41,19 @@ class DashboardGenerator:
                     'last_status': state.get('lastStatus', 'unknown'),
                     'schedule': job.get('schedule', {}).get('expr', '-')
                 })
-            return jobs
         except Exception as e:
             print(f"获取cron状态失败: {e}")
-            return []
+
+        for name, job in load_job_status().items():
+            jobs.append({
+                'name': name,
+                'enabled': job.get('enabled', False),
+                'next_run': self._format_time((job.get('next_run') or 0) * 1000),
+                'last_run': self._format_time((job.get('last_run') or 0) * 1000),
+                'last_status': 'running' if job.get('running') else job.get('last_status', 'pending'),
+                'schedule': job.get('schedule', '-')
+            })
+        return jobs
     
     def _format_time(self, ms: int) -> str:
         """格式化时间戳"""
@@ -308,9 +320,10 @@ class DashboardGenerator:
     def generate(self):
         """生成Dashboard"""
         html = self.generate_html()
-        with open(self.html_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        print(f"✅ Dashboard已生成: {self.html_file}")
+        if write_if_changed(self.html_file, html, ignore=[r'更新时间: [^<]*']):
+            print(f"✅ Dashboard已生成: {self.html_file}")
+        else:
+            print(f"⏭️ Dashboard内容无变化，跳过写入: {self.html_file}")
         return self.html_file
 
 
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+貔貅检测缓存 - 同一个合约不重复调用 honeypot.is
+- 按 (chain, contract) 缓存
+- 结果保存在 SmartDatabase，读取时叠加粘性标记: 合约开源后不会变回闭源，
+  tokens.is_honeypot 标记的合约按貔貅处理
+- 确认貔貅的结论保留 HONEYPOT_TTL (7天) 后复检 (误报 / 合约状态变化)，复检结果会同步 tokens.is_honeypot
+- 易变字段 (税率、持有人) 按TTL过期后重新检测
+- 同一合约的并发查询合并成一次请求
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from smart_database import SmartDatabase
+
+HONEYPOT_API = "https://api.honeypot.is/v2/IsHoneypot?address={address}&chainID={chain_id}"
+
+
+class SingleFlight:
+    """同一个key的并发调用只真正执行一次，其余调用等待同一个结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+
+def fetch_honeypot_is(chain_id: str, address: str, timeout: int = 10) -> Dict:
+    """请求 honeypot.is，返回原始JSON"""
+    url = HONEYPOT_API.format(address=address, chain_id=chain_id)
+    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode())
+
+
+def is_honeypot_response(data: Dict) -> bool:
+    """兼容 v2 顶层字段和 honeypotResult 子字段"""
+    return bool(data.get('isHoneypot') or
+                (data.get('honeypotResult') or {}).get('isHoneypot'))
+
+
+class HoneypotCache:
+    """honeypot.is 结果缓存 (内存 + SQLite)"""
+
+    VOLATILE_TTL = 600  # 税率/持有人等易变字段: 10分钟
+    HONEYPOT_TTL = 7 * 86400  # 确认貔貅的结论: 7天后复检
+    MAX_ENTRIES = 5000  # 内存里按 LRU 最多保留的合约数，常驻进程里不会无限增长 (SQLite 里的不受影响)
+
+    def __init__(self, db: Optional[SmartDatabase] = None, ttl: int = VOLATILE_TTL,
+                 fetcher: Callable[[str, str], Dict] = fetch_honeypot_is):
+        self.db = db
+        self.ttl = ttl
+        self.fetcher = fetcher
+        self.memory: "OrderedDict[Tuple[str, str], Tuple[Dict, float]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self.flight = SingleFlight()
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'fetches': 0}
+
+    @staticmethod
+    def key(chain_id, address: str) -> Tuple[str, str]:
+        return str(chain_id), address.lower()
+
+    def _fresh(self, fetched_at: float, data: Dict) -> bool:
+        # 确认是貔貅的结论基本不会再变，保留更久
+        ttl = self.HONEYPOT_TTL if is_honeypot_response(data) else self.ttl
+        return time.time() - fetched_at < ttl
+    
+    @staticmethod
+    def _with_sticky(data: Dict, is_honeypot: bool, open_source: bool) -> Dict:
+        """把数据库里的粘性标记叠加到响应上 (不改原字典)"""
+        if is_honeypot and not is_honeypot_response(data):
+            data = dict(data, isHoneypot=True)
+        if open_source and not (data.get('contractCode') or {}).get('openSource'):
+            data = dict(data, contractCode=dict(data.get('contractCode') or {}, openSource=True))
+        return data
+
+    def _remember(self, key: Tuple[str, str], data: Dict, fetched_at: float):
+        with self._memory_lock:
+            self.memory[key] = (data, fetched_at)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.MAX_ENTRIES:
+                self.memory.popitem(last=False)
+
+    def get(self, chain_id, address: str) -> Dict:
+        """返回 honeypot.is 原始响应；检测失败时抛出异常 (失败结果不缓存)"""
+        key = self.key(chain_id, address)
+
+        with self._memory_lock:
+            cached = self.memory.get(key)
+            if cached and self._fresh(cached[1], cached[0]):
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return cached[0]
+
+        return self.flight.do(key, lambda: self._load(key))
+
+    def _load(self, key: Tuple[str, str]) -> Dict:
+        chain_id, address = key
+
+        if self.db:
+            row = self.db.get_honeypot_check(chain_id, address)
+            if row:
+                data = self._with_sticky(row['response'], row['is_honeypot'], row['open_source'])
+                if self._fresh(row['checked_at'], data):
+                    self.stats['db_hits'] += 1
+                    self._remember(key, data, row['checked_at'])
+                    return data
+
+        self.stats['fetches'] += 1
+        data = self.fetcher(chain_id, address)
+        fetched_at = time.time()
+
+        if self.db:
+            # 合约一旦开源就不会再变回闭源
+            previous = self.db.get_honeypot_check(chain_id, address)
+            open_source = bool((data.get('contractCode') or {}).get('openSource') or
+                               (previous and previous['open_source']))
+            self.db.save_honeypot_check(chain_id, address, data,
+                                        is_honeypot=is_honeypot_response(data),
+                                        open_source=open_source,
+                                        checked_at=fetched_at)
+            data = self._with_sticky(data, False, open_source)
+
+        self._remember(key, data, fetched_at)
+        return data
+
+
+_default_cache: Optional[HoneypotCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> HoneypotCache:
+    """进程内共享的缓存实例 (使用默认SmartDatabase)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HoneypotCache(SmartDatabase())
+        return _default_cache
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+📈 推文影响回测 - 检验 ElonMuskProAnalyzer 给出的影响分数 / 预计波动
+以前 "±10-30%" 这类预测从来没有对过账。这里用历史推文 + 本地K线算实际涨跌：
+- 推文: TweetStore (按作者查) 或 twitterapi.io 格式的 JSON 文件 (带点赞数，影响分数更准)
+- K线: 本地 CSV，每个标的一个文件 {bars_dir}/{SYMBOL}.csv
+  列: 时间 (秒/毫秒时间戳或 ISO) + 收盘价；有表头时按 close 列名取，
+  没表头时两列取第2列、币安 kline 格式取第5列
+- 每条推文 × 每个时间窗口 (15分钟 / 1小时 / 4小时 / 1天):
+  起点 = 推文时刻之前最近一根K线的收盘价，终点 = 窗口结束前最近一根的收盘价，
+  另算窗口内的最大偏离 (最高/最低收盘价相对起点)
+- 对齐用 merge-asof: 推文和K线都按时间排好序，每次从上一个位置往后二分 (bisect 的 lo)，
+  几年的分钟线也只要 O(推文数 × log K线数)；窗口内最大/最小值用数组切片的 max/min (C 里完成)
+- 按类别、影响级别汇总 (样本数、平均/中位/P90 绝对涨跌、上涨比例、最大偏离)，
+  并和同一标的同一窗口的无条件基准波动对比，看推文是否真的带来超额波动
+(纯 Python 实现: 仓库不依赖 numpy / pandas，排序数组 + 双指针就是 merge_asof 的做法)
+
+用法:
+    python3 impact_backtest.py                                  # TweetStore 里 elonmusk 的推文
+    python3 impact_backtest.py --tweets tweets.json --bars /path/to/bars
+    python3 impact_backtest.py --selftest                       # 用合成数据自检
+"""
+
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BARS_DIR = '/root/.openclaw/workspace/memory/price_bars'
+
+HORIZONS = {'15m': 900, '1h': 3600, '4h': 4 * 3600, '1d': 86400}
+
+# 类别 → 回测用的标的 (对应 _predict_affected_assets 里的资产；没有K线文件的自动跳过)
+CATEGORY_SYMBOLS = {
+    'crypto': ['DOGEUSDT', 'BTCUSDT'],
+    'tesla': ['TSLA'],
+    'spacex': ['ITA'],
+    'ai_tech': ['NVDA', 'MSFT'],
+}
+
+
+# ==================== K线 ====================
+
+def _parse_time(value: str) -> Optional[float]:
+    """秒/毫秒时间戳、ISO 时间、twitterapi.io 的 'Tue Feb 11 10:00:00 +0000 2026' → UTC 秒"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        ts = float(value)
+        return ts / 1000 if ts > 1e11 else ts
+    except ValueError:
+        pass
+    for parse in (lambda v: datetime.fromisoformat(v.replace('Z', '+00:00')),
+                  lambda v: datetime.strptime(v, '%a %b %d %H:%M:%S %z %Y')):
+        try:
+            dt = parse(value)
+        except ValueError:
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+class Bars:
+    """一个标的的K线 (按时间升序的 times / closes 数组)"""
+
+    def __init__(self, symbol: str, times: Iterable[float], closes: Iterable[float]):
+        rows = sorted(zip(times, closes))
+        self.symbol = symbol
+        self._spacing: Optional[float] = None
+        self.times = array('d', (t for t, _ in rows))
+        self.closes = array('d', (c for _, c in rows))
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def load_csv(cls, path: str, symbol: Optional[str] = None) -> 'Bars':
+        symbol = symbol or os.path.splitext(os.path.basename(path))[0]
+        times, closes = [], []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return cls(symbol, [], [])
+            header = [c.strip().lower() for c in first]
+            if 'close' in header:
+                close_col = header.index('close')
+                rows = reader
+            else:
+                close_col = 1 if len(first) == 2 else 4
+                rows = itertools.chain([first], reader)
+            for row in rows:
+                try:
+                    t, c = _parse_time(row[0]), float(row[close_col])
+                except (IndexError, ValueError):
+                    continue
+                if t is not None and c > 0:
+                    times.append(t)
+                    closes.append(c)
+        return cls(symbol, times, closes)
+
+    def spacing(self) -> float:
+        """K线间隔 (相邻时间差的中位数)"""
+        if self._spacing is None:
+            gaps = sorted(b - a for a, b in zip(self.times, self.times[1:]))
+            self._spacing = gaps[len(gaps) // 2] if gaps else 0.0
+        return self._spacing
+
+
+def merge_asof(query_times: List[float], bar_times: array) -> List[int]:
+    """
+    每个查询时刻之前 (含) 最近一根K线的下标，没有则 -1
+    query_times 必须升序；下一次查找从上一次的位置开始 (指针只前进)
+    """
+    out, lo = [], 0
+    for t in query_times:
+        lo = bisect_right(bar_times, t, lo)
+        out.append(lo - 1)
+    return out
+
+
+# ==================== 回测 ====================
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法百分位"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _summarize(moves: List[Dict]) -> Dict:
+    abs_moves = sorted(abs(m['move']) for m in moves)
+    excursions = [m['excursion'] for m in moves if m['excursion'] is not None]
+    n = len(moves)
+    return {
+        'n': n,
+        'mean_abs': sum(abs_moves) / n if n else 0.0,
+        'median_abs': _percentile(abs_moves, 50),
+        'p90_abs': _percentile(abs_moves, 90),
+        'up_ratio': sum(1 for m in moves if m['move'] > 0) / n if n else 0.0,
+        'mean_excursion': sum(excursions) / len(excursions) if excursions else None,
+    }
+
+
+def tweet_time(tweet: Dict) -> Optional[float]:
+    """推文时间: createdAt / posted_at，解析不了退回抓取时间"""
+    return (_parse_time(tweet.get('createdAt') or tweet.get('posted_at') or '')
+            or tweet.get('fetched_at'))
+
+
+class ImpactBacktest:
+    """
+    推文影响回测
+    run(tweets) → {'samples': [...], 'by_category': {(类别, 窗口): 统计},
+                   'by_level': {(影响级别, 窗口): 统计}, 'baseline': {(标的, 窗口): 统计}}
+    涨跌都是百分比
+    """
+
+    def __init__(self, bars_dir: str = DEFAULT_BARS_DIR, horizons: Optional[Dict[str, int]] = None,
+                 category_symbols: Optional[Dict[str, List[str]]] = None, analyzer=None):
+        if analyzer is None:
+            from elon_pro_analyzer import ElonMuskProAnalyzer
+            analyzer = ElonMuskProAnalyzer()
+        self.analyzer = analyzer
+        self.bars_dir = bars_dir
+        self.horizons = horizons or HORIZONS
+        self.category_symbols = category_symbols or CATEGORY_SYMBOLS
+        self._bars: Dict[str, Optional[Bars]] = {}
+
+    def bars(self, symbol: str) -> Optional[Bars]:
+        if symbol not in self._bars:
+            path = os.path.join(self.bars_dir, f"{symbol}.csv")
+            self._bars[symbol] = Bars.load_csv(path, symbol) if os.path.exists(path) else None
+        return self._bars[symbol]
+
+    def realized_moves(self, bars: Bars, times: List[float], excursion: bool = True,
+                       horizons: Optional[Dict[str, int]] = None) -> Dict[str, List[Optional[Tuple[float, Optional[float]]]]]:
+        """
+        一批升序时刻在各窗口的 (涨跌%, 最大偏离%)；起点/终点附近没有K线 (停牌、数据缺口) 为 None
+        容忍度: 最近一根K线不能早于目标时刻 2 个K线间隔
+        excursion=False 时不算最大偏离 (基准波动点数多，只要收盘到收盘)
+        """
+        tolerance = 2 * bars.spacing()
+        bt, closes = bars.times, bars.closes
+        start_idx = merge_asof(times, bt)
+        result = {}
+        for name, seconds in (horizons or self.horizons).items():
+            end_idx = merge_asof([t + seconds for t in times], bt)
+            moves = []
+            for t, i0, i1 in zip(times, start_idx, end_idx):
+                if (i0 < 0 or i1 <= i0 or t - bt[i0] > tolerance
+                        or t + seconds - bt[i1] > tolerance):
+                    moves.append(None)
+                    continue
+                c0 = closes[i0]
+                peak = None
+                if excursion:
+                    window = closes[i0 + 1:i1 + 1]
+                    peak = max(abs(max(window) / c0 - 1), abs(min(window) / c0 - 1)) * 100
+                moves.append(((closes[i1] / c0 - 1) * 100, peak))
+            result[name] = moves
+        return result
+
+    def baseline(self, bars: Bars, step: Optional[float] = None) -> Dict[str, Dict]:
+        """无条件基准: 每隔 step 秒 (默认按窗口长度) 取一个起点的实际涨跌"""
+        if len(bars) < 2:
+            return {}
+        out = {}
+        for name, seconds in self.horizons.items():
+            interval = step or seconds
+            n = int((bars.times[-1] - bars.times[0]) // interval)
+            times = [bars.times[0] + k * interval for k in range(n)]
+            moves = [m for m in self.realized_moves(bars, times, False, {name: seconds})[name] if m]
+            out[name] = _summarize([{'move': m, 'excursion': e} for m, e in moves])
+        return out
+
+    def run(self, tweets: List[Dict]) -> Dict:
+        tweets = [t for t in tweets if t.get('text')]
+        analyses = self.analyzer.analyze_tweets_pro(tweets)
+
+        # 按标的分组: [(时间, 推文序号, 类别列表, 影响级别)]
+        by_symbol: Dict[str, List[Tuple[float, int, List[str], str]]] = {}
+        samples = []
+        for idx, (tweet, analysis) in enumerate(zip(tweets, analyses)):
+            ts = tweet_time(tweet)
+            categories = [c['category'] for c in analysis['entities']['categories']]
+            samples.append({'id': tweet.get('id'), 'time': ts, 'categories': categories,
+                            'score': analysis['impact']['score'], 'level': analysis['impact']['level'],
+                            'predicted': analysis['impact']['estimated_volatility'], 'moves': {}})
+            if ts is None:
+                continue
+            for symbol in dict.fromkeys(s for c in categories for s in self.category_symbols.get(c, [])):
+                by_symbol.setdefault(symbol, []).append((ts, idx, categories, analysis['impact']['level']))
+
+        by_category: Dict[Tuple[str, str], List[Dict]] = {}
+        by_level: Dict[Tuple[str, str], List[Dict]] = {}
+        baseline = {}
+        for symbol, rows in by_symbol.items():
+            bars = self.bars(symbol)
+            if bars is None or len(bars) < 2:
+                continue
+            rows.sort()
+            moves = self.realized_moves(bars, [r[0] for r in rows])
+            for horizon, results in moves.items():
+                for (ts, idx, categories, level), res in zip(rows, results):
+                    if res is None:
+                        continue
+                    move = {'symbol': symbol, 'move': res[0], 'excursion': res[1]}
+                    samples[idx]['moves'].setdefault(symbol, {})[horizon] = move
+                    for c in categories:
+                        if symbol in self.category_symbols.get(c, []):
+                            by_category.setdefault((c, horizon), []).append(move)
+                    by_level.setdefault((level, horizon), []).append(move)
+            for horizon, stats in self.baseline(bars).items():
+                baseline[(symbol, horizon)] = stats
+
+        return {
+            'samples': samples,
+            'by_category': {k: _summarize(v) for k, v in by_category.items()},
+            'by_level': {k: _summarize(v) for k, v in by_level.items()},
+            'baseline': baseline,
+        }
+
+    def report(self, result: Dict) -> str:
+        lines = [
+            "📈 推文影响回测",
+            f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            "=" * 70,
+            f"推文: {len(result['samples'])} 条，"
+            f"有行情样本: {sum(1 for s in result['samples'] if s['moves'])} 条",
+            "",
+        ]
+        predicted = {cat: data['typical_movement'] for cat, data in self.analyzer.keywords.items()}
+        header = f"  {'窗口':<6}{'样本':>6}{'平均|涨跌|':>12}{'中位':>9}{'P90':>9}{'上涨比例':>10}{'最大偏离':>10}"
+
+        def rows(stats_by_key, key):
+            out = []
+            for horizon in self.horizons:
+                s = stats_by_key.get((key, horizon))
+                if s and s['n']:
+                    out.append(f"  {horizon:<6}{s['n']:>6}{s['mean_abs']:>11.2f}%{s['median_abs']:>8.2f}%"
+                               f"{s['p90_abs']:>8.2f}%{s['up_ratio']:>10.0%}"
+                               + (f"{s['mean_excursion']:>9.2f}%" if s['mean_excursion'] is not None else f"{'-':>10}"))
+            return out
+
+        lines.append("🏷️ 按类别:")
+        for cat in self.category_symbols:
+            body = rows(result['by_category'], cat)
+            if body:
+                lines += [f"\n{cat} (预测: {predicted.get(cat, '-')}, 标的: {', '.join(self.category_symbols[cat])})",
+                          header] + body
+
+        lines.append("\n🎚️ 按影响级别:")
+        for level in ('high', 'medium', 'low'):
+            body = rows(result['by_level'], level)
+            if body:
+                lines += [f"\n{level}", header] + body
+
+        symbols = sorted({s for s, _ in result['baseline']})
+        if symbols:
+            lines.append("\n📏 无条件基准 (同标的同窗口):")
+            for symbol in symbols:
+                body = rows(result['baseline'], symbol)
+                if body:
+                    lines += [f"\n{symbol}", header] + body
+
+        lines.append("\n" + "=" * 70)
+        return "\n".join(lines)
+
+
+# ==================== 数据来源 ====================
+
+def load_tweets_from_store(author: str = 'elonmusk', db_path: Optional[str] = None) -> List[Dict]:
+    """TweetStore 里某个作者的全部推文 (没有互动数据，影响分数只按类别和时段算)"""
+    from tweet_store import TweetStore
+    store = TweetStore(db_path) if db_path else TweetStore()
+    return [{'id': row['tweet_key'], 'text': row['text'], 'createdAt': row['posted_at'],
+             'fetched_at': row['fetched_at']} for row in store.query(author=author)]
+
+
+def load_tweets_from_json(path: str) -> List[Dict]:
+    """twitterapi.io 格式的推文 JSON (列表，或 {'tweets': [...]})"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('tweets', []) if isinstance(data, dict) else data
+
+
+# ==================== 自检 ====================
+
+def selftest():
+    """合成K线 + 合成推文: DOGE 推文后1小时内拉升 10%，其他时间随机游走，回测应能看出来"""
+    import random
+    import tempfile
+    import time
+
+    rng = random.Random(0)
+    start = datetime(2023, 1, 2, tzinfo=timezone.utc).timestamp()
+    minutes = 60 * 24 * 365 * 2  # 两年分钟线
+    doge_tweets = sorted(start + rng.randrange(86400, minutes * 60 - 2 * 86400) for _ in range(500))
+    jump_at = {int((t - start) // 60) for t in doge_tweets}
+
+    with tempfile.TemporaryDirectory() as bars_dir:
+        price, ramp = 0.08, 0
+        with open(os.path.join(bars_dir, 'DOGEUSDT.csv'), 'w') as f:
+            f.write('timestamp,close\n')
+            for k in range(minutes):
+                if k in jump_at:
+                    ramp = 60
+                price *= 1 + rng.gauss(0, 0.0005) + (0.10 / 60 if ramp > 0 else 0)
+                ramp -= 1
+                f.write(f"{int((start + k * 60) * 1000)},{price:.8f}\n")
+
+        tweets = [{'id': f"d{i}", 'text': 'Dogecoin to the moon', 'likeCount': 150000,
+                   'createdAt': datetime.fromtimestamp(t, timezone.utc).isoformat()}
+                  for i, t in enumerate(doge_tweets)]
+        tweets += [{'id': f"o{i}", 'text': 'Nice day', 'likeCount': 1000,
+                    'createdAt': datetime.fromtimestamp(start + i * 3600, timezone.utc).isoformat()}
+                   for i in range(500)]
+
+        began = time.time()
+        backtest = ImpactBacktest(bars_dir=bars_dir)
+        result = backtest.run(tweets)
+        print(backtest.report(result))
+        print(f"⏱️ {minutes:,} 根K线 × {len(tweets)} 条推文，耗时 {time.time() - began:.1f}s")
+
+        hour = result['by_category'][('crypto', '1h')]
+        base = result['baseline'][('DOGEUSDT', '1h')]
+        assert hour['n'] == len(doge_tweets), hour
+        assert hour['mean_abs'] > 5 > base['mean_abs'], (hour, base)
+        assert hour['up_ratio'] > 0.9, hour
+        print("✅ 自检通过")
+
+
+def main():
+    args = sys.argv[1:]
+    if '--selftest' in args:
+        selftest()
+        return
+
+    def opt(name, default=None):
+        return args[args.index(name) + 1] if name in args and args.index(name) + 1 < len(args) else default
+
+    tweets = (load_tweets_from_json(opt('--tweets')) if opt('--tweets')
+              else load_tweets_from_store(opt('--author', 'elonmusk')))
+    backtest = ImpactBacktest(bars_dir=opt('--bars', DEFAULT_BARS_DIR))
+    report = backtest.report(backtest.run(tweets))
+    print(report)
+
+    report_file = f"/tmp/impact_backtest_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        f.write(report)
+    print(f"\n💾 回测报告已保存: {report_file}")
+
+
+if __name__ == "__main__":
+    main()
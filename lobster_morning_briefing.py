@@ -2,110 +2,53 @@
 """
 🦞 智能早报生成器 - 详细版
 每天早上8:30自动生成详细早报并推送到Telegram
+08:20 先用 --prepare 预抓数据存快照，08:30 发送时直接从快照渲染
 """
 
 import json
 import os
 import re
-import urllib.request
-import subprocess
+import sys
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from tweet_store import TweetStore
+from briefing_snapshot import BriefingSnapshot
+from market_quotes import fetch_market_snapshot
+from notifier import send_telegram
 
 TELEGRAM_TARGET = '5440939697'
 
 def send_to_telegram(message: str) -> bool:
-    """推送消息到Telegram"""
-    try:
-        env = os.environ.copy()
-        env['PATH'] = '/root/.nvm/versions/node/v22.22.0/bin:' + env.get('PATH', '')
-        cmd = [
-            '/root/.nvm/versions/node/v22.22.0/bin/openclaw',
-            'message', 'send', '--channel', 'telegram',
-            '--target', TELEGRAM_TARGET, '--message', message
-        ]
-        result = subprocess.run(cmd, capture_output=True, timeout=30, env=env)
-        return result.returncode == 0
-    except:
-        return False
-
-def get_tencent_data(symbol: str) -> Dict:
-    """从腾讯财经获取数据"""
-    try:
-        url = f"https://qt.gtimg.cn/q={symbol}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as r:
-            text = r.read().decode('gbk')
-            match = re.search(r'"([^"]+)"', text)
-            if match:
-                data = match.group(1).split('~')
-                price = float(data[3])
-                prev = float(data[4])
-                change_pct = ((price - prev) / prev) * 100
-                return {
-                    'price': price,
-                    'change': change_pct,
-                    'trend': 'up' if change_pct >= 0 else 'down',
-                    'name': data[1] if len(data) > 1 else symbol
-                }
-    except Exception as e:
-        print(f"❌ 获取 {symbol} 失败: {e}")
-    return None
-
-def get_binance_price(symbol: str) -> Dict:
-    """从币安获取加密货币数据"""
-    try:
-        url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={symbol}"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            change = float(data['priceChangePercent'])
-            return {
-                'price': float(data['lastPrice']),
-                'change': change,
-                'trend': 'up' if change >= 0 else 'down'
-            }
-    except Exception as e:
-        print(f"❌ 获取 {symbol} 失败: {e}")
-    return None
+    """推送消息到Telegram (进程内推送队列，不再每条消息启动一次 openclaw CLI)"""
+    return send_telegram(message, TELEGRAM_TARGET)
 
 def get_market_data() -> Dict:
-    """获取全面的市场数据"""
+    """获取全面的市场数据 (批量并发抓取，整体8秒截止，单项失败只影响这一项)"""
     print("🔄 获取全球市场数据...")
-    
-    # 美股指数
-    nasdaq = get_tencent_data('us.IXIC') or {}
-    dow = get_tencent_data('us.DJI') or {}
-    sp500 = get_tencent_data('us.SPX') or get_tencent_data('us.INX') or {}
-    
-    # A股指数
-    sh_index = get_tencent_data('sh000001') or {}  # 沪指
-    sz_index = get_tencent_data('sz399001') or {}  # 深指
-    
-    # 港股指数
-    hstech = get_tencent_data('hkHSTECH') or {}
-    
-    # 热门个股
-    nvidia = get_tencent_data('us.NVDA') or {}
-    tesla = get_tencent_data('us.TSLA') or {}
-    amd = get_tencent_data('us.AMD') or {}
-    
-    # 加密货币
-    btc = get_binance_price('BTCUSDT') or {}
-    eth = get_binance_price('ETHUSDT') or {}
-    sol = get_binance_price('SOLUSDT') or {}
+    quotes = fetch_market_snapshot(
+        tencent={
+            'nasdaq': 'us.IXIC', 'dow': 'us.DJI', 'sp500': ['us.SPX', 'us.INX'],  # 美股指数
+            'sh': 'sh000001', 'sz': 'sz399001',                                   # A股指数 (沪指/深指)
+            'hstech': 'hkHSTECH',                                                 # 港股指数
+            'nvidia': 'us.NVDA', 'tesla': 'us.TSLA', 'amd': 'us.AMD',             # 热门个股
+        },
+        binance={'btc': 'BTCUSDT', 'eth': 'ETHUSDT', 'sol': 'SOLUSDT'},           # 加密货币
+    )
+    q = {name: quote or {} for name, quote in quotes.items()}
     
     # 市场情绪判断
-    up_count = sum([1 for x in [nasdaq, dow, sp500] if x.get('trend') == 'up'])
+    up_count = sum([1 for x in [q['nasdaq'], q['dow'], q['sp500']] if x.get('trend') == 'up'])
     sentiment = '🔥 强烈看涨' if up_count >= 3 else '❄️ 偏空' if up_count == 0 else '⚖️ 震荡'
     
     return {
         'sentiment': sentiment,
-        'us_indices': {'nasdaq': nasdaq, 'dow': dow, 'sp500': sp500},
-        'cn_indices': {'sh': sh_index, 'sz': sz_index},
-        'hk_indices': {'hstech': hstech},
-        'stocks': {'nvidia': nvidia, 'tesla': tesla, 'amd': amd},
-        'crypto': {'btc': btc, 'eth': eth, 'sol': sol}
+        'us_indices': {'nasdaq': q['nasdaq'], 'dow': q['dow'], 'sp500': q['sp500']},
+        'cn_indices': {'sh': q['sh'], 'sz': q['sz']},
+        'hk_indices': {'hstech': q['hstech']},
+        'stocks': {'nvidia': q['nvidia'], 'tesla': q['tesla'], 'amd': q['amd']},
+        'crypto': {'btc': q['btc'], 'eth': q['eth'], 'sol': q['sol']}
     }
 
 def get_today_hot_news() -> List[str]:
@@ -125,9 +68,10 @@ def get_today_hot_news() -> List[str]:
 def get_twitter_summary() -> Dict:
     """智能总结Twitter昨日内容"""
     today = datetime.now().strftime('%Y-%m-%d')
-    log_file = f"/root/.openclaw/workspace/memory/twitter_logs/{today}.md"
+    store = TweetStore()
+    rows = store.query(day=today)
     
-    if not os.path.exists(log_file):
+    if not rows:
         return {
             'count': 0, 
             'summary': [
@@ -136,52 +80,14 @@ def get_twitter_summary() -> Dict:
         }
     
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # 统计抓取次数
-        update_count = content.count('## [')
-        
-        # 提取所有推文内容（从📝后面提取）
-        tweets = []
-        lines = content.split('\n')
-        current_tweet = {}
+        update_count = store.count_fetches(today)
         
-        for line in lines:
-            # 提取作者
-            if line.startswith('### 👤'):
-                author_match = re.search(r'@([^`]+)', line)
-                if author_match:
-                    current_tweet['author'] = author_match.group(1).strip()
-            
-            # 提取内容
-            if '> 📝' in line:
-                text = line.replace('> 📝', '').strip()
-                if len(text) > 20:  # 过滤太短的
-                    current_tweet['text'] = text
-            
-            # 提取翻译（如果有）
-            if '> 🈯' in line:
-                translate = line.replace('> 🈯', '').strip()
-                current_tweet['translate'] = translate
-            
-            # 遇到分隔线或新推文，保存当前推文
-            if line.startswith('---') and current_tweet.get('text'):
-                # 优先使用中文翻译
-                display_text = current_tweet.get('translate', current_tweet['text'])
-                tweets.append({
-                    'author': current_tweet.get('author', 'unknown'),
-                    'text': display_text
-                })
-                current_tweet = {}
-        
-        # 最后一条
-        if current_tweet.get('text'):
-            display_text = current_tweet.get('translate', current_tweet['text'])
-            tweets.append({
-                'author': current_tweet.get('author', 'unknown'),
-                'text': display_text
-            })
+        # 优先使用中文翻译，过滤太短的
+        tweets = [
+            {'author': t['author'], 'text': t['translate'] or t['text']}
+            for t in rows if len(t['text']) > 20
+        ]
         
         # 智能分类和提取要点
         summaries = []
@@ -282,12 +188,25 @@ def format_num(value: float) -> str:
         return f"{value:,.0f}"
     return f"{value:,.2f}"
 
-def generate_detailed_briefing() -> str:
-    """生成详细早报"""
+def morning_snapshot() -> BriefingSnapshot:
+    """早报各板块及其最长可用时间 (超过就发送时现抓)"""
+    return BriefingSnapshot('morning_briefing', {
+        'market': (get_market_data, 15 * 60),
+        'news': (get_today_hot_news, 60 * 60),
+        'twitter': (get_twitter_summary, 30 * 60),
+    })
+
+def prepare_snapshot():
+    """发送前几分钟预抓全部数据 (调度守护进程 08:20 触发)"""
+    morning_snapshot().prepare()
+
+def generate_detailed_briefing(snapshot: Optional[BriefingSnapshot] = None) -> str:
+    """生成详细早报 (从预生成快照渲染)"""
     now = datetime.now()
-    data = get_market_data()
-    news = get_today_hot_news()
-    twitter = get_twitter_summary()
+    snapshot = snapshot or morning_snapshot()
+    data = snapshot.get('market')
+    news = snapshot.get('news')
+    twitter = snapshot.get('twitter')
     
     lines = [
         f"🌅 *龙虾早报* | {now.strftime('%m/%d %a')}",
@@ -380,6 +299,8 @@ def generate_detailed_briefing() -> str:
     lines.append("  · 英伟达财报后续影响")
     lines.append("  · 存储芯片涨价动态")
     lines.append("  · 南向资金流向")
+    lines.append("")
+    lines.append(snapshot.freshness_line({'market': '行情', 'news': '新闻', 'twitter': 'Twitter'}))
     
     return "\n".join(lines)
 
@@ -387,11 +308,17 @@ import glob
 
 def main():
     """生成并推送详细早报"""
+    if '--prepare' in sys.argv:
+        prepare_snapshot()
+        return
+    
     print("=" * 60)
     print("🦞 生成详细龙虾早报...")
     print("=" * 60)
     
+    started = time.time()
     briefing = generate_detailed_briefing()
+    print(f"⚡ 渲染耗时 {time.time() - started:.2f}s")
     
     # 保存
     with open("/tmp/lobster_morning_briefing.txt", 'w') as f:
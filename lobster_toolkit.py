@@ -4,12 +4,14 @@
 不需要等别人给，自己造！
 """
 
-import requests
 import json
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from dexscreener_client import default_client
+from honeypot_cache import default_cache
+
 class LobsterToolkit:
     """龙虾工具箱 - 自主创造"""
     
@@ -21,12 +23,10 @@ class LobsterToolkit:
     def get_token_price(self, chain: str, address: str) -> Dict:
         """自主创造：快速查币价"""
         try:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{address}"
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            pairs = default_client().get_token_pairs(address)
             
-            if data.get('pairs'):
-                pair = data['pairs'][0]
+            if pairs:
+                pair = pairs[0]
                 return {
                     'symbol': pair['baseToken']['symbol'],
                     'price': pair['priceUsd'],
@@ -43,9 +43,8 @@ class LobsterToolkit:
     def check_honeypot(self, chain_id: str, address: str) -> Dict:
         """自主创造：快速貔貅检测"""
         try:
-            url = f"https://api.honeypot.is/v2/IsHoneypot?address={address}&chainID={chain_id}"
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
+            # 同一合约重复出现时直接命中缓存，不再请求 honeypot.is
+            data = default_cache().get(chain_id, address)
             
             flags = data.get('flags', [])
             summary = data.get('summary', {})
@@ -64,7 +63,9 @@ class LobsterToolkit:
     def market_sentiment_snapshot(self) -> Dict:
         """自主创造：市场情绪快照"""
         try:
-            # 获取BTC和ETH数据作为市场情绪指标
+            # 获取BTC和ETH数据作为市场情绪指标 (一次批量请求)
+            default_client().prefetch(['0x7130d2A12B9BCbFAe4f2634d864A1Ee1Ce3Ead9c',
+                                       '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2'])
             btc = self.get_token_price('ethereum', '0x7130d2A12B9BCbFAe4f2634d864A1Ee1Ce3Ead9c')  # BTCB
             eth = self.get_token_price('ethereum', '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2')  # WETH
             
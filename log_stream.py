@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+📡 链上日志流 - 跟踪一组钱包的 ERC-20 转账
+以前按地址轮询余额快照；现在按区块区间拉 Transfer 日志：
+- 所有监控地址放进一个 topic 过滤条件 (转出看 topic1，转入看 topic2，两个 eth_getLogs 放进同一个批量请求)
+  每个区块区间一次 HTTP 请求，和钱包数量无关
+- 区块游标落盘 (checkpoint)，重启后从上次处理到的区块继续，不漏不重
+- 落后链头 confirmations 个区块再处理，避开短重组
+- 区间太大被节点拒绝时自动减半重试
+用 eth_getLogs 轮询而不是 WebSocket newHeads: 不依赖额外库，任何 HTTP 节点 (包括本地 anvil / hardhat) 都能用
+
+用法:
+    python3 log_stream.py base 0x钱包1,0x钱包2        # 持续打印转账事件
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from onchain import CHAINS, RpcClient, RpcError
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+CURSOR_DIR = '/tmp'
+
+
+def address_topic(address: str) -> str:
+    return '0x' + '0' * 24 + address.lower()[2:]
+
+
+def topic_address(topic: str) -> str:
+    return '0x' + topic[-40:]
+
+
+class LogStream:
+    """
+    钱包转账事件流
+    poll() 处理到当前 (链头 - confirmations) 为止的新区块，返回事件列表并推进游标
+    事件: {'block', 'tx', 'log_index', 'token', 'from', 'to', 'value', 'wallet', 'direction'}
+    (value 是代币最小单位；同一笔转账两端都在监控名单里时，两个钱包各一条)
+    """
+
+    def __init__(self, rpc: RpcClient, addresses: Iterable[str], name: str = 'default',
+                 tokens: Optional[List[str]] = None, confirmations: int = 2,
+                 max_range: int = 500, start_block: Optional[int] = None,
+                 cursor_file: Optional[str] = None):
+        self.rpc = rpc
+        self.addresses = {a.lower() for a in addresses}
+        self.tokens = tokens  # None = 所有代币
+        self.confirmations = confirmations
+        self.max_range = max_range
+        self.cursor_file = cursor_file or os.path.join(CURSOR_DIR, f"log_stream_{name}.json")
+        self.cursor = self._load_cursor()
+        if self.cursor is None and start_block is not None:
+            self.cursor = start_block - 1
+
+    def _load_cursor(self) -> Optional[int]:
+        try:
+            with open(self.cursor_file, 'r') as f:
+                return json.load(f)['block']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cursor(self):
+        tmp = f"{self.cursor_file}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'block': self.cursor, 'updated_at': time.time()}, f)
+        os.replace(tmp, self.cursor_file)
+
+    def _filters(self, start: int, end: int) -> List[Dict]:
+        wallets = sorted(address_topic(a) for a in self.addresses)
+        base = {'fromBlock': hex(start), 'toBlock': hex(end)}
+        if self.tokens:
+            base['address'] = self.tokens
+        return [dict(base, topics=[TRANSFER_TOPIC, wallets]),         # 转出
+                dict(base, topics=[TRANSFER_TOPIC, None, wallets])]   # 转入
+
+    def fetch_range(self, start: int, end: int) -> List[Dict]:
+        """一个区块区间的转账事件 (一次批量请求)"""
+        replies = self.rpc.batch([('eth_getLogs', [f]) for f in self._filters(start, end)])
+        for r in replies:
+            if isinstance(r, RpcError):
+                raise r
+        events, seen = [], set()
+        for direction, logs in zip(('out', 'in'), replies):
+            for log in logs:
+                topics = log.get('topics', [])
+                if len(topics) != 3 or log.get('removed'):
+                    continue  # ERC-721 的 Transfer 有4个 topic (tokenId 也是 indexed)，这里只要 ERC-20
+                sender, receiver = topic_address(topics[1]), topic_address(topics[2])
+                wallet = sender if direction == 'out' else receiver
+                key = (log['transactionHash'], log['logIndex'], wallet)
+                if wallet not in self.addresses or key in seen:
+                    continue
+                seen.add(key)
+                data = log.get('data') or '0x'
+                events.append({
+                    'block': int(log['blockNumber'], 16),
+                    'tx': log['transactionHash'],
+                    'log_index': int(log['logIndex'], 16),
+                    'token': log['address'].lower(),
+                    'from': sender,
+                    'to': receiver,
+                    'value': int(data, 16) if data != '0x' else 0,
+                    'wallet': wallet,
+                    'direction': direction,
+                })
+        events.sort(key=lambda e: (e['block'], e['log_index']))
+        return events
+
+    def poll(self, handler: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """
+        处理新区块，返回新事件；每个区间先交给 handler 处理，成功后才推进并落盘游标
+        (handler 抛异常时游标不动，下次从同一区间重来)
+        """
+        head = int(self.rpc.call('eth_blockNumber', []), 16) - self.confirmations
+        if self.cursor is None:
+            self.cursor = head  # 第一次运行从当前区块开始，不回溯历史
+            self._save_cursor()
+            return []
+
+        events = []
+        span = self.max_range
+        while self.cursor < head:
+            start = self.cursor + 1
+            end = min(start + span - 1, head)
+            try:
+                batch = self.fetch_range(start, end)
+            except RpcError as e:
+                if span == 1:
+                    raise
+                span = max(1, span // 2)  # 结果太多 / 区间太大，减半重试
+                print(f"⚠️ eth_getLogs {start}-{end} 失败 ({e})，区间减半到 {span}")
+                continue
+            if handler and batch:
+                handler(batch)
+            events += batch
+            self.cursor = end
+            self._save_cursor()
+        return events
+
+    def follow(self, handler: Callable[[List[Dict]], None], poll: float = 2.0):
+        """持续跟踪新区块，有事件就交给 handler"""
+        while True:
+            try:
+                self.poll(handler)
+            except Exception as e:
+                print(f"⚠️ 日志流出错: {e}")
+            time.sleep(poll)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    chain = sys.argv[1]
+    rpc = RpcClient(os.environ.get(f'{chain.upper()}_RPC_URL') or CHAINS[chain]['rpc'])
+    stream = LogStream(rpc, sys.argv[2].split(','), name=f"cli_{chain}")
+    stream.follow(lambda evs: [print(e) for e in evs])
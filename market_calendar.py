@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+📅 交易日历 - 港股 / A股 / 美股
+- 交易时段、午休、节假日、半日市
+- 休市时不再请求行情: cached_quote() 直接返回收盘后缓存的最后价格
+- 美股节假日按规则推算；港股/A股农历假期每年由交易所公布，写在下面的表里，
+  新一年的假期也可以放到 config/market_holidays.json 里 (格式同 HOLIDAYS)
+
+用法:
+    python3 market_calendar.py          # 查看三个市场当前状态
+"""
+
+import json
+import os
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+CLOSE_CACHE_FILE = '/tmp/market_close_cache.json'
+EXTRA_HOLIDAYS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'market_holidays.json')
+CLOSE_GRACE = 600  # 收盘后10分钟内抓到的价格可能还没定格，之后再抓一次
+
+MARKETS = {
+    'hk': {
+        'name': '港股',
+        'tz': ZoneInfo('Asia/Hong_Kong'),
+        'sessions': [(dtime(9, 30), dtime(12, 0)), (dtime(13, 0), dtime(16, 0))],
+        'half_day': [(dtime(9, 30), dtime(12, 0))],
+    },
+    'cn': {
+        'name': 'A股',
+        'tz': ZoneInfo('Asia/Shanghai'),
+        'sessions': [(dtime(9, 30), dtime(11, 30)), (dtime(13, 0), dtime(15, 0))],
+        'half_day': [(dtime(9, 30), dtime(11, 30))],
+    },
+    'us': {
+        'name': '美股',
+        'tz': ZoneInfo('America/New_York'),
+        'sessions': [(dtime(9, 30), dtime(16, 0))],
+        'half_day': [(dtime(9, 30), dtime(13, 0))],
+    },
+}
+
+# 交易所公布的休市日 / 半日市 (不含周末)
+HOLIDAYS = {
+    'hk': {
+        'holidays': [
+            '2026-01-01', '2026-02-17', '2026-02-18', '2026-02-19', '2026-04-03',
+            '2026-04-06', '2026-04-07', '2026-05-01', '2026-05-25', '2026-06-19',
+            '2026-07-01', '2026-10-01', '2026-10-19', '2026-12-25',
+        ],
+        'half_days': ['2026-02-16', '2026-12-24', '2026-12-31'],
+    },
+    'cn': {
+        'holidays': [
+            '2026-01-01', '2026-01-02', '2026-02-16', '2026-02-17', '2026-02-18',
+            '2026-02-19', '2026-02-20', '2026-02-23', '2026-04-06', '2026-05-01',
+            '2026-05-04', '2026-05-05', '2026-06-19', '2026-09-25', '2026-10-01',
+            '2026-10-02', '2026-10-05', '2026-10-06', '2026-10-07',
+        ],
+        'half_days': [],
+    },
+    'us': {'holidays': [], 'half_days': []},  # 美股按规则推算，见 us_holidays()
+}
+
+
+# ==================== 节假日 ====================
+
+def _easter(year: int) -> date:
+    """复活节 (公历，Anonymous Gregorian 算法)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """某月第n个星期几 (n=-1 表示最后一个)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """周六的假期提前到周五，周日的顺延到周一"""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def us_holidays(year: int) -> Tuple[set, set]:
+    """NYSE 休市日和半日市 (13:00 收盘)"""
+    new_year = date(year, 1, 1)
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),                 # 马丁路德金日
+        _nth_weekday(year, 2, 0, 3),                 # 总统日
+        _easter(year) - timedelta(days=2),           # 耶稣受难日
+        _nth_weekday(year, 5, 0, -1),                # 阵亡将士纪念日
+        _observed(date(year, 6, 19)),                # 六月节
+        _observed(date(year, 7, 4)),                 # 独立日
+        _nth_weekday(year, 9, 0, 1),                 # 劳动节
+        _nth_weekday(year, 11, 3, 4),                # 感恩节
+        _observed(date(year, 12, 25)),               # 圣诞节
+    }
+    if new_year.weekday() != 5:                      # 元旦逢周六不补休 (不占上一年12/31)
+        holidays.add(_observed(new_year))
+
+    half_days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # 感恩节次日
+    for d in (date(year, 7, 3), date(year, 12, 24)):
+        if d.weekday() < 5 and d not in holidays:
+            half_days.add(d)
+    return holidays, half_days
+
+
+def _load_extra_holidays() -> Dict:
+    try:
+        with open(EXTRA_HOLIDAYS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_EXTRA = _load_extra_holidays()
+_DAY_CACHE: Dict[Tuple[str, int], Tuple[set, set]] = {}
+
+
+def _holiday_sets(market: str, year: int) -> Tuple[set, set]:
+    key = (market, year)
+    if key not in _DAY_CACHE:
+        holidays, half_days = us_holidays(year) if market == 'us' else (set(), set())
+        for table in (HOLIDAYS.get(market, {}), _EXTRA.get(market, {})):
+            holidays |= {date.fromisoformat(d) for d in table.get('holidays', []) if d.startswith(str(year))}
+            half_days |= {date.fromisoformat(d) for d in table.get('half_days', []) if d.startswith(str(year))}
+        _DAY_CACHE[key] = (holidays, half_days)
+    return _DAY_CACHE[key]
+
+
+# ==================== 交易时段 ====================
+
+def _to_local(market: str, now: Optional[datetime] = None) -> datetime:
+    # 不带时区的时间按本机时区解释
+    return (now or datetime.now()).astimezone(MARKETS[market]['tz'])
+
+
+def is_trading_day(market: str, day: date) -> bool:
+    if day.weekday() >= 5:
+        return False
+    return day not in _holiday_sets(market, day.year)[0]
+
+
+def is_half_day(market: str, day: date) -> bool:
+    return day in _holiday_sets(market, day.year)[1]
+
+
+def sessions(market: str, day: date) -> List[Tuple[datetime, datetime]]:
+    """某个交易日的交易时段 (带时区)，非交易日返回空列表"""
+    if not is_trading_day(market, day):
+        return []
+    cfg = MARKETS[market]
+    spans = cfg['half_day'] if is_half_day(market, day) else cfg['sessions']
+    return [(datetime.combine(day, start, cfg['tz']), datetime.combine(day, end, cfg['tz']))
+            for start, end in spans]
+
+
+def is_open(market: Optional[str], now: Optional[datetime] = None) -> bool:
+    """市场是否在交易时段 (午休算休市)；不认识的市场 (crypto 等) 视为全天开市"""
+    if market not in MARKETS:
+        return True
+    local = _to_local(market, now)
+    return any(start <= local < end for start, end in sessions(market, local.date()))
+
+
+def next_open(market: str, now: Optional[datetime] = None) -> datetime:
+    """下一个开盘时间 (正在交易则返回当前时段的开始)"""
+    local = _to_local(market, now)
+    for offset in range(30):
+        for start, end in sessions(market, local.date() + timedelta(days=offset)):
+            if local < end:
+                return start
+    raise ValueError(f"{market} 30天内没有交易日，请检查节假日表")
+
+
+def last_close(market: str, now: Optional[datetime] = None) -> datetime:
+    """最近一次收盘 (午休也算一次收盘)"""
+    local = _to_local(market, now)
+    for offset in range(30):
+        for start, end in reversed(sessions(market, local.date() - timedelta(days=offset))):
+            if end <= local:
+                return end
+    raise ValueError(f"{market} 30天内没有交易日，请检查节假日表")
+
+
+def market_of(code: str) -> Optional[str]:
+    """从行情代码推断市场: hk02577 / 02577.HK → hk，sh600703 / sz300346 → cn，us.NVDA / NVDA → us"""
+    lower = code.lower()
+    if lower.startswith('hk') or lower.endswith('.hk'):
+        return 'hk'
+    if (lower[:2] in ('sh', 'sz') and lower[2:].isdigit()) or lower.endswith(('.ss', '.sz')):
+        return 'cn'
+    if lower.startswith('us.') or code.isalpha():
+        return 'us'
+    return None
+
+
+# ==================== 收盘价缓存 ====================
+
+def load_quote_cache() -> Dict:
+    try:
+        with open(CLOSE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_quotes(quotes: Dict[str, object], now: Optional[datetime] = None):
+    """把一批刚抓到的行情写进缓存 (一次写盘)"""
+    quotes = {key: quote for key, quote in quotes.items() if quote}
+    if not quotes:
+        return
+    cache = load_quote_cache()  # 读回再合并，其他进程写的条目不丢
+    fetched_at = (now or datetime.now()).timestamp()
+    for key, quote in quotes.items():
+        cache[key] = {'quote': quote, 'fetched_at': fetched_at}
+    tmp = f"{CLOSE_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp, CLOSE_CACHE_FILE)
+
+
+def closed_quote(markets: Union[str, Iterable[str]], key: str, now: Optional[datetime] = None,
+                 cache: Optional[Dict] = None):
+    """全部休市且缓存是上次收盘之后抓的 → 返回缓存 (dict 结果带 cached=True)，否则 None (需要现抓)"""
+    markets = [markets] if isinstance(markets, str) else list(markets)
+    entry = (cache if cache is not None else load_quote_cache()).get(key)
+    if entry and not any(is_open(m, now) for m in markets):
+        closed_at = max(last_close(m, now) for m in markets).timestamp()
+        if entry['fetched_at'] >= closed_at + CLOSE_GRACE:
+            return _mark_cached(entry['quote'])
+    return None
+
+
+def last_quote(key: str, cache: Optional[Dict] = None):
+    """缓存里最后一次的行情 (现抓失败时兜底)，没有返回 None"""
+    entry = (cache if cache is not None else load_quote_cache()).get(key)
+    return _mark_cached(entry['quote']) if entry else None
+
+
+def quote_price(value) -> Optional[float]:
+    """接口返回的价格字段 → 正数价格；缺失、非数字、<=0 (接口报错时的兜底值) 返回 None"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def cached_quote(markets: Union[str, Iterable[str]], key: str, fetch: Callable,
+                 now: Optional[datetime] = None):
+    """
+    按交易日历决定要不要真的请求行情
+    - 任一市场在交易 → 调用 fetch() 并缓存结果
+    - 全部休市且缓存是上次收盘之后抓的 → 直接返回缓存 (dict 结果带 cached=True)
+    - fetch() 失败 (返回空，或 dict 结果的 price 不是有效价格) → 不写缓存，有旧缓存就用旧缓存，否则 None
+    """
+    cache = load_quote_cache()
+    cached = closed_quote(markets, key, now, cache)
+    if cached is not None:
+        return cached
+
+    quote = fetch()
+    if isinstance(quote, dict) and 'price' in quote and quote_price(quote['price']) is None:
+        quote = None  # 例如 twelvedata 报错时没有 close，不能把 0 当收盘价缓存一整个休市期
+    if quote:
+        store_quotes({key: quote}, now)
+        return quote
+    return last_quote(key, cache) or quote
+
+
+def _mark_cached(quote):
+    return dict(quote, cached=True) if isinstance(quote, dict) else quote
+
+
+def market_status(market: str, now: Optional[datetime] = None) -> str:
+    name = MARKETS[market]['name']
+    if is_open(market, now):
+        return f"🟢 {name} 交易中"
+    opens = next_open(market, now)
+    return f"⚪ {name} 休市，下次开盘 {opens:%m-%d %H:%M} ({opens.tzname()})"
+
+
+if __name__ == '__main__':
+    for m in MARKETS:
+        print(market_status(m))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+⚡ 行情并发抓取层 - 早报 / 晚报的市场快照共用
+以前每个指数、每个币各发一次请求、各自10秒超时，串行累加。现在：
+- 腾讯行情所有代码合成一次请求 (q=us.IXIC,us.DJI,hkHSTECH,...)
+- 币安所有交易对合成一次请求 (ticker/24hr?symbols=[...])
+- 两个批量请求并发执行，整体一个截止时间
+- 某一项失败只影响这一项 (返回 None)，休市的市场直接用交易日历的收盘缓存
+"""
+
+import json
+import re
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+
+from market_calendar import closed_quote, last_quote, market_of, store_quotes, load_quote_cache
+
+TENCENT_URL = 'https://qt.gtimg.cn/q='
+BINANCE_URL = 'https://api.binance.com/api/v3/ticker/24hr?symbols='
+DEFAULT_DEADLINE = 8.0
+
+TENCENT_LINE_RE = re.compile(r'v_([^=]+)="([^"]*)"')
+
+
+def _get(url: str, timeout: float) -> bytes:
+    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return r.read()
+
+
+def _quote(price: float, change: float, name: Optional[str] = None) -> Dict:
+    quote = {'price': price, 'change': change, 'trend': 'up' if change >= 0 else 'down'}
+    if name:
+        quote['name'] = name
+    return quote
+
+
+def _normalize_code(code: str) -> str:
+    # 腾讯返回的变量名会去掉代码里的点: us.IXIC → v_usIXIC
+    return code.replace('.', '').lower()
+
+
+def fetch_tencent(codes: List[str], timeout: float = DEFAULT_DEADLINE) -> Dict[str, Dict]:
+    """一次请求取多个腾讯行情代码，返回 {代码: quote}，解析失败的代码不在结果里"""
+    if not codes:
+        return {}
+    text = _get(TENCENT_URL + ','.join(codes), timeout).decode('gbk', errors='ignore')
+    by_var = {}
+    for var, payload in TENCENT_LINE_RE.findall(text):
+        fields = payload.split('~')
+        try:
+            price, prev = float(fields[3]), float(fields[4])
+        except (IndexError, ValueError):
+            continue
+        if price and prev:
+            by_var[_normalize_code(var)] = _quote(price, (price - prev) / prev * 100,
+                                                  fields[1] if len(fields) > 1 else None)
+    return {code: by_var[_normalize_code(code)] for code in codes if _normalize_code(code) in by_var}
+
+
+def fetch_binance(symbols: List[str], timeout: float = DEFAULT_DEADLINE) -> Dict[str, Dict]:
+    """一次请求取多个币安交易对的24小时行情，返回 {交易对: quote}"""
+    if not symbols:
+        return {}
+    query = urllib.parse.quote(json.dumps(symbols, separators=(',', ':')))
+    rows = json.loads(_get(BINANCE_URL + query, timeout).decode())
+    return {row['symbol']: _quote(float(row['lastPrice']), float(row['priceChangePercent']))
+            for row in rows if 'lastPrice' in row}
+
+
+def gather(tasks: Dict[str, Callable], deadline: float = DEFAULT_DEADLINE) -> Dict[str, object]:
+    """
+    并发执行多个无参函数，整体截止时间 deadline 秒
+    超时或抛异常的任务结果为 None (不影响其他任务)
+    """
+    results = {name: None for name in tasks}
+    if not tasks:
+        return results
+    pool = ThreadPoolExecutor(max_workers=len(tasks))
+    futures = {pool.submit(func): name for name, func in tasks.items()}
+    done, pending = wait(futures, timeout=deadline)
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"❌ {name} 获取失败: {e}")
+    for future in pending:
+        print(f"⏱️ {futures[future]} 超过 {deadline:.0f}s 截止时间，跳过")
+    pool.shutdown(wait=False, cancel_futures=True)  # 不等超时的请求，让它们在后台结束
+    return results
+
+
+def fetch_market_snapshot(tencent: Optional[Dict[str, Union[str, List[str]]]] = None,
+                          binance: Optional[Dict[str, str]] = None,
+                          deadline: float = DEFAULT_DEADLINE) -> Dict[str, Optional[Dict]]:
+    """
+    批量 + 并发取一组行情
+    tencent: {名称: 腾讯代码 或 [代码, 备用代码...]}
+    binance: {名称: 交易对}
+    返回 {名称: quote 或 None}；休市市场用收盘缓存，现抓失败的用最后一次缓存兜底
+    """
+    tencent = {name: [codes] if isinstance(codes, str) else list(codes)
+               for name, codes in (tencent or {}).items()}
+    binance = binance or {}
+    cache = load_quote_cache()
+
+    results: Dict[str, Optional[Dict]] = {}
+    live_codes = []
+    for name, codes in tencent.items():
+        cached = closed_quote(market_of(codes[0]) or 'us', f"tencent:{codes[0]}", cache=cache)
+        if cached is not None:
+            results[name] = cached
+        else:
+            live_codes.extend(c for c in codes if c not in live_codes)
+
+    batches = gather({
+        'tencent': (lambda: fetch_tencent(live_codes, deadline)) if live_codes else (lambda: {}),
+        'binance': lambda: fetch_binance(list(dict.fromkeys(binance.values())), deadline),
+    }, deadline)
+    tencent_quotes = batches['tencent'] or {}
+    binance_quotes = batches['binance'] or {}
+
+    fresh = {}
+    for name, codes in tencent.items():
+        if name in results:
+            continue
+        quote = next((tencent_quotes[c] for c in codes if c in tencent_quotes), None)
+        key = f"tencent:{codes[0]}"
+        if quote:
+            fresh[key] = quote
+        results[name] = quote or last_quote(key, cache)
+    store_quotes(fresh)
+
+    for name, symbol in binance.items():
+        results[name] = binance_quotes.get(symbol)
+    return results
@@ -4,14 +4,20 @@
 只扫描+评估，输出信号，不执行交易
 """
 
+import asyncio
 import json
 import random
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
 from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from enum import Enum
 
+from honeypot_cache import HoneypotCache, SingleFlight
+from staged_pipeline import Stage, StagedPipeline
+
 # ============== 数据模型 ==============
 
 class Action(Enum):
@@ -89,8 +95,34 @@ class PreFilter:
 class SafetyChecker:
     """安全检测器 - Honeypot检测"""
     
+    # (chain, 合约) → (报告, 检测时间)，重复出现的合约在TTL内不再重新检测
+    # 按 LRU 最多保留 MAX_REPORTS 条，常驻进程里不会无限增长
+    REPORT_TTL = HoneypotCache.VOLATILE_TTL
+    MAX_REPORTS = 5000
+    _reports: "OrderedDict[Tuple[str, str], Tuple[SafetyReport, float]]" = OrderedDict()
+    _reports_lock = threading.Lock()
+    _flight = SingleFlight()
+    
     @classmethod
     def check(cls, token: Token) -> SafetyReport:
+        """带缓存的安全检测，同一合约的并发检测合并为一次"""
+        key = (token.chain, token.address.lower())
+        with cls._reports_lock:
+            cached = cls._reports.get(key)
+            if cached and time.time() - cached[1] < cls.REPORT_TTL:
+                cls._reports.move_to_end(key)
+                return cached[0]
+        
+        report = cls._flight.do(key, lambda: cls._detect(token))
+        with cls._reports_lock:
+            cls._reports[key] = (report, time.time())
+            cls._reports.move_to_end(key)
+            while len(cls._reports) > cls.MAX_REPORTS:
+                cls._reports.popitem(last=False)
+        return report
+    
+    @classmethod
+    def _detect(cls, token: Token) -> SafetyReport:
         """
         模拟安全检测
         实际项目中这里会调用区块链RPC进行模拟交易
@@ -98,34 +130,35 @@ class SafetyChecker:
         # 模拟检测结果 (实际应调用合约模拟买卖)
         # 这里用随机数模拟不同代币的安全状况
         
-        random.seed(token.address)  # 确保同一地址结果一致
+        # 每个地址独立的随机源: 同一地址结果一致，且流水线多线程并发时互不干扰
+        rng = random.Random(token.address)
         
         # 70%的币是安全的
-        is_safe = random.random() < 0.7
+        is_safe = rng.random() < 0.7
         
         if is_safe:
             return SafetyReport(
                 can_buy=True,
                 can_sell=True,
-                honeypot_score=random.uniform(0, 0.15),
-                liquidity_locked=random.random() < 0.6,
-                owner_renounced=random.random() < 0.4,
-                has_tax=random.random() < 0.3,
-                tax_percent=random.uniform(0, 5) if random.random() < 0.3 else 0,
-                slippage=random.uniform(0.5, 3)
+                honeypot_score=rng.uniform(0, 0.15),
+                liquidity_locked=rng.random() < 0.6,
+                owner_renounced=rng.random() < 0.4,
+                has_tax=rng.random() < 0.3,
+                tax_percent=rng.uniform(0, 5) if rng.random() < 0.3 else 0,
+                slippage=rng.uniform(0.5, 3)
             )
         else:
             # Honeypot币特征
-            can_sell = random.random() < 0.3  # 70% honeypot不能卖
+            can_sell = rng.random() < 0.3  # 70% honeypot不能卖
             return SafetyReport(
                 can_buy=True,
                 can_sell=can_sell,
-                honeypot_score=random.uniform(0.6, 1.0),
+                honeypot_score=rng.uniform(0.6, 1.0),
                 liquidity_locked=False,
                 owner_renounced=False,
                 has_tax=True,
-                tax_percent=random.uniform(10, 25),
-                slippage=random.uniform(15, 50)
+                tax_percent=rng.uniform(10, 25),
+                slippage=rng.uniform(15, 50)
             )
 
 class OffChainDataGatherer:
@@ -137,19 +170,19 @@ class OffChainDataGatherer:
         收集社交媒体和交易数据
         实际项目中这里会调用Twitter API, CoinGecko等
         """
-        random.seed(token.address + "offchain")
+        rng = random.Random(token.address + "offchain")
         
         # 模拟社交热度
-        social_score = random.uniform(10, 95)
+        social_score = rng.uniform(10, 95)
         
         # 模拟交易量
-        volume = random.uniform(1000, 100000)
+        volume = rng.uniform(1000, 100000)
         
         # 模拟持有者数量
-        holders = random.randint(50, 5000)
+        holders = rng.randint(50, 5000)
         
         # 速度趋势
-        trend = random.choice(["rising", "stable", "falling"])
+        trend = rng.choice(["rising", "stable", "falling"])
         
         return OffChainMetrics(
             volume_24h=volume,
@@ -163,6 +196,24 @@ class StrategyEvaluator:
     
     THRESHOLD_BUY = 0.80  # 买入阈值
     THRESHOLD_MONITOR = 0.60  # 观察阈值
+    STOP_LOSS = 0.85  # 止损: 跌到买入价的85%
+    TAKE_PROFIT = 2.0  # 止盈: 涨到买入价的2倍
+    
+    # 各因素对胜率的加减分 (回测调参时用子类覆盖，见 strategy_backtest.py)
+    WEIGHTS = {
+        "base": 0.50,              # 基础胜率
+        "tradable": 0.15,          # 可买可卖
+        "untradable": -0.30,       # 无法卖出
+        "honeypot_low": 0.10,      # Honeypot风险极低 (<0.1)
+        "honeypot_high": -0.25,    # Honeypot风险高 (>0.5)
+        "liquidity_locked": 0.08,  # 流动性已锁定
+        "owner_renounced": 0.07,   # 所有者已放弃权限
+        "no_tax": 0.05,            # 无交易税
+        "volume": 0.10,            # 24h交易量 > 50000
+        "social": 0.08,            # 社交热度 > 70
+        "rising": 0.07,            # 上升趋势
+        "falling": -0.10,          # 下降趋势
+    }
     
     @classmethod
     def evaluate(
@@ -175,53 +226,55 @@ class StrategyEvaluator:
         计算胜率并生成交易决策
         算法来自原Go项目
         """
+        w = cls.WEIGHTS
+        
         # 基础胜率 50%
-        win_prob = 0.50
+        win_prob = w["base"]
         reasons = []
         
         # ===== 安全因素调整 (最重要) =====
         if safety.can_buy and safety.can_sell:
-            win_prob += 0.15
+            win_prob += w["tradable"]
             reasons.append("✓ 可买可卖")
         else:
-            win_prob -= 0.30
+            win_prob += w["untradable"]
             reasons.append("✗ 无法卖出!")
         
         if safety.honeypot_score < 0.1:
-            win_prob += 0.10
+            win_prob += w["honeypot_low"]
             reasons.append("✓ Honeypot风险极低")
         elif safety.honeypot_score > 0.5:
-            win_prob -= 0.25
+            win_prob += w["honeypot_high"]
             reasons.append("✗ Honeypot风险高!")
         
         if safety.liquidity_locked:
-            win_prob += 0.08
+            win_prob += w["liquidity_locked"]
             reasons.append("✓ 流动性已锁定")
         
         if safety.owner_renounced:
-            win_prob += 0.07
+            win_prob += w["owner_renounced"]
             reasons.append("✓ 所有者已放弃权限")
         
         if not safety.has_tax:
-            win_prob += 0.05
+            win_prob += w["no_tax"]
             reasons.append("✓ 无交易税")
         
         # ===== 交易量因素 =====
         if metrics.volume_24h > 50000:
-            win_prob += 0.10
+            win_prob += w["volume"]
             reasons.append("✓ DEX交易量良好")
         
         # ===== 社交热度因素 =====
         if metrics.social_score > 70:
-            win_prob += 0.08
+            win_prob += w["social"]
             reasons.append("✓ 社交媒体活跃")
         
         # ===== 动量因素 =====
         if metrics.velocity_trend == "rising":
-            win_prob += 0.07
+            win_prob += w["rising"]
             reasons.append("✓ 上升趋势")
         elif metrics.velocity_trend == "falling":
-            win_prob -= 0.10
+            win_prob += w["falling"]
             reasons.append("✗ 下降趋势")
         
         # 限制在0-1范围
@@ -248,8 +301,8 @@ class StrategyEvaluator:
             confidence=confidence,
             expected_roi=win_prob * 2.0,  # 简单估算
             position_size=position_size,
-            stop_loss=0.85,
-            take_profit=2.0,
+            stop_loss=cls.STOP_LOSS,
+            take_profit=cls.TAKE_PROFIT,
             reason=" | ".join(reasons),
             timestamp=datetime.now()
         )
@@ -259,7 +312,17 @@ class StrategyEvaluator:
 class MemeCoinSignalHunter:
     """Meme币信号猎人主控"""
     
-    def __init__(self):
+    # 流水线各阶段并发数: 安全检测/链外数据是I/O密集，其余阶段很轻
+    STAGE_CONCURRENCY = {
+        "prefilter": 1,
+        "safety": 8,
+        "offchain": 8,
+        "evaluate": 1,
+    }
+    STAGE_QUEUE_SIZE = 50  # 阶段间队列上限 (背压)
+    
+    def __init__(self, evaluator: type = StrategyEvaluator):
+        self.evaluator = evaluator  # 回测时换成调过参数的 StrategyEvaluator 子类
         self.candidates: List[StrategyDecision] = []
         self.signals: List[StrategyDecision] = []
         self.stats = {
@@ -268,31 +331,23 @@ class MemeCoinSignalHunter:
             "safety_checked": 0,
             "honeypots": 0,
             "candidates": 0,
-            "buy_signals": 0
+            "buy_signals": 0,
+            "stages": {}
         }
     
-    def process_token(self, token: Token) -> Optional[StrategyDecision]:
-        """处理单个代币，返回决策"""
+    def _prefilter(self, token: Token) -> bool:
         self.stats["scanned"] += 1
-        
-        # 1. 预过滤
         passed, reason = PreFilter.filter(token)
         if not passed:
             self.stats["filtered"] += 1
-            return None
-        
-        # 2. 安全检测
-        safety = SafetyChecker.check(token)
+        return passed
+    
+    def _record_safety(self, safety: SafetyReport):
         self.stats["safety_checked"] += 1
         if safety.honeypot_score > 0.5:
             self.stats["honeypots"] += 1
-        
-        # 3. 收集链外数据
-        metrics = OffChainDataGatherer.gather(token)
-        
-        # 4. 策略评估
-        decision = StrategyEvaluator.evaluate(token, safety, metrics)
-        
+    
+    def _record_decision(self, decision: StrategyDecision):
         if decision.action in [Action.BUY, Action.LIST]:
             self.stats["candidates"] += 1
             self.candidates.append(decision)
@@ -300,9 +355,36 @@ class MemeCoinSignalHunter:
         if decision.action == Action.BUY:
             self.stats["buy_signals"] += 1
             self.signals.append(decision)
+    
+    def process_token(self, token: Token) -> Optional[StrategyDecision]:
+        """处理单个代币，返回决策"""
+        # 1. 预过滤
+        if not self._prefilter(token):
+            return None
+        
+        # 2. 安全检测
+        safety = SafetyChecker.check(token)
+        self._record_safety(safety)
+        
+        # 3. 收集链外数据
+        metrics = OffChainDataGatherer.gather(token)
+        
+        # 4. 策略评估
+        decision = self.evaluator.evaluate(token, safety, metrics)
+        self._record_decision(decision)
         
         return decision
     
+    def replay_token(self, token: Token, safety: SafetyReport,
+                     metrics: OffChainMetrics) -> Optional[StrategyDecision]:
+        """回测重放: 安全报告 / 链外数据用历史记录构造，不调用检测器"""
+        if not self._prefilter(token):
+            return None
+        self._record_safety(safety)
+        decision = self.evaluator.evaluate(token, safety, metrics)
+        self._record_decision(decision)
+        return decision
+    
     def scan_batch(self, tokens: List[Token]) -> List[StrategyDecision]:
         """批量扫描代币"""
         results = []
@@ -312,6 +394,50 @@ class MemeCoinSignalHunter:
                 results.append(decision)
         return results
     
+    def build_pipeline(self, concurrency: Optional[Dict[str, int]] = None,
+                       queue_size: Optional[int] = None) -> StagedPipeline:
+        """
+        构建 预过滤 → 安全检测 → 链外数据 → 评估 的分阶段流水线
+        I/O阶段放到线程里跑，计数统一在事件循环里更新
+        """
+        limits = dict(self.STAGE_CONCURRENCY, **(concurrency or {}))
+        size = queue_size or self.STAGE_QUEUE_SIZE
+        
+        def prefilter(token):
+            return token if self._prefilter(token) else None
+        
+        async def safety(token):
+            report = await asyncio.to_thread(SafetyChecker.check, token)
+            self._record_safety(report)
+            return token, report
+        
+        async def offchain(item):
+            token, report = item
+            metrics = await asyncio.to_thread(OffChainDataGatherer.gather, token)
+            return token, report, metrics
+        
+        def evaluate(item):
+            decision = self.evaluator.evaluate(*item)
+            self._record_decision(decision)
+            return decision
+        
+        funcs = [("prefilter", prefilter), ("safety", safety),
+                 ("offchain", offchain), ("evaluate", evaluate)]
+        return StagedPipeline([
+            Stage(name, func, concurrency=limits[name], queue_size=size)
+            for name, func in funcs
+        ])
+    
+    async def scan_batch_async(self, tokens: List[Token],
+                               concurrency: Optional[Dict[str, int]] = None,
+                               queue_size: Optional[int] = None) -> List[StrategyDecision]:
+        """批量扫描代币 (流水线版): 不同代币的各阶段重叠执行，结果顺序与输入一致"""
+        pipeline = self.build_pipeline(concurrency, queue_size)
+        try:
+            return await pipeline.run(tokens)
+        finally:
+            self.stats["stages"] = pipeline.stats()
+    
     def get_report(self) -> str:
         """生成扫描报告"""
         report = []
@@ -331,6 +457,16 @@ class MemeCoinSignalHunter:
         report.append(f"   买入信号: {self.stats['buy_signals']}")
         report.append("")
         
+        # 流水线阶段统计
+        if self.stats["stages"]:
+            report.append("⚙️ 流水线阶段")
+            for name, st in self.stats["stages"].items():
+                report.append(
+                    f"   {name}: 并发{st['concurrency']} | 处理{st['processed']} | "
+                    f"队列峰值{st['max_queue_depth']} | p50 {st['p50_ms']}ms | p99 {st['p99_ms']}ms"
+                )
+            report.append("")
+        
         # 买入信号
         if self.signals:
             report.append("🚀 买入信号 (胜率≥80%)")
@@ -390,8 +526,8 @@ def main():
     print("🔍 正在扫描新发射的Meme币...")
     mock_tokens = generate_mock_tokens(15)
     
-    # 处理
-    hunter.scan_batch(mock_tokens)
+    # 处理 (分阶段流水线)
+    asyncio.run(hunter.scan_batch_async(mock_tokens))
     
     # 输出报告
     report = hunter.get_report()
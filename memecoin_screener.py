@@ -10,12 +10,15 @@ from datetime import datetime, timedelta
 from typing import List, Dict
 import time
 
+from dexscreener_client import default_client
+
 class MemecoinScreener:
     """Memecoin 热点筛选器"""
     
     def __init__(self):
         self.base_url = "https://api.dexscreener.com/latest"
         self.session = requests.Session()
+        self.dex = default_client()  # tokens接口批量查询+短缓存
     
     def get_base_chain_hot_tokens(self, min_volume_24h: float = 10000) -> List[Dict]:
         """
@@ -120,13 +123,8 @@ class MemecoinScreener:
     
     def get_token_details(self, token_address: str) -> Dict:
         """获取特定代币详情"""
-        url = f"{self.base_url}/dex/tokens/{token_address}"
-        
         try:
-            response = self.session.get(url, timeout=30)
-            data = response.json()
-            
-            pairs = data.get('pairs', [])
+            pairs = self.dex.get_token_pairs(token_address)
             if not pairs:
                 return {}
             
@@ -153,6 +151,11 @@ class MemecoinScreener:
             print(f"❌ 获取详情失败: {e}")
             return {}
     
+    def get_tokens_details(self, token_addresses: List[str]) -> Dict[str, Dict]:
+        """批量获取代币详情 (30个地址合并为一个请求)"""
+        self.dex.prefetch(token_addresses)
+        return {addr: self.get_token_details(addr) for addr in token_addresses}
+    
     def generate_hot_memecoin_report(self, top_n: int = 20) -> str:
         """生成热点 memecoin 报告"""
         print("="*70)
@@ -10,9 +10,12 @@ import json
 import urllib.request
 import urllib.parse
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from collections import Counter
 
+from alert_queue import enqueue_alert
+from tweet_engine import get_engine
+
 class ElonMuskMonitor:
     """马斯克推特专业监控器"""
     
@@ -61,6 +64,16 @@ class ElonMuskMonitor:
             'moderate': ['good', 'great', 'nice', 'cool', 'interesting'],
             'mild': ['ok', 'fine', 'maybe', 'perhaps']
         }
+        
+        # 情绪词
+        self.positive_words = ['love', 'great', 'amazing', 'awesome', 'bullish', 'moon', 'rocket']
+        self.negative_words = ['hate', 'bad', 'terrible', 'bearish', 'crash', 'dump']
+        
+        # 所有词库注册进共用的匹配引擎 (编译一次，按推文 id 缓存命中结果)
+        self.engine = get_engine()
+        self.engine.register(*(data['terms'] for data in self.keywords.values()),
+                             self.sarcasm_markers, *self.intensity_words.values(),
+                             self.positive_words, self.negative_words)
     
     def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
         """发送API请求"""
@@ -117,12 +130,21 @@ class ElonMuskMonitor:
         
         return len(new_tweets) > 0, new_tweets
     
-    def analyze_tweet_pro(self, tweet: Dict) -> Dict:
-        """专业5层分析"""
+    def analyze_tweets_pro(self, tweets: List[Dict]) -> List[Dict]:
+        """批量分析: 整批推文一次扫描词库，再逐条评分"""
+        found = self.engine.scan_many([(t.get('full_text', '') or t.get('text', ''), t.get('id')) for t in tweets])
+        return [self.analyze_tweet_pro(t, f) for t, f in zip(tweets, found)]
+    
+    def analyze_tweet_pro(self, tweet: Dict, found: Optional[FrozenSet[str]] = None) -> Dict:
+        """
+        专业5层分析
+        found: 词库命中结果 (批量分析时传入)，不传则现扫
+        """
         
         # 优先获取完整文本（Twitter API可能有full_text字段）
         text = tweet.get('full_text', '') or tweet.get('text', '')
-        text_lower = text.lower()
+        if found is None:
+            found = self.engine.scan(text, tweet.get('id'))
         created = tweet.get('createdAt', '')
         likes = tweet.get('likeCount', 0)
         retweets = tweet.get('retweetCount', 0)
@@ -149,7 +171,7 @@ class ElonMuskMonitor:
         
         detected_categories = []
         for category, data in self.keywords.items():
-            if any(term in text_lower for term in data['terms']):
+            if not found.isdisjoint(data['terms']):
                 detected_categories.append({
                     'category': category,
                     'impact': data['impact_level'],
@@ -164,20 +186,18 @@ class ElonMuskMonitor:
         }
         
         # === Layer 3: 语义分析 ===
-        sarcasm_score = sum(1 for marker in self.sarcasm_markers if marker in text_lower)
+        sarcasm_score = sum(1 for marker in self.sarcasm_markers if marker in found)
         is_sarcasm = sarcasm_score >= 1 and likes > 100000
         
         intensity = 'neutral'
         for level, words in self.intensity_words.items():
-            if any(w in text_lower for w in words):
+            if not found.isdisjoint(words):
                 intensity = level
                 break
         
         # 情绪分析
-        positive = ['love', 'great', 'amazing', 'awesome', 'bullish', 'moon', 'rocket']
-        negative = ['hate', 'bad', 'terrible', 'bearish', 'crash', 'dump']
-        pos_count = sum(1 for w in positive if w in text_lower)
-        neg_count = sum(1 for w in negative if w in text_lower)
+        pos_count = sum(1 for w in self.positive_words if w in found)
+        neg_count = sum(1 for w in self.negative_words if w in found)
         sentiment = 'positive' if pos_count > neg_count else 'negative' if neg_count > pos_count else 'neutral'
         
         analysis['semantic'] = {
@@ -418,11 +438,15 @@ def main():
         print(f"🔔 发现 {len(new_tweets)} 条新推文！\n")
         
         # 专业5层分析每条推文
-        analyses = [monitor.analyze_tweet_pro(t) for t in new_tweets]
+        analyses = monitor.analyze_tweets_pro(new_tweets)
         
         # 生成专业推送
         alert = monitor.generate_pro_alert(analyses)
-        print(alert)
+        levels = {a['impact']['level'] for a in analyses}
+        priority = 'high' if 'high' in levels else 'normal' if 'medium' in levels else 'low'
+        # 推送只走告警队列，不再打印全文 (输出会被当作推送再发一次)
+        if enqueue_alert(alert, source='elon', priority=priority):
+            print(f"📨 推送已入队 ({priority})")
         
         # 保存
         filename = f"/tmp/elon_pro_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
@@ -5,118 +5,29 @@
 推送：新内容即时通知
 """
 
-import os
-import re
-import json
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+from alert_queue import enqueue_alert
+from tg_channel import ChannelFetcher, fetch_page
 
 class PowsGemCallsMonitor:
     """Pow's Gem Calls 频道监控器"""
     
-    def __init__(self):
-        self.channel_url = "https://t.me/s/PowsGemCalls"
-        self.data_file = "/tmp/pows_gem_calls_last.json"
+    def __init__(self, fetcher: Optional[ChannelFetcher] = None):
+        self.channel = "PowsGemCalls"
+        self.channel_url = f"https://t.me/s/{self.channel}"
         self.db_file = "/tmp/pows_gem_calls_db.json"
+        self.fetcher = fetcher or ChannelFetcher()
     
     def fetch_latest_posts(self) -> List[Dict]:
-        """获取频道最新帖子（通过网页抓取）"""
-        import urllib.request
-        
-        # 尝试多个数据源
-        urls_to_try = [
-            # 1. 直接抓取 Telegram 公开频道
-            ("https://t.me/s/PowsGemCalls", "html"),
-            # 2. 备用：使用 r.jina.ai 提取
-            ("https://r.jina.ai/http://t.me/s/PowsGemCalls", "text"),
-        ]
-        
-        for url, content_type in urls_to_try:
-            try:
-                req = urllib.request.Request(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                
-                with urllib.request.urlopen(req, timeout=30) as resp:
-                    content = resp.read().decode('utf-8')
-                    if content_type == "html":
-                        return self._parse_html_posts(content)
-                    else:
-                        return self._parse_simple(content)
-            except Exception as e:
-                print(f"Failed to fetch from {url}: {e}")
-                continue
-        
-        return []
-    
-    def _parse_html_posts(self, html: str) -> List[Dict]:
-        """解析HTML提取帖子"""
-        posts = []
-        
-        # Telegram 网页版的消息结构
-        # 尝试提取消息内容
-        import re
-        
-        # 查找消息文本
-        # Telegram 网页版的消息通常在特定class中
-        message_pattern = r'class="tgme_widget_message_text[^"]*"[^>]*>(.*?)</div>'
-        messages = re.findall(message_pattern, html, re.DOTALL)
-        
-        for msg_html in messages:
-            # 清理HTML标签
-            text = re.sub(r'<[^>]+>', '', msg_html)
-            text = text.replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-            text = text.strip()
-            
-            if text and len(text) > 10:
-                post = {
-                    "text": text,
-                    "contracts": [],
-                    "links": []
-                }
-                
-                # 提取合约地址
-                contract_pattern = r'0x[a-fA-F0-9]{40}'
-                post["contracts"] = re.findall(contract_pattern, text)
-                
-                # 提取链接
-                link_pattern = r'https?://[^\s<>"]+'
-                post["links"] = re.findall(link_pattern, text)
-                
-                posts.append(post)
-        
-        return posts
-    
-    def _parse_simple(self, text: str) -> List[Dict]:
-        """简单文本解析"""
-        posts = []
-        lines = text.split('\n')
-        current_post = {"text": "", "contracts": [], "links": []}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_post["text"]:
-                    posts.append(current_post)
-                    current_post = {"text": "", "contracts": [], "links": []}
-                continue
-            
-            current_post["text"] += line + "\n"
-            
-            # 提取合约地址
-            contract_pattern = r'0x[a-fA-F0-9]{40}'
-            contracts = re.findall(contract_pattern, line)
-            current_post["contracts"].extend(contracts)
-            
-            # 提取链接
-            link_pattern = r'https?://[^\s]+'
-            links = re.findall(link_pattern, line)
-            current_post["links"].extend(links)
-        
-        if current_post["text"]:
-            posts.append(current_post)
-        
-        return posts
+        """获取频道最新一页帖子 (新的在前)"""
+        try:
+            posts = fetch_page(self.channel)
+        except Exception as e:
+            print(f"Failed to fetch {self.channel}: {e}")
+            return []
+        return [p for p in reversed(posts) if len(p['text']) > 10]
     
     def extract_gem_call(self, post: Dict) -> Dict:
         """提取Gem Call的结构化信息"""
@@ -203,31 +114,13 @@ class PowsGemCallsMonitor:
         return "Other"
     
     def check_new_content(self) -> Tuple[bool, List[Dict]]:
-        """检查是否有新内容"""
-        posts = self.fetch_latest_posts()
-        
-        # 读取上次记录
-        last_check = []
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    last_check = json.load(f)
-            except:
-                pass
-        
-        # 对比找新内容
-        new_posts = []
-        last_texts = [p.get("text", "")[:100] for p in last_check]
-        
-        for post in posts[:5]:  # 只检查最近5条
-            post_preview = post.get("text", "")[:100]
-            if post_preview not in last_texts:
-                new_posts.append(post)
-        
-        # 保存当前记录
-        with open(self.data_file, 'w') as f:
-            json.dump(posts[:10], f, indent=2)
-        
+        """检查是否有新内容 (只请求上次处理到的消息之后的帖子，新的在前)"""
+        try:
+            posts = self.fetcher.fetch_new(self.channel)
+        except Exception as e:
+            print(f"Failed to fetch {self.channel}: {e}")
+            return False, []
+        new_posts = [p for p in reversed(posts) if len(p['text']) > 10]
         return len(new_posts) > 0, new_posts
     
     def generate_alert(self, posts: List[Dict]) -> str:
@@ -266,9 +159,13 @@ class PowsGemCallsMonitor:
         
         return "\n".join(lines)
     
-    def learn_patterns(self) -> Dict:
-        """学习Pow的Gem狩猎模式"""
-        posts = self.fetch_latest_posts()
+    def learn_patterns(self, pages: int = 5) -> Dict:
+        """学习Pow的Gem狩猎模式 (并发回溯最近几页历史)"""
+        try:
+            posts = [p for p in self.fetcher.backfill(self.channel, pages) if len(p['text']) > 10]
+        except Exception as e:
+            print(f"Failed to fetch {self.channel}: {e}")
+            posts = []
         
         patterns = {
             "total_posts": len(posts),
@@ -348,7 +245,9 @@ def main():
     
     if has_new:
         alert = monitor.generate_alert(new_posts)
-        print(alert)
+        # 推送只走告警队列，不再打印全文 (输出会被当作推送再发一次)
+        if enqueue_alert(alert, source='powsgemcalls', priority='normal'):
+            print("📨 推送已入队")
         
         # 保存到文件
         filename = f"/tmp/pows_alert_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
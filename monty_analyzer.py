@@ -2,110 +2,27 @@
 """
 🧠 Monty Analyzer - 通用 AI 分析工具
 安全执行 AI 生成的 Python 代码，用于数据分析、情绪判断、风险评估等
+预置的数值分析 (Meme币汇总 / 投资组合 / 异常检测) 默认走原生 Python 实现，
+结果和沙箱版逐字段一致 (见 test_monty.py 的对拍测试)；原生实现出错时退回沙箱。
+AI 生成 / 用户提交的代码始终在沙箱里跑。
 """
 
 import pydantic_monty
+import hashlib
 import json
-from typing import Any, Dict, List, Callable, Optional
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Callable, Optional, Tuple
 from datetime import datetime
 
-class MontyAnalyzer:
-    """
-    通用 Monty 分析工具
-    所有监控任务都可以调用这个类进行 AI 分析
-    """
-    
-    def __init__(self):
-        self.execution_log = []
-    
-    def analyze(self, code: str, inputs: Dict[str, Any], 
-                external_functions: Optional[Dict[str, Callable]] = None,
-                description: str = "") -> Dict[str, Any]:
-        """
-        通用分析方法
-        
-        Args:
-            code: Python 代码字符串
-            inputs: 输入数据字典
-            external_functions: 外部函数字典 {name: function}
-            description: 分析描述（用于日志）
-        
-        Returns:
-            {
-                'success': bool,
-                'result': Any,  # 分析结果
-                'execution_time_ms': float,
-                'error': str,  # 如果失败
-                'description': str
-            }
-        """
-        start_time = datetime.now()
-        
-        try:
-            # 创建 Monty 实例
-            input_keys = list(inputs.keys())
-            ext_func_names = list(external_functions.keys()) if external_functions else []
-            
-            m = pydantic_monty.Monty(
-                code,
-                inputs=input_keys,
-                external_functions=ext_func_names
-            )
-            
-            # 执行
-            if external_functions:
-                result = m.run(inputs=inputs, external_functions=external_functions)
-            else:
-                result = m.run(inputs=inputs)
-            
-            execution_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            # 记录日志
-            log_entry = {
-                'time': datetime.now().isoformat(),
-                'description': description,
-                'execution_time_ms': execution_time,
-                'success': True,
-                'result_preview': str(result)[:100] if result else None
-            }
-            self.execution_log.append(log_entry)
-            
-            return {
-                'success': True,
-                'result': result,
-                'execution_time_ms': execution_time,
-                'error': None,
-                'description': description
-            }
-            
-        except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            log_entry = {
-                'time': datetime.now().isoformat(),
-                'description': description,
-                'execution_time_ms': execution_time,
-                'success': False,
-                'error': str(e)
-            }
-            self.execution_log.append(log_entry)
-            
-            return {
-                'success': False,
-                'result': None,
-                'execution_time_ms': execution_time,
-                'error': str(e),
-                'description': description
-            }
-    
-    # ==================== 预置分析方法 ====================
-    
-    def analyze_tokens(self, tokens: List[Dict]) -> Dict[str, Any]:
-        """
-        分析 Meme 币数据
-        用于: XXYY.io 监控
-        """
-        code = '''
+LOG_SIZE = 500          # 执行日志只保留最近500条 (环形缓冲)
+PROGRAM_CACHE_SIZE = 64  # 编译好的程序最多缓存64个 (LRU)
+
+# ==================== 预置分析程序 ====================
+# 固定代码，编译一次后复用 (见 MontyAnalyzer.program)
+
+TOKENS_CODE = '''
 # Meme 币数据分析
 total_holders = 0
 total_mc = 0
@@ -149,14 +66,8 @@ avg_mc = total_mc / len(tokens) if tokens else 0
     'risk_score': len(hot_tokens) / len(tokens) if tokens else 0
 }
 '''
-        return self.analyze(code, {'tokens': tokens}, description="Meme币数据分析")
-    
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
-        """
-        情绪分析
-        用于: Twitter 推文分析
-        """
-        code = '''
+
+SENTIMENT_CODE = '''
 # 情绪分析
 positive_words = ['good', 'great', 'amazing', 'excellent', 'love', 'best', 'bullish', 'moon', 'pump']
 negative_words = ['bad', 'terrible', 'worst', 'hate', 'bearish', 'dump', 'crash', 'scam', 'rug']
@@ -190,14 +101,8 @@ else:
     'text_length': len(text)
 }
 '''
-        return self.analyze(code, {'text': text}, description=f"推文情绪分析: {text[:50]}...")
-    
-    def analyze_portfolio(self, holdings: List[Dict]) -> Dict[str, Any]:
-        """
-        投资组合风险评估
-        用于: 股票监控
-        """
-        code = '''
+
+PORTFOLIO_CODE = '''
 # 投资组合分析
 total_value = 0
 weighted_volatility = 0
@@ -244,14 +149,8 @@ else:
     'stock_count': len(holdings)
 }
 '''
-        return self.analyze(code, {'holdings': holdings}, description="投资组合风险评估")
-    
-    def detect_anomalies(self, data: List[Dict], threshold: float = 0.05) -> Dict[str, Any]:
-        """
-        异常检测
-        用于: 供应商监控、价格监控
-        """
-        code = '''
+
+ANOMALIES_CODE = '''
 # 异常检测
 anomalies = []
 changes = []
@@ -296,15 +195,8 @@ else:
     'threshold': threshold
 }
 '''
-        return self.analyze(code, {'data': data, 'threshold': threshold}, 
-                          description=f"异常检测 (阈值: {threshold})")
-    
-    def summarize_texts(self, texts: List[str], max_length: int = 100) -> Dict[str, Any]:
-        """
-        文本摘要（简单版本）
-        用于: 推文汇总、新闻摘要
-        """
-        code = '''
+
+SUMMARIZE_CODE = '''
 # 文本摘要
 all_text = ' '.join(texts)
 words = all_text.split()
@@ -347,15 +239,332 @@ for i in range(min(5, len(top_words))):
     'avg_length': len(all_text) / len(texts) if texts else 0
 }
 '''
-        return self.analyze(code, {'texts': texts}, description="文本摘要分析")
+
+
+# ==================== 原生实现 ====================
+# 和上面的沙箱程序逐行对应: 相同的遍历顺序、相同的比较 (严格大于，平局取第一个)、
+# 相同的求和顺序 (逐个累加，不用 sum()/numpy，保证浮点结果一位不差)
+
+def native_tokens(tokens: List[Dict]) -> Dict[str, Any]:
+    """TOKENS_CODE 的原生实现"""
+    total_holders = 0
+    total_mc = 0
+    max_holders = 0
+    max_symbol = ''
+    hot_tokens = []
+    narrative_counts = {}
+    
+    for token in tokens:
+        h = token['holders']
+        mc = token['mc']
+        sym = token['symbol']
+        nar = token.get('narrative', '其他')
+        
+        total_holders += h
+        total_mc += mc
+        if h > max_holders:
+            max_holders = h
+            max_symbol = sym
+        if h >= 200:
+            hot_tokens.append(sym)
+        narrative_counts[nar] = narrative_counts.get(nar, 0) + 1
+    
+    n = len(tokens)
+    return {
+        'total_tokens': n,
+        'avg_holders': total_holders / n if tokens else 0,
+        'avg_mc': total_mc / n if tokens else 0,
+        'hottest_token': max_symbol,
+        'hottest_holders': max_holders,
+        'hot_tokens': hot_tokens,
+        'narrative_distribution': narrative_counts,
+        'risk_score': len(hot_tokens) / n if tokens else 0
+    }
+
+
+def native_portfolio(holdings: List[Dict]) -> Dict[str, Any]:
+    """PORTFOLIO_CODE 的原生实现"""
+    total_value = 0
+    weighted_volatility = 0
+    sector_counts = {}
+    high = mid = low = 0
+    
+    for stock in holdings:
+        value = stock['shares'] * stock['price']
+        volatility = stock.get('volatility', 0.5)
+        sector = stock.get('sector', '其他')
+        
+        total_value += value
+        weighted_volatility += value * volatility
+        sector_counts[sector] = sector_counts.get(sector, 0) + 1
+        if volatility > 0.7:
+            high += value
+        elif volatility > 0.4:
+            mid += value
+        else:
+            low += value
+    
+    avg_volatility = weighted_volatility / total_value if total_value > 0 else 0
+    if avg_volatility > 0.6:
+        overall_risk = '高风险'
+    elif avg_volatility > 0.3:
+        overall_risk = '中风险'
+    else:
+        overall_risk = '低风险'
+    
+    return {
+        'total_value': total_value,
+        'avg_volatility': avg_volatility,
+        'overall_risk': overall_risk,
+        'risk_distribution': {'高风险': high, '中风险': mid, '低风险': low},
+        'sector_distribution': sector_counts,
+        'stock_count': len(holdings)
+    }
+
+
+def native_anomalies(data: List[Dict], threshold: float) -> Dict[str, Any]:
+    """ANOMALIES_CODE 的原生实现"""
+    anomalies = []
+    changes = [item['change_pct'] for item in data]
+    
+    for item, change in zip(data, changes):
+        if abs(change) > threshold:
+            anomalies.append({
+                'name': item['name'],
+                'change_pct': change,
+                'direction': '大涨' if change > 0 else '大跌'
+            })
+    
+    if changes:
+        total_change = 0
+        max_change = min_change = changes[0]
+        for c in changes:
+            total_change += c
+            if c > max_change:
+                max_change = c
+            if c < min_change:
+                min_change = c
+        avg_change = total_change / len(changes)
+    else:
+        avg_change = max_change = min_change = 0
+    
+    return {
+        'anomalies': anomalies,
+        'anomaly_count': len(anomalies),
+        'avg_change': avg_change,
+        'max_change': max_change,
+        'min_change': min_change,
+        'threshold': threshold
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法百分位"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class MontyAnalyzer:
+    """
+    通用 Monty 分析工具
+    所有监控任务都可以调用这个类进行 AI 分析
+    """
+    
+    # 编译好的程序，所有实例共用: {(代码哈希, 输入名, 外部函数名): Monty}
+    _programs: "OrderedDict[Tuple, pydantic_monty.Monty]" = OrderedDict()
+    _programs_lock = threading.Lock()
+    _cache_stats = {'hits': 0, 'misses': 0}
+    
+    def __init__(self, log_size: int = LOG_SIZE, native: bool = True):
+        """native=False 时预置分析也走沙箱 (对拍测试用)"""
+        self.execution_log = deque(maxlen=log_size)
+        self.native = native
+    
+    @classmethod
+    def program(cls, code: str, input_names, external_function_names=()) -> Tuple[pydantic_monty.Monty, bool]:
+        """
+        取编译好的程序 (没有就编译并缓存)
+        返回 (Monty 实例, 是否命中缓存)
+        """
+        inputs = tuple(sorted(input_names))
+        ext_funcs = tuple(sorted(external_function_names))
+        key = (hashlib.sha1(code.encode('utf-8')).hexdigest(), inputs, ext_funcs)
+        with cls._programs_lock:
+            m = cls._programs.get(key)
+            if m is not None:
+                cls._programs.move_to_end(key)
+                cls._cache_stats['hits'] += 1
+                return m, True
+        
+        m = pydantic_monty.Monty(code, inputs=list(inputs), external_functions=list(ext_funcs))
+        with cls._programs_lock:
+            cls._programs[key] = m
+            cls._cache_stats['misses'] += 1
+            while len(cls._programs) > PROGRAM_CACHE_SIZE:
+                cls._programs.popitem(last=False)
+        return m, False
+    
+    def _record(self, description: str, started: datetime, success: bool, cached: bool,
+                result: Any = None, error: Optional[str] = None, native: bool = False) -> Dict[str, Any]:
+        """记日志并生成统一的返回结构"""
+        execution_time = (datetime.now() - started).total_seconds() * 1000
+        log_entry = {
+            'time': datetime.now().isoformat(),
+            'description': description,
+            'execution_time_ms': execution_time,
+            'success': success,
+            'cached': cached,
+            'native': native,
+        }
+        if success:
+            log_entry['result_preview'] = str(result)[:100] if result else None
+        else:
+            log_entry['error'] = error
+        self.execution_log.append(log_entry)
+        
+        return {
+            'success': success,
+            'result': result,
+            'execution_time_ms': execution_time,
+            'error': error,
+            'description': description
+        }
+    
+    def analyze(self, code: str, inputs: Dict[str, Any], 
+                external_functions: Optional[Dict[str, Callable]] = None,
+                description: str = "") -> Dict[str, Any]:
+        """
+        通用分析方法 (同样的代码 + 输入名 + 外部函数名只编译一次)
+        
+        Args:
+            code: Python 代码字符串
+            inputs: 输入数据字典
+            external_functions: 外部函数字典 {name: function}
+            description: 分析描述（用于日志）
+        
+        Returns:
+            {
+                'success': bool,
+                'result': Any,  # 分析结果
+                'execution_time_ms': float,
+                'error': str,  # 如果失败
+                'description': str
+            }
+        """
+        return self.run_many(code, [inputs], external_functions, description)[0]
+    
+    def run_many(self, code: str, inputs_list: List[Dict[str, Any]],
+                 external_functions: Optional[Dict[str, Callable]] = None,
+                 description: str = "") -> List[Dict[str, Any]]:
+        """
+        同一段代码跑一批输入: 只编译一次，逐个执行
+        每个输入的返回结构和 analyze() 相同；某个输入失败不影响其他输入
+        (同一批输入的键要一致，以第一个为准)
+        """
+        if not inputs_list:
+            return []
+        ext_func_names = list(external_functions.keys()) if external_functions else []
+        
+        started = datetime.now()
+        try:
+            m, cached = self.program(code, inputs_list[0].keys(), ext_func_names)
+        except Exception as e:
+            failed = self._record(description, started, False, False, error=str(e))
+            return [dict(failed) for _ in inputs_list]
+        
+        results = []
+        for inputs in inputs_list:
+            try:
+                # 执行
+                if external_functions:
+                    result = m.run(inputs=inputs, external_functions=external_functions)
+                else:
+                    result = m.run(inputs=inputs)
+                results.append(self._record(description, started, True, cached, result=result))
+            except Exception as e:
+                results.append(self._record(description, started, False, cached, error=str(e)))
+            started = datetime.now()
+            cached = True  # 第二个输入起程序一定是现成的
+        return results
+    
+    # ==================== 预置分析方法 ====================
+    
+    def _preset(self, native_func: Callable, code: str, inputs: Dict[str, Any],
+                description: str) -> Dict[str, Any]:
+        """预置分析: 优先原生实现，出任何异常都交给沙箱重跑 (报错信息和以前一致)"""
+        if self.native:
+            started = datetime.now()
+            try:
+                result = native_func(**inputs)
+            except Exception:
+                pass
+            else:
+                return self._record(description, started, True, True, result=result, native=True)
+        return self.analyze(code, inputs, description=description)
+    
+    def analyze_tokens(self, tokens: List[Dict]) -> Dict[str, Any]:
+        """
+        分析 Meme 币数据
+        用于: XXYY.io 监控
+        """
+        return self._preset(native_tokens, TOKENS_CODE, {'tokens': tokens}, "Meme币数据分析")
+    
+    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+        """
+        情绪分析
+        用于: Twitter 推文分析
+        """
+        return self.analyze(SENTIMENT_CODE, {'text': text}, description=f"推文情绪分析: {text[:50]}...")
+    
+    def analyze_portfolio(self, holdings: List[Dict]) -> Dict[str, Any]:
+        """
+        投资组合风险评估
+        用于: 股票监控
+        """
+        return self._preset(native_portfolio, PORTFOLIO_CODE, {'holdings': holdings}, "投资组合风险评估")
+    
+    def detect_anomalies(self, data: List[Dict], threshold: float = 0.05) -> Dict[str, Any]:
+        """
+        异常检测
+        用于: 供应商监控、价格监控
+        """
+        return self._preset(native_anomalies, ANOMALIES_CODE, {'data': data, 'threshold': threshold},
+                            f"异常检测 (阈值: {threshold})")
+    
+    def summarize_texts(self, texts: List[str], max_length: int = 100) -> Dict[str, Any]:
+        """
+        文本摘要（简单版本）
+        用于: 推文汇总、新闻摘要
+        """
+        return self.analyze(SUMMARIZE_CODE, {'texts': texts}, description="文本摘要分析")
     
     def get_log(self, n: int = 10) -> List[Dict]:
         """获取最近的执行日志"""
-        return self.execution_log[-n:]
+        return list(self.execution_log)[-n:]
     
     def clear_log(self):
         """清空日志"""
-        self.execution_log = []
+        self.execution_log.clear()
+    
+    def stats(self, description: Optional[str] = None) -> Dict[str, Any]:
+        """
+        最近执行的耗时统计 (日志环形缓冲里的记录)
+        description: 只统计描述以此开头的记录
+        """
+        entries = [e for e in self.execution_log
+                   if description is None or e['description'].startswith(description)]
+        times = sorted(e['execution_time_ms'] for e in entries)
+        return {
+            'count': len(entries),
+            'success_rate': sum(1 for e in entries if e['success']) / len(entries) if entries else 0,
+            'p50_ms': _percentile(times, 50),
+            'p90_ms': _percentile(times, 90),
+            'p99_ms': _percentile(times, 99),
+            'max_ms': times[-1] if times else 0,
+            'program_cache': dict(self._cache_stats, size=len(self._programs)),
+        }
 
 
 # ==================== 便捷函数 ====================
@@ -435,3 +644,4 @@ if __name__ == "__main__":
     print("✅ 所有测试通过！")
     print("=" * 50)
     print(f"\n执行日志: {len(analyzer.execution_log)} 条记录")
+    print(f"耗时统计: {analyzer.stats()}")
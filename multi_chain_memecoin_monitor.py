@@ -7,263 +7,231 @@
 
 import requests
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
-import time
+from typing import List, Dict, Optional, Set, Tuple
 
 class MemecoinLauncherMonitor:
     """多链发射平台监控器"""
     
-    def __init__(self):
+    # (平台, 链名, DexScreener chainId, 搜索词) —— 顺序即分类优先级
+    LAUNCHERS = [
+        ('Pump.fun', 'Solana', 'solana', 'pump'),
+        ('Clanker', 'Base', 'base', 'clanker'),
+        ('Bankr', 'Base', 'base', 'bankr'),
+        ('Four.meme', 'BSC', 'bsc', 'meme'),
+    ]
+    REPORT_LIMIT = 5  # 报告里每个平台最多列出的交易对
+    
+    def __init__(self, state_file: str = "/tmp/multi_chain_seen_pairs.json"):
         self.session = requests.Session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.state_file = state_file
+        self.max_seen = 5000  # 已见交易对最多保留条数
     
-    # ==================== Solana - Pump.fun ====================
-    def get_pumpfun_new_tokens(self, limit: int = 20) -> List[Dict]:
-        """
-        获取 Pump.fun 最新发射的代币
-        Pump.fun API: https://pump.fun/api/... (需要逆向或第三方API)
-        """
-        print("🔍 获取 Pump.fun (Solana) 新币...")
+    # ==================== DexScreener 搜索 ====================
+    def _search(self, query: str) -> List[Dict]:
+        url = f"https://api.dexscreener.com/latest/dex/search?q={query}"
+        r = self.session.get(url, headers=self.headers, timeout=30)
+        return r.json().get('pairs', []) or []
+    
+    def search_all(self, queries: List[str] = None) -> Dict[str, List[Dict]]:
+        """并发执行所有平台的搜索，返回 {搜索词: pairs}；失败的搜索返回空列表"""
+        queries = queries or list(dict.fromkeys(l[3] for l in self.LAUNCHERS))
+        platforms = {l[3]: l[0] for l in self.LAUNCHERS}
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = {q: pool.submit(self._search, q) for q in queries}
+            for q, future in futures.items():
+                try:
+                    results[q] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {platforms.get(q, q)} 获取失败: {e}")
+                    results[q] = []
         
-        # 使用 Solana FM API 或 DexScreener 筛选新币
-        # 这里用 DexScreener 作为替代方案
-        try:
-            url = "https://api.dexscreener.com/latest/dex/search?q=pump"
-            r = self.session.get(url, headers=self.headers, timeout=30)
-            data = r.json()
-            
-            tokens = []
-            for pair in data.get('pairs', [])[:limit]:
-                if pair.get('chainId', '').lower() == 'solana':
-                    tokens.append({
-                        'chain': 'Solana',
-                        'platform': 'Pump.fun',
-                        'symbol': pair.get('baseToken', {}).get('symbol', 'N/A'),
-                        'name': pair.get('baseToken', {}).get('name', 'N/A'),
-                        'address': pair.get('baseToken', {}).get('address', ''),
-                        'priceUsd': float(pair.get('priceUsd') or 0),
-                        'volume24h': float(pair.get('volume', {}).get('h24') or 0),
-                        'priceChange24h': float(pair.get('priceChange', {}).get('h24') or 0),
-                        'liquidityUsd': float(pair.get('liquidity', {}).get('usd') or 0),
-                        'createdAt': pair.get('pairCreatedAt', ''),
-                    })
-            
-            return tokens
-        except Exception as e:
-            print(f"⚠️ Pump.fun 获取失败: {e}")
-            return []
+        return results
     
-    # ==================== Base - Clanker ====================
-    def get_clanker_new_tokens(self, limit: int = 20) -> List[Dict]:
+    # ==================== 合并 + 分类 ====================
+    def classify_launcher(self, pair: Dict, queries: Set[str]) -> Optional[Tuple[str, str]]:
+        """根据命中的搜索词和链判断发射平台，返回 (平台, 链名)"""
+        chain_id = (pair.get('chainId') or '').lower()
+        for platform, chain_name, launcher_chain, query in self.LAUNCHERS:
+            if query in queries and chain_id == launcher_chain:
+                return platform, chain_name
+        return None
+    
+    def _pair_to_token(self, pair: Dict, platform: str, chain_name: str) -> Dict:
+        return {
+            'chain': chain_name,
+            'platform': platform,
+            'symbol': pair.get('baseToken', {}).get('symbol', 'N/A'),
+            'name': pair.get('baseToken', {}).get('name', 'N/A'),
+            'address': pair.get('baseToken', {}).get('address', ''),
+            'pairAddress': pair.get('pairAddress', ''),
+            'priceUsd': float(pair.get('priceUsd') or 0),
+            'volume24h': float(pair.get('volume', {}).get('h24') or 0),
+            'priceChange24h': float(pair.get('priceChange', {}).get('h24') or 0),
+            'liquidityUsd': float(pair.get('liquidity', {}).get('usd') or 0),
+            'createdAt': pair.get('pairCreatedAt', ''),
+        }
+    
+    def merge_pairs(self, results: Dict[str, List[Dict]]) -> List[Dict]:
         """
-        获取 Clanker (Base) 最新发射的代币
+        把各搜索结果合并成按交易对地址去重的集合，一次遍历完成平台分类
+        同一个代币在同一平台只保留第一个交易对
         """
-        print("🔍 获取 Clanker (Base) 新币...")
+        merged: Dict[str, Dict] = {}
+        hits: Dict[str, Set[str]] = {}
         
-        try:
-            # 搜索 Clanker 相关代币
-            url = "https://api.dexscreener.com/latest/dex/search?q=clanker"
-            r = self.session.get(url, headers=self.headers, timeout=30)
-            data = r.json()
-            
-            tokens = []
-            seen = set()
-            
-            for pair in data.get('pairs', []):
-                if pair.get('chainId', '').lower() != 'base':
-                    continue
-                
-                addr = pair.get('baseToken', {}).get('address', '')
-                if addr in seen:
+        for query, pairs in results.items():
+            for pair in pairs:
+                key = pair.get('pairAddress') or pair.get('baseToken', {}).get('address', '')
+                if not key:
                     continue
-                seen.add(addr)
-                
-                if len(tokens) >= limit:
-                    break
-                
-                tokens.append({
-                    'chain': 'Base',
-                    'platform': 'Clanker',
-                    'symbol': pair.get('baseToken', {}).get('symbol', 'N/A'),
-                    'name': pair.get('baseToken', {}).get('name', 'N/A'),
-                    'address': addr,
-                    'priceUsd': float(pair.get('priceUsd') or 0),
-                    'volume24h': float(pair.get('volume', {}).get('h24') or 0),
-                    'priceChange24h': float(pair.get('priceChange', {}).get('h24') or 0),
-                    'liquidityUsd': float(pair.get('liquidity', {}).get('usd') or 0),
-                    'createdAt': pair.get('pairCreatedAt', ''),
-                })
-            
-            return tokens
-        except Exception as e:
-            print(f"⚠️ Clanker 获取失败: {e}")
-            return []
+                merged.setdefault(key, pair)
+                hits.setdefault(key, set()).add(query)
+        
+        tokens = []
+        seen_tokens = set()
+        for key, pair in merged.items():
+            launcher = self.classify_launcher(pair, hits[key])
+            if not launcher:
+                continue
+            token = self._pair_to_token(pair, *launcher)
+            token_key = (token['platform'], token['address'])
+            if token_key in seen_tokens:
+                continue
+            seen_tokens.add(token_key)
+            tokens.append(token)
+        
+        return tokens
+    
+    def collect_launcher_tokens(self) -> List[Dict]:
+        """并发搜索所有平台并合并去重"""
+        return self.merge_pairs(self.search_all())
+    
+    def _platform_tokens(self, platform: str, limit: int) -> List[Dict]:
+        query = next(l[3] for l in self.LAUNCHERS if l[0] == platform)
+        tokens = self.merge_pairs(self.search_all([query]))
+        return [t for t in tokens if t['platform'] == platform][:limit]
+    
+    # ==================== 增量: 只输出新交易对 ====================
+    def load_seen(self) -> Dict[str, str]:
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {}
+    
+    def save_seen(self, seen: Dict[str, str]):
+        # 按首次发现时间保留最近的 max_seen 条
+        recent = sorted(seen.items(), key=lambda x: x[1])[-self.max_seen:]
+        with open(self.state_file, 'w') as f:
+            json.dump(dict(recent), f)
+    
+    @staticmethod
+    def _pair_key(token: Dict) -> str:
+        return token['pairAddress'] or token['address']
+    
+    def new_pairs(self) -> List[Dict]:
+        """上一轮之后新出现的交易对 (不记录，处理完再调 mark_seen)"""
+        seen = self.load_seen()
+        return [t for t in self.collect_launcher_tokens() if self._pair_key(t) not in seen]
+    
+    def mark_seen(self, tokens: List[Dict]):
+        """把已经输出的交易对记到状态文件"""
+        if not tokens:
+            return
+        seen = self.load_seen()
+        now = datetime.now().isoformat()
+        for t in tokens:
+            seen.setdefault(self._pair_key(t), now)
+        self.save_seen(seen)
+    
+    def scan_new_pairs(self) -> List[Dict]:
+        """返回上一轮之后新出现的交易对，并全部记录到状态文件"""
+        new_tokens = self.new_pairs()
+        self.mark_seen(new_tokens)
+        return new_tokens
+    
+    # ==================== 单平台查询 (兼容旧接口) ====================
+    def get_pumpfun_new_tokens(self, limit: int = 20) -> List[Dict]:
+        """获取 Pump.fun (Solana) 最新发射的代币 (DexScreener 搜索替代方案)"""
+        print("🔍 获取 Pump.fun (Solana) 新币...")
+        return self._platform_tokens('Pump.fun', limit)
+    
+    def get_clanker_new_tokens(self, limit: int = 20) -> List[Dict]:
+        """获取 Clanker (Base) 最新发射的代币"""
+        print("🔍 获取 Clanker (Base) 新币...")
+        return self._platform_tokens('Clanker', limit)
     
-    # ==================== Base - Bankr ====================
     def get_bankr_new_tokens(self, limit: int = 20) -> List[Dict]:
-        """
-        获取 Bankr (Base) 最新发射的代币
-        """
+        """获取 Bankr (Base) 最新发射的代币"""
         print("🔍 获取 Bankr (Base) 新币...")
-        
-        try:
-            url = "https://api.dexscreener.com/latest/dex/search?q=bankr"
-            r = self.session.get(url, headers=self.headers, timeout=30)
-            data = r.json()
-            
-            tokens = []
-            seen = set()
-            
-            for pair in data.get('pairs', []):
-                if pair.get('chainId', '').lower() != 'base':
-                    continue
-                
-                addr = pair.get('baseToken', {}).get('address', '')
-                if addr in seen:
-                    continue
-                seen.add(addr)
-                
-                if len(tokens) >= limit:
-                    break
-                
-                tokens.append({
-                    'chain': 'Base',
-                    'platform': 'Bankr',
-                    'symbol': pair.get('baseToken', {}).get('symbol', 'N/A'),
-                    'name': pair.get('baseToken', {}).get('name', 'N/A'),
-                    'address': addr,
-                    'priceUsd': float(pair.get('priceUsd') or 0),
-                    'volume24h': float(pair.get('volume', {}).get('h24') or 0),
-                    'priceChange24h': float(pair.get('priceChange', {}).get('h24') or 0),
-                    'liquidityUsd': float(pair.get('liquidity', {}).get('usd') or 0),
-                    'createdAt': pair.get('pairCreatedAt', ''),
-                })
-            
-            return tokens
-        except Exception as e:
-            print(f"⚠️ Bankr 获取失败: {e}")
-            return []
+        return self._platform_tokens('Bankr', limit)
     
-    # ==================== BSC - Four.meme ====================
     def get_fourmeme_new_tokens(self, limit: int = 20) -> List[Dict]:
-        """
-        获取 Four.meme (BSC) 最新发射的代币
-        """
+        """获取 Four.meme (BSC) 最新发射的代币"""
         print("🔍 获取 Four.meme (BSC) 新币...")
-        
-        try:
-            # 搜索 BSC 新币
-            url = "https://api.dexscreener.com/latest/dex/search?q=meme"
-            r = self.session.get(url, headers=self.headers, timeout=30)
-            data = r.json()
-            
-            tokens = []
-            seen = set()
-            
-            for pair in data.get('pairs', []):
-                if pair.get('chainId', '').lower() != 'bsc':
-                    continue
-                
-                addr = pair.get('baseToken', {}).get('address', '')
-                if addr in seen:
-                    continue
-                seen.add(addr)
-                
-                if len(tokens) >= limit:
-                    break
-                
-                tokens.append({
-                    'chain': 'BSC',
-                    'platform': 'Four.meme',
-                    'symbol': pair.get('baseToken', {}).get('symbol', 'N/A'),
-                    'name': pair.get('baseToken', {}).get('name', 'N/A'),
-                    'address': addr,
-                    'priceUsd': float(pair.get('priceUsd') or 0),
-                    'volume24h': float(pair.get('volume', {}).get('h24') or 0),
-                    'priceChange24h': float(pair.get('priceChange', {}).get('h24') or 0),
-                    'liquidityUsd': float(pair.get('liquidity', {}).get('usd') or 0),
-                    'createdAt': pair.get('pairCreatedAt', ''),
-                })
-            
-            return tokens
-        except Exception as e:
-            print(f"⚠️ Four.meme 获取失败: {e}")
-            return []
+        return self._platform_tokens('Four.meme', limit)
     
     # ==================== 生成综合报告 ====================
-    def generate_multi_chain_report(self) -> str:
-        """生成多链发射平台综合报告"""
+    def generate_multi_chain_report(self, only_new: bool = True) -> str:
+        """
+        生成多链发射平台综合报告
+        only_new=True 时只报告上一轮之后新出现的交易对；
+        每个平台只列前 REPORT_LIMIT 个，只有列出来的才记为已见，其余留到下一轮
+        """
         print("="*70)
         print("🚀 多链 Memecoin 发射平台监控报告")
         print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         print("="*70)
         print()
         
-        lines = []
-        
-        # 1. Pump.fun (Solana)
-        pump_tokens = self.get_pumpfun_new_tokens(limit=10)
-        if pump_tokens:
-            lines.append("🔷 Solana - Pump.fun")
-            lines.append("-"*70)
-            for i, t in enumerate(pump_tokens[:5], 1):
-                volume_k = t['volume24h'] / 1000
-                change = t['priceChange24h']
-                emoji = "🚀" if change > 50 else "📈" if change > 0 else "📉"
-                lines.append(f"{i}. {emoji} ${t['symbol']}")
-                lines.append(f"   价格: ${t['priceUsd']:.8f} | 24h: {change:+.1f}%")
-                lines.append(f"   交易量: ${volume_k:.1f}K | 合约: {t['address'][:12]}...")
-                lines.append("")
+        print("🔍 并发获取 Pump.fun / Clanker / Bankr / Four.meme 新币...")
+        tokens = self.new_pairs() if only_new else self.collect_launcher_tokens()
         
-        # 2. Clanker (Base)
-        clanker_tokens = self.get_clanker_new_tokens(limit=10)
-        if clanker_tokens:
-            lines.append("\n🔶 Base - Clanker")
-            lines.append("-"*70)
-            for i, t in enumerate(clanker_tokens[:5], 1):
-                volume_k = t['volume24h'] / 1000
-                change = t['priceChange24h']
-                emoji = "🚀" if change > 50 else "📈" if change > 0 else "📉"
-                lines.append(f"{i}. {emoji} ${t['symbol']}")
-                lines.append(f"   价格: ${t['priceUsd']:.6f} | 24h: {change:+.1f}%")
-                lines.append(f"   交易量: ${volume_k:.1f}K | 合约: {t['address'][:12]}...")
-                lines.append("")
+        sections = [
+            ('Pump.fun', "🔷 Solana - Pump.fun", 8),
+            ('Clanker', "🔶 Base - Clanker", 6),
+            ('Bankr', "🔶 Base - Bankr", 6),
+            ('Four.meme', "🟢 BSC - Four.meme", 8),
+        ]
         
-        # 3. Bankr (Base)
-        bankr_tokens = self.get_bankr_new_tokens(limit=10)
-        if bankr_tokens:
-            lines.append("\n🔶 Base - Bankr")
-            lines.append("-"*70)
-            for i, t in enumerate(bankr_tokens[:5], 1):
-                volume_k = t['volume24h'] / 1000
-                change = t['priceChange24h']
-                emoji = "🚀" if change > 50 else "📈" if change > 0 else "📉"
-                lines.append(f"{i}. {emoji} ${t['symbol']}")
-                lines.append(f"   价格: ${t['priceUsd']:.6f} | 24h: {change:+.1f}%")
-                lines.append(f"   交易量: ${volume_k:.1f}K | 合约: {t['address'][:12]}...")
+        lines = []
+        reported = []
+        for platform, title, decimals in sections:
+            platform_tokens = [t for t in tokens if t['platform'] == platform]
+            if not platform_tokens:
+                continue
+            if lines:
                 lines.append("")
-        
-        # 4. Four.meme (BSC)
-        four_tokens = self.get_fourmeme_new_tokens(limit=10)
-        if four_tokens:
-            lines.append("\n🟢 BSC - Four.meme")
+            lines.append(title)
             lines.append("-"*70)
-            for i, t in enumerate(four_tokens[:5], 1):
+            reported += platform_tokens[:self.REPORT_LIMIT]
+            for i, t in enumerate(platform_tokens[:self.REPORT_LIMIT], 1):
                 volume_k = t['volume24h'] / 1000
                 change = t['priceChange24h']
                 emoji = "🚀" if change > 50 else "📈" if change > 0 else "📉"
                 lines.append(f"{i}. {emoji} ${t['symbol']}")
-                lines.append(f"   价格: ${t['priceUsd']:.8f} | 24h: {change:+.1f}%")
+                lines.append(f"   价格: ${t['priceUsd']:.{decimals}f} | 24h: {change:+.1f}%")
                 lines.append(f"   交易量: ${volume_k:.1f}K | 合约: {t['address'][:12]}...")
                 lines.append("")
         
         # 统计
-        total = len(pump_tokens) + len(clanker_tokens) + len(bankr_tokens) + len(four_tokens)
         lines.append("="*70)
-        lines.append(f"📊 总计发现 {total} 个新币")
+        if only_new:
+            self.mark_seen(reported)
+            lines.append(f"📊 本轮新增 {len(tokens)} 个交易对，已列出 {len(reported)} 个"
+                         + (f"，其余 {len(tokens) - len(reported)} 个下轮继续" if len(tokens) > len(reported) else ""))
+        else:
+            lines.append(f"📊 总计发现 {len(tokens)} 个新币")
         lines.append("="*70)
         
         return "\n".join(lines)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+📰 财经新闻引擎 - 各 finance_news_* 聚合器共用
+- 新闻源是可插拔的适配器 (NewsSource)，各脚本只负责挑选新闻源和条数
+- 所有新闻源并发抓取，每个源有自己的截止时间，超时的源沿用上次结果
+- 条件请求 (ETag / If-Modified-Since)，源没更新时服务器直接回 304
+- 跨来源的相似标题聚类成一条 (字符二元组 Jaccard 相似度)
+- 增量输出: 只包含上次运行之后新出现的新闻
+"""
+
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+DC_KEYWORDS = ['数据中心', 'IDC', '算力', '服务器', 'AI', '人工智能', '云计算', 'GPU']
+DC_TAG = ('数据中心', '#8b5cf6')
+
+
+class NewsSource:
+    """
+    新闻源适配器
+    parse(text) 把响应正文解析成新闻列表 [{title, url, tag, tagColor}]
+    """
+
+    def __init__(self, name: str, url: str, parse: Callable[[str], List[Dict]],
+                 limit: int = 5, deadline: float = 8, headers: Optional[Dict] = None):
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.limit = limit
+        self.deadline = deadline
+        self.headers = {'User-Agent': UA, **(headers or {})}
+
+    def items(self, text: str) -> List[Dict]:
+        items = []
+        for item in self.parse(text):
+            if not item.get('title'):
+                continue
+            items.append({'source': self.name, 'time': '刚刚', **item})
+            if len(items) >= self.limit:
+                break
+        return items
+
+
+def tag_by_keywords(title: str, keywords: Optional[List[str]], tag: str, color: str) -> Dict:
+    """命中数据中心关键词的打 数据中心 标签，否则用默认标签"""
+    if keywords and any(kw in title for kw in keywords):
+        return {'tag': DC_TAG[0], 'tagColor': DC_TAG[1]}
+    return {'tag': tag, 'tagColor': color}
+
+
+# ========== 新闻源 ==========
+
+def sina_source(limit: int = 5, tag: str = '财经', num: int = 10) -> NewsSource:
+    """新浪财经"""
+    def parse(text):
+        data = json.loads(text)
+        return [{'title': item.get('title', ''), 'url': item.get('url', ''),
+                 'tag': tag, 'tagColor': '#ef4444'}
+                for item in (data.get('result') or {}).get('data') or []]
+    return NewsSource('新浪财经', f'https://feed.sina.com.cn/api/roll/get?pageid=153&lid=2516&num={num}',
+                      parse, limit)
+
+
+def kr36_source(limit: int = 3, dc_keywords: Optional[List[str]] = None) -> NewsSource:
+    """36氪 - 科技财经"""
+    def parse(text):
+        data = json.loads(text)
+        return [{'title': item.get('title', ''),
+                 'url': f"https://36kr.com/newsflashes/{item.get('id', '')}",
+                 **tag_by_keywords(item.get('title', ''), dc_keywords, '科技', '#f59e0b')}
+                for item in (data.get('data') or {}).get('newsflashList') or []]
+    return NewsSource('36氪', 'https://36kr.com/api/newsflash/catalog', parse, limit)
+
+
+def wallstreet_source(limit: int = 3, dc_keywords: Optional[List[str]] = None,
+                      num: int = 10) -> NewsSource:
+    """华尔街见闻"""
+    def parse(text):
+        data = json.loads(text)
+        return [{'title': item.get('title', ''),
+                 'url': f"https://wallstreetcn.com/articles/{item.get('id', '')}",
+                 **tag_by_keywords(item.get('title', ''), dc_keywords, '全球',
+                                   '#10b981' if dc_keywords else '#8b5cf6')}
+                for item in (data.get('data') or {}).get('items') or []]
+    return NewsSource('华尔街见闻', f'https://api.wallstcn.com/apiv1/content/articles?page=1&limit={num}',
+                      parse, limit)
+
+
+def eastmoney_source(limit: int = 3) -> NewsSource:
+    """东方财富公告"""
+    def parse(text):
+        data = json.loads(text)
+        return [{'title': item.get('announcement_title', ''),
+                 'url': f"https://data.eastmoney.com/notices/detail/{item.get('codes', '')}/{item.get('notice_id', '')}.html",
+                 'tag': 'A股', 'tagColor': '#10b981'}
+                for item in (data.get('data') or {}).get('list') or []]
+    return NewsSource('东方财富', 'https://np-anotice-stock.eastmoney.com/api/security/ann?page_size=20&page_index=1',
+                      parse, limit)
+
+
+def cls_source(limit: int = 5) -> NewsSource:
+    """财联社滚动新闻"""
+    def parse(text):
+        data = json.loads(text)
+        if data.get('code') != 200:
+            return []
+        return [{'title': item.get('title', ''),
+                 'url': f"https://www.cls.cn/detail/{item.get('id', '')}",
+                 'tag': '快讯', 'tagColor': '#10b981'}
+                for item in data.get('data') or []]
+    return NewsSource('财联社', 'https://www.cls.cn/api/roll/get', parse, limit,
+                      headers={'Referer': 'https://www.cls.cn/'})
+
+
+def itnews_source(limit: int = 4, keywords: Optional[List[str]] = None) -> NewsSource:
+    """IT之家 - 只保留命中关键词的科技新闻"""
+    keywords = keywords or ['数据', '算力', '服务器', 'IDC', 'AI', '云计算', 'GPU', '芯片']
+
+    def parse(text):
+        data = json.loads(text)
+        return [{'title': item.get('title', ''), 'url': item.get('url', ''),
+                 'tag': DC_TAG[0], 'tagColor': DC_TAG[1]}
+                for item in data.get('newslist') or []
+                if any(kw in item.get('title', '') for kw in keywords)]
+    return NewsSource('IT之家', 'https://api.ithome.com/json/newslist/news?r=0', parse, limit)
+
+
+ZHITONG_RE = re.compile(r'<a[^>]*href="([^"]*\/detail\/[^"]*)"[^>]*>\s*<[^>]*>\s*([^<]{10,})')
+
+
+def zhitong_source(limit: int = 5) -> NewsSource:
+    """智通财经 (HTML页面)"""
+    def parse(text):
+        items = []
+        for i, (link, title) in enumerate(ZHITONG_RE.findall(text)):
+            if 'zhitongcaijing.com' not in link:
+                link = 'https://www.zhitongcaijing.com' + link
+            items.append({'title': title.strip(), 'url': link, 'time': f'{i+1}小时前',
+                          'tag': '港股', 'tagColor': '#3b82f6'})
+        return items
+    return NewsSource('智通财经', 'https://www.zhitongcaijing.com/content/recommend.html', parse, limit)
+
+
+# ========== 标题聚类 ==========
+
+NORMALIZE_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """去掉空白和标点，统一小写"""
+    return NORMALIZE_RE.sub('', title).lower()
+
+
+def bigrams(text: str) -> Set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard 相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_headlines(items: List[Dict], threshold: float = 0.6) -> List[Dict]:
+    """
+    相似标题聚成一条: 保留最先出现的那条 (新闻源优先级)，
+    其余来源记在 also_reported_by 里
+    """
+    clusters: List[Tuple[Set[str], Dict]] = []
+    for item in items:
+        grams = bigrams(normalize_title(item['title']))
+        for rep_grams, rep in clusters:
+            if similarity(grams, rep_grams) >= threshold:
+                if item['source'] != rep['source'] and item['source'] not in rep['also_reported_by']:
+                    rep['also_reported_by'].append(item['source'])
+                break
+        else:
+            clusters.append((grams, dict(item, also_reported_by=[])))
+    return [rep for _, rep in clusters]
+
+
+# ========== 引擎 ==========
+
+class NewsEngine:
+    """并发抓取 + 条件请求 + 聚类去重 + 增量输出"""
+
+    SEEN_LIMIT = 500  # 记住最近多少条标题 (用于增量判断)
+
+    def __init__(self, sources: List[NewsSource], state_file: str,
+                 threshold: float = 0.6, max_workers: int = 8):
+        self.sources = sources
+        self.state_file = state_file
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.state = self.load_state()
+        self.report: Dict[str, str] = {}  # 新闻源 → 本轮状态
+
+    # ---------- 状态 ----------
+
+    def load_state(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('http', {})
+        state.setdefault('seen', [])
+        return state
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+
+    # ---------- 抓取 ----------
+
+    def _fetch(self, source: NewsSource, cached: Dict) -> Tuple[List[Dict], str, Optional[Dict]]:
+        """
+        条件请求；304 时返回上次的结果
+        返回 (条目, 状态, 新的缓存记录或None)；不直接改 self.state，
+        超时后还在后台跑的线程不会和 save_state 抢同一个字典
+        """
+        headers = dict(source.headers)
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        req = urllib.request.Request(source.url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=source.deadline) as resp:
+                text = resp.read().decode('utf-8', errors='replace')
+                etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return cached.get('items', []), '未更新(304)', None
+            raise
+
+        items = source.items(text)
+        return items, f'{len(items)} 条', {'etag': etag, 'last_modified': last_modified, 'items': items}
+
+    def fetch_all(self) -> Dict[str, List[Dict]]:
+        """并发抓取全部新闻源，每个源在自己的截止时间内返回，否则沿用上次结果"""
+        results: Dict[str, List[Dict]] = {}
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.sources)) or 1)
+        http = self.state['http']
+        futures = [(source, pool.submit(self._fetch, source, dict(http.get(source.url, {}))))
+                   for source in self.sources]
+
+        for source, future in futures:
+            remaining = max(0.0, start + source.deadline - time.monotonic())
+            icon = '✅'
+            try:
+                items, status, entry = future.result(timeout=remaining)
+                if entry is not None:
+                    http[source.url] = entry  # 只合并按时完成的源
+            except FutureTimeout:
+                icon, status = '⏱️', '超时，沿用上次结果'
+                items = http.get(source.url, {}).get('items', [])
+            except Exception as e:
+                icon, status = '❌', f'失败: {str(e)[:50]}'
+                items = http.get(source.url, {}).get('items', [])
+            results[source.name] = items
+            self.report[source.name] = status
+            print(f"{icon} {source.name}: {status}")
+
+        # 不等超时的源，让它们在后台自然结束
+        pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    # ---------- 聚合 ----------
+
+    def _is_seen(self, grams: Set[str], seen: List[Set[str]]) -> bool:
+        return any(similarity(grams, s) >= self.threshold for s in seen)
+
+    def aggregate(self, limit: int = 12,
+                  keep: Callable[[Dict], bool] = lambda item: True) -> Tuple[List[Dict], List[Dict]]:
+        """
+        返回 (本轮全部新闻, 其中上次运行之后新出现的)
+        keep: 额外过滤条件 (例如必须有真实链接)
+        """
+        per_source = self.fetch_all()
+        merged = [item for source in self.sources for item in per_source.get(source.name, [])]
+        news = [item for item in cluster_headlines(merged, self.threshold) if keep(item)][:limit]
+
+        seen = [bigrams(title) for title, _ in self.state['seen']]
+        new_items = []
+        now = time.time()
+        for item in news:
+            norm = normalize_title(item['title'])
+            if not self._is_seen(bigrams(norm), seen):
+                new_items.append(item)
+                seen.append(bigrams(norm))
+                self.state['seen'].append([norm, now])
+        self.state['seen'] = self.state['seen'][-self.SEEN_LIMIT:]
+        self.save_state()
+        return news, new_items
+
+
+def save_news_json(output_file: str, news: List[Dict], new_items: List[Dict],
+                   source_count: int, **extra) -> str:
+    """写出仪表盘使用的 finance_news.json (news 全量，new_news 增量)"""
+    output = {
+        'update_time': datetime.now().isoformat(),
+        'source_count': source_count,
+        'total_count': len(news),
+        'news': news,
+        'new_count': len(new_items),
+        'new_news': new_items,
+        **extra,
+    }
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    return output_file
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+📨 进程内消息推送 - 替代每条消息都 fork 一次 openclaw CLI
+以前每条推送都 `openclaw message send`，Node 冷启动约1秒、超时30秒。现在：
+- 消息进异步队列，后台线程统一发送，调用方不用等 Node 启动
+- 短时间内连发的多条消息 (同一频道同一目标) 合并成一条
+- 发送失败指数退避重试；结果未知的失败 (已发出请求后超时) 不重试，避免同一条消息推两次
+- 传输层可换: Telegram Bot API 长连接 (默认) / 本地 HTTP 接口 / 常驻 CLI worker (stdin 逐行 JSON) / 兜底的一次性 CLI
+  测试时把 NOTIFY_URL 指向本地的假接口，或直接传一个 transport 进来
+
+配置 (按优先级):
+    NOTIFY_URL=http://127.0.0.1:18789/message     # POST {"channel","target","message"}
+    NOTIFY_WORKER="常驻进程命令"                    # stdin 一行一条 JSON，stdout 回 {"ok": true}
+    TELEGRAM_BOT_TOKEN，或 openclaw 配置 (~/.openclaw/openclaw.json 的 channels.telegram.botToken)
+        → 直接调 Telegram Bot API，复用一条 HTTPS 连接，不再每条消息启动 Node
+    都没有时退回 openclaw message send
+
+用法:
+    from notifier import send_telegram
+    send_telegram("🦞 早报 ...")              # 阻塞到发送完成，返回是否成功
+    await get_dispatcher().asend("...")       # 异步代码里用，不阻塞事件循环
+    python3 notifier.py "测试消息"
+"""
+
+import asyncio
+import atexit
+import http.client
+import json
+import os
+import select
+import shlex
+import subprocess
+import sys
+import threading
+import urllib.request
+import weakref
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+TELEGRAM_TARGET = '5440939697'
+OPENCLAW_BIN = '/root/.nvm/versions/node/v22.22.0/bin/openclaw'
+OPENCLAW_CONFIG = os.path.expanduser('~/.openclaw/openclaw.json')
+TELEGRAM_API_HOST = 'api.telegram.org'
+
+COALESCE_WINDOW = 0.5   # 收到第一条后再等0.5秒，期间到达的消息合并
+MAX_LENGTH = 4000       # Telegram 单条上限 4096，留点余量
+RETRY_DELAYS = (1, 2, 4)
+SEND_TIMEOUT = 30
+
+
+# ==================== 传输层 ====================
+
+class DeliveryUnknown(Exception):
+    """请求已经发出但没等到结果 (超时)，消息可能已送达: 不能重试，否则可能推两次"""
+    pass
+
+
+class Transport:
+    """传输层接口: send() 失败时抛异常；发出后结果未知时抛 DeliveryUnknown"""
+
+    def send(self, channel: str, target: str, message: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HttpTransport(Transport):
+    """POST 到本地 HTTP 接口 (openclaw 网关或测试用的假接口)"""
+
+    def __init__(self, url: str, timeout: float = SEND_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, channel: str, target: str, message: str):
+        body = json.dumps({'channel': channel, 'target': target, 'message': message}).encode()
+        req = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                if not 200 <= r.status < 300:
+                    raise RuntimeError(f"HTTP {r.status}")
+        except TimeoutError as e:  # 连接失败会包成 URLError；这里是请求发出后等响应超时
+            raise DeliveryUnknown(f"{self.timeout:.0f}s 无响应") from e
+
+
+class TelegramBotTransport(Transport):
+    """
+    直接调 Telegram Bot API sendMessage，HTTPS 长连接复用 (keep-alive)，连接断了下次发送时重连
+    只负责 telegram 频道，其他频道交给 fallback
+    """
+
+    def __init__(self, token: str, timeout: float = SEND_TIMEOUT, fallback: Optional[Transport] = None):
+        self.token = token
+        self.timeout = timeout
+        self.fallback = fallback
+        self.conn: Optional[http.client.HTTPSConnection] = None
+        self._lock = threading.Lock()
+
+    def send(self, channel: str, target: str, message: str):
+        if channel != 'telegram':
+            if not self.fallback:
+                raise RuntimeError(f"不支持的频道: {channel}")
+            return self.fallback.send(channel, target, message)
+
+        body = json.dumps({'chat_id': target, 'text': message, 'disable_web_page_preview': True})
+        with self._lock:
+            for _ in range(2):
+                reused = self.conn is not None
+                if self.conn is None:
+                    self.conn = http.client.HTTPSConnection(TELEGRAM_API_HOST, timeout=self.timeout)
+                try:
+                    self.conn.request('POST', f'/bot{self.token}/sendMessage', body=body,
+                                      headers={'Content-Type': 'application/json'})
+                except OSError:
+                    self._reset()  # 请求没发出去 (空闲连接已断开等)，复用的连接就换新连接重发，否则交给外面重试
+                    if not reused:
+                        raise
+                    continue
+                try:
+                    response = self.conn.getresponse()
+                    reply = json.loads(response.read().decode() or '{}')
+                    break
+                except http.client.RemoteDisconnected:
+                    # 空闲的长连接已被服务器关掉，请求没被处理: 换新连接重发一次
+                    self._reset()
+                    if not reused:
+                        raise
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    self._reset()
+                    raise DeliveryUnknown(f"请求已发出，未收到回复: {e}") from e
+        if not reply.get('ok'):
+            raise RuntimeError(f"Telegram {response.status}: {reply.get('description', '未知错误')}")
+
+    def _reset(self):
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+
+    def close(self):
+        with self._lock:
+            self._reset()
+        if self.fallback:
+            self.fallback.close()
+
+
+class WorkerTransport(Transport):
+    """
+    常驻 CLI worker: 启动一次，之后每条消息往 stdin 写一行 JSON，
+    从 stdout 读一行回执 {"ok": true} / {"ok": false, "error": "..."}
+    worker 挂掉会在下一次发送时重启
+    """
+
+    def __init__(self, command: List[str], timeout: float = SEND_TIMEOUT):
+        self.command = command
+        self.timeout = timeout
+        self.proc: Optional[subprocess.Popen] = None
+
+    def _ensure(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        return self.proc
+
+    def send(self, channel: str, target: str, message: str):
+        proc = self._ensure()
+        try:
+            proc.stdin.write(json.dumps({'channel': channel, 'target': target, 'message': message},
+                                        ensure_ascii=False) + '\n')
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.close()
+            raise
+        ready, _, _ = select.select([proc.stdout], [], [], self.timeout)
+        if not ready:
+            self.close()  # 回执超时，worker 状态未知，重启
+            raise DeliveryUnknown(f"worker {self.timeout:.0f}s 无回执")
+        line = proc.stdout.readline()
+        if not line:
+            self.close()
+            raise RuntimeError("worker 已退出")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error', '未知错误'))
+
+    def close(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+
+
+class CliTransport(Transport):
+    """兜底: 每条消息跑一次 openclaw message send (合并后调用次数已经少很多)"""
+
+    def __init__(self, binary: str = OPENCLAW_BIN, timeout: float = SEND_TIMEOUT):
+        self.binary = binary
+        self.timeout = timeout
+        self.env = os.environ.copy()
+        self.env['PATH'] = os.path.dirname(binary) + ':' + self.env.get('PATH', '')
+
+    def send(self, channel: str, target: str, message: str):
+        cmd = [self.binary, 'message', 'send', '--channel', channel, '--target', target, '--message', message]
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=self.timeout, env=self.env)
+        except subprocess.TimeoutExpired as e:
+            raise DeliveryUnknown(f"openclaw {self.timeout:.0f}s 未结束") from e
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode()[:100] if result.stderr else '未知错误')
+
+
+def telegram_bot_token() -> Optional[str]:
+    """TELEGRAM_BOT_TOKEN 环境变量，或 openclaw 自己配置的 Telegram 机器人"""
+    if os.environ.get('TELEGRAM_BOT_TOKEN'):
+        return os.environ['TELEGRAM_BOT_TOKEN']
+    try:
+        with open(OPENCLAW_CONFIG, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return None
+    telegram = (config.get('channels') or {}).get('telegram') or {}
+    return telegram.get('botToken') or None
+
+
+def default_transport() -> Transport:
+    if os.environ.get('NOTIFY_URL'):
+        return HttpTransport(os.environ['NOTIFY_URL'])
+    if os.environ.get('NOTIFY_WORKER'):
+        return WorkerTransport(shlex.split(os.environ['NOTIFY_WORKER']))
+    token = telegram_bot_token()
+    if token:
+        return TelegramBotTransport(token, fallback=CliTransport())
+    print("⚠️ 没有找到 Telegram 机器人 token，退回每条消息调用一次 openclaw CLI")
+    return CliTransport()
+
+
+# ==================== 调度 ====================
+
+class _Message:
+    __slots__ = ('channel', 'target', 'text', 'future')
+
+    def __init__(self, channel: str, target: str, text: str):
+        self.channel = channel
+        self.target = target
+        self.text = text
+        self.future: Future = Future()
+
+
+_live = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all():
+    """进程退出前把队列里的消息发完"""
+    for dispatcher in list(_live):
+        dispatcher.close()
+
+
+class NotificationDispatcher:
+    """
+    异步队列 + 合并 + 重试
+    后台线程跑自己的事件循环，同步代码和异步代码都能用:
+    notify() 立即返回 Future，send() 阻塞等结果，asend() 在协程里等结果
+    """
+
+    def __init__(self, transport: Optional[Transport] = None, coalesce_window: float = COALESCE_WINDOW,
+                 max_length: int = MAX_LENGTH, retry_delays=RETRY_DELAYS):
+        self.transport = transport or default_transport()
+        self.coalesce_window = coalesce_window
+        self.max_length = max_length
+        self.retry_delays = tuple(retry_delays)
+        self.stats = {'queued': 0, 'sent': 0, 'merged': 0, 'failed': 0, 'retries': 0, 'unknown': 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        _live.add(self)
+
+    def _start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._thread_main, args=(ready,),
+                                            name='notifier', daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _thread_main(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    # ---------- 对外接口 ----------
+
+    def notify(self, message: str, target: str = TELEGRAM_TARGET, channel: str = 'telegram') -> Future:
+        """消息入队，立即返回 Future (结果为是否发送成功)"""
+        self._start()
+        item = _Message(channel, target, message)
+        self.stats['queued'] += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return item.future
+
+    def send(self, message: str, target: str = TELEGRAM_TARGET, channel: str = 'telegram',
+             timeout: Optional[float] = None) -> bool:
+        """入队并阻塞到发送完成 (或重试用尽)"""
+        return self.notify(message, target, channel).result(timeout=timeout)
+
+    async def asend(self, message: str, target: str = TELEGRAM_TARGET, channel: str = 'telegram') -> bool:
+        return await asyncio.wrap_future(self.notify(message, target, channel))
+
+    def close(self, timeout: float = 60):
+        """发完队列里的消息后停止后台线程"""
+        with self._lock:
+            thread = self._thread
+            if not thread or not thread.is_alive():
+                self.transport.close()
+                return
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        thread.join(timeout)
+        self.transport.close()
+
+    # ---------- 后台循环 ----------
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = self._loop.time() + self.coalesce_window
+            while True:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            for group in self._coalesce(batch):
+                await self._deliver(group)
+
+    def _coalesce(self, batch: List[_Message]) -> List[List[_Message]]:
+        """同一频道同一目标的消息按顺序合并，合并后不超过 max_length；完全重复的消息只发一次"""
+        groups: List[List[_Message]] = []
+        open_group: Dict[tuple, List[_Message]] = {}
+        for item in batch:
+            key = (item.channel, item.target)
+            group = open_group.get(key)
+            if group and any(m.text == item.text for m in group):
+                group.append(item)
+                continue
+            if group and len(self._join(group + [item])) <= self.max_length:
+                group.append(item)
+                continue
+            group = [item]
+            open_group[key] = group
+            groups.append(group)
+        return groups
+
+    @staticmethod
+    def _join(group: List[_Message]) -> str:
+        return '\n\n'.join(dict.fromkeys(m.text for m in group))
+
+    async def _deliver(self, group: List[_Message]):
+        head = group[0]
+        text = self._join(group)
+        ok = False
+        for attempt in range(len(self.retry_delays) + 1):
+            try:
+                await self._loop.run_in_executor(None, self.transport.send, head.channel, head.target, text)
+                ok = True
+                break
+            except DeliveryUnknown as e:
+                # 可能已经送达: 按已发送处理，宁可漏一条也不重复推送
+                self.stats['unknown'] += 1
+                print(f"⚠️ {head.channel} 推送结果未知 ({e})，不重试以免重复")
+                ok = True
+                break
+            except Exception as e:
+                if attempt == len(self.retry_delays):
+                    print(f"❌ {head.channel} 推送失败 (已重试{attempt}次): {e}")
+                    break
+                delay = self.retry_delays[attempt]
+                self.stats['retries'] += 1
+                print(f"⚠️ {head.channel} 推送失败: {e}，{delay}秒后重试")
+                await asyncio.sleep(delay)
+        self.stats['sent' if ok else 'failed'] += 1
+        self.stats['merged'] += len(group) - 1
+        for item in group:
+            if not item.future.done():
+                item.future.set_result(ok)
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """进程内共用一个调度器 (调度守护进程里各任务的推送会一起合并)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+        return _dispatcher
+
+
+def send_telegram(message: str, target: str = TELEGRAM_TARGET, timeout: Optional[float] = None) -> bool:
+    """推送到 Telegram，阻塞到发送完成"""
+    return get_dispatcher().send(message, target, timeout=timeout)
+
+
+if __name__ == '__main__':
+    text = ' '.join(sys.argv[1:]) or '🦞 notifier 测试消息'
+    print('✅ 已发送' if send_telegram(text) else '❌ 发送失败')
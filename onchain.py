@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+⛓️ 链上查询层 - 余额批量读取
+以前每次检查都新建 Web3(HTTPProvider)，每个地址一次 eth_getBalance，每个代币再各一次 balanceOf + decimals。现在：
+- JSON-RPC 批量请求 (一个 HTTP 请求里带多个调用)
+- Multicall3 (0xcA11...CA11，各主流链同一个地址) 一次 eth_call 读 N 个地址 × M 个代币的余额 + 原生币余额
+- decimals / symbol 不会变，缓存到本地文件
+- 节点上没有 Multicall3 (例如本地 anvil 不 fork 主网) 时自动退回 JSON-RPC 批量 eth_call
+
+本地测试: anvil --fork-url https://mainnet.base.org 后
+    OnChain('base', rpc_url='http://127.0.0.1:8545')
+
+用法:
+    python3 onchain.py base 0x地址1,0x地址2 [0x代币1,0x代币2]
+"""
+
+import json
+import os
+import sys
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+CHAINS = {
+    'base': {'rpc': 'https://mainnet.base.org', 'native': 'ETH'},
+    'bsc': {'rpc': 'https://bsc-dataseed.binance.org/', 'native': 'BNB'},
+    'eth': {'rpc': 'https://eth.llamarpc.com', 'native': 'ETH'},
+}
+MULTICALL3 = '0xcA11bde05977b3631167028862bE2a173976CA11'
+META_FILE = '/tmp/onchain_token_meta.json'
+
+# 函数选择器 (keccak256(签名) 前4字节)
+SEL_BALANCE_OF = '70a08231'      # balanceOf(address)
+SEL_DECIMALS = '313ce567'        # decimals()
+SEL_SYMBOL = '95d89b41'          # symbol()
+SEL_GET_ETH_BALANCE = '4d2301cc'  # Multicall3.getEthBalance(address)
+SEL_AGGREGATE3 = '82ad56cb'      # Multicall3.aggregate3((address,bool,bytes)[])
+
+Block = Union[int, str]
+
+
+class RpcError(Exception):
+    pass
+
+
+class MulticallUnavailable(RpcError):
+    """这条链上的 Multicall3 地址没有合约 / 调用被 revert，不是偶发错误"""
+    pass
+
+
+# ==================== ABI 编解码 (只实现用到的几种) ====================
+
+def _word(n: int) -> bytes:
+    return n.to_bytes(32, 'big')
+
+
+def _address_word(address: str) -> bytes:
+    raw = bytes.fromhex(address[2:] if address.startswith('0x') else address)
+    if len(raw) != 20:
+        raise ValueError(f"地址格式不对: {address}")
+    return bytes(12) + raw
+
+
+def encode_call(selector: str, *addresses: str) -> bytes:
+    return bytes.fromhex(selector) + b''.join(_address_word(a) for a in addresses)
+
+
+def encode_aggregate3(calls: List[Tuple[str, bytes]]) -> bytes:
+    """aggregate3(Call3[])，每个调用 allowFailure=true (某个代币出错不影响其他)"""
+    tuples = []
+    for target, data in calls:
+        padded = data + bytes(-len(data) % 32)
+        tuples.append(_address_word(target) + _word(1) + _word(0x60) + _word(len(data)) + padded)
+    offsets, offset = [], 32 * len(tuples)
+    for t in tuples:
+        offsets.append(_word(offset))
+        offset += len(t)
+    return (bytes.fromhex(SEL_AGGREGATE3) + _word(0x20) + _word(len(tuples))
+            + b''.join(offsets) + b''.join(tuples))
+
+
+def decode_aggregate3(raw: bytes) -> List[Tuple[bool, bytes]]:
+    """返回 [(success, returnData)]"""
+    def uint(pos: int) -> int:
+        return int.from_bytes(raw[pos:pos + 32], 'big')
+
+    start = uint(0)
+    count = uint(start)
+    base = start + 32
+    results = []
+    for i in range(count):
+        t = base + uint(base + 32 * i)
+        data_at = t + uint(t + 32)
+        length = uint(data_at)
+        results.append((bool(uint(t)), raw[data_at + 32:data_at + 32 + length]))
+    return results
+
+
+def decode_uint(raw: Optional[bytes]) -> Optional[int]:
+    return int.from_bytes(raw[:32], 'big') if raw and len(raw) >= 32 else None
+
+
+def decode_string(raw: Optional[bytes]) -> Optional[str]:
+    """ABI string；老合约 (例如 MKR) 返回 bytes32"""
+    if not raw:
+        return None
+    if len(raw) == 32:
+        return raw.rstrip(b'\x00').decode('utf-8', errors='ignore')
+    length = int.from_bytes(raw[32:64], 'big')
+    return raw[64:64 + length].decode('utf-8', errors='ignore')
+
+
+def _block_param(block: Block) -> str:
+    return hex(block) if isinstance(block, int) else block
+
+
+def _hex_bytes(value: Optional[str]) -> Optional[bytes]:
+    return bytes.fromhex(value[2:]) if value and value != '0x' else None
+
+
+# ==================== JSON-RPC ====================
+
+class RpcClient:
+    """JSON-RPC 客户端，batch() 把多个调用合成一个 HTTP 请求"""
+
+    def __init__(self, url: str, timeout: float = 15, max_batch: int = 50):
+        self.url = url
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.requests = 0  # 实际发出的 HTTP 请求数
+
+    def _post(self, payload) -> object:
+        req = urllib.request.Request(self.url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json', 'User-Agent': 'Mozilla/5.0'})
+        self.requests += 1
+        with urllib.request.urlopen(req, timeout=self.timeout) as r:
+            return json.loads(r.read().decode())
+
+    def call(self, method: str, params: list):
+        reply = self._post({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params})
+        if 'error' in reply:
+            raise RpcError(f"{method}: {reply['error']}")
+        return reply['result']
+
+    def batch(self, calls: List[Tuple[str, list]]) -> List:
+        """批量调用，返回和 calls 顺序一致的结果；单个调用出错的位置是 RpcError 实例"""
+        results: List = []
+        for i in range(0, len(calls), self.max_batch):
+            chunk = calls[i:i + self.max_batch]
+            payload = [{'jsonrpc': '2.0', 'id': n, 'method': m, 'params': p} for n, (m, p) in enumerate(chunk)]
+            reply = self._post(payload)
+            if isinstance(reply, dict):  # 有的节点不支持批量，整体返回一个错误
+                raise RpcError(f"batch: {reply.get('error', reply)}")
+            by_id = {r.get('id'): r for r in reply}
+            for n, (method, _) in enumerate(chunk):
+                r = by_id.get(n, {'error': 'missing'})
+                results.append(RpcError(f"{method}: {r['error']}") if 'error' in r else r['result'])
+        return results
+
+
+# ==================== 余额查询 ====================
+
+class OnChain:
+    """某条链上的批量余额查询"""
+
+    def __init__(self, chain: str = 'base', rpc_url: Optional[str] = None,
+                 multicall: Optional[str] = MULTICALL3, meta_file: str = META_FILE,
+                 chunk: int = 300):
+        self.chain = chain
+        cfg = CHAINS.get(chain, {})
+        self.native = cfg.get('native', 'ETH')
+        self.rpc = RpcClient(rpc_url or os.environ.get(f'{chain.upper()}_RPC_URL') or cfg['rpc'])
+        self.multicall = multicall
+        self.meta_file = meta_file
+        self.chunk = chunk  # 每个 aggregate3 最多多少个子调用 (太多会超节点 gas 上限)
+        self.meta = self._load_meta()
+
+    def _load_meta(self) -> Dict:
+        try:
+            with open(self.meta_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self):
+        tmp = f"{self.meta_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_file)
+
+    def block_number(self) -> int:
+        return int(self.rpc.call('eth_blockNumber', []), 16)
+
+    def eth_calls(self, calls: List[Tuple[str, bytes]], block: Block = 'latest') -> List[Optional[bytes]]:
+        """
+        一组只读调用 [(合约, calldata)]，失败的位置返回 None
+        有 Multicall3 就合成 aggregate3，没有就 JSON-RPC 批量 eth_call
+        """
+        if self.multicall:
+            try:
+                results = []
+                for i in range(0, len(calls), self.chunk):
+                    data = encode_aggregate3(calls[i:i + self.chunk])
+                    raw = self.rpc.call('eth_call', [{'to': self.multicall, 'data': '0x' + data.hex()},
+                                                     _block_param(block)])
+                    try:
+                        decoded = decode_aggregate3(_hex_bytes(raw) or b'')
+                    except ValueError as e:
+                        raise MulticallUnavailable(f"aggregate3 返回无法解析: {e}")
+                    results += [ret if ok else None for ok, ret in decoded]
+                if len(results) == len(calls):
+                    return results
+                raise MulticallUnavailable(f"aggregate3 返回 {len(results)} 个结果，预期 {len(calls)}")
+            except (RpcError, ValueError) as e:
+                if isinstance(e, MulticallUnavailable) or 'revert' in str(e).lower():
+                    # 合约不存在 / 执行 revert / 返回的不是 aggregate3 格式 → 以后都不再用
+                    print(f"⚠️ {self.chain} Multicall3 不可用 ({e})，改用 JSON-RPC 批量调用")
+                    self.multicall = None
+                else:
+                    # 节点偶发错误 (限流、超时等) 只影响这一次，下次还走 Multicall3
+                    print(f"⚠️ {self.chain} Multicall3 调用失败 ({e})，本次改用 JSON-RPC 批量调用")
+        replies = self.rpc.batch([('eth_call', [{'to': target, 'data': '0x' + data.hex()}, _block_param(block)])
+                                  for target, data in calls])
+        return [None if isinstance(r, RpcError) else _hex_bytes(r) for r in replies]
+
+    def token_meta(self, tokens: Iterable[str]) -> Dict[str, Dict]:
+        """代币 decimals / symbol (不可变，查一次永久缓存)"""
+        tokens = list(dict.fromkeys(tokens))
+        key = lambda t: f"{self.chain}:{t.lower()}"
+        missing = [t for t in tokens if key(t) not in self.meta]
+        if missing:
+            calls = []
+            for t in missing:
+                calls += [(t, encode_call(SEL_DECIMALS)), (t, encode_call(SEL_SYMBOL))]
+            results = self.eth_calls(calls)
+            for i, t in enumerate(missing):
+                decimals = decode_uint(results[2 * i])
+                if decimals is None:
+                    continue  # 不是 ERC-20 或节点出错，下次再查
+                self.meta[key(t)] = {'decimals': decimals, 'symbol': decode_string(results[2 * i + 1]) or t[:8]}
+            self._save_meta()
+        return {t: self.meta[key(t)] for t in tokens if key(t) in self.meta}
+
+    def raw_balances(self, addresses: List[str], tokens: List[str] = (), block: Block = 'latest',
+                     native: bool = True) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        {地址: {'native': wei, 代币地址: 最小单位余额}}，读失败的是 None
+        有 Multicall3 时原生币余额也在同一个 eth_call 里 (getEthBalance)
+        """
+        result = {a: {} for a in addresses}
+        calls, slots = [], []
+        for a in addresses:
+            for t in tokens:
+                calls.append((t, encode_call(SEL_BALANCE_OF, a)))
+                slots.append((a, t))
+        if native and self.multicall:
+            for a in addresses:
+                calls.append((self.multicall, encode_call(SEL_GET_ETH_BALANCE, a)))
+                slots.append((a, 'native'))
+        values = self.eth_calls(calls, block) if calls else []
+        fell_back = native and not self.multicall  # eth_calls 里刚确认 Multicall3 不可用，getEthBalance 的结果无效
+        for (a, t), raw in zip(slots, values):
+            if not (fell_back and t == 'native'):
+                result[a][t] = decode_uint(raw)
+
+        if native and any('native' not in v for v in result.values()):
+            # 没有 Multicall3 (或上面刚退回批量模式) → 批量 eth_getBalance
+            replies = self.rpc.batch([('eth_getBalance', [a, _block_param(block)]) for a in addresses])
+            for a, r in zip(addresses, replies):
+                result[a]['native'] = None if isinstance(r, RpcError) else int(r, 16)
+        return result
+
+    def balances(self, addresses: List[str], tokens: List[str] = (), block: Block = 'latest',
+                 native: bool = True) -> Dict[str, Dict[str, Optional[float]]]:
+        """{地址: {币种符号: 余额}}，已按 decimals 换算"""
+        meta = self.token_meta(tokens) if tokens else {}
+        raw = self.raw_balances(addresses, [t for t in tokens if t in meta], block, native)
+        out = {}
+        for a, values in raw.items():
+            row = {}
+            for t, v in values.items():
+                if t == 'native':
+                    row[self.native] = v / 1e18 if v is not None else None
+                else:
+                    row[meta[t]['symbol']] = v / 10 ** meta[t]['decimals'] if v is not None else None
+            out[a] = row
+        return out
+
+
+_clients: Dict[str, OnChain] = {}
+
+
+def get_chain(chain: str) -> OnChain:
+    """进程内每条链共用一个客户端 (元数据缓存、Multicall3 探测结果都复用)"""
+    if chain not in _clients:
+        _clients[chain] = OnChain(chain)
+    return _clients[chain]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    client = OnChain(sys.argv[1])
+    addrs = sys.argv[2].split(',')
+    toks = sys.argv[3].split(',') if len(sys.argv) > 3 else []
+    for addr, bal in client.balances(addrs, toks).items():
+        print(addr, bal)
+    print(f"HTTP 请求数: {client.rpc.requests}")
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+⏰ 常驻调度守护进程 - 替代 cron 每次拉起新的 Python 解释器
+以前每个监控脚本都由 cron 启动一个新进程：重新 import pandas/playwright/web3、
+重新建连接、重新读 /tmp 下的状态JSON。现在所有任务注册在一个进程里：
+- 触发器: cron 表达式 (分 时 日 月 周) 或固定间隔，可加随机抖动
+- 同一任务上次还没跑完就跳过本次 (防重叠)，每个任务有超时
+- 共享预热资源: HTTP 连接池、推文数据库、浏览器 (按需创建，进程内复用)
+- 协程任务只有用到浏览器这类异步资源 (或显式 shared_loop=True) 才放进共享事件循环，
+  其余在自己的线程里 asyncio.run，里面的阻塞调用不会卡住共享循环
+- 运行历史写入 STATUS_FILE，generate_dashboard.get_cron_status 读取展示
+
+用法:
+    python3 scheduler_daemon.py              # 常驻运行
+    python3 scheduler_daemon.py --list       # 查看任务和下次运行时间
+    python3 scheduler_daemon.py --run NAME   # 立即执行一次某个任务
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Union
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, 'scripts')
+STATUS_FILE = '/tmp/scheduler_daemon_status.json'
+HISTORY_LIMIT = 20  # 每个任务保留最近N次运行记录
+
+# 任务失败时，出现这些异常 (或错误信息) 说明注入的资源已经坏了 (浏览器崩溃、连接断开)，要丢弃重建
+BROKEN_RESOURCE_ERRORS = {'TargetClosedError', 'ConnectionError', 'BrokenPipeError',
+                          'RemoteDisconnected', 'ProtocolError'}
+BROKEN_RESOURCE_HINTS = ('has been closed', 'connection closed', 'browser closed',
+                         'target closed', 'disconnected')
+
+
+# ==================== 触发器 ====================
+
+class CronTrigger:
+    """标准5段 cron 表达式: 分 时 日 月 周 (支持 * , - /)"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要5段: {expr}")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse(field, lo, hi) for field, (lo, hi) in zip(fields, self.RANGES)]
+        # 日和周都有限定时按 cron 的规则取并集
+        self.day_any = fields[2] == '*'
+        self.weekday_any = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_str = part.split('/', 1)
+                step = int(step_str)
+            if part == '*':
+                start, end = lo, hi
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+            values.update(v % 7 if hi == 6 else v for v in range(start, end + 1, step))
+        if not values or min(values) < lo or max(values) > hi:
+            raise ValueError(f"cron 字段超出范围: {field}")
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays  # cron: 0=周日
+        if self.day_any:
+            return weekday_ok
+        if self.weekday_any:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, now: datetime) -> datetime:
+        """下一次触发时间 (严格晚于 now)，按月/日/时跳跃而不是逐分钟扫描"""
+        dt = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"cron 表达式永远不会触发: {self.expr}")
+
+    def __str__(self):
+        return self.expr
+
+
+class IntervalTrigger:
+    """固定间隔 (秒)"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_after(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        if self.seconds % 3600 == 0:
+            return f"every {int(self.seconds // 3600)}h"
+        if self.seconds % 60 == 0:
+            return f"every {int(self.seconds // 60)}m"
+        return f"every {self.seconds:g}s"
+
+
+# ==================== 共享资源 ====================
+
+class SharedResources:
+    """
+    进程内共享的预热资源，第一次用到时才创建
+    同步资源 (HTTP Session、数据库) 用 get()；
+    异步资源 (Playwright 浏览器) 用 aget()，在守护进程的事件循环里创建和使用
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Dict] = {}
+        self._instances: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable, close: Optional[Callable] = None):
+        self._factories[name] = {'factory': factory, 'close': close}
+
+    def is_async(self, name: str) -> bool:
+        return inspect.iscoroutinefunction(self._factories[name]['factory'])
+
+    def get(self, name: str):
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]['factory']()
+            return self._instances[name]
+
+    async def aget(self, name: str):
+        # 只在守护进程的单个事件循环里调用，不需要加锁
+        if name not in self._instances:
+            self._instances[name] = await self._factories[name]['factory']()
+        return self._instances[name]
+
+    def discard(self, name: str):
+        """资源坏掉时丢弃 (例如浏览器崩溃)，下次重新创建；返回被丢弃的实例"""
+        with self._lock:
+            return self._instances.pop(name, None)
+
+    async def aclose_instance(self, name: str, instance):
+        close = self._factories[name]['close']
+        try:
+            if close:
+                result = close(instance)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as e:
+            print(f"⚠️ 关闭资源 {name} 失败: {e}")
+
+    async def aclose(self):
+        for name, instance in list(self._instances.items()):
+            await self.aclose_instance(name, instance)
+            self._instances.pop(name, None)
+
+
+def _http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=1)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'Mozilla/5.0'
+    return session
+
+
+def _tweet_store():
+    from tweet_store import TweetStore
+    return TweetStore()
+
+
+async def _browser():
+    from playwright.async_api import async_playwright
+    os.environ['PLAYWRIGHT_BROWSERS_PATH'] = '0'
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(
+        headless=True, args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage'])
+    browser._lobster_playwright = playwright  # 关闭时一起停掉
+    return browser
+
+
+async def _close_browser(browser):
+    await browser.close()
+    await browser._lobster_playwright.stop()
+
+
+resources = SharedResources()
+resources.register('http', _http_session, close=lambda s: s.close())
+resources.register('tweet_store', _tweet_store)
+resources.register('browser', _browser, close=_close_browser)
+
+
+# ==================== 任务 ====================
+
+def is_broken_resource_error(error: BaseException) -> bool:
+    """沿着异常链看是不是浏览器/连接类错误"""
+    while error is not None:
+        names = {cls.__name__ for cls in type(error).__mro__}
+        message = str(error).lower()
+        if names & BROKEN_RESOURCE_ERRORS or any(hint in message for hint in BROKEN_RESOURCE_HINTS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class Job:
+    """
+    一个注册的任务
+    target: 函数，或 "模块:函数" 字符串 (第一次运行时才 import，之后复用)
+    inject: {参数名: 资源名}，运行时把共享资源作为关键字参数传入
+    shared_loop: 协程任务是否在共享事件循环里跑 (确认里面没有阻塞调用才打开；注入异步资源的任务总是在共享循环里)
+    """
+
+    def __init__(self, name: str, target: Union[str, Callable], trigger,
+                 timeout: float = 600, jitter: float = 0, inject: Optional[Dict[str, str]] = None,
+                 enabled: bool = True, shared_loop: bool = False):
+        self.name = name
+        self.target = target
+        self.trigger = CronTrigger(trigger) if isinstance(trigger, str) else trigger
+        self.timeout = timeout
+        self.jitter = jitter
+        self.inject = inject or {}
+        self.enabled = enabled
+        self.shared_loop = shared_loop
+        self.next_run: Optional[datetime] = None
+        self.running = False
+        self.history: List[Dict] = []
+        self._func: Optional[Callable] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def func(self) -> Callable:
+        if self._func is None:
+            if callable(self.target):
+                self._func = self.target
+            else:
+                module_name, func_name = self.target.split(':', 1)
+                self._func = getattr(importlib.import_module(module_name), func_name)
+        return self._func
+
+    def schedule_next(self, now: datetime):
+        self.next_run = self.trigger.next_after(now)
+        if self.jitter:
+            self.next_run += timedelta(seconds=random.uniform(0, self.jitter))
+
+    @property
+    def last_result(self) -> Dict:
+        """最近一次真正执行的结果 (因为上次没跑完而跳过的不算)"""
+        for entry in reversed(self.history):
+            if entry['status'] != 'skipped':
+                return entry
+        return {}
+
+    def record(self, started: float, status: str, error: str = ''):
+        self.history.append({
+            'started_at': started,
+            'duration': round(time.time() - started, 2),
+            'status': status,
+            'error': error[:300],
+        })
+        del self.history[:-HISTORY_LIMIT]
+
+
+class SchedulerDaemon:
+    """常驻调度器: 主线程计时，同步任务进线程池，协程任务进共享事件循环"""
+
+    def __init__(self, status_file: str = STATUS_FILE, max_workers: int = 8,
+                 shared: SharedResources = resources):
+        self.status_file = status_file
+        self.resources = shared
+        self.jobs: Dict[str, Job] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name='job-loop', daemon=True)
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self._load_history()
+
+    def add_job(self, job: Job) -> Job:
+        self.jobs[job.name] = job
+        job.history = self._saved.get(job.name, {}).get('history', [])  # 重启后保留历史
+        job.schedule_next(datetime.now())
+        return job
+
+    # ---------- 状态持久化 ----------
+
+    def _load_history(self):
+        try:
+            with open(self.status_file, 'r', encoding='utf-8') as f:
+                self._saved = json.load(f).get('jobs', {})
+        except (OSError, ValueError):
+            self._saved = {}
+
+    def save_status(self):
+        with self.lock:
+            jobs = {}
+            for job in self.jobs.values():
+                last = job.last_result
+                jobs[job.name] = {
+                    'schedule': str(job.trigger),
+                    'enabled': job.enabled,
+                    'running': job.running,
+                    'next_run': job.next_run.timestamp() if job.next_run else None,
+                    'last_run': last.get('started_at'),
+                    'last_status': last.get('status', 'pending'),
+                    'last_duration': last.get('duration'),
+                    'history': job.history,
+                }
+            tmp = f"{self.status_file}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'updated_at': time.time(), 'jobs': jobs},
+                          f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.status_file)
+
+    # ---------- 执行 ----------
+
+    def _on_shared_loop(self, job: Job) -> bool:
+        if not inspect.iscoroutinefunction(job.func):
+            return False
+        return job.shared_loop or any(self.resources.is_async(name) for name in job.inject.values())
+
+    def _call_sync(self, job: Job):
+        kwargs = {arg: self.resources.get(name) for arg, name in job.inject.items()}
+        if inspect.iscoroutinefunction(job.func):
+            # 没放进共享循环的协程任务: 在这个工作线程里开自己的事件循环
+            return asyncio.run(job.func(**kwargs))
+        return job.func(**kwargs)
+
+    async def _call_async(self, job: Job):
+        kwargs = {}
+        for arg, name in job.inject.items():
+            kwargs[arg] = await self.resources.aget(name) if self.resources.is_async(name) \
+                else self.resources.get(name)
+        return await asyncio.wait_for(job.func(**kwargs), timeout=job.timeout)
+
+    def run_job(self, job: Job):
+        """执行一次任务并记录结果 (在线程池中调用)"""
+        started = time.time()
+        print(f"▶️ [{datetime.now().strftime('%H:%M:%S')}] {job.name}")
+        try:
+            if self._on_shared_loop(job):
+                future = asyncio.run_coroutine_threadsafe(self._call_async(job), self.loop)
+                future.result()
+            else:
+                # 同步函数 (和自带事件循环的协程任务) 没法强制中断: 超时后记为 timeout，线程跑完前任务保持 running，不会重叠
+                worker = threading.Thread(target=self._call_sync_guarded, args=(job,),
+                                          name=f"job-{job.name}", daemon=True)
+                worker.start()
+                worker.join(job.timeout)
+                if worker.is_alive():
+                    job.record(started, 'timeout', f"超过 {job.timeout}s")
+                    print(f"⏱️ {job.name} 超时 ({job.timeout}s)，等待其结束")
+                    self.save_status()
+                    worker.join()
+                    return
+                if job._error:
+                    raise job._error
+            job.record(started, 'success')
+            print(f"✅ {job.name} 完成 ({time.time() - started:.1f}s)")
+        except (asyncio.TimeoutError, FutureTimeout):
+            job.record(started, 'timeout', f"超过 {job.timeout}s")
+            print(f"⏱️ {job.name} 超时 ({job.timeout}s)")
+        except BaseException as e:
+            job.record(started, 'error', f"{type(e).__name__}: {e}")
+            print(f"❌ {job.name} 失败: {e}")
+            traceback.print_exc()
+            self._discard_broken(job, e)
+        finally:
+            job.running = False
+            self.save_status()
+
+    def _discard_broken(self, job: Job, error: BaseException):
+        """注入的资源坏了就丢掉，下次运行重新创建，不然崩溃的浏览器会一直被复用到守护进程重启"""
+        if not job.inject or not is_broken_resource_error(error):
+            return
+        for name in set(job.inject.values()):
+            instance = self.resources.discard(name)
+            if instance is None:
+                continue
+            print(f"♻️ 资源 {name} 已损坏，下次运行重新创建")
+            if self.resources.is_async(name):
+                # 浏览器这类异步资源在事件循环里关掉 (顺带停掉 playwright 驱动进程)，不等结果
+                asyncio.run_coroutine_threadsafe(
+                    self.resources.aclose_instance(name, instance), self.loop)
+
+    def _call_sync_guarded(self, job: Job):
+        job._error = None
+        try:
+            self._call_sync(job)
+        except BaseException as e:
+            job._error = e
+
+    def dispatch(self, job: Job):
+        if job.running:
+            job.record(time.time(), 'skipped', '上次运行尚未结束')
+            print(f"⏭️ {job.name} 上次还在运行，跳过本次")
+            return
+        job.running = True
+        self.executor.submit(self.run_job, job)
+
+    # ---------- 主循环 ----------
+
+    def start(self):
+        sys.path[:0] = [p for p in (ROOT_DIR, SCRIPTS_DIR) if p not in sys.path]
+        if not self.loop_thread.is_alive():
+            self.loop_thread.start()
+
+    def run_forever(self, tick: float = 30):
+        self.start()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self.stop_event.set())
+        print(f"⏰ 调度守护进程启动 (PID {os.getpid()})，共 {len(self.jobs)} 个任务")
+        self.save_status()
+
+        while not self.stop_event.is_set():
+            now = datetime.now()
+            for job in self.jobs.values():
+                if job.enabled and job.next_run and job.next_run <= now:
+                    job.schedule_next(now)
+                    self.dispatch(job)
+            self.save_status()
+            upcoming = [j.next_run for j in self.jobs.values() if j.enabled and j.next_run]
+            wait = min(upcoming) - datetime.now() if upcoming else timedelta(seconds=tick)
+            self.stop_event.wait(max(0.1, min(wait.total_seconds(), tick)))
+
+        self.shutdown()
+
+    def run_now(self, name: str):
+        """立即同步执行一次 (调试用)"""
+        self.start()
+        job = self.jobs[name]
+        job.running = True
+        self.run_job(job)
+
+    def shutdown(self):
+        print("🛑 调度守护进程退出，等待运行中的任务...")
+        self.executor.shutdown(wait=True)
+        asyncio.run_coroutine_threadsafe(self.resources.aclose(), self.loop).result(timeout=30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.save_status()
+
+
+def load_job_status(status_file: str = STATUS_FILE) -> Dict[str, Dict]:
+    """读取守护进程写出的任务状态 (供 Dashboard 展示)"""
+    try:
+        with open(status_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('jobs', {})
+    except (OSError, ValueError):
+        return {}
+
+
+# ==================== 默认任务 ====================
+
+def default_jobs() -> List[Job]:
+    """
+    原来 cron 里跑的监控脚本
+    clanker/twitter/btc 按最快频率触发，实际是否抓取由 smart_scheduler 的自适应节奏决定
+    """
+    return [
+        Job('clanker_monitor', 'clanker_monitor:main', '*/5 * * * *', jitter=30, timeout=600),
+        Job('twitter_hourly_push', 'twitter_hourly_push:main', '*/15 * * * *', jitter=60,
+            timeout=900, inject={'browser': 'browser'}),
+        # fetch_all_data 虽然是 async def，里面全是阻塞的 subprocess.run，不能进共享循环
+        Job('data_aggregator', 'data_aggregator:fetch_all_data', '*/5 * * * *', timeout=280),
+        Job('binance_price_update', 'binance_price_update:update_dashboard', IntervalTrigger(60),
+            jitter=10, timeout=120),
+        Job('innoscience_price_monitor', 'innoscience_price_monitor:main', '15 9 * * 1-5',
+            timeout=120, inject={'session': 'http'}),
+        # 早报 08:30 / 晚报 18:30 发送前预抓数据，发送时从快照渲染
+        Job('morning_briefing_prepare', 'lobster_morning_briefing:prepare_snapshot', '20 8 * * *', timeout=300),
+        Job('evening_report_prepare', 'daily_report_summary:prepare_snapshot', '20 18 * * *', timeout=300),
+        # 推送告警队列: 到期的合并消息 / 低优先级摘要
+        Job('alert_queue_flush', 'alert_queue:flush', IntervalTrigger(30), timeout=120),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='常驻调度守护进程')
+    parser.add_argument('--list', action='store_true', help='列出任务')
+    parser.add_argument('--run', metavar='NAME', help='立即执行一次某个任务')
+    args = parser.parse_args()
+
+    daemon = SchedulerDaemon()
+    for job in default_jobs():
+        daemon.add_job(job)
+
+    if args.list:
+        for job in daemon.jobs.values():
+            print(f"  {job.name:28s} {str(job.trigger):16s} 下次: {job.next_run:%m-%d %H:%M}")
+        return
+    if args.run:
+        daemon.run_now(args.run)
+        daemon.shutdown()
+        return
+    daemon.run_forever()
+
+
+if __name__ == '__main__':
+    main()
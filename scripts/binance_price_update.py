@@ -3,11 +3,20 @@
 币安 API 获取实时价格并更新 Dashboard
 """
 
+import os
+import sys
 import urllib.request
 import json
 import re
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dashboard_renderer import DELTA_POLL_ASSETS, DashboardRenderer, with_delta_polling, write_if_changed
+from dashboard_deploy import deploy_files
+from smart_scheduler import AdaptiveCadence
+
+CADENCE = AdaptiveCadence()  # 价格波动大时抓得勤，横盘时退避
+
 def get_binance_price(symbol):
     """从币安获取实时价格"""
     try:
@@ -25,14 +34,19 @@ def get_binance_price(symbol):
         print(f"❌ 获取 {symbol} 失败: {e}")
         return None
 
-def update_dashboard():
-    """更新 Dashboard HTML"""
+def update_dashboard(force=False):
+    """更新 Dashboard HTML (价格波动大时抓得勤，横盘时退避)"""
+    if not force and not CADENCE.due('btc'):
+        print(f"💤 价格平稳，下次更新: {CADENCE.next_fetch('btc'):%H:%M}")
+        return
+    
     # 获取 BTC 价格
     btc = get_binance_price('BTCUSDT')
     
     if not btc:
         print("❌ 无法获取价格")
         return
+    CADENCE.record('btc', value=btc['price'])
     
     print(f"✅ BTC: ${btc['price']:,.2f} ({btc['change']:+.2f}%)")
     
@@ -79,32 +93,30 @@ def update_dashboard():
         content
     )
     
-    # 保存
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # 页面轮询增量局部刷新价格元素
+    content = with_delta_polling(content)
+    
+    # 保存 (只有"最后更新"时间变化时不写、不部署)
+    if not write_if_changed(html_path, content, ignore=[r'最后更新:[^<]+']):
+        print("⏭️ 价格无变化，跳过写入和部署")
+        return
     
     print(f"✅ Dashboard 已更新 ({now})")
     
-    # 部署到服务器
-    import subprocess
-    deploy_cmd = """
-    cd /root/.openclaw/workspace/lobster-workspace/dashboard && 
-    scp -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no index.html ubuntu@43.160.229.161:/home/ubuntu/ &&
-    ssh -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no ubuntu@43.160.229.161 'sudo cp /home/ubuntu/index.html /var/www/html/ && sudo chown www-data:www-data /var/www/html/index.html'
-    """
+    # 增量数据: 页面轮询后只替换价格元素
+    elements = {}
+    for element_id in ('btcValue', 'btcChange'):
+        match = re.search(rf'<div class="[^"]*" id="{element_id}">[^<]*</div>', content)
+        if match:
+            elements[element_id] = match.group(0)
+    DashboardRenderer(os.path.dirname(html_path)).publish({'btc': btc}, extra_cards=elements)
     
-    try:
-        result = subprocess.run(deploy_cmd, shell=True, capture_output=True, text=True, timeout=60)
-        if result.returncode == 0:
-            print("✅ 已部署到服务器")
-        else:
-            print(f"⚠️ 部署警告")
-    except Exception as e:
-        print(f"❌ 部署失败: {e}")
+    # 部署到服务器
+    deploy_files(['index.html'] + DELTA_POLL_ASSETS, local_dir=os.path.dirname(html_path))
 
 if __name__ == '__main__':
     print(f"{'='*50}")
     print("🪙 币安价格更新")
     print(f"{'='*50}")
-    update_dashboard()
+    update_dashboard(force='--force' in sys.argv)
     print(f"{'='*50}")
@@ -5,12 +5,16 @@
 """
 
 import os
+import sys
 import urllib.request
 import urllib.parse
 import json
 import pandas as pd
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import index_announcements
+
 class CNInfoScraperWithCookie:
     """巨潮资讯网公告抓取器 (Cookie版)"""
     
@@ -102,6 +106,7 @@ class CNInfoScraperWithCookie:
                     '链接': f"http://static.cninfo.com.cn/{ann.get('adjunctUrl', '')}"
                 })
             
+            index_announcements(data_list)
             return pd.DataFrame(data_list)
             
         except Exception as e:
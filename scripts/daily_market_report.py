@@ -4,29 +4,25 @@
 每天早上8:30发送
 """
 
-import subprocess
+import os
 import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, '/root/.openclaw/workspace/lobster-workspace/scripts')
 sys.path.insert(0, '/root/.openclaw/workspace/learning/fund_manager')
 
 from twitter_daily_review import parse_daily_log, analyze_tweets
 from fred_client import FREDClient
+from notifier import send_telegram
 from datetime import datetime, timedelta
 
 TELEGRAM_CHAT_ID = "5440939697"
 
 def send_message(message):
-    """发送消息到Telegram"""
-    escaped = message.replace('"', '\\"').replace("'", "\\'")
-    cmd = f'openclaw message send -t "{TELEGRAM_CHAT_ID}" -m "{escaped[:4000]}"'
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"[{datetime.now().strftime('%H:%M')}] 消息已发送")
-        else:
-            print(f"发送失败: {result.stderr}")
-    except Exception as e:
-        print(f"发送异常: {e}")
+    """发送消息到Telegram (进程内推送队列)"""
+    if send_telegram(message[:4000], TELEGRAM_CHAT_ID):
+        print(f"[{datetime.now().strftime('%H:%M')}] 消息已发送")
+    else:
+        print("发送失败")
 
 def get_fred_summary():
     """获取FRED宏观数据摘要"""
@@ -10,11 +10,17 @@ import re
 import json
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from market_calendar import cached_quote
 
 class StockPriceMonitor:
     """实时股价监控"""
     
-    def __init__(self):
+    def __init__(self, session=None):
+        # 调度守护进程会传入共享的 requests.Session (连接池复用)
+        self.http = session or requests
         # 监控列表
         self.stocks = {
             # 英诺赛科
@@ -33,12 +39,19 @@ class StockPriceMonitor:
         self.report_file = "/root/.openclaw/workspace/reports/innoscience_daily_price.json"
         
     def fetch_prices(self):
-        """获取实时股价"""
+        """获取实时股价 (港股和A股都休市时直接用收盘缓存，不请求接口)"""
+        prices = cached_quote(['hk', 'cn'], 'innoscience_price_monitor', self._fetch_live_prices)
+        if prices and prices.pop('cached', False):
+            # 整个 {代码: 行情} 映射是一条缓存，cached 标记加在了映射上，挪到每只股票上
+            prices = {code: dict(stock, cached=True) for code, stock in prices.items()}
+        return prices
+    
+    def _fetch_live_prices(self):
         code_str = ','.join(self.stocks.keys())
         
         try:
             url = f'http://qt.gtimg.cn/q={code_str}'
-            resp = requests.get(url, timeout=10)
+            resp = self.http.get(url, timeout=10)
             resp.encoding = 'gb2312'
             
             results = {}
@@ -163,8 +176,8 @@ class StockPriceMonitor:
         
         return alerts
 
-if __name__ == '__main__':
-    monitor = StockPriceMonitor()
+def main(session=None):
+    monitor = StockPriceMonitor(session)
     report = monitor.generate_report()
     
     if report:
@@ -179,3 +192,6 @@ if __name__ == '__main__':
                 print(f"  {alert}")
     else:
         print("❌ 获取数据失败")
+
+if __name__ == '__main__':
+    main()
@@ -5,14 +5,18 @@ Twitter 自动监控 + 翻译 + 部署
 """
 
 import os
+import sys
 import json
 import asyncio
-import subprocess
 import urllib.request
 import urllib.parse
 import re
 from datetime import datetime, timezone, timedelta
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dashboard_renderer import DELTA_POLL_ASSETS, DashboardRenderer, with_delta_polling, write_if_changed
+from dashboard_deploy import deploy_files
+
 def translate_text(text):
     """翻译文本 - 使用本地 Ollama"""
     if not text:
@@ -60,6 +64,7 @@ MONITOR_ACCOUNTS = {
 
 SAVE_DIR = '/tmp/twitter_monitor'
 DASHBOARD_DATA = '/root/.openclaw/workspace/lobster-workspace/dashboard/data/twitter_translated.json'
+DASHBOARD_HTML = '/root/.openclaw/workspace/lobster-workspace/dashboard/index.html'
 
 def get_time_ago(time_str):
     """计算相对时间"""
@@ -141,17 +146,25 @@ def save_and_deploy(tweets_data):
         'tweets': tweets_data
     }
     
-    # 保存 JSON
-    os.makedirs(os.path.dirname(DASHBOARD_DATA), exist_ok=True)
-    with open(DASHBOARD_DATA, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    print(f"✅ JSON 已保存")
+    # 保存 JSON (除更新时间外没变化就不写)
+    json_changed = write_if_changed(DASHBOARD_DATA, json.dumps(output, ensure_ascii=False, indent=2),
+                                    ignore=[r'"update_time": "[^"]*"'])
+    print(f"✅ JSON 已保存" if json_changed else "⏭️ JSON 无变化")
     
     # 生成 HTML 嵌入内容
     html_content = generate_twitter_html(tweets_data, now)
     
     # 更新 Dashboard HTML
-    update_dashboard_html(html_content, now)
+    html_changed = update_dashboard_html(html_content, now)
+    
+    if not (json_changed or html_changed):
+        print("⏭️ 推文无变化，跳过部署")
+        return
+    
+    # 增量数据，页面轮询后只替换 Twitter 卡片
+    DashboardRenderer(os.path.dirname(DASHBOARD_HTML)).publish(
+        {'tweets': tweets_data},
+        extra_cards={'twitterContainer': f'<div class="card-body" id="twitterContainer">{html_content}\n            </div>'})
     
     # 部署到服务器
     print("🚀 部署到服务器...")
@@ -204,7 +217,7 @@ def generate_twitter_html(tweets_data, now):
 
 def update_dashboard_html(twitter_html, now):
     """更新 Dashboard HTML 文件"""
-    html_path = '/root/.openclaw/workspace/lobster-workspace/dashboard/index.html'
+    html_path = DASHBOARD_HTML
     
     with open(html_path, 'r', encoding='utf-8') as f:
         content = f.read()
@@ -222,29 +235,20 @@ def update_dashboard_html(twitter_html, now):
     pattern = r'(<div class="card-body" id="twitterContainer">)[\s\S]*?(</div>\s*</div>\s*<!-- 第三栏)'
     replacement = f'\\g<1>{twitter_html}\\n            </div>\\n            <!-- 第三栏'
     content = re.sub(pattern, replacement, content, count=1)
+    content = with_delta_polling(content)  # 页面轮询增量局部刷新
     
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # 只有时间标签变化时不写
+    if not write_if_changed(html_path, content, ignore=[r'更新于: [^<]+']):
+        print(f"⏭️ HTML 无变化")
+        return False
     
     print(f"✅ HTML 已更新 ({time_str})")
+    return True
 
 def deploy_dashboard():
     """部署 Dashboard"""
-    deploy_cmd = """
-    cd /root/.openclaw/workspace/lobster-workspace/dashboard && 
-    scp -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no index.html ubuntu@43.160.229.161:/home/ubuntu/ 2>/dev/null &&
-    scp -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no data/twitter_translated.json ubuntu@43.160.229.161:/home/ubuntu/ 2>/dev/null &&
-    ssh -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no ubuntu@43.160.229.161 'sudo cp /home/ubuntu/index.html /var/www/html/ && sudo cp /home/ubuntu/twitter_translated.json /var/www/html/data/ && sudo chown www-data:www-data /var/www/html/index.html /var/www/html/data/twitter_translated.json' 2>/dev/null
-    """
-    
-    try:
-        result = subprocess.run(deploy_cmd, shell=True, capture_output=True, text=True, timeout=60)
-        if result.returncode == 0:
-            print("✅ 部署成功!")
-        else:
-            print(f"⚠️ 部署警告")
-    except Exception as e:
-        print(f"❌ 部署失败: {e}")
+    deploy_files(['index.html', 'data/twitter_translated.json'] + DELTA_POLL_ASSETS,
+                 local_dir=os.path.dirname(DASHBOARD_HTML))
 
 async def main():
     print(f"\n{'='*60}")
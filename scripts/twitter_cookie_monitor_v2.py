@@ -5,12 +5,16 @@ Twitter Cookie 监控 - Playwright 完整版
 """
 
 import os
+import sys
 import json
 import asyncio
 from playwright.async_api import async_playwright
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tweet_store import TweetStore
+
 # Cookie 配置
 AUTH_TOKEN = os.getenv('TWITTER_AUTH_TOKEN', '5da5c73c3286e0c825c5a337eb60ffaf93f2620c')
 CT0 = os.getenv('TWITTER_CT0', 'bb867bfa8ae5a410dec9e6537f8aa4f183c43b65c641f9b293a171e8eb8b1b9df359891c89b0e181f4c21bb6e292f422075b77ac3f51a0915fc5e82e2c69c9c5100c14355137082faa36804f10f18ebd')
@@ -133,6 +137,14 @@ async def main():
         all_tweets[username] = tweets
         await asyncio.sleep(2)  # 避免请求过快
     
+    # 写入推文存储（唯一数据源）
+    store = TweetStore()
+    new_tweets = store.add_tweets(
+        [dict(t, username=username, name=MONITOR_ACCOUNTS[username])
+         for username, tweets in all_tweets.items() for t in tweets],
+        source='twitter_cookie_monitor')
+    print(f"\n🗄️ 新增 {len(new_tweets)} 条推文到推文库")
+    
     # 保存汇总
     summary_file = f'{SAVE_DIR}/summary_{datetime.now().strftime("%Y%m%d_%H%M")}.json'
     with open(summary_file, 'w', encoding='utf-8') as f:
@@ -5,56 +5,29 @@ Twitter 每日复盘
 """
 
 import os
-import re
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tweet_store import TweetStore
+
 LOG_DIR = '/root/.openclaw/workspace/memory/twitter_logs'
 
 def parse_daily_log(date_str):
-    """解析某一天的Markdown日志"""
-    log_file = f"{LOG_DIR}/{date_str}.md"
-    
-    if not os.path.exists(log_file):
+    """读取某一天的推文（来自推文存储，不再解析Markdown日志）"""
+    rows = TweetStore().query(day=date_str)
+    if not rows:
         return None
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 解析推文
-    tweets = []
-    tweet_blocks = re.split(r'### ', content)[1:]  # 跳过第一个空块
-    
-    for block in tweet_blocks:
-        lines = block.strip().split('\n')
-        if not lines:
-            continue
-        
-        # 第一行是作者名
-        author_line = lines[0].strip()
-        match = re.match(r'(.+?) \(@(.+?)\)', author_line)
-        if match:
-            name = match.group(1)
-            author = match.group(2)
-        else:
-            name = author_line
-            author = 'unknown'
-        
-        # 提取其他信息
-        tweet = {'name': name, 'author': author}
-        for line in lines[1:]:
-            if line.startswith('- 时间:'):
-                tweet['time_info'] = line.replace('- 时间:', '').strip()
-            elif line.startswith('- 原文:'):
-                tweet['text'] = line.replace('- 原文:', '').strip()
-            elif line.startswith('- 翻译:'):
-                tweet['translate'] = line.replace('- 翻译:', '').strip()
-            elif line.startswith('- 链接:'):
-                tweet['url'] = line.replace('- 链接:', '').strip()
-        
-        tweets.append(tweet)
-    
-    return tweets
+    return [{
+        'name': t['name'],
+        'author': t['author'],
+        'time_info': t['time_ago'] or t['posted_at'],
+        'text': t['text'],
+        'translate': t['translate'],
+        'url': t['url'],
+    } for t in rows]
 
 def analyze_tweets(tweets):
     """分析推文内容，提取关键信息"""
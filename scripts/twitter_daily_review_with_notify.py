@@ -4,32 +4,24 @@ Twitter 每日复盘 - 带推送功能
 生成复盘报告并通过Telegram发送
 """
 
-import subprocess
+import os
 import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, '/root/.openclaw/workspace/lobster-workspace/scripts')
 
 from twitter_daily_review import parse_daily_log, analyze_tweets, generate_report
+from notifier import send_telegram
 from datetime import datetime, timedelta
-import os
 
 # Telegram 配置
 TELEGRAM_CHAT_ID = "5440939697"
 
 def send_telegram_message(message):
-    """通过openclaw命令行发送消息 - 使用 -t 和 -m 参数"""
-    # 转义消息中的特殊字符
-    escaped_message = message.replace('"', '\\"').replace("'", "\\'")
-    
-    # 使用正确的参数: -t (target) 和 -m (message)
-    cmd = f'openclaw message send -t "{TELEGRAM_CHAT_ID}" -m "{escaped_message[:4000]}"'
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"[{datetime.now().strftime('%H:%M')}] 消息已发送到 Telegram")
-        else:
-            print(f"[{datetime.now().strftime('%H:%M')}] 发送失败: {result.stderr}")
-    except Exception as e:
-        print(f"[{datetime.now().strftime('%H:%M')}] 发送异常: {e}")
+    """发送消息到 Telegram (进程内推送队列)"""
+    if send_telegram(message[:4000], TELEGRAM_CHAT_ID):
+        print(f"[{datetime.now().strftime('%H:%M')}] 消息已发送到 Telegram")
+    else:
+        print(f"[{datetime.now().strftime('%H:%M')}] 发送失败")
 
 def main():
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
@@ -5,22 +5,20 @@ Twitter 每日总结
 """
 
 import os
+import sys
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tweet_store import TweetStore
+
 SAVE_DIR = '/tmp/twitter_monitor'
 
 def get_yesterday_tweets():
-    """获取昨天的所有推文"""
-    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
-    daily_file = f"{SAVE_DIR}/daily_{yesterday}.json"
-    
-    if not os.path.exists(daily_file):
-        return []
-    
-    with open(daily_file, 'r') as f:
-        return json.load(f)
+    """获取昨天的所有推文（来自推文存储）"""
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    return TweetStore().query(day=yesterday)
 
 def summarize_tweets(tweets):
     """总结推文内容"""
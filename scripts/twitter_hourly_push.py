@@ -8,10 +8,14 @@ import os
 import sys
 import json
 import asyncio
-import subprocess
 from datetime import datetime, timezone, timedelta
 from playwright.async_api import async_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tweet_store import TweetStore
+from smart_scheduler import AdaptiveCadence
+from alert_queue import enqueue_alert
+
 # 配置
 MONITOR_ACCOUNTS = {
     'elonmusk': 'Elon Musk',
@@ -30,6 +34,9 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(PUSHED_DIR, exist_ok=True)
 
+TWEET_STORE = TweetStore()  # 推文唯一数据源
+CADENCE = AdaptiveCadence()  # 新推文/关键词多时抓得勤，安静时退避
+
 AUTH_TOKEN = os.getenv('TWITTER_AUTH_TOKEN', '5da5c73c3286e0c825c5a337eb60ffaf93f2620c')
 CT0 = os.getenv('TWITTER_CT0', 'bb867bfa8ae5a410dec9e6537f8aa4f183c43b65c641f9b293a171e8eb8b1b9df359891c89b0e181f4c21bb6e292f422075b77ac3f51a0915fc5e82e2c69c9c5100c14355137082faa36804f10f18ebd')
 
@@ -205,52 +212,14 @@ def filter_already_pushed(tweets):
     return new_tweets
 
 def save_to_daily_log(tweets):
-    """保存到每日Markdown日志 - 美化版"""
+    """写入推文存储，并重新渲染每日Markdown日志（Markdown只是视图）"""
     today = datetime.now().strftime('%Y-%m-%d')
     log_file = f"{LOG_DIR}/{today}.md"
     
-    now = datetime.now().strftime('%H:%M')
-    
-    # 如果文件不存在，创建表头
-    if not os.path.exists(log_file):
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write(f"# 🐦 Twitter 抓取记录 - {today}\n\n")
-            f.write("📊 监控账号: Elon Musk · jdhasoptions · xiaomucrypto · AI Stock Savvy · BlueJay · QQ_Timmy\n\n")
-            f.write("---\n\n")
-    
-    # 按账号分组
-    tweets_by_author = {}
-    for t in tweets:
-        author = t.get('author', 'unknown')
-        if author not in tweets_by_author:
-            tweets_by_author[author] = []
-        tweets_by_author[author].append(t)
-    
-    # 追加本次抓取记录
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(f"\n## 📅 {now} 更新 · {len(tweets)} 条新推文\n\n")
-        
-        for author, author_tweets in tweets_by_author.items():
-            name = author_tweets[0].get('name', author)
-            f.write(f"### 👤 {name} `@{author}`\n\n")
-            
-            for i, t in enumerate(author_tweets, 1):
-                time_display = t.get('time_ago', t.get('time', '未知'))
-                text = t.get('text', '')
-                translate = t.get('translate', '')
-                url = t.get('url', f'https://x.com/{author}')
-                
-                f.write(f"**{i}.** [{time_display}]({url})\n")
-                f.write(f"> 📝 {text}\n")
-                if translate and translate != text:
-                    f.write(f"> 🈯 {translate}\n")
-                f.write("\n")
-            
-            f.write("\n")
-        
-        f.write("---\n")
+    new_tweets = TWEET_STORE.add_tweets(tweets, source='twitter_hourly_push')
+    TWEET_STORE.write_markdown(today, log_file, accounts=' · '.join(MONITOR_ACCOUNTS.values()))
     
-    print(f"✅ 已记录到 {log_file}")
+    print(f"✅ 已记录 {len(new_tweets)} 条新推文到推文库，日志: {log_file}")
 
 def save_to_json(tweets):
     """保存到JSON供复盘使用"""
@@ -384,7 +353,7 @@ async def fetch_user_tweets(username, name):
                         'author': username,
                         'name': name,
                         'text': text,
-                        'translate': translate_text(text),
+                        'translate': await asyncio.to_thread(translate_text, text),  # 阻塞的HTTP请求放到线程里，不卡事件循环
                         'time': time_str,
                         'time_ago': get_time_ago(time_str),
                         'tweet_id': tweet_id,
@@ -448,7 +417,7 @@ async def fetch_user_tweets_optimized(page, username, name):
                     'author': username,
                     'name': name,
                     'text': text,
-                    'translate': translate_text(text),
+                    'translate': await asyncio.to_thread(translate_text, text),  # 阻塞的HTTP请求放到线程里，不卡事件循环
                     'time': time_str,
                     'time_ago': get_time_ago(time_str),
                     'tweet_id': tweet_id,
@@ -464,10 +433,14 @@ async def fetch_user_tweets_optimized(page, username, name):
         print(f"  [错误] 抓取 @{username} 失败: {e}")
         return []
 
-async def fetch_all():
-    """抓取所有账号 - 使用单一浏览器实例优化"""
-    all_new_tweets = []
-    
+async def fetch_all(browser=None):
+    """
+    抓取所有账号 - 使用单一浏览器实例优化
+    browser: 调度守护进程传入的常驻浏览器，复用它只新建 context；不传则自己启动一个
+    """
+    if browser is not None:
+        return await _fetch_all_with_browser(browser)
+
     # 设置环境变量
     os.environ['PLAYWRIGHT_BROWSERS_PATH'] = '0'
     
@@ -481,13 +454,22 @@ async def fetch_all():
             print(f"[错误] 启动浏览器失败: {e}")
             return []
         
-        context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
-        
-        await context.add_cookies([
-            {'name': 'auth_token', 'value': AUTH_TOKEN, 'domain': '.x.com', 'path': '/'},
-            {'name': 'ct0', 'value': CT0, 'domain': '.x.com', 'path': '/'}
-        ])
-        
+        all_new_tweets = await _fetch_all_with_browser(browser)
+        await browser.close()
+    
+    return all_new_tweets
+
+async def _fetch_all_with_browser(browser):
+    """在已有浏览器里开一个带 cookie 的 context，依次抓取所有账号"""
+    all_new_tweets = []
+    context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
+    
+    await context.add_cookies([
+        {'name': 'auth_token', 'value': AUTH_TOKEN, 'domain': '.x.com', 'path': '/'},
+        {'name': 'ct0', 'value': CT0, 'domain': '.x.com', 'path': '/'}
+    ])
+    
+    try:
         page = await context.new_page()
         
         # 依次抓取所有账号
@@ -497,8 +479,8 @@ async def fetch_all():
             all_new_tweets.extend(tweets)
             if tweets:
                 print(f"    ✓ 获取 {len(tweets)} 条推文")
-        
-        await browser.close()
+    finally:
+        await context.close()
     
     return all_new_tweets
 
@@ -654,40 +636,50 @@ def format_push_message(tweets):
     
     return message
 
-def send_to_telegram(message):
-    """发送到Telegram"""
+def alert_priority(tweets):
+    """命中 twitter_keywords.json 里 high 关键词的推文插队发送，其余等合并窗口"""
     try:
-        # 设置环境变量
-        env = os.environ.copy()
-        env['PATH'] = '/root/.nvm/versions/node/v22.22.0/bin:' + env.get('PATH', '')
-        
-        cmd = ['/root/.nvm/versions/node/v22.22.0/bin/openclaw', 'message', 'send', '--channel', 'telegram', '--target', '5440939697', '--message', message]
-        result = subprocess.run(cmd, capture_output=True, timeout=30, env=env)
-        if result.returncode == 0:
-            print(f"  ✅ Telegram 推送成功")
-        else:
-            err = result.stderr.decode()[:100] if result.stderr else '未知错误'
-            print(f"  ⚠️ Telegram 推送失败: {err}")
-        return result.returncode == 0
-    except Exception as e:
-        print(f"  ❌ Telegram 推送异常: {e}")
-        return False
+        from twitter_keyword_detector import detect_keywords
+    except (OSError, ValueError):  # 关键词配置不在
+        return 'normal'
+    hits = [m for t in tweets for m in detect_keywords(t.get('text', ''))]
+    return 'high' if any(m['priority'] == 'high' for m in hits) else 'normal'
+
+async def send_to_telegram(message, tweets):
+    """放进推送告警队列 (和其他监控的提醒一起合并/限速；守护进程里不阻塞共享事件循环)"""
+    priority = alert_priority(tweets)
+    alert_id = await asyncio.to_thread(enqueue_alert, message, source='twitter', priority=priority)
+    print(f"  ✅ 已加入推送队列 ({priority})" if alert_id else f"  🔁 相同内容已推送过")
+    return alert_id is not None
 
-async def main():
+async def main(browser=None, force=False):
+    try:
+        await run_once(browser, force)
+    finally:
+        CADENCE.flush()  # 每轮结束写一次盘 (一轮里的多次 record 合并)
+
+async def run_once(browser=None, force=False):
+    if not force and not CADENCE.due('twitter'):
+        print(f"💤 Twitter 近期安静，下次抓取: {CADENCE.next_fetch('twitter'):%H:%M}")
+        return
+    
     print(f"[{datetime.now().strftime('%H:%M')}] 开始抓取Twitter...")
     
-    tweets = await fetch_all()
+    tweets = await fetch_all(browser)
     
     if tweets:
         # 0. 过滤空推文
         valid_tweets = [t for t in tweets if t.get('text')]
         
         if not valid_tweets:
+            CADENCE.record('twitter')
             print(f"发现 {len(tweets)} 条推文，但全部为空，跳过")
             return
         
         # 1. 去重 - 过滤已推送的推文（关键修复！）
         new_tweets = filter_already_pushed(valid_tweets)
+        CADENCE.record('twitter', new_items=len(new_tweets),
+                       keyword_hits=len(filter_important_tweets(new_tweets)))
         
         if not new_tweets:
             print(f"发现 {len(valid_tweets)} 条推文，但全部已推送过，跳过")
@@ -705,14 +697,15 @@ async def main():
         message = format_push_message(new_tweets)
         if message:
             print(f"推送 {len(new_tweets)} 条新推文...")
-            send_to_telegram(message)
+            await send_to_telegram(message, new_tweets)
             # 5. 记录已推送的推文
             record_pushed_tweets(new_tweets)
     else:
+        CADENCE.record('twitter')
         print("没有新推文")
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    asyncio.run(main(force='--force' in sys.argv))
 
 # Playwright EPIPE错误修复 - 设置Node.js内存限制
 import os
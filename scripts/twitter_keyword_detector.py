@@ -4,9 +4,13 @@ Twitter 关键词检测与标记
 自动检测推文中是否包含关注的关键词
 """
 import json
+import os
 import re
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # 加载关键词配置
 with open('/root/.openclaw/workspace/config/twitter_keywords.json', 'r') as f:
     config = json.load(f)
@@ -37,6 +41,17 @@ def detect_keywords(text):
     
     return matches
 
+def push_keyword_alert(tweet, matches):
+    """高优先级关键词命中 → 入队 (不立即发送，由 process_tweets 最后统一 flush 合并成一条)"""
+    from alert_queue import enqueue_alert
+    words = ', '.join(m['word'] for m in matches if m['priority'] == 'high')
+    author = tweet.get('author') or tweet.get('username', '')
+    text = f"🚨 关键词命中: {words}\n👤 {author}\n💬 {tweet.get('text', '')[:500]}"
+    if tweet.get('url'):
+        text += f"\n🔗 {tweet['url']}"
+    key = tweet.get('url') or f"{author}:{tweet.get('text', '')[:80]}"
+    enqueue_alert(text, source='twitter_keywords', priority='high', key=f"keyword:{key}", flush=False)
+
 def process_tweets():
     """处理推文并标记关键词"""
     # 读取最新推文
@@ -44,6 +59,7 @@ def process_tweets():
         tweets = json.load(f)
     
     high_priority_count = 0
+    queued = 0
     
     for tweet in tweets:
         text = tweet.get('text', '')
@@ -55,11 +71,20 @@ def process_tweets():
             
             # 检查是否有高优先级关键词
             if any(m['priority'] == 'high' for m in matches):
-                tweet['alert'] = True
                 high_priority_count += 1
+                # 上次运行已经推过的 (文件里留着 alert 标记) 不再入队，去重窗口过期后也不会重发
+                if not tweet.get('alert'):
+                    tweet['alert'] = True
+                    push_keyword_alert(tweet, matches)
+                    queued += 1
         else:
             tweet['has_keywords'] = False
     
+    # 这一轮的命中一次发出 (多条高优先级提醒合并成一条消息)
+    if queued:
+        from alert_queue import flush
+        flush()
+    
     # 保存处理后的推文
     with open('/root/.openclaw/workspace/reports/twitter_undetected_latest.json', 'w', encoding='utf-8') as f:
         json.dump(tweets, f, ensure_ascii=False, indent=2)
@@ -8,10 +8,12 @@ import os
 import sys
 import json
 import asyncio
-import subprocess
 from datetime import datetime
 from playwright.async_api import async_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from notifier import send_telegram
+
 # 设置环境
 os.environ['PATH'] = '/root/.nvm/versions/node/v22.22.0/bin:' + os.environ.get('PATH', '')
 
@@ -76,20 +78,8 @@ async def fetch_all():
     return all_tweets
 
 def send_to_telegram_sync(message):
-    """同步发送"""
-    try:
-        cmd = [
-            '/root/.nvm/versions/node/v22.22.0/bin/openclaw',
-            'message', 'send',
-            '--channel', 'telegram',
-            '--target', TELEGRAM_CHAT_ID,
-            '--message', message
-        ]
-        result = subprocess.run(cmd, capture_output=True, timeout=30)
-        return result.returncode == 0
-    except Exception as e:
-        print(f"  推送失败: {e}")
-        return False
+    """同步发送 (进程内推送队列)"""
+    return send_telegram(message, TELEGRAM_CHAT_ID)
 
 async def main():
     print(f"[{datetime.now().strftime('%H:%M')}] 开始...")
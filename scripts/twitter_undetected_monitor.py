@@ -5,10 +5,15 @@ Twitter 监控脚本 - 使用 patchright 绕过反爬虫检测
 """
 import asyncio
 import json
+import os
 import re
+import sys
 from patchright.async_api import async_playwright
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tweet_store import TweetStore
+
 class TwitterMonitor:
     def __init__(self):
         self.browser = None
@@ -156,7 +161,13 @@ async def main():
         with open(result_file, 'w', encoding='utf-8') as f:
             json.dump(all_tweets, f, ensure_ascii=False, indent=2)
         
+        # 写入推文存储（author 是显示名，username 是账号）
+        new_tweets = TweetStore().add_tweets(
+            [dict(t, name=t['author']) for t in all_tweets],
+            source='twitter_undetected_monitor')
+        
         print("\n" + "="*50)
+        print(f"🗄️ 新增 {len(new_tweets)} 条推文到推文库")
         print(f"📊 共获取 {len(all_tweets)} 条推文")
         for i, tweet in enumerate(all_tweets[:5]):
             print(f"\n{i+1}. @{tweet['username']}")
@@ -4,10 +4,14 @@
 """
 
 import urllib.request
+import os
 import re
-import subprocess
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dashboard_deploy import deploy_files
+
 def get_tencent_us(symbol):
     try:
         url = f"https://qt.gtimg.cn/q=us.{symbol}"
@@ -75,11 +79,6 @@ content = regex.sub(r'(<div class="last-update" id="lastUpdate">)最后更新:[^
 with open('/root/.openclaw/workspace/lobster-workspace/dashboard/index.html', 'w') as f:
     f.write(content)
 
-# 部署
-deploy_cmd = """
-cd /root/.openclaw/workspace/lobster-workspace/dashboard && 
-scp -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no index.html ubuntu@43.160.229.161:/home/ubuntu/ &&
-ssh -i /root/.ssh/lobster_deploy -o StrictHostKeyChecking=no ubuntu@43.160.229.161 'sudo cp /home/ubuntu/index.html /var/www/html/ && sudo chown www-data:www-data /var/www/html/index.html'
-"""
-subprocess.run(deploy_cmd, shell=True, capture_output=True)
-print(f"✅ 已部署 ({now})")
+# 部署 (内容没变时自动跳过)
+if deploy_files(['index.html']):
+    print(f"✅ 已部署 ({now})")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+全文检索 - 推文 / 财经新闻 / 巨潮公告
+SQLite FTS5 + 中日韩文字逐字切分，不依赖分词库：
+- 中文按单字入索引，查询词转成短语匹配 ("英诺赛科" → "英 诺 赛 科")
+- 英文按词入索引 (不区分大小写)
+- bm25 排序，标题权重更高，可按来源、时间过滤
+
+用法:
+    python3 search_index.py "GaN/英诺赛科" --days 7
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB = '/root/.openclaw/workspace/memory/search_index.db'
+
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'  # 假名、汉字、谚文
+CJK_RE = re.compile(f'([{CJK_CHARS}])')
+CJK_PUNCT = '\u3000-\u303f\uff00-\uffef'  # 全角标点 (摘要高亮用的【】也在其中)
+CJK_GAP_RE = re.compile(f'(?<=[{CJK_CHARS}{CJK_PUNCT}]) (?=[{CJK_CHARS}{CJK_PUNCT}])')
+
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+
+def cjk_tokenize(text: str) -> str:
+    """中日韩字符前后补空格，让 unicode61 分词器把每个字当成一个词"""
+    return re.sub(r'\s+', ' ', CJK_RE.sub(r' \1 ', text or '')).strip()
+
+
+def cjk_untokenize(text: str) -> str:
+    """去掉 cjk_tokenize 加进去的空格 (用于摘要展示)"""
+    return CJK_GAP_RE.sub('', text)
+
+
+def build_match(query: str) -> str:
+    """
+    把查询串转成 FTS5 MATCH 表达式
+    空格分隔的词之间是 AND；同一个词里用 / 或 | 分隔的是 OR
+    "GaN/英诺赛科 财报" → ("gan" OR "英 诺 赛 科") AND ("财 报")
+    """
+    groups = []
+    for term in query.split():
+        alternatives = []
+        for alt in re.split(r'[/|]', term):
+            phrase = cjk_tokenize(alt.replace('"', ' '))
+            if phrase:
+                alternatives.append(f'"{phrase}"')
+        if alternatives:
+            groups.append('(' + ' OR '.join(alternatives) + ')')
+    return ' AND '.join(groups)
+
+
+def parse_time(value) -> Optional[float]:
+    """统一成时间戳: 支持时间戳(秒/毫秒)、ISO字符串、'YYYY-MM-DD HH:MM'"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    text = str(value).strip()
+    if text.isdigit():
+        return parse_time(int(text))
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class SearchIndex:
+    """全文检索索引"""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        """初始化数据库"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # 原文
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_key TEXT UNIQUE NOT NULL,
+                source TEXT NOT NULL,  -- tweet / news / cninfo
+                origin TEXT,  -- 作者、新闻来源、公司简称
+                title TEXT,
+                body TEXT,
+                url TEXT,
+                published_at REAL,
+                indexed_at REAL,
+                meta TEXT
+            )
+        ''')
+
+        # 倒排索引 (rowid = documents.id，存切分后的文本)
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, body, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        ''')
+
+        # 增量同步进度 (例如推文库已同步到的最大id)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name TEXT PRIMARY KEY,
+                value INTEGER
+            )
+        ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_time ON documents(source, published_at)')
+
+        conn.commit()
+        conn.close()
+
+    # ========== 写入 ==========
+
+    def add_documents(self, source: str, docs: Iterable[Dict]) -> int:
+        """
+        写入文档，doc_key 已存在的跳过
+        doc: {key, title, body, origin, url, published_at, meta}
+        返回新增数量
+        """
+        now = time.time()
+        added = 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            for doc in docs:
+                title, body = doc.get('title') or '', doc.get('body') or ''
+                if not (title or body):
+                    continue
+                cursor.execute('''
+                    INSERT OR IGNORE INTO documents (doc_key, source, origin, title, body, url,
+                                                     published_at, indexed_at, meta)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (f"{source}:{doc['key']}", source, doc.get('origin', ''), title, body,
+                      doc.get('url', ''), doc.get('published_at') or now, now,
+                      json.dumps(doc.get('meta') or {}, ensure_ascii=False)))
+                if cursor.rowcount == 0:
+                    continue
+                cursor.execute('INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)',
+                               (cursor.lastrowid, cjk_tokenize(title), cjk_tokenize(body)))
+                added += 1
+            conn.commit()
+        finally:
+            conn.close()
+        return added
+
+    def add_news(self, items: Iterable[Dict], published_at: Optional[float] = None) -> int:
+        """财经新闻 (finance_news_* / 智通财经): {title 或 text, source, url, time}"""
+        docs = []
+        for item in items:
+            title = item.get('title') or item.get('text') or ''
+            url = item.get('url', '')
+            docs.append({
+                'key': title[:40],  # 与聚合器一致，按标题去重
+                'title': title,
+                'body': item.get('summary', ''),
+                'origin': item.get('source', ''),
+                'url': url,
+                'published_at': published_at or parse_time(item.get('time')),
+                'meta': {k: item[k] for k in ('tag', 'time') if item.get(k)},
+            })
+        return self.add_documents('news', docs)
+
+    def add_announcements(self, records: Iterable[Dict]) -> int:
+        """巨潮公告 (CNInfoScraperWithCookie 的 DataFrame 行)"""
+        docs = [{
+            'key': r.get('公告ID') or r.get('链接'),
+            'title': r.get('公告标题', ''),
+            'origin': f"{r.get('简称', '')}({r.get('代码', '')})",
+            'url': r.get('链接', ''),
+            'published_at': parse_time(r.get('公告时间')),
+            'meta': {'code': r.get('代码', ''), 'category': r.get('公告类型', '')},
+        } for r in records if r.get('公告ID') or r.get('链接')]
+        return self.add_documents('cninfo', docs)
+
+    def sync_tweets(self, store=None) -> int:
+        """从推文库增量同步 (只读取上次同步之后的新推文)"""
+        if store is None:
+            from tweet_store import DEFAULT_DB as TWEET_DB, TweetStore
+            if not os.path.exists(TWEET_DB):
+                return 0
+            store = TweetStore(TWEET_DB)
+
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM sync_state WHERE name = 'tweets'").fetchone()
+        finally:
+            conn.close()
+        last_id = row['value'] if row else 0
+
+        # query 按 fetched_at 排序，最后一行不一定是最大 id，游标取 max
+        rows = store.query(after_id=last_id)
+        if not rows:
+            return 0
+
+        added = self.add_documents('tweet', ({
+            'key': t['tweet_key'],
+            'title': t['text'],
+            'body': t['translate'],
+            'origin': t['author'],
+            'url': t['url'],
+            'published_at': t['fetched_at'],
+        } for t in rows))
+
+        conn = self._connect()
+        try:
+            conn.execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)',
+                         ('tweets', max(t['id'] for t in rows)))
+            conn.commit()
+        finally:
+            conn.close()
+        return added
+
+    # ========== 查询 ==========
+
+    def search(self, query: str, sources: Optional[List[str]] = None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               days: Optional[float] = None, limit: int = 20,
+               sync: bool = True) -> List[Dict]:
+        """
+        全文检索，按相关度排序 (bm25，分数越小越相关)
+        sources: ['tweet', 'news', 'cninfo']，默认全部
+        days: 最近N天，等价于 since = now - days*86400
+        """
+        match = build_match(query)
+        if not match:
+            return []
+        if sync and (not sources or 'tweet' in sources):
+            self.sync_tweets()
+        if days is not None:
+            since = time.time() - days * 86400
+
+        sql = f'''
+            SELECT d.*, bm25(documents_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score,
+                   snippet(documents_fts, -1, '【', '】', '…', 24) AS snippet
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+        '''
+        params: List = [match]
+        if sources:
+            sql += f" AND d.source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        if since is not None:
+            sql += ' AND d.published_at >= ?'
+            params.append(since)
+        if until is not None:
+            sql += ' AND d.published_at < ?'
+            params.append(until)
+        sql += ' ORDER BY score LIMIT ?'
+        params.append(int(limit))
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for row in rows:
+            doc = dict(row)
+            doc['snippet'] = cjk_untokenize(doc['snippet'])
+            doc['meta'] = json.loads(doc['meta'] or '{}')
+            results.append(doc)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """各来源文档数"""
+        conn = self._connect()
+        try:
+            return {row['source']: row['n'] for row in
+                    conn.execute('SELECT source, COUNT(*) AS n FROM documents GROUP BY source')}
+        finally:
+            conn.close()
+
+
+def index_news(items: Iterable[Dict]) -> int:
+    """抓取脚本调用: 新闻写入检索索引，失败只打印不影响主流程"""
+    try:
+        return SearchIndex().add_news(items)
+    except Exception as e:
+        print(f"⚠️ 新闻写入检索索引失败: {e}")
+        return 0
+
+
+def index_announcements(records: Iterable[Dict]) -> int:
+    """抓取脚本调用: 公告写入检索索引，失败只打印不影响主流程"""
+    try:
+        return SearchIndex().add_announcements(records)
+    except Exception as e:
+        print(f"⚠️ 公告写入检索索引失败: {e}")
+        return 0
+
+
+def format_results(results: List[Dict]) -> str:
+    """检索结果转成文本"""
+    icons = {'tweet': '🐦', 'news': '📰', 'cninfo': '📢'}
+    lines = []
+    for i, doc in enumerate(results, 1):
+        when = datetime.fromtimestamp(doc['published_at']).strftime('%m-%d %H:%M')
+        lines.append(f"{i}. {icons.get(doc['source'], '•')} [{when}] {doc['origin']}: {doc['snippet']}")
+        if doc['url']:
+            lines.append(f"   🔗 {doc['url']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索 推文/新闻/公告')
+    parser.add_argument('query', help='检索词，空格=AND，/ 或 | = OR')
+    parser.add_argument('--days', type=float, default=None, help='最近N天')
+    parser.add_argument('--source', action='append', choices=['tweet', 'news', 'cninfo'])
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    results = index.search(args.query, sources=args.source, days=args.days, limit=args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"🔍 {args.query} · {len(results)} 条结果 · {elapsed:.1f}ms")
+    print("=" * 60)
+    print(format_results(results) if results else "无结果")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@
 import sqlite3
 import json
 import hashlib
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -54,6 +55,33 @@ class SmartDatabase:
             )
         ''')
         
+        # 貔貅检测结果表（honeypot.is 缓存）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS honeypot_checks (
+                chain_id TEXT NOT NULL,
+                contract_address TEXT NOT NULL,
+                is_honeypot BOOLEAN DEFAULT 0,  -- 确认貔貅后永久有效
+                open_source BOOLEAN DEFAULT 0,  -- 开源后不会再变
+                response TEXT,  -- 最近一次API原始结果（税率/持有人，有TTL）
+                checked_at REAL,
+                PRIMARY KEY (chain_id, contract_address)
+            )
+        ''')
+        
+        # 交易对快照表（DexScreener价格/流动性历史，供策略回测重放）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pair_snapshots (
+                contract_address TEXT NOT NULL,
+                pair_address TEXT NOT NULL,
+                chain_id TEXT,
+                ts REAL NOT NULL,  -- 快照时间（秒时间戳）
+                price_usd REAL,
+                liquidity_usd REAL,
+                volume_24h REAL,
+                PRIMARY KEY (contract_address, pair_address, ts)
+            )
+        ''')
+        
         # 创建索引
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_token_contract ON tokens(contract_address)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_hash ON contents(content_hash)')
@@ -118,6 +146,116 @@ class SmartDatabase:
         conn.close()
         return result is None
     
+    def get_honeypot_check(self, chain_id: str, contract: str) -> Optional[Dict]:
+        """读取缓存的貔貅检测结果"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # tokens.is_honeypot 也算（其他来源手动/外部标记的貔貅）
+        cursor.execute('''
+            SELECT h.is_honeypot OR COALESCE(t.is_honeypot, 0), h.open_source, h.response, h.checked_at
+            FROM honeypot_checks h
+            LEFT JOIN tokens t ON t.contract_address = h.contract_address
+            WHERE h.chain_id = ? AND h.contract_address = ?
+        ''', (str(chain_id), contract.lower()))
+        row = cursor.fetchone()
+        
+        conn.close()
+        if not row:
+            return None
+        return {
+            'is_honeypot': bool(row[0]),
+            'open_source': bool(row[1]),
+            'response': json.loads(row[2] or '{}'),
+            'checked_at': row[3] or 0
+        }
+    
+    def save_honeypot_check(self, chain_id: str, contract: str, response: Dict,
+                            is_honeypot: bool, open_source: bool, checked_at: float):
+        """保存貔貅检测结果，同步 tokens.is_honeypot（复检不再是貔貅时清掉标记）"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO honeypot_checks
+                    (chain_id, contract_address, is_honeypot, open_source, response, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (str(chain_id), contract.lower(), is_honeypot, open_source,
+                  json.dumps(response), checked_at))
+            
+            cursor.execute('UPDATE tokens SET is_honeypot = ? WHERE contract_address = ?',
+                           (bool(is_honeypot), contract.lower()))
+            conn.commit()
+        except Exception as e:
+            print(f"数据库错误: {e}")
+        finally:
+            conn.close()
+    
+    def add_pair_snapshot(self, contract: str, pair: Dict, ts: Optional[float] = None):
+        """记录一次DexScreener交易对快照（价格/流动性/交易量）"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO pair_snapshots
+                    (contract_address, pair_address, chain_id, ts, price_usd, liquidity_usd, volume_24h)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (contract.lower(), (pair.get('pairAddress') or '').lower(), pair.get('chainId', ''),
+                  ts if ts is not None else time.time(),
+                  float(pair.get('priceUsd', 0) or 0),
+                  float((pair.get('liquidity') or {}).get('usd', 0) or 0),
+                  float((pair.get('volume') or {}).get('h24', 0) or 0)))
+            conn.commit()
+        except Exception as e:
+            print(f"数据库错误: {e}")
+        finally:
+            conn.close()
+    
+    def get_pair_histories(self) -> Dict[str, List[Dict]]:
+        """
+        所有代币的交易对快照历史 {合约: [快照, ...]}（按时间升序）
+        一个代币有多个交易对时只取流动性最大的那个（和监控里取第一个交易对一致）
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT contract_address, pair_address, chain_id, ts, price_usd, liquidity_usd, volume_24h
+            FROM pair_snapshots ORDER BY contract_address, ts
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        by_pair: Dict[tuple, List[Dict]] = {}
+        for contract, pair, chain, ts, price, liquidity, volume in rows:
+            by_pair.setdefault((contract, pair), []).append({
+                'ts': ts, 'chain': chain, 'price': price or 0.0,
+                'liquidity': liquidity or 0.0, 'volume_24h': volume or 0.0
+            })
+        
+        histories: Dict[str, List[Dict]] = {}
+        for (contract, _), snaps in by_pair.items():
+            best = histories.get(contract)
+            if best is None or max(s['liquidity'] for s in snaps) > max(s['liquidity'] for s in best):
+                histories[contract] = snaps
+        return histories
+    
+    def get_tokens(self) -> List[Dict]:
+        """tokens表全部记录（按首次发现时间升序）"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT contract_address, symbol, name, token_type, first_seen, is_honeypot, narrative
+            FROM tokens ORDER BY first_seen, id
+        ''')
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
     def get_stats(self) -> Dict:
         """获取统计信息"""
         conn = sqlite3.connect(self.db_path)
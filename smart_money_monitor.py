@@ -2,14 +2,31 @@
 """
 聪明钱地址监控系统
 监控指定地址的Base链持仓变化和交易行为
+持仓通过 onchain 查询层读取: 所有地址 × 关注代币的余额一次 Multicall3 调用读完
+交易动作通过 log_stream 跟踪 Transfer 日志: 所有地址一个过滤条件，逐区块增量推送
+(python3 smart_money_monitor.py --watch)
 """
 
-import urllib.request
 import json
 import os
+import sys
 from datetime import datetime
 from typing import Dict, List, Set
 
+from log_stream import LogStream
+from onchain import get_chain
+
+# Base 链上关注的代币 (持仓变化才有意义的主流币)
+WATCH_TOKENS = {
+    'base': [
+        '0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913',  # USDC
+        '0x4200000000000000000000000000000000000006',  # WETH
+        '0xcbB7C0000aB88B473b1f5aFd9ef808440eed33Bf',  # cbBTC
+    ],
+}
+CHANGE_THRESHOLD = 0.05   # 持仓变化超过5%算一次异动
+DUST = 1e-6
+
 class SmartMoneyMonitor:
     """聪明钱监控器"""
     
@@ -52,16 +69,38 @@ class SmartMoneyMonitor:
         with open(self.data_file, 'w') as f:
             json.dump(data, f, indent=2)
     
+    def scan(self, chain: str = 'base', block=None) -> Dict[str, Dict]:
+        """一次读完某条链上所有监控地址的持仓 {地址: {'balances', 'block', 'checked_at'}}"""
+        addresses = [a['address'] for a in self.addresses if a['chain'].lower() == chain]
+        if not addresses:
+            return {}
+        client = get_chain(chain)
+        block = block if block is not None else client.block_number()
+        balances = client.balances(addresses, WATCH_TOKENS.get(chain, []), block=block)
+        checked_at = datetime.now().isoformat()
+        return {addr: {'address': addr, 'balances': bal, 'block': block, 'checked_at': checked_at}
+                for addr, bal in balances.items()}
+
     def check_address_base(self, address: str) -> Dict:
-        """检查Base链地址活动"""
-        # 使用BaseScan API或DeBank API
-        # 这里先用简化版本，只记录时间戳
-        return {
-            'address': address,
-            'checked_at': datetime.now().isoformat(),
-            'note': '需要BaseScan API Key获取详细数据'
-        }
-    
+        """检查Base链地址持仓"""
+        client = get_chain('base')
+        balances = client.balances([address], WATCH_TOKENS['base'])[address]
+        return {'address': address, 'balances': balances, 'checked_at': datetime.now().isoformat()}
+
+    @staticmethod
+    def diff(previous: Dict, current: Dict) -> List[str]:
+        """持仓异动: 变化超过 CHANGE_THRESHOLD 的币种"""
+        changes = []
+        old_bal = previous.get('balances') or {}
+        for symbol, new in (current.get('balances') or {}).items():
+            old = old_bal.get(symbol)
+            if new is None or old is None or max(old, new) < DUST:
+                continue
+            if old < DUST or abs(new - old) / old >= CHANGE_THRESHOLD:
+                arrow = '🟢 加仓' if new > old else '🔴 减仓'
+                changes.append(f"{arrow} {symbol}: {old:,.4f} → {new:,.4f}")
+        return changes
+
     def generate_report(self) -> str:
         """生成监控报告"""
         lines = [
@@ -78,6 +117,13 @@ class SmartMoneyMonitor:
         
         lines.append(f"📊 监控地址数量: {len(self.addresses)}")
         lines.append("")
+
+        scans = {}
+        for chain in {a['chain'].lower() for a in self.addresses}:
+            try:
+                scans.update(self.scan(chain))
+            except Exception as e:
+                print(f"❌ {chain} 持仓读取失败: {e}")
         
         for addr_info in self.addresses:
             addr = addr_info['address']
@@ -100,8 +146,13 @@ class SmartMoneyMonitor:
                 lines.append("🆕 新添加地址，首次监控")
             
             # 当前检查
-            current = self.check_address_base(addr)
+            current = scans.get(addr) or {'checked_at': datetime.now().isoformat(), 'balances': {}}
             lines.append(f"⏰ 本次检查: {current['checked_at']}")
+            for symbol, amount in current['balances'].items():
+                lines.append(f"  💰 {symbol}: {amount:,.4f}" if amount is not None else f"  💰 {symbol}: 读取失败")
+            lines.extend(f"  {c}" for c in self.diff(self.previous_data.get(addr, {}), current))
+            for act in self.previous_data.get(addr, {}).get('recent', [])[-3:]:
+                lines.append(f"  🔄 #{act['block']} {act['text']}")
             
             # 保存数据
             if addr not in self.previous_data:
@@ -113,16 +164,62 @@ class SmartMoneyMonitor:
         lines.extend([
             "",
             "="*60,
-            "💡 说明: 需要BaseScan API Key获取详细持仓和交易数据",
+            f"💡 说明: 关注代币 {len(WATCH_TOKENS.get('base', []))} 个 + 原生币，持续监控: --watch",
             "="*60
         ])
         
         return "\n".join(lines)
 
+    @staticmethod
+    def describe(event: Dict, meta: Dict) -> str:
+        """一条转账事件的文字描述"""
+        token = meta.get(event['token'])
+        if token:
+            amount = f"{event['value'] / 10 ** token['decimals']:,.4f} {token['symbol']}"
+        else:
+            amount = f"{event['value']} ({event['token'][:10]}...)"
+        if event['direction'] == 'in':
+            return f"🟢 转入 {amount} ← {event['from'][:10]}... | tx {event['tx'][:12]}..."
+        return f"🔴 转出 {amount} → {event['to'][:10]}... | tx {event['tx'][:12]}..."
+
+    def watch(self, chain: str = 'base', poll: float = 2.0):
+        """
+        跟踪 Transfer 日志: 所有地址一个过滤条件，每个区块区间一次请求 (游标落盘，重启接着跑)
+        有转账就推送到告警队列，并记录到最近动作
+        """
+        from alert_queue import enqueue_alert
+
+        client = get_chain(chain)
+        wallets = {a['address'].lower(): a for a in self.addresses if a['chain'].lower() == chain}
+        stream = LogStream(client.rpc, wallets, name=f"smart_money_{chain}")
+
+        def handle(events: List[Dict]):
+            meta = client.token_meta({e['token'] for e in events})
+            by_wallet: Dict[str, List[Dict]] = {}
+            for e in events:
+                by_wallet.setdefault(e['wallet'], []).append(e)
+            for wallet, evs in by_wallet.items():
+                info = wallets[wallet]
+                lines = [self.describe(e, meta) for e in evs]
+                text = "\n".join([f"🐋 聪明钱动作 | {info['label']}", f"📄 {info['address']}",
+                                  f"⛓️ {chain} #{evs[-1]['block']}", ""] + lines)
+                print(text)
+                enqueue_alert(text, source='smart_money', key=f"{wallet}:{evs[0]['tx']}:{evs[0]['log_index']}")
+                record = self.previous_data.setdefault(info['address'], {})
+                record['recent'] = (record.get('recent', []) + [
+                    {'block': e['block'], 'tx': e['tx'], 'text': line} for e, line in zip(evs, lines)])[-20:]
+            self._save_data(self.previous_data)
+
+        print(f"👀 开始跟踪 {chain} 上 {len(wallets)} 个地址的转账 (从区块 {stream.cursor or '当前'} 开始，Ctrl+C 退出)")
+        stream.follow(handle, poll)
+
 
 def main():
     """主函数"""
     monitor = SmartMoneyMonitor()
+    if '--watch' in sys.argv:
+        monitor.watch()
+        return
     report = monitor.generate_report()
     print(report)
     
@@ -1,41 +1,200 @@
 #!/usr/bin/env python3
 """
-智能推送调节器
-根据市场活跃度自动调整推送频率
+智能推送调节器 + 自适应抓取频率
+根据市场活跃度自动调整推送频率，也调整各数据源的抓取频率：
+- 有信号 (波动大 / 新币多 / 关键词命中) → 缩短间隔，最快到 min_interval
+- 没信号 → 间隔指数退避，最慢到 max_interval
+- 对应市场休市 (交易日历: 时段外 / 午休 / 节假日) → 至少 off_hours_interval 才抓一次
+- 每个数据源独立状态；状态先记在内存，批量写盘 (不再每次调用都重写文件)
+  常驻进程里的实例按 FLUSH_EVERY 定期写盘；一次性脚本里的局部实例用完要自己调用 flush()
+API 配额和浏览器时间花在有信号的地方
 """
 
+import atexit
 import os
 import json
-from datetime import datetime, timedelta
+import time
+import weakref
+from datetime import datetime
+from typing import Dict, Optional
 
-class SmartScheduler:
-    """智能调度器"""
-    
-    def __init__(self, state_file="/tmp/smart_scheduler.json"):
+from market_calendar import is_open as market_open
+
+STATE_FILE = "/tmp/smart_scheduler.json"
+
+# 各数据源的频率配置 (秒)
+# value_threshold: 两次抓取之间数值变化超过这个百分比算一次信号 (例如价格)
+SOURCES = {
+    'clanker':     {'base': 600,  'min': 300, 'max': 3600},
+    'twitter':     {'base': 3600, 'min': 900, 'max': 4 * 3600},
+    'btc':         {'base': 300,  'min': 60,  'max': 1800, 'value_threshold': 0.3},
+    'innoscience': {'base': 1800, 'min': 300, 'max': 7200, 'market': 'hk',
+                    'off_hours_interval': 6 * 3600, 'value_threshold': 1.0},
+    'us_stocks':   {'base': 900,  'min': 300, 'max': 3600, 'market': 'us',
+                    'off_hours_interval': 4 * 3600, 'value_threshold': 1.0},
+}
+DEFAULT_SOURCE = {'base': 900, 'min': 300, 'max': 4 * 3600}
+
+BACKOFF = 2.0        # 连续无信号时间隔 ×2
+SPEEDUP = 2.0        # 有信号时间隔 ÷2，强信号直接到最快
+STRONG_SIGNAL = 3.0
+DUE_SLACK = 30       # cron 启动时间有误差，差30秒以内也算到点
+FLUSH_EVERY = 60     # 内存状态最多每60秒写一次盘 (进程退出时也会写)
+
+# 推送间隔档位: 连续N次无活跃 → 至少间隔多少小时 (用户定制版 - 激进静默)
+PUSH_TIERS = [(2, 8, 'deep_sleep'), (1, 4, 'sleep'), (0, 1, 'normal')]
+
+
+_live = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """进程退出前把还没写盘的状态写掉"""
+    for cadence in list(_live):
+        cadence.flush()
+
+
+class AdaptiveCadence:
+    """按数据源自适应抓取频率"""
+
+    def __init__(self, state_file: str = STATE_FILE, sources: Optional[Dict] = None,
+                 flush_every: float = FLUSH_EVERY):
         self.state_file = state_file
+        self.sources = {**SOURCES, **(sources or {})}
+        self.flush_every = flush_every
         self.state = self.load_state()
-    
-    def load_state(self):
-        """加载状态"""
-        if os.path.exists(self.state_file):
+        self.dirty = set()
+        self.last_flush = time.time()
+        _live.add(self)
+
+    def load_state(self) -> Dict:
+        """加载状态 (兼容旧版只有推送状态的平铺格式)"""
+        try:
             with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {
-            'last_push_time': None,
-            'last_active_count': 0,
-            'consecutive_silent': 0,  # 连续静默次数
-            'market_status': 'normal',  # normal, hot, sleep, deep_sleep
-        }
-    
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if 'sources' not in data:
+            data = {'sources': {'push': data} if data else {}}
+        return data
+
+    def config(self, source: str) -> Dict:
+        return {**DEFAULT_SOURCE, **self.sources.get(source, {})}
+
+    def source_state(self, source: str) -> Dict:
+        states = self.state['sources']
+        if source not in states:
+            states[source] = {'interval': self.config(source)['base'], 'last_fetch': None,
+                              'last_value': None, 'quiet_streak': 0, 'last_score': 0}
+        return states[source]
+
+    # ---------- 抓取频率 ----------
+
+    def interval(self, source: str, now: Optional[datetime] = None) -> float:
+        """当前有效间隔 (秒)：休市时段至少 off_hours_interval"""
+        cfg = self.config(source)
+        interval = self.source_state(source)['interval']
+        if not market_open(cfg.get('market'), now):
+            interval = max(interval, cfg.get('off_hours_interval', cfg['max']))
+        return interval
+
+    def due(self, source: str, now: Optional[datetime] = None) -> bool:
+        """距上次抓取是否已超过当前间隔"""
+        last = self.source_state(source)['last_fetch']
+        if not last:
+            return True
+        now_ts = (now or datetime.now()).timestamp()
+        return now_ts - last >= self.interval(source, now) - DUE_SLACK
+
+    def next_fetch(self, source: str) -> Optional[datetime]:
+        last = self.source_state(source)['last_fetch']
+        return datetime.fromtimestamp(last + self.interval(source)) if last else None
+
+    def record(self, source: str, new_items: int = 0, keyword_hits: int = 0,
+               value: Optional[float] = None, now: Optional[datetime] = None) -> float:
+        """
+        记录一次抓取结果并调整间隔，返回新间隔 (秒)
+        信号分 = 新条目数 + 关键词命中×2 + 数值变化幅度/阈值
+        """
+        cfg = self.config(source)
+        state = self.source_state(source)
+
+        score = new_items + keyword_hits * 2
+        if value is not None:
+            last_value = state.get('last_value')
+            if last_value and cfg.get('value_threshold'):
+                score += abs(value - last_value) / abs(last_value) * 100 / cfg['value_threshold']
+            state['last_value'] = value
+
+        if score >= STRONG_SIGNAL:
+            state['interval'] = cfg['min']
+            state['quiet_streak'] = 0
+        elif score >= 1:
+            state['interval'] = max(cfg['min'], state['interval'] / SPEEDUP)
+            state['quiet_streak'] = 0
+        else:
+            state['interval'] = min(cfg['max'], state['interval'] * BACKOFF)
+            state['quiet_streak'] += 1
+
+        state['last_fetch'] = (now or datetime.now()).timestamp()
+        state['last_score'] = round(score, 2)
+        self.mark_dirty(source)
+        return state['interval']
+
+    # ---------- 批量写盘 ----------
+
+    def mark_dirty(self, source: str):
+        self.dirty.add(source)
+        if time.time() - self.last_flush >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """把有变化的数据源写盘 (先读回文件再合并，不覆盖其他进程更新的数据源)"""
+        if not self.dirty:
+            return
+        on_disk = self.load_state()
+        for source in self.dirty:
+            on_disk['sources'][source] = self.state['sources'][source]
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(on_disk, f)
+        os.replace(tmp, self.state_file)
+        self.dirty.clear()
+        self.last_flush = time.time()
+
+    def get_cadence_status(self) -> str:
+        lines = []
+        for source, state in sorted(self.state['sources'].items()):
+            if source == 'push':
+                continue
+            interval = self.interval(source)
+            lines.append(f"{source}: 每{interval / 60:.0f}分钟 (信号 {state.get('last_score', 0)}, "
+                         f"连续静默 {state.get('quiet_streak', 0)})")
+        return "\n".join(lines)
+
+
+class SmartScheduler(AdaptiveCadence):
+    """智能调度器: 推送节奏 + 各数据源抓取节奏"""
+
+    @property
+    def push_state(self) -> Dict:
+        push = self.state['sources'].setdefault('push', {})
+        push.setdefault('last_push_time', None)
+        push.setdefault('last_active_count', 0)
+        push.setdefault('consecutive_silent', 0)  # 连续静默次数
+        push.setdefault('market_status', 'normal')  # normal, hot, sleep, deep_sleep
+        return push
+
     def save_state(self):
         """保存状态"""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f)
-    
+        self.dirty.add('push')
+        self.flush()
+
     def should_push(self, active_token_count: int) -> bool:
         """
         判断是否该推送
-        
+
         规则（用户定制版 - 激进静默）：
         1. 有活跃代币(>0) → 立即推送
         2. 连续1次无活跃 → 延长到4小时
@@ -43,66 +202,44 @@ class SmartScheduler:
         4. 新币首次出现 → 立即推送（不管时间）
         """
         now = datetime.now()
-        
+        state = self.push_state
+        state['last_active_count'] = active_token_count
+        self.mark_dirty('push')
+
         # 更新活跃计数
         if active_token_count > 0:
-            self.state['consecutive_silent'] = 0
-            self.state['market_status'] = 'hot'
-            self.save_state()
+            state['consecutive_silent'] = 0
+            state['market_status'] = 'hot'
             return True  # 有活跃币，立即推送
-        
+
         # 无活跃币
-        self.state['consecutive_silent'] += 1
-        silent_count = self.state['consecutive_silent']
-        
+        state['consecutive_silent'] += 1
+        silent_count = state['consecutive_silent']
+
         # 检查距离上次推送的时间
-        if self.state['last_push_time']:
-            last_push = datetime.fromisoformat(self.state['last_push_time'])
+        if state['last_push_time']:
+            last_push = datetime.fromisoformat(state['last_push_time'])
             hours_since_last = (now - last_push).total_seconds() / 3600
         else:
             hours_since_last = 999  # 第一次
-        
+
         # 根据静默次数决定推送间隔（用户定制版）
-        if silent_count >= 2:
-            # 连续2次+无活跃，进入"深度休眠"模式
-            self.state['market_status'] = 'deep_sleep'
-            if hours_since_last >= 8:
-                self.save_state()
-                return True  # 8小时推一次
-            else:
-                self.save_state()
-                return False
-        
-        elif silent_count >= 1:
-            # 连续1次无活跃，进入"休眠"模式
-            self.state['market_status'] = 'sleep'
-            if hours_since_last >= 4:
-                self.save_state()
-                return True  # 4小时推一次
-            else:
-                self.save_state()
-                return False
-        
-        else:
-            # 正常情况
-            self.state['market_status'] = 'normal'
-            if hours_since_last >= 1:
-                self.save_state()
-                return True
-            else:
-                self.save_state()
-                return False
-    
+        for min_silent, hours, status in PUSH_TIERS:
+            if silent_count >= min_silent:
+                state['market_status'] = status
+                return hours_since_last >= hours
+        return False
+
     def mark_pushed(self):
         """标记已推送"""
-        self.state['last_push_time'] = datetime.now().isoformat()
+        self.push_state['last_push_time'] = datetime.now().isoformat()
         self.save_state()
-    
+
     def get_status(self) -> str:
         """获取当前状态说明"""
-        silent = self.state['consecutive_silent']
-        status = self.state['market_status']
-        
+        silent = self.push_state['consecutive_silent']
+        status = self.push_state['market_status']
+
         if status == 'hot':
             return "🔥 市场活跃 - 正常推送"
         elif status == 'deep_sleep':
@@ -115,8 +252,10 @@ class SmartScheduler:
 
 if __name__ == "__main__":
     scheduler = SmartScheduler()
-    
+
     # 测试：假设当前有0个活跃币
     should = scheduler.should_push(0)
     print(f"是否推送: {should}")
     print(f"状态: {scheduler.get_status()}")
+    print(f"港股开市: {market_open('hk')} | 美股开市: {market_open('us')}")
+    print(scheduler.get_cadence_status())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+分阶段异步流水线 - 提速方案
+每个阶段独立并发 + 阶段之间有界队列 (背压)，不同数据的不同阶段可以重叠执行
+"""
+import asyncio
+import inspect
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    """最近秩百分位数，samples为空时返回0"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Stage:
+    """
+    流水线的一个阶段
+    func(item) 返回下一阶段的输入，返回 None 表示该条数据在本阶段被丢弃
+    func 可以是协程函数 (I/O阶段) 或普通函数 (在事件循环里直接执行的轻量阶段)
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any],
+                 concurrency: int = 1, queue_size: int = 100,
+                 latency_window: int = 1000):
+        self.name = name
+        self.func = func
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.latencies = deque(maxlen=latency_window)
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = ""
+        self.max_queue_depth = 0
+
+    async def call(self, item: Any) -> Any:
+        if inspect.iscoroutinefunction(self.func):
+            return await self.func(item)
+        return self.func(item)
+
+    def stats(self) -> Dict:
+        """阶段统计: 队列深度 + 延迟分位数(毫秒)"""
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+        }
+
+
+class StagedPipeline:
+    """多阶段流水线: 输入 → stage1 → stage2 → ... → 输出 (保持输入顺序)"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    async def _put(self, stage: Stage, entry):
+        # 队列满时在这里等待 → 上游自然减速 (背压)
+        await stage.queue.put(entry)
+        stage.max_queue_depth = max(stage.max_queue_depth, stage.queue.qsize())
+
+    async def _worker(self, index: int, results: Dict[int, Any]):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            seq, item = await stage.queue.get()
+            start = time.perf_counter()
+            try:
+                out = await stage.call(item)
+            except Exception as e:
+                stage.errors += 1
+                stage.last_error = f"{type(e).__name__}: {e}"
+                out = None
+            stage.latencies.append(time.perf_counter() - start)
+            stage.processed += 1
+
+            try:
+                if out is None:
+                    stage.dropped += 1
+                elif next_stage:
+                    await self._put(next_stage, (seq, out))
+                else:
+                    results[seq] = out
+            finally:
+                stage.queue.task_done()
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """跑完全部数据，返回最后一个阶段的输出 (按输入顺序，不含被丢弃的)"""
+        results: Dict[int, Any] = {}
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+
+        workers = [
+            asyncio.create_task(self._worker(i, results))
+            for i, stage in enumerate(self.stages)
+            for _ in range(stage.concurrency)
+        ]
+
+        try:
+            for seq, item in enumerate(items):
+                await self._put(self.stages[0], (seq, item))
+            # 按顺序排空: 第i阶段排空后，它的输出都已进入第i+1阶段的队列
+            for stage in self.stages:
+                await stage.queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return [results[seq] for seq in sorted(results)]
+
+    def stats(self) -> Dict[str, Dict]:
+        return {stage.name: stage.stats() for stage in self.stages}
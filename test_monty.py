@@ -222,6 +222,124 @@ open('/etc/passwd').read()
     
     print()
 
+# 示例7: 编译缓存 + 批量执行 (MontyAnalyzer)
+def test_program_cache():
+    print("=" * 50)
+    print("测试7: 编译缓存 + 批量执行")
+    print("=" * 50)
+    
+    from monty_analyzer import MontyAnalyzer, TOKENS_CODE
+    
+    analyzer = MontyAnalyzer(log_size=50)
+    batches = [[{'symbol': f'T{i}{j}', 'holders': 100 + j * 50, 'mc': 1000 * j} for j in range(5)]
+               for i in range(20)]
+    
+    before = analyzer.stats()['program_cache']
+    results = analyzer.run_many(TOKENS_CODE, [{'tokens': b} for b in batches], description="批量")
+    after = analyzer.stats()['program_cache']
+    
+    assert all(r['success'] for r in results)
+    assert after['misses'] - before['misses'] <= 1, "同一段代码只应编译一次"
+    
+    for _ in range(100):
+        analyzer.analyze('x + 1', {'x': 1})
+    assert len(analyzer.execution_log) == 50, "日志应是有界环形缓冲"
+    
+    stats = analyzer.stats()
+    print(f"批量执行: {len(results)} 组输入，编译 {after['misses'] - before['misses']} 次")
+    print(f"日志条数: {stats['count']} (上限50)")
+    print(f"耗时 p50/p90/p99: {stats['p50_ms']:.3f} / {stats['p90_ms']:.3f} / {stats['p99_ms']:.3f} ms")
+    print()
+
+# 示例8: 预置分析原生实现 vs 沙箱 (对拍)
+def random_tokens(rng, n):
+    narratives = ['AI', '动物', '政治', '游戏/动漫']
+    tokens = []
+    for i in range(n):
+        token = {'symbol': f'T{i}', 'holders': rng.choice([rng.randint(0, 500), 200, 250]),
+                 'mc': rng.choice([rng.randint(0, 10**6), rng.uniform(0, 1e6)])}
+        if rng.random() < 0.8:
+            token['narrative'] = rng.choice(narratives)
+        tokens.append(token)
+    return tokens
+
+def random_holdings(rng, n):
+    holdings = []
+    for i in range(n):
+        stock = {'shares': rng.randint(0, 5000), 'price': rng.choice([rng.randint(1, 500), rng.uniform(0.5, 500)])}
+        if rng.random() < 0.8:
+            stock['volatility'] = rng.choice([0.4, 0.7, round(rng.uniform(0, 1), 3)])
+        if rng.random() < 0.7:
+            stock['sector'] = rng.choice(['科技', '有色', '医药'])
+        holdings.append(stock)
+    return holdings
+
+def random_changes(rng, n):
+    return [{'name': f'S{i}', 'change_pct': rng.choice([0.05, -0.05, 0, round(rng.uniform(-0.2, 0.2), 4)])}
+            for i in range(n)]
+
+def test_native_matches_sandbox():
+    print("=" * 50)
+    print("测试8: 预置分析 原生实现 vs 沙箱")
+    print("=" * 50)
+    
+    import random
+    from monty_analyzer import MontyAnalyzer
+    
+    native, sandbox = MontyAnalyzer(), MontyAnalyzer(native=False)
+    rng = random.Random(42)
+    
+    cases = [
+        ('analyze_tokens', ([],)),
+        ('analyze_tokens', ([{'symbol': 'A', 'holders': 300, 'mc': 1}, {'symbol': 'B', 'holders': 300, 'mc': 2}],)),  # 平局取第一个
+        ('analyze_tokens', ([{'symbol': 'Z', 'holders': 0, 'mc': 0}],)),   # 没有大于0的 holders
+        ('analyze_tokens', ([{'symbol': 'X', 'mc': 1}],)),                 # 缺字段 → 两边都报错
+        ('analyze_portfolio', ([],)),
+        ('analyze_portfolio', ([{'shares': 0, 'price': 10, 'volatility': 0.9}],)),  # 总市值为0
+        ('detect_anomalies', ([], 0.05)),
+        ('detect_anomalies', ([{'name': 'A', 'change_pct': 0.1}, {'name': 'B', 'change_pct': 0.1}], 0.05)),
+    ]
+    for n in (1, 7, 100, 1000):
+        cases.append(('analyze_tokens', (random_tokens(rng, n),)))
+        cases.append(('analyze_portfolio', (random_holdings(rng, n),)))
+        cases.append(('detect_anomalies', (random_changes(rng, n), rng.choice([0, 0.05, 0.1]))))
+    
+    for method, args in cases:
+        fast = getattr(native, method)(*args)
+        slow = getattr(sandbox, method)(*args)
+        assert fast['success'] == slow['success'], (method, fast, slow)
+        assert fast['result'] == slow['result'], (method, fast['result'], slow['result'])
+        assert fast['error'] == slow['error'], (method, fast['error'], slow['error'])
+    
+    print(f"✅ {len(cases)} 组输入两条路径结果一致")
+    print()
+
+# 示例9: 10k 个币的性能对比
+def test_native_benchmark():
+    print("=" * 50)
+    print("测试9: 原生实现 vs 沙箱 (10k 个币)")
+    print("=" * 50)
+    
+    import random
+    from monty_analyzer import MontyAnalyzer
+    
+    tokens = random_tokens(random.Random(7), 10_000)
+    native, sandbox = MontyAnalyzer(), MontyAnalyzer(native=False)
+    sandbox.analyze_tokens(tokens[:1])  # 先编译，只比较执行耗时
+    
+    timings = {}
+    for name, analyzer in (('原生', native), ('沙箱', sandbox)):
+        start = time.perf_counter()
+        for _ in range(5):
+            result = analyzer.analyze_tokens(tokens)
+        timings[name] = (time.perf_counter() - start) / 5 * 1000
+        assert result['success']
+    
+    print(f"原生: {timings['原生']:.2f} ms / 次")
+    print(f"沙箱: {timings['沙箱']:.2f} ms / 次")
+    print(f"加速: {timings['沙箱'] / timings['原生']:.1f}x")
+    print()
+
 if __name__ == "__main__":
     print("🚀 Pydantic Monty 测试开始\n")
     
@@ -231,6 +349,9 @@ if __name__ == "__main__":
     test_serialization()
     test_performance()
     test_security()
+    test_program_cache()
+    test_native_matches_sandbox()
+    test_native_benchmark()
     
     print("=" * 50)
     print("✅ 所有测试完成！")
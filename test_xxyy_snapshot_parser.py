@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+🧪 XXYY 快照解析器测试
+用 agent-browser snapshot 的原样输出行 (含页面图标字符) 检查解析结果
+"""
+
+from xxyy_snapshot_parser import parse_snapshot
+
+# agent-browser snapshot 原样输出的一段 (\ue87a 是时间图标，\ue8bc 是 holder 图标，都是页面里的字符)
+SNAPSHOT = [
+    '- link:',
+    '  - /url: https://pump.fun/coin/7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsUpump',
+    '  - text: GROK Grok Cat\ue87a 5m 7xKX...pump',
+    '  - term: \ue8bc',
+    '  - definition: "356"',
+    '  - term: MC',
+    '  - definition: $45.2K',
+    '- link:',
+    '  - text: PEPE Pepe Coin\ue87a 2h 9aBc...pump',
+    '  - /url: https://pump.fun/coin/9aBcDeFgHiJkLmNoPqRsTuVwXyZ123456789abcdpump',
+    '  - term: \ue8bc',
+    '  - definition: "12"',
+    '  - term: MC',
+    '  - definition: $1.5M',
+]
+
+
+def test_holders_and_mc():
+    print("=" * 50)
+    print("测试: holder 数 / MC 解析")
+    print("=" * 50)
+
+    tokens = list(parse_snapshot(SNAPSHOT))
+    for t in tokens:
+        print(f"  {t.symbol:<6} {t.time_ago:>4} holders={t.holders:<5} mc=${t.mc:,.0f}")
+
+    assert [t.symbol for t in tokens] == ['GROK', 'PEPE']
+    assert tokens[0].holders == 356 and tokens[1].holders == 12
+    assert tokens[0].mc == 45200 and tokens[1].mc == 1500000
+    assert tokens[0].time_seconds == 300 and tokens[1].time_seconds == 7200
+    # GROK 的链接在标题行之前 (属于上一个代币的窗口)，PEPE 的在标题行之后
+    assert tokens[0].address_full is None
+    assert tokens[1].address_full == '9aBcDeFgHiJkLmNoPqRsTuVwXyZ123456789abcdpump'
+    print("✅ 通过")
+    print()
+
+
+if __name__ == "__main__":
+    test_holders_and_mc()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+📢 Telegram 公开频道增量抓取 - t.me/s/<频道> 网页版
+以前每次都下载整页、正则扫全文、再和上次保存的帖子逐条比对。现在：
+- 每个频道记住处理到的最后一条消息 id (落盘)，只请求 ?after=<id> 之后的新帖子
+- 流式 HTML 解析 (html.parser 边下载边喂)，按 data-post 取消息 id，不靠正则
+- 多个频道并发抓取
+- 回溯历史时先取最新一页，再按 ?before=<id> 并发拉多页
+  (每页是 before 之前最近的 PAGE_SIZE 条，相邻页的 before 相差 PAGE_SIZE，
+   消息 id 有空洞时页之间只会重叠、不会漏)
+- t.me 直连失败时走 r.jina.ai 镜像 (X-Return-Format: html，拿到的是同样的网页)
+
+用法:
+    python3 tg_channel.py PowsGemCalls              # 打印新帖子并推进游标
+    python3 tg_channel.py PowsGemCalls other --backfill 5
+"""
+
+import codecs
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+
+CURSOR_FILE = '/tmp/tg_channel_cursors.json'
+PAGE_SIZE = 20        # t.me/s 每页大约20条
+MAX_PAGES = 10        # 一次增量最多翻10页 (长时间没跑时)
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 30
+
+SOURCES = [
+    ('https://t.me/s/{path}', {}),
+    ('https://r.jina.ai/https://t.me/s/{path}', {'X-Return-Format': 'html'}),
+]
+
+CONTRACT_RE = re.compile(r'0x[a-fA-F0-9]{40}')
+
+
+# ==================== 解析 ====================
+
+class ChannelPageParser(HTMLParser):
+    """
+    t.me/s 页面的流式解析器，feed() 可以分块喂
+    每条消息: <div class="tgme_widget_message ..." data-post="频道/id"> 里面
+    正文在 tgme_widget_message_text，发布时间在 <time datetime=...>
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.posts: List[Dict] = []
+        self._post: Optional[Dict] = None
+        self._depth = 0               # 当前消息内 div 嵌套深度
+        self._text_depth = None       # 正文 div 的深度 (在正文里时不为 None)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'div':
+            classes = (attrs.get('class') or '').split()
+            if 'tgme_widget_message' in classes and attrs.get('data-post'):
+                self._finish()
+                channel, _, msg_id = attrs['data-post'].rpartition('/')
+                if msg_id.isdigit():
+                    self._post = {'id': int(msg_id), 'channel': channel, 'text': [], 'links': [],
+                                  'date': None, 'has_text': False}
+                    self._depth = 1
+                return
+            if self._post is None:
+                return
+            self._depth += 1
+            if 'tgme_widget_message_text' in classes and not self._post['has_text']:
+                self._text_depth = self._depth  # 只取第一段正文，转发/回复引用的不要
+                self._post['has_text'] = True
+        elif self._post is None:
+            return
+        elif tag == 'br' and self._text_depth is not None:
+            self._post['text'].append('\n')
+        elif tag == 'a' and self._text_depth is not None:
+            href = attrs.get('href') or ''
+            if href.startswith(('http://', 'https://')) and href not in self._post['links']:
+                self._post['links'].append(href)
+        elif tag == 'time' and attrs.get('datetime') and self._post['date'] is None:
+            self._post['date'] = attrs['datetime']
+
+    def handle_endtag(self, tag):
+        if tag != 'div' or self._post is None:
+            return
+        if self._text_depth == self._depth:
+            self._text_depth = None
+        self._depth -= 1
+        if self._depth == 0:
+            self._finish()
+
+    def handle_data(self, data):
+        if self._text_depth is not None:
+            self._post['text'].append(data)
+
+    def close(self):
+        super().close()
+        self._finish()
+
+    def _finish(self):
+        post, self._post, self._text_depth = self._post, None, None
+        if post is None:
+            return
+        del post['has_text']
+        post['text'] = ''.join(post['text']).strip()
+        post['contracts'] = CONTRACT_RE.findall(post['text'])
+        self.posts.append(post)
+
+
+# ==================== 抓取 ====================
+
+def fetch_page(channel: str, before: Optional[int] = None, after: Optional[int] = None,
+               timeout: float = TIMEOUT) -> List[Dict]:
+    """
+    抓一页帖子 (按 id 升序)；before / after 对应 t.me/s 的分页参数
+    所有数据源都失败时抛出最后一个异常
+    """
+    query = {k: v for k, v in (('before', before), ('after', after)) if v is not None}
+    path = channel + ('?' + urllib.parse.urlencode(query) if query else '')
+    error = None
+    for template, headers in SOURCES:
+        url = template.format(path=path)
+        try:
+            posts = _stream_parse(url, headers, timeout)
+        except Exception as e:
+            error = e
+            print(f"⚠️ 抓取失败 {url}: {e}")
+            continue
+        # 分页边界以本地为准 (越界时 t.me 可能直接返回最新一页)
+        return [p for p in posts
+                if (after is None or p['id'] > after) and (before is None or p['id'] < before)]
+    raise error
+
+
+def _stream_parse(url: str, headers: Dict[str, str], timeout: float) -> List[Dict]:
+    req = urllib.request.Request(url, headers=dict({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }, **headers))
+    parser = ChannelPageParser()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        while True:
+            chunk = resp.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return sorted(parser.posts, key=lambda p: p['id'])
+
+
+class ChannelFetcher:
+    """
+    多频道增量抓取，游标 {频道: 最后一条消息 id} 存在 cursor_file
+    fetch_new() 第一次运行返回最新一页并记下游标，之后只返回游标之后的新帖子
+    """
+
+    def __init__(self, cursor_file: str = CURSOR_FILE, max_workers: int = 8,
+                 timeout: float = TIMEOUT):
+        self.cursor_file = cursor_file
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.cursors = self._load()
+
+    def _load(self) -> Dict[str, int]:
+        try:
+            with open(self.cursor_file, 'r') as f:
+                return {k: int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _advance(self, channel: str, last_id: int):
+        """推进游标并落盘 (读回再合并，其他进程的频道不丢)"""
+        with self._lock:
+            if last_id <= self.cursors.get(channel, 0):
+                return
+            cursors = self._load()
+            for name, value in dict(self.cursors, **{channel: last_id}).items():
+                cursors[name] = max(value, cursors.get(name, 0))
+            self.cursors = cursors
+            tmp = f"{self.cursor_file}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(cursors, f)
+            os.replace(tmp, self.cursor_file)
+
+    def fetch_new(self, channel: str, max_pages: int = MAX_PAGES) -> List[Dict]:
+        """游标之后的新帖子 (按 id 升序)，返回前推进游标"""
+        last = self.cursors.get(channel)
+        if last is None:
+            posts = fetch_page(channel, timeout=self.timeout)
+            if posts:
+                self._advance(channel, posts[-1]['id'])
+            return posts
+
+        posts = []
+        for _ in range(max_pages):
+            page = fetch_page(channel, after=last, timeout=self.timeout)
+            if not page:
+                break
+            posts += page
+            last = page[-1]['id']
+            if len(page) < PAGE_SIZE:
+                break  # 已经到最新
+        if posts:
+            self._advance(channel, last)
+        return posts
+
+    def fetch_new_many(self, channels: Iterable[str]) -> Dict[str, List[Dict]]:
+        """多个频道并发增量抓取，某个频道失败结果为空列表"""
+        channels = list(dict.fromkeys(channels))
+
+        def one(channel):
+            try:
+                return self.fetch_new(channel)
+            except Exception as e:
+                print(f"❌ {channel} 抓取失败: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(channels)))) as pool:
+            return dict(zip(channels, pool.map(one, channels)))
+
+    def backfill(self, channel: str, pages: int = 5) -> List[Dict]:
+        """
+        最近 pages 页历史 (按 id 降序，不动游标)
+        第一页确定最老的 id 之后，剩下的页按 before 并发抓
+        """
+        latest = fetch_page(channel, timeout=self.timeout)
+        if not latest or pages <= 1:
+            return latest[::-1]
+        oldest = latest[0]['id']
+        befores = [oldest - i * PAGE_SIZE for i in range(pages - 1) if oldest - i * PAGE_SIZE > 1]
+
+        def one(before):
+            try:
+                return fetch_page(channel, before=before, timeout=self.timeout)
+            except Exception as e:
+                print(f"⚠️ {channel} before={before} 抓取失败: {e}")
+                return []
+
+        by_id = {p['id']: p for p in latest}
+        if befores:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(befores)))) as pool:
+                for page in pool.map(one, befores):
+                    for p in page:
+                        by_id.setdefault(p['id'], p)
+        return sorted(by_id.values(), key=lambda p: -p['id'])
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    fetcher = ChannelFetcher()
+    if '--backfill' in args:
+        i = args.index('--backfill')
+        pages = int(args[i + 1]) if i + 1 < len(args) else 5
+        for channel in args[:i]:
+            posts = fetcher.backfill(channel, pages)
+            print(f"📚 {channel}: {len(posts)} 条历史 (id {posts[-1]['id'] if posts else '-'} ~ {posts[0]['id'] if posts else '-'})")
+    else:
+        start = time.time()
+        for channel, posts in fetcher.fetch_new_many(args).items():
+            print(f"📢 {channel}: {len(posts)} 条新帖子")
+            for p in posts:
+                print(f"  #{p['id']} {p['date']} {p['text'][:80]!r}")
+        print(f"⏱️ {time.time() - start:.1f}s")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+🔎 推文词库匹配引擎 - Elon 各分析器共用
+以前每个分析器对每条推文逐个词 `term in text_lower`，几个分析器各扫一遍 (合计一百多次子串查找)。现在：
+- 各分析器在初始化时把词库注册进来，所有词编译成一个前缀树正则 (只编译一次)
+- 每条推文只过一遍这个正则 (匹配在 C 里完成)，得到命中的词集合，各分析器共用
+- 命中结果按推文 id 缓存 (LRU)，同一条推文被多个分析器 / 多次回测分析时不再扫描
+匹配语义和原来的子串判断完全一致: 在小写后的文本里找原样的词 (词本身不转小写)，
+重叠、互相包含的词 (doge / dogecoin) 都会命中
+
+用法:
+    engine = get_engine()
+    engine.register(['doge', 'dogecoin'], ['lol', 'haha'])
+    found = engine.scan("Dogecoin to the moon lol", tweet_id='1')   # frozenset({'doge', 'dogecoin', 'lol'})
+    engine.scan_many([(text, tweet_id), ...])
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+CACHE_SIZE = 20000  # 按推文 id 缓存的命中结果条数
+
+
+def _trie_regex(terms: Iterable[str]) -> str:
+    """
+    词表 → 前缀树形状的正则 (公共前缀只比较一次)
+    同一位置能匹配多个词时，贪婪的可选分支保证匹配到最长的那个
+    """
+    root: Dict = {}
+    for term in terms:
+        node = root
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = True  # 词结束标记
+
+    def emit(node: Dict) -> str:
+        branches = []
+        for ch in sorted(k for k in node if k):
+            child = node[ch]
+            has_children = any(k for k in child)
+            if not has_children:
+                branches.append(re.escape(ch))
+            elif '' in child:
+                branches.append(re.escape(ch) + '(?:' + emit(child) + ')?')
+            else:
+                branches.append(re.escape(ch) + emit(child))
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return emit(root)
+
+
+class TweetEngine:
+    """
+    词库匹配引擎
+    register() 注册词库 (有新词才重新编译)，scan() / scan_many() 返回每条推文命中的词集合
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self.vocabulary: set = set()
+        self.stats = {'scanned': 0, 'cache_hits': 0, 'compiles': 0}
+        self._pattern: Optional[re.Pattern] = None
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        self._cache: "OrderedDict[str, Tuple[str, FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, *lexicons: Iterable[str]):
+        """注册词表 (可以传多个)；词表变了会清空缓存"""
+        terms = {t for lexicon in lexicons for t in lexicon if t}
+        with self._lock:
+            if terms <= self.vocabulary:
+                return
+            self.vocabulary |= terms
+            self._pattern = None
+            self._cache.clear()
+
+    def _compile(self) -> re.Pattern:
+        with self._lock:
+            if self._pattern is None:
+                vocab = sorted(self.vocabulary)
+                # 同一位置只报告最长的词，被它包含的词由这张表补上
+                self._implied = {t: frozenset(u for u in vocab if u in t) for t in vocab}
+                self._pattern = re.compile('(?=(' + _trie_regex(vocab) + '))') if vocab else re.compile('(?!)')
+                self.stats['compiles'] += 1
+            return self._pattern
+
+    def scan(self, text: str, tweet_id: Optional[str] = None) -> FrozenSet[str]:
+        """一条推文命中的词"""
+        return self.scan_many([(text, tweet_id)])[0]
+
+    def scan_many(self, items: List[Tuple[str, Optional[str]]]) -> List[FrozenSet[str]]:
+        """
+        一批推文 [(文本, 推文id), ...]，返回每条命中的词集合 (顺序同输入)
+        有 id 且文本没变的推文直接用缓存
+        """
+        pattern = self._compile()
+        results: List[Optional[FrozenSet[str]]] = [None] * len(items)
+        pending = []
+        with self._lock:
+            for i, (text, tweet_id) in enumerate(items):
+                entry = self._cache.get(str(tweet_id)) if tweet_id is not None else None
+                if entry is not None and entry[0] == text:
+                    self._cache.move_to_end(str(tweet_id))
+                    results[i] = entry[1]
+                    self.stats['cache_hits'] += 1
+                else:
+                    pending.append(i)
+        if not pending:
+            return results
+
+        # 前瞻断言让每个位置都试一次 (重叠的词也能找到)，每个位置报告最长的词，再补上它包含的词
+        findall, implied, empty = pattern.findall, self._implied, frozenset()
+        found = [empty.union(*map(implied.__getitem__, set(findall((items[i][0] or '').lower()))))
+                 for i in pending]
+
+        with self._lock:
+            self.stats['scanned'] += len(pending)
+            for i, hits in zip(pending, found):
+                results[i] = hits
+                text, tweet_id = items[i]
+                if tweet_id is not None:
+                    self._cache[str(tweet_id)] = (text, results[i])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+
+_engine: Optional[TweetEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TweetEngine:
+    """进程内共用一个引擎 (各分析器的词库编译进同一个正则，缓存也共用)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TweetEngine()
+        return _engine
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from elon_content_analyzer import ElonContentAnalyzer
+    from elon_industry_analyzer import ElonIndustryAnalyzer
+    from elon_pro_analyzer import ElonMuskProAnalyzer
+
+    ElonContentAnalyzer(), ElonIndustryAnalyzer()
+    engine = ElonMuskProAnalyzer().engine  # 以脚本运行时本模块是 __main__，要用分析器导入的那个引擎
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    samples = ['Dogecoin to the moon 🚀 lol', 'Tesla FSD v12 is amazing!', 'Starship launch next week',
+               'Grok is learning fast at xAI', 'The Boring Company tunnel in Vegas', 'gm']
+    items = [(samples[i % len(samples)] + f' #{i}', str(i)) for i in range(n)]
+    start = time.perf_counter()
+    engine.scan_many(items)
+    print(f"🔎 {len(engine.vocabulary)} 个词，{n} 条推文扫描耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    engine.scan_many(items)
+    print(f"♻️ 缓存命中耗时 {(time.perf_counter() - start) * 1000:.1f} ms  {engine.stats}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+推文存储 - 所有推文的唯一数据源
+SQLite 追加写入，按作者 / 时间 / 关键词建索引
+- 抓取脚本统一 add_tweets() 写入
+- 日报/复盘/简报统一 query() 查询，不再逐行解析 Markdown
+- memory/twitter_logs/{date}.md 只是 render_markdown() 渲染出来的视图
+  (迁移前已有的日志内容存进 legacy_logs，渲染时原样保留在渲染标记之上)
+"""
+
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB = '/root/.openclaw/workspace/memory/tweets.db'
+
+TICKER_RE = re.compile(r'\$[A-Za-z]{2,5}\b')
+HASHTAG_RE = re.compile(r'#\w+')
+WORD_RE = re.compile(r'[A-Za-z][A-Za-z0-9]{2,}')
+
+# 渲染出来的日志从这一行开始；这行之上的内容 (迁移前的日志、手写补充) 重新渲染时保留
+RENDER_MARK = '<!-- 以下由推文库自动生成，手写内容请写在这行之上 -->'
+
+
+def extract_keywords(text: str) -> List[str]:
+    """关键词索引: $股票代码、#话题、英文单词 (统一小写)"""
+    words = set(TICKER_RE.findall(text)) | set(HASHTAG_RE.findall(text)) | set(WORD_RE.findall(text))
+    return sorted({w.lower() for w in words})
+
+
+def tweet_key(t: Dict) -> str:
+    """推文唯一键: 优先推文链接/ID，否则 作者+时间(+内容前缀)"""
+    url = t.get('url') or ''
+    if '/status/' in url:
+        return url.split('?')[0].replace('twitter.com', 'x.com')
+    author = t.get('username') or t.get('author', 'unknown')
+    return f"{author}:{t.get('time', '')}:{(t.get('text') or '')[:50]}"
+
+
+class TweetStore:
+    """推文存储"""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        """初始化数据库"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # 每次抓取一条记录（用于统计抓取次数、按批次渲染Markdown）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS fetches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                day TEXT,
+                fetched_at REAL,
+                tweet_count INTEGER DEFAULT 0,
+                new_count INTEGER DEFAULT 0
+            )
+        ''')
+
+        # 推文表（只追加）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tweets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tweet_key TEXT UNIQUE NOT NULL,
+                fetch_id INTEGER,
+                source TEXT,
+                author TEXT,
+                name TEXT,
+                text TEXT,
+                translate TEXT,
+                url TEXT,
+                posted_at TEXT,  -- 推文自身时间（原样保存）
+                time_ago TEXT,
+                day TEXT,  -- 首次抓到的日期（本地时间）
+                fetched_at REAL
+            )
+        ''')
+
+        # 关键词倒排索引
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tweet_keywords (
+                keyword TEXT NOT NULL,
+                tweet_id INTEGER NOT NULL,
+                PRIMARY KEY (keyword, tweet_id)
+            )
+        ''')
+
+        # 日志文件里渲染标记之上的内容 (按天)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS legacy_logs (
+                day TEXT PRIMARY KEY,
+                content TEXT
+            )
+        ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tweets_author ON tweets(author, fetched_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tweets_day ON tweets(day)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tweets_fetched ON tweets(fetched_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_fetches_day ON fetches(day)')
+
+        conn.commit()
+        conn.close()
+
+    # ========== 写入 ==========
+
+    def add_tweets(self, tweets: Iterable[Dict], source: str = 'twitter',
+                   fetched_at: Optional[float] = None) -> List[Dict]:
+        """
+        写入一次抓取的推文，已存在的自动跳过
+        返回本次真正新增的推文
+        """
+        tweets = [t for t in tweets if t.get('text')]
+        fetched_at = fetched_at or time.time()
+        day = datetime.fromtimestamp(fetched_at).strftime('%Y-%m-%d')
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        new_tweets = []
+
+        try:
+            cursor.execute('INSERT INTO fetches (source, day, fetched_at, tweet_count) VALUES (?, ?, ?, ?)',
+                           (source, day, fetched_at, len(tweets)))
+            fetch_id = cursor.lastrowid
+
+            for t in tweets:
+                author = t.get('username') or t.get('author', 'unknown')
+                cursor.execute('''
+                    INSERT OR IGNORE INTO tweets (tweet_key, fetch_id, source, author, name, text,
+                                                  translate, url, posted_at, time_ago, day, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (tweet_key(t), fetch_id, source, author, t.get('name') or author,
+                      t['text'], t.get('translate', ''), t.get('url', ''),
+                      t.get('time', ''), t.get('time_ago', ''), day, fetched_at))
+                if cursor.rowcount == 0:
+                    continue
+
+                tweet_id = cursor.lastrowid
+                keywords = extract_keywords(f"{t['text']} {t.get('translate', '')}")
+                cursor.executemany('INSERT OR IGNORE INTO tweet_keywords (keyword, tweet_id) VALUES (?, ?)',
+                                   [(kw, tweet_id) for kw in keywords])
+                new_tweets.append(t)
+
+            cursor.execute('UPDATE fetches SET new_count = ? WHERE id = ?', (len(new_tweets), fetch_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return new_tweets
+
+    # ========== 查询 ==========
+
+    def query(self, author: Optional[str] = None, day: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              keyword: Optional[str] = None, limit: Optional[int] = None,
+              newest_first: bool = False, after_id: Optional[int] = None) -> List[Dict]:
+        """
+        按作者 / 日期 / 时间范围 / 关键词查询推文
+        keyword: 英文词、$代码、#话题走索引；中文等其他词按子串匹配
+        after_id: 只返回 id 大于它的推文 (增量同步用)
+        """
+        sql = 'SELECT t.* FROM tweets t'
+        where, params = [], []
+
+        if keyword:
+            kw = keyword.lower()
+            if kw in extract_keywords(keyword):
+                sql += ' JOIN tweet_keywords k ON k.tweet_id = t.id'
+                where.append('k.keyword = ?')
+                params.append(kw)
+            else:
+                where.append('(t.text LIKE ? OR t.translate LIKE ?)')
+                params.extend([f'%{keyword}%'] * 2)
+        if author:
+            where.append('t.author = ?')
+            params.append(author)
+        if day:
+            where.append('t.day = ?')
+            params.append(day)
+        if after_id is not None:
+            where.append('t.id > ?')
+            params.append(after_id)
+        if since is not None:
+            where.append('t.fetched_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('t.fetched_at < ?')
+            params.append(until)
+
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY t.fetched_at {0}, t.id {0}'.format('DESC' if newest_first else 'ASC')
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def count_fetches(self, day: str) -> int:
+        """某天的抓取次数"""
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM fetches WHERE day = ?', (day,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    # ========== Markdown 视图 ==========
+
+    def legacy_log(self, day: str) -> str:
+        """某天日志里不由推文库渲染的内容"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT content FROM legacy_logs WHERE day = ?', (day,)).fetchone()
+            return row['content'] if row else ''
+        finally:
+            conn.close()
+
+    def save_legacy_log(self, day: str, content: str):
+        conn = self._connect()
+        try:
+            conn.execute('INSERT OR REPLACE INTO legacy_logs (day, content) VALUES (?, ?)',
+                         (day, content.strip()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def render_markdown(self, day: str, accounts: str = '') -> str:
+        """把某天的推文渲染成每日Markdown日志（按抓取批次、作者分组），保留的旧内容放在最前面"""
+        legacy = self.legacy_log(day)
+        lines = [legacy, ""] if legacy else []
+        lines += [RENDER_MARK, f"# 🐦 Twitter 抓取记录 - {day}", ""]
+        if accounts:
+            lines += [f"📊 监控账号: {accounts}", ""]
+        lines += ["---", ""]
+
+        batches: Dict[int, List[Dict]] = {}
+        for t in self.query(day=day):
+            batches.setdefault(t['fetch_id'], []).append(t)
+
+        for batch in batches.values():
+            fetched = datetime.fromtimestamp(batch[0]['fetched_at']).strftime('%H:%M')
+            lines += ["", f"## 📅 {fetched} 更新 · {len(batch)} 条新推文", ""]
+
+            by_author: Dict[str, List[Dict]] = {}
+            for t in batch:
+                by_author.setdefault(t['author'], []).append(t)
+
+            for author, author_tweets in by_author.items():
+                lines += [f"### 👤 {author_tweets[0]['name']} `@{author}`", ""]
+                for i, t in enumerate(author_tweets, 1):
+                    time_display = t['time_ago'] or t['posted_at'] or '未知'
+                    url = t['url'] or f'https://x.com/{author}'
+                    lines.append(f"**{i}.** [{time_display}]({url})")
+                    lines.append(f"> 📝 {t['text']}")
+                    if t['translate'] and t['translate'] != t['text']:
+                        lines.append(f"> 🈯 {t['translate']}")
+                    lines.append("")
+                lines.append("")
+            lines.append("---")
+
+        return "\n".join(lines) + "\n"
+
+    def write_markdown(self, day: str, path: str, accounts: str = ''):
+        """
+        重新渲染并写出某天的Markdown日志
+        已有文件里渲染标记之上的内容 (迁移前追加的日志没有标记，整个文件都算) 先存进推文库再渲染，不会被覆盖
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.save_legacy_log(day, f.read().split(RENDER_MARK)[0])
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.render_markdown(day, accounts))
@@ -8,7 +8,11 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+from dashboard_renderer import DashboardRenderer, with_delta_polling, write_if_changed
+
 DASHBOARD_DIR = "/root/.openclaw/workspace/lobster-workspace/dashboard"
+TWITTER_BODY_ID = "twitterContainer"  # 和 scripts/twitter_auto_deploy.py 用同一个 id
+NEWS_BODY_ID = "newsContainer"
 
 def load_json(filename):
     """加载 JSON 文件"""
@@ -118,27 +122,38 @@ def update_html():
     tweets_html = generate_tweet_html(tweets_data)
     news_html = generate_news_html(news_data)
     
+    # 卡片内容区带上 id，data.delta.json 里按 id 整块替换 (card-system.js pollDelta)
+    twitter_body = f'<div class="card-body" id="{TWITTER_BODY_ID}">\n{tweets_html}\n</div>'
+    news_body = f'<div class="card-body" id="{NEWS_BODY_ID}">\n{news_html}\n</div>'
+    
     # 更新 Twitter 卡片
-    twitter_pattern = r'(<!-- 第二栏：Twitter -->.*?<div class="card-body">)(.*?)(</div>\s*<a href="tweets.html")'
-    twitter_replacement = r'\1\n' + tweets_html + r'\n\3'
-    html = re.sub(twitter_pattern, twitter_replacement, html, flags=re.DOTALL)
+    twitter_pattern = r'(<!-- 第二栏：Twitter -->.*?)<div class="card-body"[^>]*>.*?</div>(\s*<a href="tweets.html")'
+    html = re.sub(twitter_pattern, lambda m: m.group(1) + twitter_body + m.group(2), html, flags=re.DOTALL)
     
     # 更新财经要报卡片
-    news_pattern = r'(<!-- 第三栏：财经要报 -->.*?<div class="card-body">)(.*?)(</div>\s*</div>\s*</div>\s*</main>)'
-    news_replacement = r'\1\n' + news_html + r'\n\3'
-    html = re.sub(news_pattern, news_replacement, html, flags=re.DOTALL)
+    news_pattern = r'(<!-- 第三栏：财经要报 -->.*?)<div class="card-body"[^>]*>.*?</div>(\s*</div>\s*</div>\s*</main>)'
+    html = re.sub(news_pattern, lambda m: m.group(1) + news_body + m.group(2), html, flags=re.DOTALL)
     
     # 更新时间戳
     now = datetime.now().strftime('%Y-%m-%d %H:%M')
     html = re.sub(r'更新于: \d{4}-\d{2}-\d{2} \d{2}:\d{2}', f'更新于: {now}', html)
     
-    # 写回文件
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # 页面轮询 data.delta.json 局部刷新，不再整页重载
+    html = with_delta_polling(html)
+    
+    # 写回文件 (只有时间戳变化时不写)
+    if not write_if_changed(str(index_path), html, ignore=[r'更新于: \d{4}-\d{2}-\d{2} \d{2}:\d{2}']):
+        print(f"⏭️ Dashboard 内容无变化，跳过写入")
+        return False
+    
+    # 增量数据，供 card-system.js 轮询
+    DashboardRenderer(DASHBOARD_DIR).publish({'tweets': tweets_data, 'news': news_data},
+                                             extra_cards={TWITTER_BODY_ID: twitter_body, NEWS_BODY_ID: news_body})
     
     print(f"✅ Dashboard 已更新: {now}")
     print(f"   - Twitter 推文: {len(tweets_data.get('tweets', {})) if tweets_data else 0} 位作者")
     print(f"   - 财经新闻: {len(news_data.get('news', [])) if news_data else 0} 条")
+    return True
 
 if __name__ == '__main__':
     update_html()
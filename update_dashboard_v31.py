@@ -12,6 +12,8 @@ import os
 import sys
 import subprocess
 
+from dashboard_renderer import write_if_changed
+
 # 禁用SSL验证
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -506,14 +508,14 @@ def main():
         'updated_at': datetime.now(timezone.utc).isoformat()
     }
     
-    # 保存数据
-    with open(f'{dashboard_dir}/data.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 保存数据 (除更新时间外没有变化就不写)
+    write_if_changed(f'{dashboard_dir}/data.json', json.dumps(data, ensure_ascii=False, indent=2),
+                     ignore=[r'"updated_at": "[^"]*"'])
     
-    # 生成并保存HTML
+    # 生成并保存HTML (页面里的时间不算变化)
     html = generate_html(data, price_chart_svg)
-    with open(f'{dashboard_dir}/index.html', 'w', encoding='utf-8') as f:
-        f.write(html)
+    if not write_if_changed(f'{dashboard_dir}/index.html', html, ignore=[r'\d{4}-\d{2}-\d{2} \d{2}:\d{2} UTC']):
+        log("页面内容无变化，跳过写入")
     
     log(f"Dashboard更新完成! 当前股价: {stock_data['price']} HKD")
     log("="*50)
@@ -13,6 +13,11 @@ import os
 import sys
 import math
 
+from dashboard_renderer import DashboardRenderer, compile_template
+from market_calendar import cached_quote
+
+DASHBOARD_DIR = '/home/ubuntu/dashboard'
+
 # 禁用SSL验证
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -83,6 +88,13 @@ def get_hk_stock_price_sina(stock_code):
     return None
 
 def get_stock_price(stock_code):
+    """港股休市 (午休/收盘/节假日) 时直接返回收盘缓存，不请求接口"""
+    result = cached_quote('hk', f'hk{stock_code}', lambda: _fetch_stock_price(stock_code))
+    if result and result.get('cached'):
+        log(f"✓ 港股休市，使用收盘价: {result['price']} HKD")
+    return result
+
+def _fetch_stock_price(stock_code):
     result = get_hk_stock_price_tencent(stock_code)
     if result:
         log(f"✓ 腾讯API获取成功: {result['price']} HKD")
@@ -113,6 +125,8 @@ def save_price_history(history):
 
 def update_price_history(stock_data):
     history = load_price_history()
+    if stock_data.get('cached') and history:
+        return history  # 休市期间价格不变，不重复记点
     now = datetime.now(timezone.utc)
     new_point = {
         'time': now.isoformat(),
@@ -517,44 +531,112 @@ def get_price_alert(history, current_price, rsi=None):
     # 返回最重要的预警
     return alerts[0] if alerts else None
 
-def generate_html(data, price_chart_svg):
-    stock = data.get('stock', {})
+# 页面骨架 (预编译，占位符 $name)
+PAGE_TEMPLATE = compile_template('''<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>投资监控仪表板 | 一键</title>
+<style>
+*{margin:0;padding:0;box-sizing:border-box}
+body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI','Microsoft YaHei',sans-serif;background:#0a0e14;color:#e6e6e6;padding:15px;line-height:1.6}
+.header{text-align:center;padding:25px;background:linear-gradient(135deg,#1a2332,#0d1117);border-radius:16px;margin-bottom:20px;border:1px solid #30363d}
+.header h1{color:#00d4aa;font-size:28px;margin-bottom:8px}
+.clock{font-size:18px;color:#58a6ff;font-family:monospace}
+.market-sentiment{margin-top:10px;font-size:14px;color:#8b949e}
+.grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(350px,1fr));gap:16px;max-width:1400px;margin:0 auto}
+.card{background:#161b22;border-radius:16px;padding:20px;border:1px solid #30363d;transition:transform .2s}
+.card:hover{transform:translateY(-4px)}
+.card h2{color:#00d4aa;font-size:16px;margin-bottom:15px;display:flex;align-items:center;gap:10px}
+.price{font-size:32px;font-weight:700}
+.change{display:inline-block;padding:6px 14px;border-radius:20px;font-size:14px;background:rgba(0,212,170,.2);margin-top:8px}
+.agc-box{background:linear-gradient(135deg,rgba(255,215,0,.1),rgba(255,215,0,.05));border:1px solid rgba(255,215,0,.3)}
+.agc-box h2{color:#ffd700}
+.agc-amount{font-size:36px;font-weight:800;color:#ffd700;text-shadow:0 0 20px rgba(255,215,0,.3)}
+.levels{margin-top:15px}
+.level{display:flex;justify-content:space-between;padding:10px 0;border-bottom:1px solid #21262d;font-size:14px}
+.level:last-child{border-bottom:none}
+.tweet{border-left:3px solid #00d4aa;padding:12px;margin:10px 0;background:#0f1419;border-radius:0 8px 8px 0;transition:all .2s}
+.tweet:hover{background:#161b22}
+.tweet-author{color:#00d4aa;font-size:13px;font-weight:600}
+.tweet-text{color:#c9d1d9;font-size:14px;margin-top:4px}
+.alert-box{background:rgba(255,59,59,.1);border-left:3px solid #ff3b3b;padding:12px;margin:10px 0;border-radius:0 8px 8px 0;transition:all .2s}
+.alert-box:hover{background:rgba(255,59,59,.15)}
+.alert-box.success{background:rgba(0,212,170,.1);border-left:3px solid #00d4aa}
+.alert-box.info{background:rgba(88,166,255,.1);border-left:3px solid #58a6ff}
+.alert-title{font-weight:600;font-size:14px}
+.alert-text{color:#8b949e;font-size:13px;margin-top:4px}
+.news-item{padding:10px 0;border-bottom:1px solid #21262d;transition:all .2s}
+.news-item:hover{background:#0f1419;padding-left:8px}
+.news-item:last-child{border-bottom:none}
+.news-title{color:#c9d1d9;font-size:14px}
+.news-time{color:#666;font-size:12px;margin-top:4px}
+.task{display:flex;align-items:center;gap:10px;padding:8px 0}
+.status{width:8px;height:8px;border-radius:50%}
+.ok{background:#00d4aa}.pending{background:#ffd93d}.error{background:#ff3b3b}
+.footer{text-align:center;margin-top:30px;padding:20px;color:#666;font-size:13px}
+a{color:#58a6ff;text-decoration:none}a:hover{text-decoration:underline}
+.refresh-btn{background:#00d4aa;color:#0a0e14;padding:10px 20px;border-radius:8px;border:none;cursor:pointer;font-weight:600;margin-top:10px}
+.refresh-btn:hover{background:#00ffaa}
+.update-badge{background:#238636;color:#fff;font-size:11px;padding:2px 8px;border-radius:10px;margin-left:8px}
+.price-chart{margin-top:10px;border-radius:8px;overflow:hidden}
+.metric{display:flex;justify-content:space-between;padding:6px 0;font-size:13px;color:#8b949e}
+.metric-value{color:#00d4aa;font-weight:600}
+.stock-info{display:grid;grid-template-columns:1fr 1fr;gap:8px;margin-top:12px;padding:10px;background:#0f1419;border-radius:8px}
+.stock-info-item{text-align:center}
+.stock-info-label{font-size:11px;color:#666}
+.stock-info-value{font-size:14px;color:#c9d1d9;margin-top:2px}
+.health-box{background:rgba(0,212,170,.05);border:1px solid rgba(0,212,170,.2);padding:10px;border-radius:8px;margin-top:10px}
+.health-status{font-size:13px}
+.health-ok{color:#00d4aa}
+.health-warn{color:#ffd93d}
+.version-tag{font-size:11px;color:#666;background:#0f1419;padding:2px 8px;border-radius:4px}
+.indicator-box{background:#0f1419;border-radius:8px;padding:12px;margin-top:10px}
+.trend-box{background:linear-gradient(135deg,rgba(0,212,170,.05),rgba(88,166,255,.05));border:1px solid rgba(0,212,170,.2);border-radius:8px;padding:12px;margin-top:10px}
+.trend-header{font-size:16px;font-weight:700;margin-bottom:5px}
+.trend-desc{font-size:12px;color:#8b949e;margin-bottom:3px}
+.trend-volatility{font-size:11px;color:#666}
+</style></head><body>
+$header
+<div class="grid">
+$cards
+</div>
+<div class="footer">🚀 Dashboard 实时更新 | 24小时监控 | 自动刷新(5分钟) | 腾讯云新加坡 | 最后更新: <span data-field="updated_at">$updated_at</span></div>
+<script src="js/card-system.js"></script>
+<script>
+function updateClock(){
+    const now = new Date();
+    document.getElementById('clock').textContent = now.toISOString().slice(0,16).replace('T',' ') + ' UTC';
+}
+setInterval(updateClock, 1000);
+updateClock();
+// 有 card-system.js 时轮询增量局部刷新，否则退回整页刷新
+if (typeof dashboardCards !== 'undefined') {
+    dashboardCards.pollDelta('data.delta.json', 300000);
+} else {
+    setInterval(()=>location.reload(),300000);
+}
+</script>
+</body></html>''')
+
+# 时间只由页面脚本 / data.json 更新，比较页面是否变化时忽略
+UPDATED_AT_RE = r'<span data-field="updated_at">[^<]*</span>'
+
+
+def render_header(market):
+    hsi_html = ""
+    if market:
+        hsi_color = '#00d4aa' if market['hsi_change'] >= 0 else '#ff3b3b'
+        hsi_html = f"恒指: {market['hsi_price']:.0f} (<span style='color:{hsi_color}'>{market['hsi_change']:+.2f}%</span>)"
+    return f'<div class="header" data-card-id="header"><h1>📊 投资监控仪表板</h1><div class="clock" id="clock">--</div><div class="market-sentiment">{hsi_html}</div></div>'
+
+
+def render_stock_card(d):
+    stock, indicators, trend = d['stock'], d['indicators'], d['trend']
     price = stock.get('price', 63.50)
     change = stock.get('change_percent', 0)
     change_symbol = '+' if change >= 0 else ''
     change_color = '#00d4aa' if change >= 0 else '#ff3b3b'
-    current_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
     targets = calculate_targets(price)
-    health = data.get('system_health', {'status': 'ok', 'issues': []})
-    market = data.get('market_sentiment', {})
-    indicators = data.get('indicators', {})
-    trend = data.get('trend_analysis', {})
-    
-    health_status = "✅ 正常" if health['status'] == 'ok' else "⚠️ 警告"
-    health_issues = " | ".join(health['issues']) if health['issues'] else "无"
-    
-    hsi_html = ""
-    if market:
-        hsi_color = '#00d4aa' if market['hsi_change'] >= 0 else '#ff3b3b'
-        hsi_html = f"恒指: {market['hsi_price']:.0f} (<span style='color:{hsi_color}'>{market['hsi_change']:+.2f}%</span>)"
-    
-    twitter_html = "".join([
-        f'<div class="tweet"><div class="tweet-author">{t["author"]} · {t["time"]}</div><div class="tweet-text">{t["text"]}</div></div>'
-        for t in data.get('tweets', [])
-    ])
-    
-    news_html = "".join([
-        f'<div class="news-item"><div class="news-title">{n["title"]}</div><div class="news-time">{n["time"]} · {n["tag"]}</div></div>'
-        for n in data.get('news', [])
-    ])
-    
-    # 获取价格预警
-    alert_html = ""
-    if data.get('price_alert'):
-        alert = data['price_alert']
-        color = '#ff3b3b' if alert['type'] == 'warning' else '#00d4aa' if alert['type'] == 'success' else '#58a6ff'
-        alert_html = f'<div class="alert-box"><div class="alert-title" style="color:{color}">{alert["title"]}</div><div class="alert-text">{alert["text"]}</div></div>'
-    
+
     # 技术指标显示
     indicator_html = ""
     if indicators:
@@ -573,87 +655,21 @@ def generate_html(data, price_chart_svg):
             <div class="metric"><span>MACD</span><span style="color:{macd_color}">{indicators.get('macd', '--'):.3f}</span></div>
         </div>
         '''
-    
+
     # 趋势分析
     trend_html = ""
     if trend:
         trend_color = '#00d4aa' if trend.get('change_pct', 0) > 0 else '#ff3b3b' if trend.get('change_pct', 0) < 0 else '#8b949e'
         trend_html = f'''
         <div class="trend-box">
-            <div class="trend-header">{trend.get('trend', '')}</div>
+            <div class="trend-header" style="color:{trend_color}">{trend.get('trend', '')}</div>
             <div class="trend-desc">{trend.get('trend_desc', '')}</div>
             <div class="trend-volatility">{trend.get('volatility', '')}</div>
         </div>
         '''
-    
-    return f'''<!DOCTYPE html>
-<html lang="zh-CN"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>投资监控仪表板 | 一键</title>
-<style>
-*{{margin:0;padding:0;box-sizing:border-box}}
-body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI','Microsoft YaHei',sans-serif;background:#0a0e14;color:#e6e6e6;padding:15px;line-height:1.6}}
-.header{{text-align:center;padding:25px;background:linear-gradient(135deg,#1a2332,#0d1117);border-radius:16px;margin-bottom:20px;border:1px solid #30363d}}
-.header h1{{color:#00d4aa;font-size:28px;margin-bottom:8px}}
-.clock{{font-size:18px;color:#58a6ff;font-family:monospace}}
-.market-sentiment{{margin-top:10px;font-size:14px;color:#8b949e}}
-.grid{{display:grid;grid-template-columns:repeat(auto-fit,minmax(350px,1fr));gap:16px;max-width:1400px;margin:0 auto}}
-.card{{background:#161b22;border-radius:16px;padding:20px;border:1px solid #30363d;transition:transform .2s}}
-.card:hover{{transform:translateY(-4px)}}
-.card h2{{color:#00d4aa;font-size:16px;margin-bottom:15px;display:flex;align-items:center;gap:10px}}
-.price{{font-size:32px;font-weight:700;color:{change_color}}}
-.change{{display:inline-block;padding:6px 14px;border-radius:20px;font-size:14px;background:rgba(0,212,170,.2);color:{change_color};margin-top:8px}}
-.agc-box{{background:linear-gradient(135deg,rgba(255,215,0,.1),rgba(255,215,0,.05));border:1px solid rgba(255,215,0,.3)}}
-.agc-box h2{{color:#ffd700}}
-.agc-amount{{font-size:36px;font-weight:800;color:#ffd700;text-shadow:0 0 20px rgba(255,215,0,.3)}}
-.levels{{margin-top:15px}}
-.level{{display:flex;justify-content:space-between;padding:10px 0;border-bottom:1px solid #21262d;font-size:14px}}
-.level:last-child{{border-bottom:none}}
-.tweet{{border-left:3px solid #00d4aa;padding:12px;margin:10px 0;background:#0f1419;border-radius:0 8px 8px 0;transition:all .2s}}
-.tweet:hover{{background:#161b22}}
-.tweet-author{{color:#00d4aa;font-size:13px;font-weight:600}}
-.tweet-text{{color:#c9d1d9;font-size:14px;margin-top:4px}}
-.alert-box{{background:rgba(255,59,59,.1);border-left:3px solid #ff3b3b;padding:12px;margin:10px 0;border-radius:0 8px 8px 0;transition:all .2s}}
-.alert-box:hover{{background:rgba(255,59,59,.15)}}
-.alert-box.success{{background:rgba(0,212,170,.1);border-left:3px solid #00d4aa}}
-.alert-box.info{{background:rgba(88,166,255,.1);border-left:3px solid #58a6ff}}
-.alert-title{{font-weight:600;font-size:14px}}
-.alert-text{{color:#8b949e;font-size:13px;margin-top:4px}}
-.news-item{{padding:10px 0;border-bottom:1px solid #21262d;transition:all .2s}}
-.news-item:hover{{background:#0f1419;padding-left:8px}}
-.news-item:last-child{{border-bottom:none}}
-.news-title{{color:#c9d1d9;font-size:14px}}
-.news-time{{color:#666;font-size:12px;margin-top:4px}}
-.task{{display:flex;align-items:center;gap:10px;padding:8px 0}}
-.status{{width:8px;height:8px;border-radius:50%}}
-.ok{{background:#00d4aa}}.pending{{background:#ffd93d}}.error{{background:#ff3b3b}}
-.footer{{text-align:center;margin-top:30px;padding:20px;color:#666;font-size:13px}}
-a{{color:#58a6ff;text-decoration:none}}a:hover{{text-decoration:underline}}
-.refresh-btn{{background:#00d4aa;color:#0a0e14;padding:10px 20px;border-radius:8px;border:none;cursor:pointer;font-weight:600;margin-top:10px}}
-.refresh-btn:hover{{background:#00ffaa}}
-.update-badge{{background:#238636;color:#fff;font-size:11px;padding:2px 8px;border-radius:10px;margin-left:8px}}
-.price-chart{{margin-top:10px;border-radius:8px;overflow:hidden}}
-.metric{{display:flex;justify-content:space-between;padding:6px 0;font-size:13px;color:#8b949e}}
-.metric-value{{color:#00d4aa;font-weight:600}}
-.stock-info{{display:grid;grid-template-columns:1fr 1fr;gap:8px;margin-top:12px;padding:10px;background:#0f1419;border-radius:8px}}
-.stock-info-item{{text-align:center}}
-.stock-info-label{{font-size:11px;color:#666}}
-.stock-info-value{{font-size:14px;color:#c9d1d9;margin-top:2px}}
-.health-box{{background:rgba(0,212,170,.05);border:1px solid rgba(0,212,170,.2);padding:10px;border-radius:8px;margin-top:10px}}
-.health-status{{font-size:13px}}
-.health-ok{{color:#00d4aa}}
-.health-warn{{color:#ffd93d}}
-.version-tag{{font-size:11px;color:#666;background:#0f1419;padding:2px 8px;border-radius:4px}}
-.indicator-box{{background:#0f1419;border-radius:8px;padding:12px;margin-top:10px}}
-.trend-box{{background:linear-gradient(135deg,rgba(0,212,170,.05),rgba(88,166,255,.05));border:1px solid rgba(0,212,170,.2);border-radius:8px;padding:12px;margin-top:10px}}
-.trend-header{{font-size:16px;font-weight:700;color:{trend_color};margin-bottom:5px}}
-.trend-desc{{font-size:12px;color:#8b949e;margin-bottom:3px}}
-.trend-volatility{{font-size:11px;color:#666}}
-</style></head><body>
-<div class="header"><h1>📊 投资监控仪表板</h1><div class="clock" id="clock">{current_time}</div><div class="market-sentiment">{hsi_html}</div></div>
-<div class="grid">
 
-<div class="card"><h2>🦞 英诺赛科 (02577.HK) <span class="update-badge">实时</span></h2><div class="price">{price:.2f} HKD</div><span class="change">{change_symbol} {change:+.2f}%</span>
-<div class="price-chart">{price_chart_svg}</div>
+    return f'''<div class="card" data-card-id="stock"><h2>🦞 英诺赛科 (02577.HK) <span class="update-badge">实时</span></h2><div class="price" style="color:{change_color}">{price:.2f} HKD</div><span class="change" style="color:{change_color}">{change_symbol} {change:+.2f}%</span>
+<div class="price-chart">{d['chart_svg']}</div>
 {trend_html}
 <div class="stock-info">
 <div class="stock-info-item"><div class="stock-info-label">今开</div><div class="stock-info-value">{stock.get('open', price):.2f}</div></div>
@@ -662,21 +678,47 @@ a{{color:#58a6ff;text-decoration:none}}a:hover{{text-decoration:underline}}
 <div class="stock-info-item"><div class="stock-info-label">最低</div><div class="stock-info-value">{stock.get('low', price*0.98):.2f}</div></div>
 </div>
 {indicator_html}
-<div class="levels"><div class="level"><span>{targets['抢跑位']['label']} 抢跑位 (76 HKD)</span><span style="color:#ffd93d">{targets['抢跑位']['change']:+.1f}%</span></div><div class="level"><span>{targets['确认位']['label']} 确认位 (82 HKD)</span><span style="color:#00d4aa">{targets['确认位']['change']:+.1f}%</span></div><div class="level"><span>{targets['清仓位']['label']} 清仓位 (90 HKD)</span><span style="color:#ff6b6b">{targets['清仓位']['change']:+.1f}%</span></div></div></div>
+<div class="levels"><div class="level"><span>{targets['抢跑位']['label']} 抢跑位 (76 HKD)</span><span style="color:#ffd93d">{targets['抢跑位']['change']:+.1f}%</span></div><div class="level"><span>{targets['确认位']['label']} 确认位 (82 HKD)</span><span style="color:#00d4aa">{targets['确认位']['change']:+.1f}%</span></div><div class="level"><span>{targets['清仓位']['label']} 清仓位 (90 HKD)</span><span style="color:#ff6b6b">{targets['清仓位']['change']:+.1f}%</span></div></div></div>'''
+
+
+AGC_CARD = '''<div class="card agc-box" data-card-id="agc"><h2>⛏️ AgentCoin 挖矿 <span class="update-badge">实时</span></h2><div class="agc-amount">200,000 AGC</div><p style="color:#ffd700;margin-top:10px">💰 BNB余额: 0.312 (可挖62次)</p><p style="color:#ffd700;margin-top:8px">⛏️ 全网挖矿: 98 次</p><p style="color:#8b949e;font-size:13px">🤖 自动挖矿运行中 | 每5分钟答题</p><a href="https://bscscan.com/address/0xf2BD3694E7B0505cEcC4317B3Da8F86D54d770DA" target="_blank">查看链上记录 ↗</a></div>'''
+
+
+def render_twitter_card(tweets):
+    twitter_html = "".join([
+        f'<div class="tweet"><div class="tweet-author">{t["author"]} · {t["time"]}</div><div class="tweet-text">{t["text"]}</div></div>'
+        for t in tweets
+    ])
+    return f'<div class="card" data-card-id="twitter"><h2>🐦 Twitter 重点 <span class="update-badge">精选</span></h2>{twitter_html}</div>'
+
+
+def render_alert_card(alert):
+    # 获取价格预警
+    alert_html = ""
+    if alert:
+        color = '#ff3b3b' if alert['type'] == 'warning' else '#00d4aa' if alert['type'] == 'success' else '#58a6ff'
+        alert_html = f'<div class="alert-box"><div class="alert-title" style="color:{color}">{alert["title"]}</div><div class="alert-text">{alert["text"]}</div></div>'
+    return f'<div class="card" data-card-id="alerts"><h2>🚨 预警提醒 <span class="update-badge">AI监控</span></h2>{alert_html}<div class="alert-box"><div class="alert-title">⚡ SNDK 黄昏之星</div><div class="alert-text">存储龙头走出顶部反转形态，建议减仓锁定利润</div></div><div class="alert-box"><div class="alert-title">⚡ 中国铝业跌 3.94%</div><div class="alert-text">上游供应商异常波动，关注金属镓价格走势</div></div><div class="alert-box"><div class="alert-title">⚡ 五角大楼清单风险</div><div class="alert-text">阿里/百度/比亚迪可能被列入军方清单，中概股承压</div></div></div>'
 
-<div class="card agc-box"><h2>⛏️ AgentCoin 挖矿 <span class="update-badge">实时</span></h2><div class="agc-amount">200,000 AGC</div><p style="color:#ffd700;margin-top:10px">💰 BNB余额: 0.312 (可挖62次)</p><p style="color:#ffd700;margin-top:8px">⛏️ 全网挖矿: 98 次</p><p style="color:#8b949e;font-size:13px">🤖 自动挖矿运行中 | 每5分钟答题</p><a href="https://bscscan.com/address/0xf2BD3694E7B0505cEcC4317B3Da8F86D54d770DA" target="_blank">查看链上记录 ↗</a></div>
 
-<div class="card"><h2>🐦 Twitter 重点 <span class="update-badge">精选</span></h2>{twitter_html}</div>
+def render_news_card(news):
+    news_html = "".join([
+        f'<div class="news-item"><div class="news-title">{n["title"]}</div><div class="news-time">{n["time"]} · {n["tag"]}</div></div>'
+        for n in news
+    ])
+    return f'<div class="card" data-card-id="news"><h2>📰 财经要闻 <span class="update-badge">实时</span></h2>{news_html}</div>'
 
-<div class="card"><h2>🚨 预警提醒 <span class="update-badge">AI监控</span></h2>{alert_html}<div class="alert-box"><div class="alert-title">⚡ SNDK 黄昏之星</div><div class="alert-text">存储龙头走出顶部反转形态，建议减仓锁定利润</div></div><div class="alert-box"><div class="alert-title">⚡ 中国铝业跌 3.94%</div><div class="alert-text">上游供应商异常波动，关注金属镓价格走势</div></div><div class="alert-box"><div class="alert-title">⚡ 五角大楼清单风险</div><div class="alert-text">阿里/百度/比亚迪可能被列入军方清单，中概股承压</div></div></div>
 
-<div class="card"><h2>📰 财经要闻 <span class="update-badge">实时</span></h2>{news_html}</div>
+STATIC_CARDS = '''<div class="card" data-card-id="datacenter"><h2>🏢 AI数据中心动态 <span class="update-badge">监控</span></h2><div class="news-item"><div class="news-title">英伟达数据中心业务Q4营收预期上调，Blackwell需求强劲</div><div class="news-time">今日 08:30 · 财报</div></div><div class="news-item"><div class="news-title">CoreWeave算力租赁价格月涨15%，AI算力持续紧张</div><div class="news-time">今日 08:30 · 算力</div></div></div>
 
-<div class="card"><h2>🏢 AI数据中心动态 <span class="update-badge">监控</span></h2><div class="news-item"><div class="news-title">英伟达数据中心业务Q4营收预期上调，Blackwell需求强劲</div><div class="news-time">今日 08:30 · 财报</div></div><div class="news-item"><div class="news-title">CoreWeave算力租赁价格月涨15%，AI算力持续紧张</div><div class="news-time">今日 08:30 · 算力</div></div></div>
+<div class="card" data-card-id="tasks"><h2>📅 任务追踪</h2><div class="task"><span class="status ok"></span><span>09:15 英诺赛科股价监控 ✓</span></div><div class="task"><span class="status ok"></span><span>10:00 Twitter监控推送 ✓</span></div><div class="task"><span class="status ok"></span><span>21:35 BOTCOIN自动解谜 ✓</span></div><div class="task"><span class="status pending"></span><span>⏳ BOTCOIN解锁: 明日21:38</span></div><div class="task"><span class="status ok"></span><span>Dashboard自动优化 ✓</span></div></div>'''
 
-<div class="card"><h2>📅 任务追踪</h2><div class="task"><span class="status ok"></span><span>09:15 英诺赛科股价监控 ✓</span></div><div class="task"><span class="status ok"></span><span>10:00 Twitter监控推送 ✓</span></div><div class="task"><span class="status ok"></span><span>21:35 BOTCOIN自动解谜 ✓</span></div><div class="task"><span class="status pending"></span><span>⏳ BOTCOIN解锁: 明日21:38</span></div><div class="task"><span class="status ok"></span><span>Dashboard自动优化 ✓</span></div></div>
 
-<div class="card"><h2>🖥️ 系统状态 <span class="version-tag">v3.5</span></h2>
+def render_system_card(d):
+    health = d['health']
+    health_status = "✅ 正常" if health['status'] == 'ok' else "⚠️ 警告"
+    health_issues = " | ".join(health['issues']) if health['issues'] else "无"
+    return f'''<div class="card" data-card-id="system"><h2>🖥️ 系统状态 <span class="version-tag">v3.5</span></h2>
 <div class="health-box">
 <div class="health-status {'health-ok' if health['status'] == 'ok' else 'health-warn'}">{health_status}</div>
 <div style="font-size:12px;color:#666;margin-top:5px">{health_issues}</div>
@@ -685,30 +727,46 @@ a{{color:#58a6ff;text-decoration:none}}a:hover{{text-decoration:underline}}
 <div class="metric"><span>Dashboard版本</span><span class="metric-value">v3.5</span></div>
 <div class="metric"><span>自动更新</span><span class="metric-value">每5分钟</span></div>
 <div class="metric"><span>Nginx状态</span><span class="metric-value">运行中</span></div>
-<div class="metric"><span>价格历史记录</span><span class="metric-value">{data.get('price_history_count', 0)}条</span></div>
+<div class="metric"><span>价格历史记录</span><span class="metric-value">{d['price_history_count']}条</span></div>
 </div>
-</div>
-
-<div class="card"><h2>🔗 快速链接</h2><div class="news-item"><a href="https://www.hkexnews.hk" target="_blank">📈 港交所披露易</a></div><div class="news-item"><a href="https://quote.eastmoney.com/hk/02577.html" target="_blank">📊 东方财富-英诺赛科</a></div><div class="news-item"><a href="https://x.com" target="_blank">🐦 Twitter/X</a></div><div class="news-item"><a href="https://www.zhitongcaijing.com" target="_blank">📰 智通财经</a></div><button class="refresh-btn" onclick="location.reload()">🔄 立即刷新</button></div>
-
-</div>
-<div class="footer">🚀 Dashboard 实时更新 | 24小时监控 | 自动刷新(5分钟) | 腾讯云新加坡 | 最后更新: {current_time}</div>
-<script>
-function updateClock(){{
-    const now = new Date();
-    document.getElementById('clock').textContent = now.toISOString().slice(0,16).replace('T',' ') + ' UTC';
-}}
-setInterval(updateClock, 1000);
-updateClock();
-setInterval(()=>location.reload(),300000);
-</script>
-</body></html>'''
+</div>'''
+
+
+LINKS_CARD = '''<div class="card" data-card-id="links"><h2>🔗 快速链接</h2><div class="news-item"><a href="https://www.hkexnews.hk" target="_blank">📈 港交所披露易</a></div><div class="news-item"><a href="https://quote.eastmoney.com/hk/02577.html" target="_blank">📊 东方财富-英诺赛科</a></div><div class="news-item"><a href="https://x.com" target="_blank">🐦 Twitter/X</a></div><div class="news-item"><a href="https://www.zhitongcaijing.com" target="_blank">📰 智通财经</a></div><button class="refresh-btn" onclick="location.reload()">🔄 立即刷新</button></div>'''
+
+
+def generate_html(data, price_chart_svg, renderer=None):
+    """按卡片渲染页面；数据没变的卡片直接复用 renderer 缓存的片段"""
+    renderer = renderer or DashboardRenderer(DASHBOARD_DIR)
+    cards = [
+        renderer.card('stock', {
+            'stock': data.get('stock', {}),
+            'indicators': data.get('indicators', {}),
+            'trend': data.get('trend_analysis', {}),
+            'chart_svg': price_chart_svg,
+        }, render_stock_card),
+        AGC_CARD,
+        renderer.card('twitter', data.get('tweets', []), render_twitter_card),
+        renderer.card('alerts', data.get('price_alert'), render_alert_card),
+        renderer.card('news', data.get('news', []), render_news_card),
+        STATIC_CARDS,
+        renderer.card('system', {
+            'health': data.get('system_health', {'status': 'ok', 'issues': []}),
+            'price_history_count': data.get('price_history_count', 0),
+        }, render_system_card),
+        LINKS_CARD,
+    ]
+    return PAGE_TEMPLATE.substitute(
+        header=renderer.card('header', data.get('market_sentiment', {}), render_header),
+        cards="\n\n".join(cards),
+        updated_at=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC'),
+    )
 
 def main():
     log("="*50)
     log("Dashboard v3.5 开始更新...")
     
-    dashboard_dir = '/home/ubuntu/dashboard'
+    dashboard_dir = DASHBOARD_DIR
     os.makedirs(dashboard_dir, exist_ok=True)
     
     data_file = f'{dashboard_dir}/data.json'
@@ -795,12 +853,16 @@ def main():
         'updated_at': datetime.now(timezone.utc).isoformat()
     }
     
-    with open(f'{dashboard_dir}/data.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    renderer = DashboardRenderer(dashboard_dir)
+    html = generate_html(data, price_chart_svg, renderer)
+    result = renderer.publish(data, html, ignore=[UPDATED_AT_RE])
     
-    html = generate_html(data, price_chart_svg)
-    with open(f'{dashboard_dir}/index.html', 'w', encoding='utf-8') as f:
-        f.write(html)
+    if not result['changed']:
+        log("✓ 内容无变化，跳过写入")
+    else:
+        log(f"✓ 页面{'已更新' if result['html_changed'] else '无变化'} | "
+            f"变化卡片: {', '.join(result['cards']) or '无'} | 增量版本: {result['version']}")
+    log(f"✓ 卡片缓存命中 {renderer.stats['cache_hits']} / 重新渲染 {renderer.stats['renders']}")
     
     log(f"✓ Dashboard更新完成! 股价: {stock_data['price']} HKD")
     log("="*50)
@@ -9,6 +9,8 @@ import json
 from datetime import datetime
 from typing import List, Dict
 
+from market_calendar import cached_quote, quote_price
+
 class USMarketHotMonitor:
     """美股市场热点监控器"""
     
@@ -29,31 +31,47 @@ class USMarketHotMonitor:
         ]
     
     def get_index_data(self, symbol: str) -> Dict:
-        """获取指数数据"""
+        """获取指数数据 (美股休市时用收盘缓存)"""
+        data = cached_quote('us', f'twelvedata:{symbol}', lambda: self._fetch_index_data(symbol))
+        return data or {'error': '获取失败'}
+    
+    def _fetch_index_data(self, symbol: str) -> Dict:
         try:
             url = f"https://api.twelvedata.com/quote?symbol={symbol}&apikey={self.api_key}"
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
             with urllib.request.urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
+                price = quote_price(data.get('close'))
+                if price is None:
+                    print(f"获取{symbol}数据失败: {data.get('message', '没有收盘价')}")
+                    return None
                 return {
-                    'price': float(data.get('close', 0)),
+                    'price': price,
                     'change': float(data.get('change', 0)),
                     'change_percent': float(data.get('percent_change', 0)),
                     'name': self.indices.get(symbol, {}).get('name', symbol)
                 }
         except Exception as e:
-            return {'error': str(e)}
+            print(f"获取{symbol}数据失败: {e}")
+            return None
     
     def get_stock_data(self, symbol: str) -> Dict:
-        """获取个股数据"""
+        """获取个股数据 (美股休市时用收盘缓存)"""
+        return cached_quote('us', f'twelvedata:{symbol}:stock', lambda: self._fetch_stock_data(symbol))
+    
+    def _fetch_stock_data(self, symbol: str) -> Dict:
         try:
             url = f"https://api.twelvedata.com/quote?symbol={symbol}&apikey={self.api_key}"
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
             with urllib.request.urlopen(req, timeout=10) as resp:
                 data = json.loads(resp.read().decode())
+                price = quote_price(data.get('close'))
+                if price is None:
+                    print(f"获取{symbol}数据失败: {data.get('message', '没有收盘价')}")
+                    return None
                 return {
                     'symbol': symbol,
-                    'price': float(data.get('close', 0)),
+                    'price': price,
                     'change_percent': float(data.get('percent_change', 0)),
                     'volume': int(data.get('volume', 0))
                 }
@@ -10,6 +10,8 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Dict
 
+from market_calendar import cached_quote, quote_price
+
 class USStockHotMonitor:
     """美股热点监控器"""
     
@@ -35,15 +37,22 @@ class USStockHotMonitor:
         }
     
     def get_stock_data(self, symbol: str) -> Dict:
-        """获取股票数据"""
+        """获取股票数据 (美股休市时用收盘缓存)"""
+        return cached_quote('us', f'twelvedata:{symbol}:hot', lambda: self._fetch_stock_data(symbol)) or {}
+    
+    def _fetch_stock_data(self, symbol: str) -> Dict:
         try:
             # 获取价格和变化
             url = f"https://api.twelvedata.com/quote?symbol={symbol}&apikey={self.api_key}"
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
             with urllib.request.urlopen(req, timeout=15) as resp:
                 data = json.loads(resp.read().decode())
+                price = quote_price(data.get('close'))
+                if price is None:
+                    print(f"获取{symbol}数据失败: {data.get('message', '没有收盘价')}")
+                    return None
                 return {
-                    'price': float(data.get('close', 0)),
+                    'price': price,
                     'change': float(data.get('change', 0)),
                     'change_percent': float(data.get('percent_change', 0)),
                     'volume': int(data.get('volume', 0)),
@@ -150,12 +159,13 @@ class USStockHotMonitor:
 
 def main():
     monitor = USStockHotMonitor()
-    print(monitor.generate_report())
+    report = monitor.generate_report()
+    print(report)
     
     # 保存报告
     filename = f"/tmp/us_stock_hot_{datetime.now().strftime('%Y%m%d_%H%M')}.txt"
     with open(filename, 'w', encoding='utf-8') as f:
-        f.write(monitor.generate_report())
+        f.write(report)
     print(f"\n💾 报告已保存: {filename}")
 
 
@@ -4,12 +4,12 @@
 筛选Pump+LetsBonk+Bags，holder≥100，带详细叙事分析
 """
 
-import subprocess
-import re
 import json
 from datetime import datetime
 from typing import List, Dict, Tuple
 
+from xxyy_snapshot_parser import scan_snapshot
+
 class XXYYScanner:
     def __init__(self):
         # 筛选特定平台: Pump + LetsBonk + Bags
@@ -66,107 +66,30 @@ class XXYYScanner:
     
     def scan_page(self) -> List[Dict]:
         print("🪙 扫描 xyy.io/meme...")
-        tokens = []
         
         try:
-            cmd = f"agent-browser snapshot '{self.url}' --timeout {self.timeout}000"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
-            content = result.stdout
-            lines = content.split('\n')
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if 'text:' in line and 'pump' in line and '...' in line:
-                    text_content = line.replace('- text:', '').strip()
-                    match = re.search(r'([A-Za-z0-9]+)\s+([^]+)\s*(\d+)([smhd])\s+([A-Za-z0-9]+\.\.\.pump)', text_content)
-                    
-                    if match:
-                        symbol = match.group(1).strip()
-                        name = match.group(2).strip()
-                        time_val = match.group(3)
-                        time_unit = match.group(4)
-                        
-                        time_seconds = int(time_val)
-                        if time_unit == 'm': time_seconds *= 60
-                        elif time_unit == 'h': time_seconds *= 3600
-                        elif time_unit == 'd': time_seconds *= 86400
-                        
-                        time_ago = f"{time_val}{time_unit}"
-                        
-                        emoji, narrative, strength, analysis = self.analyze_narrative(symbol, name)
-                        
-                        token = {
-                            'symbol': symbol,
-                            'name': name,
-                            'time_ago': time_ago,
-                            'time_seconds': time_seconds,
-                            'emoji': emoji,
-                            'narrative': narrative,
-                            'analysis': analysis,
-                            'strength': strength,
-                            'address_full': None,
-                            'holders': 0,
-                            'mc': 0,
-                        }
-                        
-                        # 查找链接和holder数据
-                        j = i + 1
-                        while j < len(lines) and j < i + 25:
-                            next_line = lines[j].strip()
-                            if 'text:' in next_line and 'pump' in next_line and '...' in next_line:
-                                break
-                            
-                            if '/url:' in next_line:
-                                url_match = re.search(r'/url:\s*(https://[^\s]+)', next_line)
-                                if url_match:
-                                    url = url_match.group(1)
-                                    if 'pump.fun' in url:
-                                        addr_match = re.search(r'/coin/([A-Za-z0-9]+)', url)
-                                        if addr_match:
-                                            token['address_full'] = addr_match.group(1)
-                            
-                            # 抓取holder数量
-                            if next_line == '- term: ':
-                                if j + 1 < len(lines):
-                                    def_line = lines[j + 1].strip()
-                                    holder_match = re.search(r'definition:\s*"(\d+)"', def_line)
-                                    if holder_match:
-                                        token['holders'] = int(holder_match.group(1))
-                            
-                            # 抓取MC
-                            if next_line == '- term: MC':
-                                if j + 1 < len(lines):
-                                    def_line = lines[j + 1].strip()
-                                    mc_match = re.search(r'definition:\s*\$([0-9.]+)([KMB]?)', def_line)
-                                    if mc_match:
-                                        mc_val = float(mc_match.group(1))
-                                        mc_unit = mc_match.group(2)
-                                        if mc_unit == 'K': token['mc'] = mc_val * 1000
-                                        elif mc_unit == 'M': token['mc'] = mc_val * 1000000
-                                        elif mc_unit == 'B': token['mc'] = mc_val * 1000000000
-                                        else: token['mc'] = mc_val
-                            j += 1
-                        
-                        if time_seconds > 60 and token.get('address_full') and token.get('holders', 0) >= self.min_holders:
-                            tokens.append(token)
-                
-                i += 1
-            
-            # 去重
-            seen = set()
-            unique = []
-            for t in tokens:
-                if t['address_full'] not in seen:
-                    seen.add(t['address_full'])
-                    unique.append(t)
-            
-            return unique
-            
+            # 只保留发射>60秒、有完整地址且holder达标的
+            records = scan_snapshot(
+                self.url, self.timeout, window=25,
+                keep=lambda t: t.time_seconds > 60 and t.address_full and t.holders >= self.min_holders
+            )
         except Exception as e:
             print(f"扫描失败: {e}")
             return []
+        
+        tokens = []
+        for record in records:
+            emoji, narrative, strength, analysis = self.analyze_narrative(record.symbol, record.name)
+            token = record.to_dict()
+            token.update({
+                'emoji': emoji,
+                'narrative': narrative,
+                'analysis': analysis,
+                'strength': strength,
+            })
+            tokens.append(token)
+        
+        return tokens
     
     def generate_report(self, tokens: List[Dict]) -> str:
         now = datetime.now()
@@ -6,13 +6,12 @@
 第三步：只推送MC>$35K的币
 """
 
-import subprocess
-import re
-import requests
 import json
 from datetime import datetime
 from typing import List, Dict, Tuple
-import time
+
+from dexscreener_client import default_client
+from xxyy_snapshot_parser import scan_snapshot
 
 class XXYYScannerWithMC:
     """XXYY.io + DexScreener MC查询"""
@@ -21,6 +20,7 @@ class XXYYScannerWithMC:
         self.url = "https://www.xxyy.io/meme?chainId=sol"
         self.timeout = 30
         self.mc_threshold = 35000  # $35K
+        self.dex = default_client()
         
         self.narratives = {
             'ai': {'keywords': ['ai', 'xai', 'grok', 'gpt', 'tech'], 'emoji': '🤖', 'name': 'AI科技'},
@@ -51,97 +51,42 @@ class XXYYScannerWithMC:
         """扫描xxyy.io获取代币列表"""
         print("🕷️ 扫描 xyy.io/meme...")
         
-        tokens = []
         try:
-            cmd = f"agent-browser snapshot '{self.url}' --timeout {self.timeout}000"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
-            content = result.stdout
-            lines = content.split('\n')
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if 'text:' in line and 'pump' in line and '...' in line:
-                    text_content = line.replace('- text:', '').strip()
-                    match = re.search(r'([A-Za-z0-9]+)\s+([^]+)\s*(\d+)([smhd])\s+([A-Za-z0-9]+\.\.\.pump)', text_content)
-                    
-                    if match:
-                        symbol = match.group(1).strip()
-                        name = match.group(2).strip()
-                        time_val = match.group(3)
-                        time_unit = match.group(4)
-                        address_short = match.group(5)
-                        
-                        time_seconds = int(time_val)
-                        if time_unit == 'm': time_seconds *= 60
-                        elif time_unit == 'h': time_seconds *= 3600
-                        elif time_unit == 'd': time_seconds *= 86400
-                        
-                        emoji, narrative, strength = self.analyze_narrative(symbol, name)
-                        
-                        token = {
-                            'symbol': symbol,
-                            'name': name,
-                            'time_ago': f"{time_val}{time_unit}",
-                            'time_seconds': time_seconds,
-                            'address_short': address_short,
-                            'emoji': emoji,
-                            'narrative': narrative,
-                            'strength': strength,
-                            'address_full': None,
-                            'chain': 'sol'
-                        }
-                        
-                        # 查找Pump链接获取完整地址
-                        j = i + 1
-                        while j < len(lines) and j < i + 15:
-                            next_line = lines[j].strip()
-                            if 'text:' in next_line and 'pump' in next_line and '...' in next_line:
-                                break
-                            
-                            if '/url:' in next_line and 'pump.fun' in next_line:
-                                url_match = re.search(r'/url:\s*(https://[^\s]+)', next_line)
-                                if url_match:
-                                    url = url_match.group(1)
-                                    addr_match = re.search(r'/coin/([A-Za-z0-9]+)', url)
-                                    if addr_match:
-                                        token['address_full'] = addr_match.group(1)
-                                        token['pump_url'] = url
-                            
-                            j += 1
-                        
-                        # 只保留发射>60秒且有完整地址的
-                        if time_seconds > 60 and token.get('address_full'):
-                            tokens.append(token)
-                
-                i += 1
-            
-            # 去重
-            seen = set()
-            unique = []
-            for t in tokens:
-                key = t['address_full']
-                if key and key not in seen:
-                    seen.add(key)
-                    unique.append(t)
-            
-            return unique
-            
+            # 只保留发射>60秒且有完整地址的
+            records = scan_snapshot(
+                self.url, self.timeout, window=15,
+                keep=lambda t: t.time_seconds > 60 and t.address_full
+            )
         except Exception as e:
             print(f"❌ xxyy扫描失败: {e}")
             return []
+        
+        tokens = []
+        for record in records:
+            emoji, narrative, strength = self.analyze_narrative(record.symbol, record.name)
+            token = record.to_dict()
+            token.update({
+                'emoji': emoji,
+                'narrative': narrative,
+                'strength': strength,
+                'chain': 'sol'
+            })
+            tokens.append(token)
+        
+        return tokens
+    
+    @staticmethod
+    def _empty_dex_data() -> Dict:
+        """查不到/查询失败时的默认数据 (字段和正常结果一致，filter_by_mc 直接读)"""
+        return {'mc': 0, 'volume_24h': 0, 'liquidity': 0, 'price': 0,
+                'dex': 'Unknown', 'pair_url': ''}
     
     def query_dexscreener(self, address: str) -> Dict:
         """查询DexScreener获取MC数据"""
         try:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{address}"
-            r = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
-            data = r.json()
-            
-            pairs = data.get('pairs', [])
+            pairs = self.dex.get_token_pairs(address)
             if not pairs:
-                return {'mc': 0, 'volume': 0, 'liquidity': 0, 'price': 0}
+                return self._empty_dex_data()
             
             # 取第一个交易对的数据
             pair = pairs[0]
@@ -166,7 +111,7 @@ class XXYYScannerWithMC:
             
         except Exception as e:
             print(f"  ⚠️ DexScreener查询失败: {e}")
-            return {'mc': 0, 'volume': 0, 'liquidity': 0, 'price': 0}
+            return self._empty_dex_data()
     
     def filter_by_mc(self, tokens: List[Dict]) -> List[Dict]:
         """过滤MC>$35K的币"""
@@ -174,11 +119,13 @@ class XXYYScannerWithMC:
         
         qualified = []
         
-        for i, token in enumerate(tokens[:20], 1):  # 只查前20个避免超时
-            print(f"{i}/{min(20, len(tokens))} 查询 {token['symbol']}...", end=' ')
+        # 30个地址一批合并查询，100个币只需4个请求，不再需要截断和逐个sleep
+        self.dex.prefetch(t['address_full'] for t in tokens)
+        
+        for i, token in enumerate(tokens, 1):
+            print(f"{i}/{len(tokens)} 查询 {token['symbol']}...", end=' ')
             
             dex_data = self.query_dexscreener(token['address_full'])
-            time.sleep(0.5)  # 避免请求过快
             
             token['mc'] = dex_data['mc']
             token['volume_24h'] = dex_data['volume_24h']
@@ -4,13 +4,13 @@
 只推holder≥100的币
 """
 
-import subprocess
-import re
 import requests
 import json
 from datetime import datetime
 from typing import List, Dict, Tuple
 
+from xxyy_snapshot_parser import scan_snapshot
+
 class XXYYScanner:
     def __init__(self):
         self.url = "https://www.xxyy.io/meme?chainId=sol"
@@ -49,77 +49,28 @@ class XXYYScanner:
     
     def scan_page(self) -> List[Dict]:
         print("🪙 扫描 xyy.io/meme...")
-        tokens = []
         
         try:
-            cmd = f"agent-browser snapshot '{self.url}' --timeout {self.timeout}000"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
-            content = result.stdout
-            lines = content.split('\n')
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if 'text:' in line and 'pump' in line and '...' in line:
-                    text_content = line.replace('- text:', '').strip()
-                    match = re.search(r'([A-Za-z0-9]+)\s+([^]+)\s*(\d+)([smhd])\s+([A-Za-z0-9]+\.\.\.pump)', text_content)
-                    
-                    if match:
-                        symbol = match.group(1).strip()
-                        name = match.group(2).strip()
-                        time_val = match.group(3)
-                        time_unit = match.group(4)
-                        
-                        time_seconds = int(time_val)
-                        if time_unit == 'm': time_seconds *= 60
-                        elif time_unit == 'h': time_seconds *= 3600
-                        elif time_unit == 'd': time_seconds *= 86400
-                        
-                        emoji, narrative, strength = self.analyze_narrative(symbol, name)
-                        
-                        token = {
-                            'symbol': symbol,
-                            'name': name,
-                            'time_ago': f"{time_val}{time_unit}",
-                            'time_seconds': time_seconds,
-                            'emoji': emoji,
-                            'narrative': narrative,
-                            'address_full': None,
-                        }
-                        
-                        # 查找链接
-                        j = i + 1
-                        while j < len(lines) and j < i + 15:
-                            next_line = lines[j].strip()
-                            if '/url:' in next_line and 'pump.fun' in next_line:
-                                url_match = re.search(r'/url:\s*(https://[^\s]+)', next_line)
-                                if url_match:
-                                    url = url_match.group(1)
-                                    addr_match = re.search(r'/coin/([A-Za-z0-9]+)', url)
-                                    if addr_match:
-                                        token['address_full'] = addr_match.group(1)
-                            j += 1
-                        
-                        # 只保留发射>60秒且有完整地址的
-                        if time_seconds > 60 and token.get('address_full'):
-                            tokens.append(token)
-                
-                i += 1
-            
-            # 去重
-            seen = set()
-            unique = []
-            for t in tokens:
-                if t['address_full'] not in seen:
-                    seen.add(t['address_full'])
-                    unique.append(t)
-            
-            return unique[:15]  # 只处理前15个，避免超时
-            
+            # 只保留发射>60秒且有完整地址的
+            records = scan_snapshot(
+                self.url, self.timeout, window=15,
+                keep=lambda t: t.time_seconds > 60 and t.address_full
+            )
         except Exception as e:
             print(f"扫描失败: {e}")
             return []
+        
+        tokens = []
+        for record in records[:15]:  # 只处理前15个，避免超时
+            emoji, narrative, strength = self.analyze_narrative(record.symbol, record.name)
+            token = record.to_dict()
+            token.update({
+                'emoji': emoji,
+                'narrative': narrative,
+            })
+            tokens.append(token)
+        
+        return tokens
     
     def filter_by_holders(self, tokens: List[Dict]) -> List[Dict]:
         """过滤holder≥100的币"""
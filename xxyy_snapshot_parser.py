@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🕷️ XXYY.io 快照解析器 - 各版本扫描器共用
+agent-browser snapshot 的输出逐行流式读取，单遍状态机解析：
+- 正则全部预编译
+- 不把整个stdout读进内存，也不对每个代币再回扫后面25行
+- 输出带类型的代币记录 SnapshotToken
+"""
+
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# 代币标题行: "SYMBOL Name<图标>5m Abc...pump" (\ue87a 是页面里的时间图标字符)
+HEADER_RE = re.compile(r'([A-Za-z0-9]+)\s+([^\ue87a]+)\ue87a\s*(\d+)([smhd])\s+([A-Za-z0-9]+\.\.\.pump)')
+URL_RE = re.compile(r'/url:\s*(https://[^\s]+)')
+PUMP_COIN_RE = re.compile(r'/coin/([A-Za-z0-9]+)')
+HOLDERS_RE = re.compile(r'definition:\s*"(\d+)"')
+MC_RE = re.compile(r'definition:\s*\$([0-9.]+)([KMB]?)')
+
+TIME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MC_UNITS = {'': 1, 'K': 1000, 'M': 1000000, 'B': 1000000000}
+HOLDERS_TERM = '\ue8bc'  # holder 数那一行的 term 是页面里的人像图标字符，不是空的
+
+
+@dataclass
+class SnapshotToken:
+    """快照里解析出的一个代币"""
+    symbol: str
+    name: str
+    time_ago: str
+    time_seconds: int
+    address_short: str
+    address_full: Optional[str] = None
+    pump_url: Optional[str] = None
+    holders: int = 0
+    mc: float = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def is_header_line(line: str) -> bool:
+    return 'text:' in line and 'pump' in line and '...' in line
+
+
+def parse_header(line: str) -> Optional[SnapshotToken]:
+    match = HEADER_RE.search(line.replace('- text:', '').strip())
+    if not match:
+        return None
+    time_val, time_unit = match.group(3), match.group(4)
+    return SnapshotToken(
+        symbol=match.group(1).strip(),
+        name=match.group(2).strip(),
+        time_ago=f"{time_val}{time_unit}",
+        time_seconds=int(time_val) * TIME_UNITS[time_unit],
+        address_short=match.group(5),
+    )
+
+
+def parse_snapshot(lines: Iterable[str], window: int = 25) -> Iterator[SnapshotToken]:
+    """
+    单遍解析快照行，逐个产出代币
+    window: 标题行之后最多读取多少行属性 (链接/holder/MC)，遇到下一个标题行提前结束
+    """
+    current: Optional[SnapshotToken] = None
+    remaining = 0
+    pending_term = None  # 上一行是 "- term: X" 时，本行是它的 definition
+
+    for raw in lines:
+        line = raw.strip()
+
+        if is_header_line(line):
+            if current:
+                yield current
+            current = parse_header(line)
+            remaining = window
+            pending_term = None
+            continue
+
+        if current is None or remaining <= 0:
+            continue
+        remaining -= 1
+
+        if pending_term is not None:
+            term, pending_term = pending_term, None
+            if term == HOLDERS_TERM:
+                holder_match = HOLDERS_RE.search(line)
+                if holder_match:
+                    current.holders = int(holder_match.group(1))
+            elif term == 'MC':
+                mc_match = MC_RE.search(line)
+                if mc_match:
+                    current.mc = float(mc_match.group(1)) * MC_UNITS[mc_match.group(2)]
+
+        if line.startswith('- term:'):
+            # 图标 term (HOLDERS_TERM) 是 holder 数，"MC" 是市值
+            pending_term = line[len('- term:'):].strip()
+        elif '/url:' in line and 'pump.fun' in line:
+            url_match = URL_RE.search(line)
+            if url_match:
+                addr_match = PUMP_COIN_RE.search(url_match.group(1))
+                if addr_match:
+                    current.address_full = addr_match.group(1)
+                    current.pump_url = url_match.group(1)
+
+    if current:
+        yield current
+
+
+def stream_snapshot(url: str, timeout: int = 30, proc_timeout: int = 60) -> Iterator[str]:
+    """运行 agent-browser snapshot，按行流式读取 stdout"""
+    cmd = ['agent-browser', 'snapshot', url, '--timeout', f'{timeout}000']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True, encoding='utf-8', errors='replace')
+    killer = threading.Timer(proc_timeout, proc.kill)
+    killer.start()
+    try:
+        for line in proc.stdout:
+            yield line
+    finally:
+        killer.cancel()
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def scan_snapshot(url: str, timeout: int = 30, window: int = 25,
+                  keep: Callable[[SnapshotToken], bool] = lambda t: True,
+                  lines: Optional[Iterable[str]] = None) -> List[SnapshotToken]:
+    """
+    抓取并解析页面，按完整地址去重，只保留 keep() 为真的代币
+    lines 可直接传入已有的快照行 (测试/离线解析用)
+    """
+    source = lines if lines is not None else stream_snapshot(url, timeout)
+    seen = set()
+    tokens = []
+    for token in parse_snapshot(source, window):
+        if not keep(token) or token.address_full in seen:
+            continue
+        seen.add(token.address_full)
+        tokens.append(token)
+    return tokens
@@ -8,6 +8,8 @@ import subprocess
 import re
 from datetime import datetime
 
+from search_index import index_news
+
 class ZhitongCombinedMonitor:
     """智通财经合并监控"""
     
@@ -86,6 +88,7 @@ class ZhitongCombinedMonitor:
         ]
         
         all_news, tech_news = self.fetch_news()
+        index_news([dict(item, source='智通财经') for item in tech_news + all_news])
         
         # 科技板块（优先显示）
         if tech_news: